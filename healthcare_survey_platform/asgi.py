@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare_survey_platform.settings')
 
-application = get_asgi_application()
+# As get_asgi_application(), with a handler that serves the live counter
+# event streams on the event loop
+django.setup(set_prefix=False)
+
+from survey_management.live import LiveASGIHandler  # noqa: E402
+
+application = LiveASGIHandler()
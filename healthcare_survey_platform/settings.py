@@ -12,10 +12,14 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 
 import os
 from pathlib import Path
+from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Environment variables may also come from a .env file next to manage.py
+load_dotenv(BASE_DIR / '.env')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.1/howto/deployment/checklist/
@@ -46,13 +50,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'survey_management.middleware.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'survey_management.middleware.profiling.RequestProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'survey_management.middleware.audit.AuditFlushMiddleware',
+    'survey_management.middleware.audit.ReadAuditMiddleware',
+    'survey_management.middleware.replica.StickyPrimaryMiddleware',
 ]
 
 ROOT_URLCONF = 'healthcare_survey_platform.urls'
@@ -79,13 +88,111 @@ WSGI_APPLICATION = 'healthcare_survey_platform.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE selects 'sqlite' (default) or 'postgresql'. PostgreSQL keeps
+# connections open for DB_CONN_MAX_AGE seconds (health-checked before reuse);
+# behind a transaction-pooling PgBouncer set DB_DISABLE_SERVER_SIDE_CURSORS=1.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'healthcare_survey_platform'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', '0') == '1',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+                'sslmode': os.environ.get('DB_SSLMODE', 'prefer'),
+            },
+            'TEST': {
+                'NAME': os.environ.get('DB_TEST_NAME', 'test_healthcare_survey_platform'),
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+            'OPTIONS': {
+                # Seconds the driver waits for a lock before raising "database is locked"
+                'timeout': int(os.environ.get('DB_BUSY_TIMEOUT', 20)),
+            },
+        }
+    }
+
+# Applied to every new SQLite connection (see survey_management.signals).
+# The busy timeout is set by OPTIONS['timeout'] above, not a PRAGMA.
+SURVEY_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
 }
 
+# Optional read replica. Analytics, exports and list endpoints read from
+# SURVEY_READ_DATABASE when it exists (see survey_management.db_router);
+# users who wrote in the last SURVEY_DB_STICKY_SECONDS stay on the primary.
+# The mark is a signed cookie plus a cache entry; clients without cookies
+# (API keys) need a shared cache (CACHE_URL) for it to reach every process.
+# PostgreSQL: DB_REPLICA_HOST names the standby. SQLite: DB_REPLICA_NAME
+# names a second file refreshed with `manage.py sync_sqlite_replica`.
+if DB_ENGINE == 'postgresql' and os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        HOST=os.environ['DB_REPLICA_HOST'],
+        PORT=os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        TEST={'MIRROR': 'default'},
+    )
+elif DB_ENGINE != 'postgresql' and os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        NAME=BASE_DIR / os.environ['DB_REPLICA_NAME'],
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['survey_management.db_router.ReadReplicaRouter']
+SURVEY_READ_DATABASE = 'replica'
+SURVEY_DB_STICKY_SECONDS = int(os.environ.get('DB_STICKY_SECONDS', 5))
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+# CACHE_URL selects a cache shared by every process: redis://host:6379/0
+# (needs the redis package) or memcached://host:11211 (needs pymemcache).
+# API-key revocation, sticky primary reads, 'cache' throttle buckets and the
+# shared tier of SURVEY_TIERED_CACHE go through it. Without CACHE_URL each
+# process has its own memory cache, so those only take effect in the process
+# that made the change and reach the others when their local TTLs expire.
+CACHE_URL = os.environ.get('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith('memcached://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_URL[len('memcached://'):],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'healthcare-survey-platform',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -129,6 +236,7 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'survey_management.authentication.APIKeyAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.TokenAuthentication',
     ],
@@ -147,9 +255,170 @@ SWAGGER_SETTINGS = {
             'type': 'apiKey',
             'name': 'Authorization',
             'in': 'header'
+        },
+        'ApiKey': {
+            'type': 'apiKey',
+            'name': 'X-API-Key',
+            'in': 'header'
         }
     }
 }
 
 # Email settings (for survey notifications)
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
\ No newline at end of file
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
+
+# Maximum number of trigger events accepted in one ingestion request
+SURVEY_EVENT_BATCH_LIMIT = 5000
+
+# Bulk survey assignment: users resolved and responses created per chunk
+SURVEY_ASSIGNMENT_CHUNK_SIZE = 1000
+SURVEY_BULK_ASSIGN_ASYNC = True
+
+# Notifications are queued in an outbox and delivered by
+# `python manage.py run_notification_worker` instead of in the request
+SURVEY_ASYNC_NOTIFICATIONS = True
+SURVEY_NOTIFICATION_WORKERS = 4
+SURVEY_NOTIFICATION_BATCH_SIZE = 100
+SURVEY_NOTIFICATION_MAX_ATTEMPTS = 5
+SURVEY_NOTIFICATION_BACKOFF_SECONDS = 30
+SURVEY_NOTIFICATION_MAX_BACKOFF_SECONDS = 3600
+
+# Messages per second (and burst size) per channel
+SURVEY_NOTIFICATION_RATE_LIMITS = {
+    'EMAIL': 20,
+    'SMS': 5,
+}
+
+# SMS provider; use survey_management.services.sms_backends.LocmemSMSBackend in tests
+SURVEY_SMS_BACKEND = 'survey_management.services.sms_backends.ConsoleSMSBackend'
+
+# Audit entries are buffered and written in bulk. MODE is 'thread' (background
+# flush), 'request' (flush at request end) or 'sync' (write immediately).
+# Set SPILL_PATH to keep a local journal that is replayed after a crash.
+SURVEY_AUDIT_WRITER = {
+    'MODE': 'thread',
+    'MAX_BATCH': 500,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_BUFFER': 10000,
+    'SPILL_PATH': os.environ.get('SURVEY_AUDIT_SPILL_PATH'),
+}
+
+# Reverse proxies (addresses or networks) in front of the app. Audit entries
+# record REMOTE_ADDR, and only read X-Forwarded-For when the request came
+# through one of these; the header is otherwise set by the client.
+SURVEY_TRUSTED_PROXIES = [proxy.strip() for proxy in os.environ.get('SURVEY_TRUSTED_PROXIES', '').split(',')
+                          if proxy.strip()]
+
+# Audit partitions older than SURVEY_AUDIT_HOT_DAYS are moved to compressed
+# archive segments by `python manage.py archive_audit_logs`
+SURVEY_AUDIT_HOT_DAYS = 90
+SURVEY_AUDIT_ARCHIVE_DIR = os.environ.get('SURVEY_AUDIT_ARCHIVE_DIR', os.path.join(BASE_DIR, 'audit_archive'))
+
+# READ audit entries for PHI endpoints, keyed by URL name. Rules either sample
+# reads (sample_rate) or log every one (always); sampled reads of the same
+# object by the same user are coalesced within COALESCE_SECONDS.
+SURVEY_READ_AUDIT = {
+    'ENABLED': True,
+    'COALESCE_SECONDS': 300,
+    'RULES': {
+        'response-detail': {'sample_rate': 1.0},
+        'response-list': {'sample_rate': 0.1},
+        'responseitem-detail': {'sample_rate': 1.0},
+        'responseitem-list': {'sample_rate': 0.1},
+        'survey-export-responses': {'always': True},
+        'survey-export': {'always': True},
+    },
+}
+
+# Resolved role/permission/department contexts are cached per user; profile
+# and survey department changes invalidate them
+SURVEY_AUTHZ_CACHE_SECONDS = 300
+
+# Integrator API keys are stored as an HMAC with this secret plus a lookup
+# prefix. Verified keys are cached in memory for TTL seconds; rotating or
+# revoking a key, changing its role or deactivating its user evicts it in
+# every process through CACHES (see CACHE_URL; locally only without one).
+SURVEY_API_KEY_SECRET = os.environ.get('SURVEY_API_KEY_SECRET', SECRET_KEY)
+SURVEY_API_KEY_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 60,
+}
+
+# Token-bucket throttles per viewset action ('<throttle_scope>.<action>'):
+# rate is tokens per second, burst the bucket size; roles override both.
+# BACKEND 'cache' shares buckets between processes through CACHES.
+SURVEY_THROTTLES = {
+    'BACKEND': 'local',
+    'RATES': {
+        'responses.submit': {'rate': 1, 'burst': 10,
+                             'roles': {'PATIENT': {'rate': 0.2, 'burst': 5}}},
+        'responses.create': {'rate': 1, 'burst': 10},
+        'responses.draft': {'rate': 1, 'burst': 10},
+        # Autosave sends one PATCH per edit
+        'responses.answers': {'rate': 5, 'burst': 30},
+        'responses.finalize': {'rate': 1, 'burst': 10,
+                               'roles': {'PATIENT': {'rate': 0.2, 'burst': 5}}},
+        'schedules.trigger_manually': {'rate': 0.2, 'burst': 5},
+        'surveys.assign_survey': {'rate': 2, 'burst': 20},
+        'surveys.bulk_assign': {'rate': 0.1, 'burst': 3},
+        'surveys.export_responses': {'rate': 0.2, 'burst': 5},
+        'events.ingest': {'rate': 5, 'burst': 20},
+    },
+}
+
+# Completed responses store their answers in one packed JSON column so
+# exports and serializers need no ResponseItem join. Analytics aggregate
+# the item rows in SQL; with KEEP_ITEMS False the item rows of packed
+# responses are deleted and analytics read their packed answers instead.
+# `manage.py pack_responses` converts historical responses in batches.
+SURVEY_PACKED_ANSWERS = {
+    'ENABLED': True,
+    'KEEP_ITEMS': True,
+}
+
+# Survey definitions, the department list and profiles are cached in process
+# memory in front of CACHES, under versions bumped by model signals. Other
+# processes see a bump within VERSION_TTL seconds; a miss is recomputed by
+# one thread/process while the others wait up to LOCK_WAIT seconds.
+SURVEY_TIERED_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'LOCAL_MAX_SIZE': 1000,
+    'LOCAL_TTL': 300,
+    'SHARED_TTL': 3600,
+    'VERSION_TTL': 1,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2,
+}
+
+# Per-route latency, query-count and response-size histograms, exposed in
+# Prometheus format at /api/metrics/. Requests running more than
+# QUERY_BUDGET queries are logged with their most repeated statements.
+SURVEY_METRICS = {
+    'ENABLED': True,
+    'QUERY_BUDGET': int(os.environ.get('SURVEY_QUERY_BUDGET', 50)),
+    'TOP_STATEMENTS': 5,
+    'MAX_SERIES': 500,
+}
+
+# On-demand request profiling. Admins send the X-Profile header to profile
+# one request; SAMPLE_RATE profiles a share of all requests. Profiles keep
+# collapsed stacks plus the SQL run and are listed at /api/profiles/.
+# When disabled the middleware removes itself at startup.
+SURVEY_PROFILING = {
+    'ENABLED': os.environ.get('SURVEY_PROFILING_ENABLED', '0') == '1',
+    'SAMPLE_RATE': float(os.environ.get('SURVEY_PROFILING_SAMPLE_RATE', 0)),
+    'MODE': 'statistical',
+    'MAX_PROFILES': 200,
+    'MAX_AGE_DAYS': 7,
+}
+
+# Live response counters streamed to dashboards at /api/analytics/live/ as
+# Server-Sent Events. Counters are kept in process memory, updated by the
+# submit path and reloaded from the database every RESEED_SECONDS. Under
+# ASGI the streams need asgi.py's LiveASGIHandler; under WSGI each open
+# stream holds a worker thread.
+SURVEY_LIVE_COUNTERS = {
+    'HEARTBEAT_SECONDS': 15,
+    'RESEED_SECONDS': 60,
+    'MAX_SUBSCRIBERS': 5000,
+}
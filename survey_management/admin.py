@@ -2,8 +2,12 @@ from django.contrib import admin
 from survey_management.models.survey import Survey, Question, QuestionOption
 from survey_management.models.response import Response, ResponseItem
 from survey_management.models.department import Department
-from survey_management.models.schedule import SurveySchedule
+from survey_management.models.schedule import SurveySchedule, ScheduledDelivery
 from survey_management.models.audit import AuditLog
+from survey_management.models.assignment import AssignmentJob
+from survey_management.models.notification import NotificationOutbox
+from survey_management.models.reminder import ReminderPolicy
+from survey_management.models.profiling import RequestProfile
 
 class QuestionOptionInline(admin.TabularInline):
     model = QuestionOption
@@ -29,7 +33,7 @@ class QuestionAdmin(admin.ModelAdmin):
 
 @admin.register(Response)
 class ResponseAdmin(admin.ModelAdmin):
-    list_display = ('survey', 'respondent', 'submitted_at', 'is_complete')
+    list_display = ('survey', 'respondent', 'submitted_at', 'is_complete', 'reminders_sent')
     list_filter = ('is_complete', 'submitted_at')
     search_fields = ('survey__title', 'respondent__username')
 
@@ -59,9 +63,54 @@ class SurveyScheduleAdmin(admin.ModelAdmin):
     list_filter = ('trigger_event', 'is_active')
     search_fields = ('survey__title', 'trigger_event')
 
+@admin.register(ScheduledDelivery)
+class ScheduledDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('schedule', 'user', 'event_type', 'deliver_at', 'status')
+    list_filter = ('status', 'event_type')
+    search_fields = ('user__username', 'event_id')
+    raw_id_fields = ('schedule', 'user')
+
+@admin.register(AssignmentJob)
+class AssignmentJobAdmin(admin.ModelAdmin):
+    list_display = ('survey', 'requested_by', 'status', 'processed', 'assigned', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('processed', 'assigned', 'skipped', 'not_found', 'error',
+                       'started_at', 'finished_at')
+
+@admin.register(ReminderPolicy)
+class ReminderPolicyAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'survey', 'schedule', 'max_reminders', 'is_active')
+    list_filter = ('is_active',)
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'channel', 'kind', 'status', 'attempts', 'next_attempt_at')
+    list_filter = ('status', 'channel', 'kind')
+    search_fields = ('recipient', 'user__username')
+    raw_id_fields = ('user', 'survey')
+    actions = ['requeue']
+    
+    def requeue(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.filter(status='DEAD').update(
+            status='PENDING', attempts=0, next_attempt_at=timezone.now(), last_error=''
+        )
+        self.message_user(request, f"Requeued {updated} dead-letter notifications")
+    requeue.short_description = 'Requeue dead-letter notifications'
+
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ('user', 'action', 'timestamp', 'ip_address')
     list_filter = ('action', 'timestamp')
     search_fields = ('user__username', 'action', 'details')
-    readonly_fields = ('user', 'action', 'details', 'timestamp', 'ip_address')
+    readonly_fields = ('user', 'action', 'details', 'timestamp', 'ip_address', 'period')
+    list_select_related = ('user',)
+    date_hierarchy = 'timestamp'
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('method', 'route', 'status_code', 'trigger', 'duration_ms', 'query_count', 'created_at')
+    list_filter = ('trigger', 'mode', 'method')
+    search_fields = ('path', 'route', 'user__username')
+    raw_id_fields = ('user',)
+    readonly_fields = ('collapsed_stacks', 'queries')
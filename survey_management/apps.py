@@ -6,4 +6,5 @@ class SurveyManagementConfig(AppConfig):
     name = 'survey_management'
 
     def ready(self):
+        import survey_management.checks
         import survey_management.signals
@@ -0,0 +1,64 @@
+import inspect
+from asgiref.sync import sync_to_async
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.views import APIView
+from survey_management.db_router import activate, deactivate, wrote_recently
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose HTTP handlers are coroutines, served natively under ASGI
+
+    DRF dispatches synchronously, so this view replaces dispatch(). The
+    preamble (authentication, permission checks and throttling) reads the
+    cache and the database, so it runs in one worker thread. The handler is
+    then awaited on the event loop and uses the async ORM; it offloads any
+    other blocking call with sync_to_async. Exceptions are turned into
+    responses by DRF's exception handler as usual.
+
+    ``action`` and ``throttle_scope`` play the same role as on a viewset, so
+    the existing permission classes and SURVEY_THROTTLES rules apply
+    unchanged. With ``use_replica``, safe-method reads go to the read alias
+    unless the user wrote recently, as with ReadReplicaMixin.
+    """
+    action = None
+    use_replica = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        self.read_target = None
+
+        token = None
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            method = request.method.lower()
+            handler = getattr(self, method, None) if method in self.http_method_names else None
+            if handler is None:
+                self.http_method_not_allowed(request, *args, **kwargs)
+
+            if self.read_target is not None:
+                token = activate(self.read_target)
+            response = handler(request, *args, **kwargs)
+            # options() is inherited from APIView and stays synchronous
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        finally:
+            if token is not None:
+                deactivate(token)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.use_replica and request.method in SAFE_METHODS:
+            user = request.user
+            sticky = user is not None and user.is_authenticated and wrote_recently(user.pk, request)
+            self.read_target = 'primary' if sticky else 'replica'
@@ -0,0 +1,131 @@
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework import authentication, exceptions
+from survey_management.models.user import API_KEY_PREFIX_LENGTH, hash_api_key
+
+REVOCATION_KEY = 'survey:apikey:generation'
+
+
+class APIKeyCache:
+    """
+    Bounded, thread-safe LRU cache of resolved API-key principals
+
+    Entries are keyed by the key's hash, expire after ttl seconds and are
+    dropped when the key's revocation generation in the shared cache
+    moves. With a cache shared between processes (CACHES) a revoked key
+    stops working everywhere at its next request; with the per-process
+    default, other processes keep it for at most ttl seconds.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key_hash, generation):
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                return None
+            user, entry_generation, expires_at = entry
+            if entry_generation != generation or expires_at <= time.monotonic():
+                del self._entries[key_hash]
+                return None
+            self._entries.move_to_end(key_hash)
+            return user
+
+    def set(self, key_hash, user, generation):
+        with self._lock:
+            self._entries[key_hash] = (user, generation, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, key_hash):
+        with self._lock:
+            self._entries.pop(key_hash, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _build_cache():
+    config = getattr(settings, 'SURVEY_API_KEY_CACHE', {})
+    return APIKeyCache(max_size=config.get('MAX_SIZE', 1024), ttl=config.get('TTL', 60))
+
+
+api_key_cache = _build_cache()
+
+
+def revocation_key(key_hash):
+    return f'{REVOCATION_KEY}:{key_hash}'
+
+
+def revoke_cached_api_key(key_hash):
+    """Drop a key's cached principal in this and, through the shared cache, every other process"""
+    api_key_cache.evict(key_hash)
+    try:
+        cache.incr(revocation_key(key_hash))
+    except ValueError:
+        cache.set(revocation_key(key_hash), 1, None)
+
+
+class APIKeyAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates integrators by API key
+
+    Clients send ``Authorization: Api-Key <key>`` or ``X-API-Key: <key>``.
+    Keys are looked up by their indexed prefix and verified against the
+    stored keyed hash; verified principals are cached in memory so
+    repeated calls need no database query.
+    """
+    keyword = 'Api-Key'
+
+    def get_key(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if auth and auth[0].lower() == self.keyword.lower().encode():
+            if len(auth) != 2:
+                raise exceptions.AuthenticationFailed('Invalid API key header.')
+            try:
+                return auth[1].decode()
+            except UnicodeError:
+                raise exceptions.AuthenticationFailed('Invalid API key header.')
+        return request.META.get('HTTP_X_API_KEY') or None
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        key_hash = hash_api_key(key)
+        generation = cache.get(revocation_key(key_hash), 0)
+        user = api_key_cache.get(key_hash, generation)
+        if user is None:
+            user = self.resolve(key, key_hash)
+            api_key_cache.set(key_hash, user, generation)
+
+        # The key prefix identifies the key (e.g. for throttling) without revealing it
+        return (user, key[:API_KEY_PREFIX_LENGTH])
+
+    def resolve(self, key, key_hash):
+        """Find the active integrator owning a key"""
+        candidates = User.objects.select_related('profile').filter(
+            profile__api_key_prefix=key[:API_KEY_PREFIX_LENGTH],
+            profile__role='INTEGRATOR'
+        )
+        for user in candidates:
+            if hmac.compare_digest(user.profile.api_key_hash or '', key_hash):
+                if not user.is_active:
+                    raise exceptions.AuthenticationFailed('User inactive or deleted.')
+                return user
+        raise exceptions.AuthenticationFailed('Invalid API key.')
+
+    def authenticate_header(self, request):
+        return self.keyword
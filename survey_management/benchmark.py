@@ -0,0 +1,352 @@
+import asyncio
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from http.cookiejar import CookieJar
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models import Count
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from survey_management.metrics import QueryRecorder, record_context_queries, stop_recording_context_queries
+from survey_management.models.survey import Survey
+
+
+class Scenario:
+    """
+    One benchmarked request: who sends it, how, and to which URL
+
+    async_path names the native async endpoint answering the same request,
+    used instead of path when benchmarking an ASGI deployment.
+    """
+
+    def __init__(self, name, role, method, path, payload=None, async_path=None):
+        self.name = name
+        self.role = role
+        self.method = method
+        self.path = path
+        self.payload = payload
+        self.async_path = async_path
+
+    def path_for(self, asgi=False):
+        return self.async_path if asgi and self.async_path else self.path
+
+
+def build_scenarios(survey):
+    """The main endpoints, exercised against one survey"""
+    answers = []
+    for question in survey.questions.prefetch_related('options'):
+        answer = {'question_id': str(question.id)}
+        if question.question_type == 'RATING':
+            answer['numeric_answer'] = '4'
+        elif question.question_type == 'BOOLEAN':
+            answer['numeric_answer'] = '1'
+        elif question.question_type == 'MULTIPLE_CHOICE':
+            option = question.options.first()
+            if option is None:
+                continue
+            answer['option_id'] = str(option.id)
+        else:
+            answer['text_answer'] = 'Benchmark answer'
+        answers.append(answer)
+
+    return [
+        Scenario('submit', 'patient', 'POST', '/api/responses/submit/',
+                 {'survey_id': survey.id, 'answers': answers}, '/api/async/responses/submit/'),
+        Scenario('survey_definition', 'patient', 'GET', f'/api/surveys/{survey.id}/definition/',
+                 async_path=f'/api/async/surveys/{survey.id}/definition/'),
+        Scenario('list_responses_staff', 'staff', 'GET', '/api/responses/'),
+        Scenario('list_responses_admin', 'admin', 'GET', '/api/responses/'),
+        Scenario('export', 'admin', 'GET', f'/api/surveys/{survey.id}/export_responses/'),
+        Scenario('analytics_completion_rates', 'admin', 'GET', '/api/analytics/completion_rates/',
+                 async_path='/api/async/analytics/completion_rates/'),
+        Scenario('analytics_rating_averages', 'admin', 'GET', '/api/analytics/rating_averages/',
+                 async_path='/api/async/analytics/rating_averages/'),
+        Scenario('analytics_response_trends', 'admin', 'GET', '/api/analytics/response_trends/',
+                 async_path='/api/async/analytics/response_trends/'),
+        Scenario('analytics_multiple_choice_distribution', 'admin', 'GET',
+                 f'/api/analytics/{survey.id}/multiple_choice_distribution/',
+                 async_path=f'/api/async/analytics/{survey.id}/multiple_choice_distribution/'),
+    ]
+
+
+def pick_users():
+    """An admin, a department staff member and a patient from the current database"""
+    users = {
+        'admin': User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first(),
+        'staff': User.objects.filter(profile__role='STAFF', profile__department__isnull=False,
+                                     is_active=True).order_by('pk').first(),
+        'patient': User.objects.filter(profile__role='PATIENT', is_active=True).order_by('pk').first(),
+    }
+    missing = [role for role, user in users.items() if user is None]
+    if missing:
+        raise ValueError(f"No {', '.join(missing)} user found; run generate_synthetic_data first")
+    return users
+
+
+def pick_survey(survey_id=None):
+    """The given survey, or the active survey with the most responses"""
+    surveys = Survey.objects.filter(is_active=True)
+    if survey_id is not None:
+        return surveys.get(pk=survey_id)
+    survey = surveys.annotate(response_total=Count('responses')).order_by('-response_total').first()
+    if survey is None:
+        raise ValueError('No active survey found; run generate_synthetic_data first')
+    return survey
+
+
+class InProcessDriver:
+    """Sends requests through the Django test client (the WSGI handler) and counts their queries"""
+
+    counts_queries = True
+    is_async = False
+
+    def __init__(self, users):
+        self.users = users
+        self._local = threading.local()
+
+    def client(self, role):
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if role not in clients:
+            # Server errors are counted like over HTTP instead of raised
+            client = Client(raise_request_exception=False)
+            client.force_login(self.users[role])
+            clients[role] = client
+        return clients[role]
+
+    def send(self, scenario):
+        client = self.client(scenario.role)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            if scenario.method == 'POST':
+                response = client.post(scenario.path, scenario.payload, content_type='application/json')
+            else:
+                response = client.get(scenario.path)
+        return response.status_code, recorder.count
+
+    def settings_override(self):
+        # Benchmarks measure endpoints, not the throttles in front of them
+        return override_settings(ALLOWED_HOSTS=['*'], SURVEY_THROTTLES={'BACKEND': 'local', 'RATES': {}})
+
+
+class ASGIInProcessDriver(InProcessDriver):
+    """
+    Sends requests through Django's ASGI handler to the native async endpoints
+
+    Each request gets its own ThreadSensitiveContext, as under an ASGI
+    server, so the synchronous parts of concurrent requests do not queue
+    for a single thread. Queries run in worker threads and are counted
+    through the context recorder.
+    """
+
+    is_async = True
+
+    def __init__(self, users):
+        super().__init__(users)
+        # Logging in is synchronous, so it happens before the event loop starts
+        self.clients = {}
+        for role, user in users.items():
+            self.clients[role] = AsyncClient(raise_request_exception=False)
+            self.clients[role].force_login(user)
+
+    async def send(self, scenario):
+        client = self.clients[scenario.role]
+        path = scenario.path_for(asgi=True)
+        recorder = QueryRecorder()
+        token = record_context_queries(recorder)
+        try:
+            async with ThreadSensitiveContext():
+                if scenario.method == 'POST':
+                    response = await client.post(path, scenario.payload, content_type='application/json')
+                else:
+                    response = await client.get(path)
+        finally:
+            stop_recording_context_queries(token)
+        return response.status_code, recorder.count
+
+
+class HTTPDriver:
+    """
+    Sends requests to a running server, logging in through the session login form
+
+    Query counts are not visible from outside the server process; use
+    /api/metrics/ on the server for them.
+    """
+
+    counts_queries = False
+    is_async = False
+
+    def __init__(self, base_url, credentials, asgi=False):
+        self.base_url = base_url.rstrip('/')
+        self.credentials = credentials
+        self.asgi = asgi
+        self._local = threading.local()
+
+    def opener(self, role):
+        openers = getattr(self._local, 'openers', None)
+        if openers is None:
+            openers = self._local.openers = {}
+        if role not in openers:
+            openers[role] = self.login(*self.credentials[role])
+        return openers[role]
+
+    def login(self, username, password):
+        jar = CookieJar()
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+        login_url = f"{self.base_url}/api/auth/login/"
+        opener.open(login_url).read()
+        body = urllib.parse.urlencode({
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': self._csrf_token(jar),
+            'next': '/api/',
+        }).encode()
+        opener.open(urllib.request.Request(login_url, data=body, headers={'Referer': login_url})).read()
+        opener.jar = jar
+        return opener
+
+    def _csrf_token(self, jar):
+        return next((cookie.value for cookie in jar if cookie.name == 'csrftoken'), '')
+
+    def send(self, scenario):
+        opener = self.opener(scenario.role)
+        data, headers = None, {}
+        if scenario.method == 'POST':
+            data = json.dumps(scenario.payload).encode()
+            headers = {'Content-Type': 'application/json', 'X-CSRFToken': self._csrf_token(opener.jar),
+                       'Referer': self.base_url}
+        url = f"{self.base_url}{scenario.path_for(self.asgi)}"
+        request = urllib.request.Request(url, data=data, headers=headers, method=scenario.method)
+        try:
+            with opener.open(request) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as error:
+            return error.code, None
+
+    def settings_override(self):
+        return nullcontext()
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_scenario(driver, scenario, iterations, warmup=2, concurrency=1):
+    """
+    Run one scenario and summarise its latency, throughput and queries
+
+    Returns:
+        Dictionary with request count, error count, p50/p95/p99/mean latency
+        in milliseconds, requests per second and mean queries per request
+    """
+    if driver.is_async:
+        samples, elapsed = asyncio.run(_run_async(driver, scenario, iterations, warmup, concurrency))
+        return summarise(samples, elapsed)
+
+    for _ in range(warmup):
+        driver.send(scenario)
+
+    samples = []
+
+    def timed():
+        start = time.perf_counter()
+        status, queries = driver.send(scenario)
+        samples.append((time.perf_counter() - start, status, queries))
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(timed) for _ in range(iterations)]:
+                future.result()
+    else:
+        for _ in range(iterations):
+            timed()
+    elapsed = time.perf_counter() - started
+    return summarise(samples, elapsed)
+
+
+async def _run_async(driver, scenario, iterations, warmup, concurrency):
+    """Send the scenario from up to concurrency coroutines on one event loop"""
+    for _ in range(warmup):
+        await driver.send(scenario)
+
+    samples = []
+    slots = asyncio.Semaphore(max(concurrency, 1))
+
+    async def timed():
+        async with slots:
+            start = time.perf_counter()
+            status, queries = await driver.send(scenario)
+            samples.append((time.perf_counter() - start, status, queries))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[timed() for _ in range(iterations)])
+    return samples, time.perf_counter() - started
+
+
+def summarise(samples, elapsed):
+    """Latency percentiles, throughput and mean queries of (duration, status, queries) samples"""
+    latencies = [duration * 1000 for duration, _, _ in samples]
+    queries = [count for _, _, count in samples if count is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status >= 400),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'queries': round(sum(queries) / len(queries), 1) if queries else None,
+    }
+
+
+def throughput_changes(results, baseline):
+    """
+    Throughput of every scenario against the baseline, e.g. an ASGI run against a WSGI run
+
+    Returns:
+        List of human-readable lines with both rates and their ratio
+    """
+    changes = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None or not previous.get('throughput_rps') or current['throughput_rps'] is None:
+            continue
+        ratio = current['throughput_rps'] / previous['throughput_rps']
+        changes.append(f"{name}: {previous['throughput_rps']} -> {current['throughput_rps']} req/s ({ratio:.2f}x)")
+    return changes
+
+
+def compare_to_baseline(results, baseline, threshold=0.2):
+    """
+    Scenarios whose p95 latency grew by more than threshold, or whose query count grew
+
+    Returns:
+        List of human-readable regression descriptions
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if previous.get('queries') is not None and current.get('queries') is not None \
+                and current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
@@ -0,0 +1,236 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_TIERED_CACHE = {
+    'CACHE_ALIAS': 'default',
+    # Entries kept in process memory before the least recently used are dropped
+    'LOCAL_MAX_SIZE': 1000,
+    'LOCAL_TTL': 300,
+    'SHARED_TTL': 3600,
+    # Seconds a process trusts its copy of a version before re-reading the shared one
+    'VERSION_TTL': 1,
+    # Seconds a recomputation holds its lock, and that other processes wait for its result
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2,
+}
+
+_MISSING = object()
+
+
+def get_tiered_cache_config():
+    config = dict(DEFAULT_TIERED_CACHE)
+    config.update(getattr(settings, 'SURVEY_TIERED_CACHE', {}))
+    return config
+
+
+class TieredCache:
+    """
+    In-process LRU in front of a shared Django cache, with versioned keys
+
+    Every entry belongs to a (namespace, key) pair whose version lives in
+    the shared cache; bump() moves the version so old entries are never
+    read again on any process. Versions are the millisecond time of the
+    last bump, so they also serve as Last-Modified values. Misses are recomputed once: threads of a
+    process wait on a per-key lock and processes on a shared add() lock.
+
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, alias='default', local_max_size=1000, local_ttl=300, shared_ttl=3600,
+                 version_ttl=1, lock_timeout=10, lock_wait=2):
+        self.shared = caches[alias]
+        self.local_max_size = local_max_size
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self.version_ttl = version_ttl
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+        self._local = OrderedDict()
+        self._versions = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _version_key(self, namespace, key):
+        return f"survey:tiered:{namespace}:{key}:version"
+
+    def _new_version(self):
+        # Time-based so a version evicted from the shared cache never reuses an old number
+        return int(time.time() * 1000)
+
+    def version(self, namespace, key, strict=False):
+        """Current version of (namespace, key); strict skips the process-local copy"""
+        version_key = self._version_key(namespace, key)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(version_key)
+        if not strict and cached is not None and now - cached[1] < self.version_ttl:
+            return cached[0]
+
+        version = self.shared.get(version_key)
+        if version is None:
+            self.shared.add(version_key, self._new_version(), None)
+            version = self.shared.get(version_key)
+        with self._lock:
+            self._versions[version_key] = (version, now)
+        return version
+
+    def bump(self, namespace, key='all'):
+        """Invalidate every cached value of a (namespace, key) pair"""
+        version_key = self._version_key(namespace, key)
+        now = self._new_version()
+        try:
+            # incr() guarantees a new version even if two bumps share a millisecond
+            version = self.shared.incr(version_key)
+        except ValueError:
+            version = None
+        if version is None or version < now:
+            version = now
+            self.shared.set(version_key, version, None)
+        with self._lock:
+            self._versions[version_key] = (version, time.monotonic())
+
+    def get_or_set(self, namespace, key, compute, strict=False):
+        """
+        Return the cached value of (namespace, key), computing it once on a miss
+
+        With strict, a bump made by another process within VERSION_TTL is
+        seen as well, at the cost of one shared-cache read.
+        """
+        full_key = f"survey:tiered:{namespace}:{key}:v{self.version(namespace, key, strict)}"
+
+        value = self._local_get(full_key)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            flight = self._flights.setdefault(full_key, threading.Lock())
+        try:
+            with flight:
+                # A thread that held the lock before us may have filled the entry
+                value = self._local_get(full_key)
+                if value is _MISSING:
+                    value = self.shared.get(full_key, _MISSING)
+                    if value is _MISSING:
+                        value = self._compute_once(full_key, compute)
+                    self._local_set(full_key, value)
+        finally:
+            with self._lock:
+                self._flights.pop(full_key, None)
+        return value
+
+    def _compute_once(self, full_key, compute):
+        lock_key = f"{full_key}:lock"
+        if self.shared.add(lock_key, 1, self.lock_timeout):
+            try:
+                value = compute()
+                self.shared.set(full_key, value, self.shared_ttl)
+            finally:
+                self.shared.delete(lock_key)
+            return value
+
+        # Another process is recomputing; use its result if it arrives in time
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = self.shared.get(full_key, _MISSING)
+            if value is not _MISSING:
+                return value
+        return compute()
+
+    def _local_get(self, full_key):
+        with self._lock:
+            entry = self._local.get(full_key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._local[full_key]
+                return _MISSING
+            self._local.move_to_end(full_key)
+            return value
+
+    def _local_set(self, full_key, value):
+        with self._lock:
+            self._local[full_key] = (value, time.monotonic() + self.local_ttl)
+            self._local.move_to_end(full_key)
+            while len(self._local) > self.local_max_size:
+                self._local.popitem(last=False)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+            self._versions.clear()
+
+
+def _build_cache():
+    config = get_tiered_cache_config()
+    return TieredCache(
+        alias=config['CACHE_ALIAS'],
+        local_max_size=config['LOCAL_MAX_SIZE'],
+        local_ttl=config['LOCAL_TTL'],
+        shared_ttl=config['SHARED_TTL'],
+        version_ttl=config['VERSION_TTL'],
+        lock_timeout=config['LOCK_TIMEOUT'],
+        lock_wait=config['LOCK_WAIT'],
+    )
+
+
+tiered_cache = _build_cache()
+
+
+def bump_survey_definitions(*survey_ids):
+    """Record that survey definitions changed, for their cached copies and the survey list"""
+    for survey_id in survey_ids:
+        tiered_cache.bump('survey', survey_id)
+    tiered_cache.bump('survey')
+
+
+def bump_response_versions(survey_id):
+    """Record that responses to a survey changed, for ETags of statistics and analytics"""
+    tiered_cache.bump('responses', survey_id)
+    tiered_cache.bump('responses')
+
+
+def get_survey_definition(survey_id):
+    """Serialized survey with its questions and options, or None if it does not exist"""
+    def compute():
+        from survey_management.models.survey import Survey
+        from survey_management.serializers.survey_serializers import SurveyDefinitionSerializer
+        survey = Survey.objects.select_related('created_by').prefetch_related(
+            'departments', 'questions__options'
+        ).filter(pk=survey_id).first()
+        if survey is None:
+            return None
+        return SurveyDefinitionSerializer(survey).data
+
+    return tiered_cache.get_or_set('survey', survey_id, compute)
+
+
+def get_department_list():
+    """Serialized list of every department"""
+    def compute():
+        from django.db.models import Count
+        from survey_management.models.department import Department
+        departments = Department.objects.annotate(staff_total=Count('staff')).order_by('name')
+        return [{
+            'id': department.id,
+            'name': department.name,
+            'description': department.description,
+            'staff_count': department.staff_total,
+        } for department in departments]
+
+    return tiered_cache.get_or_set('departments', 'all', compute)
+
+
+def get_profile_values(user_id, strict=False):
+    """Role, department and contact fields of a user's profile, or None without a profile"""
+    def compute():
+        from survey_management.models.user import UserProfile
+        return UserProfile.objects.filter(user_id=user_id).values(
+            'role', 'department_id', 'phone_number'
+        ).first()
+
+    return tiered_cache.get_or_set('profile', user_id, compute, strict)
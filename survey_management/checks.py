@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from survey_management.db_router import get_read_alias
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, Tags.database)
+def check_sticky_primary_cache(app_configs, **kwargs):
+    """Replica reads rely on a shared cache to keep cookie-less clients on the primary after a write"""
+    if get_read_alias() is None:
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'A read replica is configured but the default cache is not shared between processes.',
+        hint='Set CACHE_URL so clients that do not keep cookies, such as API-key integrations, '
+             'read their own writes from any process.',
+        obj='CACHES',
+        id='survey_management.W001',
+    )]
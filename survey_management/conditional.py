@@ -0,0 +1,114 @@
+import asyncio
+import functools
+import hashlib
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from survey_management.caching import tiered_cache
+from survey_management.permissions.context import get_auth_context
+
+
+def version_validators(request, versions, *variant):
+    """
+    Build a strong ETag and Last-Modified value from data version counters
+
+    Args:
+        request: Request whose user scope and URL are part of the ETag
+        versions: (namespace, key) pairs the response is derived from
+        variant: Extra values the response depends on
+
+    Returns:
+        Tuple of (etag, last_modified timestamp in seconds)
+    """
+    # Strict, so a bump made by another process is never answered with a 304
+    current = [tiered_cache.version(namespace, key, strict=True) for namespace, key in versions]
+    context = get_auth_context(request)
+    scope = (context.is_superuser, context.role, context.department_id)
+    raw = repr((current, scope, request.get_full_path(), variant)).encode('utf-8')
+    etag = f'"{hashlib.sha256(raw).hexdigest()[:32]}"'
+    return etag, max(current) // 1000
+
+
+def conditional(validators):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 before a view method runs
+
+    ``validators(view, request, *args, **kwargs)`` returns the (etag,
+    last_modified) pair of version_validators(), or None to serve the request
+    unconditionally (e.g. when the user may not see the object). Successful
+    responses get the ETag and Last-Modified headers. Async view methods are
+    supported; their validators run in a worker thread, as they read the cache.
+    """
+    def decorator(method):
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(view, request, *args, **kwargs):
+                pair = await sync_to_async(validators)(view, request, *args, **kwargs)
+                if pair is None:
+                    return await method(view, request, *args, **kwargs)
+
+                etag, last_modified = pair
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await method(view, request, *args, **kwargs)
+                if response.status_code in (200, 304):
+                    response['ETag'] = etag
+                    response['Last-Modified'] = http_date(last_modified)
+                return response
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            pair = validators(view, request, *args, **kwargs)
+            if pair is None:
+                return method(view, request, *args, **kwargs)
+
+            etag, last_modified = pair
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+            return response
+        return wrapper
+    return decorator
+
+
+def survey_validators(view, request, pk=None, **kwargs):
+    """A survey's definition plus the statistics of its responses"""
+    try:
+        survey_id = int(pk)
+    except (TypeError, ValueError):
+        return None
+    if not get_auth_context(request).can_view_survey(survey_id):
+        return None
+    return version_validators(request, [('survey', survey_id), ('responses', survey_id)])
+
+
+def survey_definition_validators(view, request, pk=None, **kwargs):
+    try:
+        survey_id = int(pk)
+    except (TypeError, ValueError):
+        return None
+    if not get_auth_context(request).can_view_survey(survey_id):
+        return None
+    return version_validators(request, [('survey', survey_id)])
+
+
+def survey_list_validators(view, request, *args, **kwargs):
+    """Any survey, question or response change"""
+    return version_validators(request, [('survey', 'all'), ('responses', 'all')])
+
+
+def question_validators(view, request, *args, **kwargs):
+    return version_validators(request, [('survey', 'all')])
+
+
+def department_validators(view, request, *args, **kwargs):
+    return version_validators(request, [('departments', 'all')])
+
+
+def analytics_validators(view, request, *args, **kwargs):
+    """Analytics read surveys, questions and every response"""
+    return version_validators(request, [('survey', 'all'), ('responses', 'all')])
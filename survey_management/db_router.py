@@ -0,0 +1,150 @@
+import asyncio
+import contextvars
+import functools
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# None: no preference, 'replica': reads may use the read alias, 'primary': they must not
+_read_target = contextvars.ContextVar('survey_read_target', default=None)
+
+
+def get_read_alias():
+    """The configured read alias, or None when no replica is set up"""
+    alias = getattr(settings, 'SURVEY_READ_DATABASE', None)
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+def activate(target):
+    """Set the read target for the current context, returning a token for deactivate()"""
+    return _read_target.set(target)
+
+
+def deactivate(token):
+    _read_target.reset(token)
+
+
+class replica_reads:
+    """
+    Context manager and decorator sending reads to the read alias
+
+    An enclosing decision to stay on the primary (e.g. a request that
+    recently wrote) is kept, so callers like AnalyticsService can opt in
+    without overriding read-your-writes.
+    """
+
+    def __enter__(self):
+        target = 'replica' if _read_target.get() is None else _read_target.get()
+        self._token = _read_target.set(target)
+        return self
+
+    def __exit__(self, *exc_info):
+        _read_target.reset(self._token)
+
+    def __call__(self, func):
+        if asyncio.iscoroutinefunction(func):
+            # The async ORM copies the context into its worker thread
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with replica_reads():
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with replica_reads():
+                return func(*args, **kwargs)
+        return wrapper
+
+
+# Signed, timestamped cookie carrying the mark to whichever process serves the next request
+STICKY_COOKIE = 'survey_primary'
+
+
+def _sticky_key(user_id):
+    return f"survey:db:sticky:{user_id}"
+
+
+def _sticky_seconds():
+    return getattr(settings, 'SURVEY_DB_STICKY_SECONDS', 5)
+
+
+def mark_recent_write(user_id, response=None):
+    """
+    Keep the user's reads on the primary for SURVEY_DB_STICKY_SECONDS
+
+    The mark goes to the default cache, which every process only sees when
+    CACHES is shared, and onto the response as a signed cookie, which
+    reaches any process for clients that keep cookies.
+    """
+    cache.set(_sticky_key(user_id), 1, _sticky_seconds())
+    if response is not None:
+        response.set_signed_cookie(STICKY_COOKIE, str(user_id), salt=STICKY_COOKIE, max_age=_sticky_seconds(),
+                                   httponly=True, samesite='Lax')
+
+
+def wrote_recently(user_id, request=None):
+    """Whether the user wrote within SURVEY_DB_STICKY_SECONDS, by the request's cookie or the cache"""
+    if request is not None:
+        # max_age is checked against the signed timestamp, not the browser's expiry
+        marked = request.get_signed_cookie(STICKY_COOKIE, default=None, salt=STICKY_COOKIE,
+                                           max_age=_sticky_seconds())
+        if marked == str(user_id):
+            return True
+    return cache.get(_sticky_key(user_id)) is not None
+
+
+class ReadReplicaRouter:
+    """
+    Routes reads to SURVEY_READ_DATABASE only where code opted in
+
+    Everything else, including every write and every read inside a
+    transaction on the primary, uses the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_target.get() != 'replica':
+            return None
+        alias = get_read_alias()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReadReplicaMixin:
+    """
+    Viewset mixin sending safe-method reads of ``replica_actions`` to the read alias
+
+    Users who wrote within SURVEY_DB_STICKY_SECONDS stay on the primary so
+    they see their own changes. The target is chosen after authentication
+    and permission checks, which therefore always read the primary.
+    """
+    replica_actions = ('list',)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and self.action in self.replica_actions:
+            user = request.user
+            sticky = user is not None and user.is_authenticated and wrote_recently(user.pk, request)
+            self._read_target_token = activate('primary' if sticky else 'replica')
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_target_token', None)
+        if token is not None:
+            deactivate(token)
+            self._read_target_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,378 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from survey_management.models.survey import Question
+from survey_management.services.analytics_service import average_rating, completion_rate, survey_counters
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIVE_COUNTERS = {
+    # Seconds between keep-alive comments on an idle stream
+    'HEARTBEAT_SECONDS': 15,
+    # Counters are reloaded from the database at most this often. This picks
+    # up responses received by other processes and rows written outside the
+    # submit path, such as bulk assignments.
+    'RESEED_SECONDS': 60,
+    # Open streams per process; further dashboards get 503 and reconnect later
+    'MAX_SUBSCRIBERS': 5000,
+    # Reconnection delay sent to EventSource clients, in milliseconds
+    'RETRY_MS': 5000,
+}
+
+
+def get_live_config():
+    config = dict(DEFAULT_LIVE_COUNTERS)
+    config.update(getattr(settings, 'SURVEY_LIVE_COUNTERS', {}))
+    return config
+
+
+class Subscriber:
+    """One open stream: the surveys it shows and those changed since it last sent"""
+
+    def __init__(self, survey_ids, wake):
+        self.survey_ids = frozenset(survey_ids)
+        self.pending = set()
+        self.wake = wake
+
+
+class LiveCounterHub:
+    """
+    In-process response counters of the surveys open dashboards are watching
+
+    A survey's counters are loaded from the database when the first stream
+    showing it connects, and then kept current by the submit path: creating a
+    response and completing one each update the counters under a lock and
+    notify the streams subscribed to that survey. Nothing is queried per
+    event. Subscribers are indexed by survey, so an event only touches the
+    streams that show it, and a stream that has not sent yet holds at most
+    one pending entry per survey however many events arrive.
+
+    Each process counts its own submissions; RESEED_SECONDS bounds how long
+    those of other processes take to show up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reseeding = threading.Lock()
+        self._counters = {}
+        self._rating_questions = {}
+        self._subscribers = defaultdict(set)
+        self._seeded_at = time.monotonic()
+        self.subscriber_count = 0
+
+    def is_counting(self, survey_id):
+        return survey_id in self._counters
+
+    def seed(self, survey_ids):
+        """Load the counters of the surveys that are not counted yet"""
+        missing = [survey_id for survey_id in survey_ids if survey_id not in self._counters]
+        if missing:
+            self._load(missing, replace=False)
+
+    def reseed_due(self):
+        return time.monotonic() - self._seeded_at >= get_live_config()['RESEED_SECONDS']
+
+    def reseed(self):
+        """Reload the watched surveys from the database and forget the others"""
+        if not self.reseed_due() or not self._reseeding.acquire(blocking=False):
+            return
+        try:
+            self._seeded_at = time.monotonic()
+            with self._lock:
+                for survey_id in [survey_id for survey_id in self._counters if not self._subscribers.get(survey_id)]:
+                    del self._counters[survey_id]
+                    del self._rating_questions[survey_id]
+                survey_ids = list(self._counters)
+            if survey_ids:
+                self._load(survey_ids, replace=True)
+        except Exception as e:
+            logger.error(f"Failed to reload live counters: {str(e)}")
+        finally:
+            self._reseeding.release()
+
+    def _load(self, survey_ids, replace):
+        counters = survey_counters(survey_ids)
+        rating_questions = defaultdict(set)
+        for survey_id, question_id in Question.objects.filter(
+            survey_id__in=survey_ids, question_type='RATING'
+        ).values_list('survey_id', 'id'):
+            rating_questions[survey_id].add(question_id)
+
+        changed = []
+        with self._lock:
+            for survey_id in survey_ids:
+                if not replace and survey_id in self._counters:
+                    continue
+                if self._counters.get(survey_id) != counters[survey_id]:
+                    changed.append(survey_id)
+                self._counters[survey_id] = counters[survey_id]
+                self._rating_questions[survey_id] = frozenset(rating_questions[survey_id])
+        if replace:
+            for survey_id in changed:
+                self.publish(survey_id)
+
+    def record_created(self, survey_id):
+        """Count a new response"""
+        with self._lock:
+            counters = self._counters.get(survey_id)
+            if counters is None:
+                return
+            counters['total'] += 1
+        self.publish(survey_id)
+
+    def record_completed(self, survey_id, answers):
+        """
+        Count a completed response and its rating answers
+
+        Args:
+            survey_id: ID of the response's survey
+            answers: The response's answers, as returned by Response.get_answers()
+        """
+        with self._lock:
+            counters = self._counters.get(survey_id)
+            if counters is None:
+                return
+            rating_questions = self._rating_questions[survey_id]
+            counters['completed'] += 1
+            for question_id, answer in answers.items():
+                if question_id in rating_questions and answer.numeric_answer is not None:
+                    counters['rating_count'] += 1
+                    counters['rating_total'] += answer.numeric_answer
+        self.publish(survey_id)
+
+    def publish(self, survey_id):
+        """Mark the survey changed on its subscribers and wake those that were idle"""
+        woken = []
+        with self._lock:
+            for subscriber in self._subscribers.get(survey_id, ()):
+                if not subscriber.pending:
+                    woken.append(subscriber)
+                subscriber.pending.add(survey_id)
+        for subscriber in woken:
+            subscriber.wake()
+
+    def subscribe(self, survey_ids, wake):
+        """
+        Register a stream for the surveys' events
+
+        Args:
+            survey_ids: Surveys the stream shows
+            wake: Called without arguments, from any thread, when the stream has events
+        """
+        subscriber = Subscriber(survey_ids, wake)
+        with self._lock:
+            for survey_id in subscriber.survey_ids:
+                self._subscribers[survey_id].add(subscriber)
+            self.subscriber_count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            for survey_id in subscriber.survey_ids:
+                subscribers = self._subscribers.get(survey_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[survey_id]
+            self.subscriber_count -= 1
+
+    def is_full(self):
+        return self.subscriber_count >= get_live_config()['MAX_SUBSCRIBERS']
+
+    def snapshot(self, survey_ids):
+        """(survey ID, counters) of the given surveys that are counted"""
+        with self._lock:
+            return [
+                (survey_id, dict(self._counters[survey_id]))
+                for survey_id in sorted(survey_ids) if survey_id in self._counters
+            ]
+
+    def take(self, subscriber):
+        """Counters of the surveys changed since the subscriber last took them"""
+        with self._lock:
+            survey_ids, subscriber.pending = subscriber.pending, set()
+        return self.snapshot(survey_ids)
+
+    def clear(self):
+        """Forget every counter and subscriber (tests)"""
+        with self._lock:
+            self._counters.clear()
+            self._rating_questions.clear()
+            self._subscribers.clear()
+            self.subscriber_count = 0
+            self._seeded_at = time.monotonic()
+
+
+live_counters = LiveCounterHub()
+
+
+def counters_event(survey_id, counters):
+    """One SSE event with the dashboard fields of a survey's counters"""
+    data = {
+        'survey_id': survey_id,
+        'total_responses': counters['total'],
+        'completed_responses': counters['completed'],
+        'completion_rate': completion_rate(counters),
+        'average_rating': average_rating(counters),
+    }
+    return f"event: counters\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_events(hub, survey_ids, config):
+    """
+    Event stream of one dashboard for WSGI servers, which hold a worker thread per open stream
+
+    Under ASGI, LiveASGIHandler uses astream_events() instead. Any other ASGI
+    handler would iterate this generator on the event loop and block it, so
+    the stream ends at once there.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        logger.error("Live counter streams need LiveASGIHandler under ASGI; closing the stream")
+        return
+
+    wakeup = threading.Event()
+    subscriber = hub.subscribe(survey_ids, wakeup.set)
+    try:
+        yield f"retry: {config['RETRY_MS']}\n\n"
+        for survey_id, counters in hub.snapshot(survey_ids):
+            yield counters_event(survey_id, counters)
+
+        while True:
+            if not wakeup.wait(config['HEARTBEAT_SECONDS']):
+                hub.reseed()
+                yield ": heartbeat\n\n"
+                continue
+            wakeup.clear()
+            for survey_id, counters in hub.take(subscriber):
+                yield counters_event(survey_id, counters)
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+async def astream_events(hub, survey_ids, config, disconnected):
+    """
+    Event stream of one dashboard, waiting on the event loop
+
+    An idle stream costs an asyncio.Event and a heartbeat timer; the counters
+    are only read, in memory, when the hub wakes it. It ends once the
+    disconnected future is done.
+    """
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+
+    def wake():
+        # The hub is notified from worker threads
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+
+    disconnected.add_done_callback(lambda _: wakeup.set())
+    subscriber = hub.subscribe(survey_ids, wake)
+    try:
+        yield f"retry: {config['RETRY_MS']}\n\n"
+        for survey_id, counters in hub.snapshot(survey_ids):
+            yield counters_event(survey_id, counters)
+
+        while not disconnected.done():
+            try:
+                await asyncio.wait_for(wakeup.wait(), config['HEARTBEAT_SECONDS'])
+            except asyncio.TimeoutError:
+                if hub.reseed_due():
+                    await sync_to_async(hub.reseed)()
+                yield ": heartbeat\n\n"
+                continue
+            wakeup.clear()
+            for survey_id, counters in hub.take(subscriber):
+                yield counters_event(survey_id, counters)
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+class EventStreamResponse(StreamingHttpResponse):
+    """Server-Sent Events stream of live survey counters"""
+
+    def __init__(self, survey_ids, hub=None):
+        self.hub = hub or live_counters
+        self.survey_ids = frozenset(survey_ids)
+        self.config = get_live_config()
+        super().__init__(stream_events(self.hub, self.survey_ids, self.config), content_type='text/event-stream')
+        self['Cache-Control'] = 'no-cache'
+        # Proxies such as nginx would otherwise buffer the events
+        self['X-Accel-Buffering'] = 'no'
+
+    def async_events(self, disconnected):
+        return astream_events(self.hub, self.survey_ids, self.config, disconnected)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets EventSource clients, which only accept text/event-stream, reach the stream endpoint"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only error responses are rendered; the stream itself is an EventStreamResponse
+        return json.dumps(data).encode('utf-8')
+
+
+_receive = ContextVar('live_receive')
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+class LiveASGIHandler(ASGIHandler):
+    """
+    ASGIHandler that serves EventStreamResponses on the event loop
+
+    Django 4.1 iterates streaming responses synchronously, which would block
+    the loop for as long as a dashboard stays connected. Event streams are
+    instead sent from their async generator until the client disconnects;
+    every other response is sent by Django as usual.
+    """
+
+    async def handle(self, scope, receive, send):
+        token = _receive.set(receive)
+        try:
+            await super().handle(scope, receive, send)
+        finally:
+            _receive.reset(token)
+
+    async def send_response(self, response, send):
+        if not isinstance(response, EventStreamResponse):
+            return await super().send_response(response, send)
+
+        headers = [
+            (header.encode('ascii'), value.encode('latin1')) for header, value in response.items()
+        ]
+        headers += [
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip()) for cookie in response.cookies.values()
+        ]
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+
+        disconnected = asyncio.ensure_future(wait_for_disconnect(_receive.get()))
+        events = response.async_events(disconnected)
+        try:
+            async for part in events:
+                await send({'type': 'http.response.body', 'body': part.encode('utf-8'), 'more_body': True})
+            if not disconnected.done():
+                await send({'type': 'http.response.body'})
+        finally:
+            disconnected.cancel()
+            await events.aclose()
+            await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,38 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from survey_management.services.audit_archive import AuditArchive
+
+class Command(BaseCommand):
+    help = 'Moves monthly audit log partitions older than N days into compressed archive segments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'SURVEY_AUDIT_HOT_DAYS', 90),
+                            help='Keep at least this many days of audit entries in the database')
+        parser.add_argument('--archive-dir', default=None,
+                            help='Archive directory (defaults to SURVEY_AUDIT_ARCHIVE_DIR)')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Maximum entries per archive segment')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report which partitions would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        archive = AuditArchive(options['archive_dir'])
+        
+        archived = archive.archive_before(
+            cutoff, chunk_size=options['chunk_size'], dry_run=options['dry_run']
+        )
+        
+        if not archived:
+            self.stdout.write("No audit partitions to archive")
+            return
+        
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        for period, count in archived.items():
+            self.stdout.write(f"{verb} {count} entries from {period // 100}-{period % 100:02d}")
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {sum(archived.values())} audit entries to {archive.directory}"
+        ))
@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+class Command(BaseCommand):
+    help = 'Generates (or revokes) the API key of an integrator account'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Integrator username')
+        parser.add_argument('--revoke', action='store_true',
+                            help='Revoke the current key instead of creating a new one')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.select_related('profile').get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+        
+        profile = user.profile
+        if profile.role != 'INTEGRATOR':
+            raise CommandError(f"User {user.username} is not a system integrator")
+        
+        if options['revoke']:
+            profile.revoke_api_key()
+            profile.save(update_fields=['api_key_prefix', 'api_key_hash'])
+            self.stdout.write(self.style.SUCCESS(f"Revoked the API key of {user.username}"))
+            return
+        
+        key = profile.set_api_key()
+        profile.save(update_fields=['api_key_prefix', 'api_key_hash'])
+        
+        self.stdout.write(self.style.SUCCESS(f"New API key for {user.username} (shown only once):"))
+        self.stdout.write(key)
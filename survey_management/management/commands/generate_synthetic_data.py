@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from survey_management.services.synthetic_data import SyntheticDataGenerator
+
+class Command(BaseCommand):
+    help = 'Bulk-creates reproducible synthetic users, surveys and responses at production scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed; usernames are prefixed with it, so use a new seed per run')
+        parser.add_argument('--departments', type=int, default=10)
+        parser.add_argument('--staff', type=int, default=200)
+        parser.add_argument('--patients', type=int, default=10000)
+        parser.add_argument('--surveys', type=int, default=50)
+        parser.add_argument('--questions', type=int, default=12,
+                            help='Questions per survey')
+        parser.add_argument('--responses', type=int, default=100000)
+        parser.add_argument('--completion-rate', type=float, default=0.8)
+        parser.add_argument('--days', type=int, default=180,
+                            help='Spread submissions over this many past days')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--password', default='synthetic',
+                            help='Password of every generated user')
+        parser.add_argument('--pack', action='store_true',
+                            help='Also store packed answers on completed responses')
+
+    def handle(self, *args, **options):
+        if options['departments'] < 1 or options['surveys'] < 1 or options['patients'] < 1:
+            raise CommandError('At least one department, survey and patient are required')
+        
+        generator = SyntheticDataGenerator(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            password=options['password']
+        )
+        counts = generator.generate(
+            departments=options['departments'],
+            staff=options['staff'],
+            patients=options['patients'],
+            surveys=options['surveys'],
+            questions_per_survey=options['questions'],
+            responses=options['responses'],
+            completion_rate=options['completion_rate'],
+            days=options['days'],
+            pack=options['pack'],
+            progress=self.stdout.write
+        )
+        
+        summary = ', '.join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} (user prefix {generator.prefix}-)"))
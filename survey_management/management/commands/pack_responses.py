@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from survey_management.services.answer_packing import AnswerPacker
+
+class Command(BaseCommand):
+    help = 'Packs the answers of completed responses into Response.packed_answers in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Responses packed per transaction')
+        parser.add_argument('--survey', type=int, default=None,
+                            help='Only pack responses to this survey')
+        parser.add_argument('--drop-items', action='store_true',
+                            help='Delete the ResponseItem rows of packed responses')
+        parser.add_argument('--repack', action='store_true',
+                            help='Also pack already packed responses again from their item rows')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many responses would be packed')
+
+    def handle(self, *args, **options):
+        packer = AnswerPacker(
+            batch_size=options['batch_size'],
+            keep_items=False if options['drop_items'] else None,
+            repack=options['repack']
+        )
+        count = packer.run(survey_id=options['survey'], dry_run=options['dry_run'])
+        
+        verb = 'Would pack' if options['dry_run'] else 'Packed'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} completed responses"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from survey_management.services.notification_service import NotificationService
+
+class Command(BaseCommand):
+    help = 'Delivers scheduled surveys whose trigger delay has elapsed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of due deliveries to process per query')
+
+    def handle(self, *args, **options):
+        notification = NotificationService()
+        results = notification.process_scheduled_surveys(batch_size=options['batch_size'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {results['processed']} deliveries: {results['success']} sent, "
+            f"{results['failed']} failed, {results['cancelled']} cancelled"
+        ))
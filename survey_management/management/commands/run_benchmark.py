@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from survey_management.benchmark import (
+    ASGIInProcessDriver, InProcessDriver, HTTPDriver, build_scenarios, compare_to_baseline, pick_survey, pick_users,
+    run_scenario, throughput_changes
+)
+
+class Command(BaseCommand):
+    help = 'Benchmarks the main endpoints and reports latency percentiles, throughput and query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50,
+                            help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Unmeasured requests per scenario, to warm caches')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Requests in flight at once')
+        parser.add_argument('--only', default=None,
+                            help='Comma-separated scenario names to run')
+        parser.add_argument('--survey', type=int, default=None,
+                            help='Survey to benchmark (defaults to the one with most responses)')
+        parser.add_argument('--base-url', default=None,
+                            help='Drive a running server instead of the in-process test client')
+        parser.add_argument('--password', default='synthetic',
+                            help='Password of the benchmark users when using --base-url')
+        parser.add_argument('--asgi', action='store_true',
+                            help='Use the async endpoints, through the ASGI handler or, with --base-url, '
+                                 'an ASGI server')
+        parser.add_argument('--save-baseline', default=None,
+                            help='Write the results to this JSON file')
+        parser.add_argument('--compare', default=None,
+                            help='Compare the results with a saved baseline')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Allowed relative p95 growth before a scenario counts as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error if any scenario regressed')
+
+    def handle(self, *args, **options):
+        try:
+            users = pick_users()
+            survey = pick_survey(options['survey'])
+        except ValueError as error:
+            raise CommandError(str(error))
+        
+        scenarios = build_scenarios(survey)
+        if options['only']:
+            wanted = set(options['only'].split(','))
+            scenarios = [scenario for scenario in scenarios if scenario.name in wanted]
+            if not scenarios:
+                raise CommandError(f"No scenario matches {options['only']}")
+        
+        if options['base_url']:
+            credentials = {role: (user.username, options['password']) for role, user in users.items()}
+            driver = HTTPDriver(options['base_url'], credentials, asgi=options['asgi'])
+        elif options['asgi']:
+            driver = ASGIInProcessDriver(users)
+        else:
+            driver = InProcessDriver(users)
+        
+        results = {}
+        with driver.settings_override():
+            for scenario in scenarios:
+                results[scenario.name] = run_scenario(
+                    driver, scenario, options['iterations'], options['warmup'], options['concurrency']
+                )
+                self.report(scenario.name, results[scenario.name])
+        
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as handle:
+                json.dump({
+                    'created_at': datetime.now().isoformat(timespec='seconds'),
+                    'survey_id': survey.id,
+                    'driver': 'http' if options['base_url'] else 'in-process',
+                    'asgi': options['asgi'],
+                    'iterations': options['iterations'],
+                    'concurrency': options['concurrency'],
+                    'results': results,
+                }, handle, indent=2)
+            self.stdout.write(f"Saved baseline to {options['save_baseline']}")
+        
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+            for change in throughput_changes(results, baseline):
+                self.stdout.write(f"Throughput {change}")
+            regressions = compare_to_baseline(results, baseline, options['threshold'])
+            for regression in regressions:
+                self.stdout.write(self.style.WARNING(f"Regression: {regression}"))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+            elif options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}")
+
+    def report(self, name, result):
+        queries = '-' if result['queries'] is None else result['queries']
+        line = (f"{name:<42} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+                f"p99 {result['p99_ms']:>9.2f} ms  {result['throughput_rps']:>8.2f} req/s  queries {queries}")
+        if result['errors']:
+            line += f"  errors {result['errors']}/{result['requests']}"
+        self.stdout.write(line)
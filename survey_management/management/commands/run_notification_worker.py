@@ -0,0 +1,38 @@
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from survey_management.services.notification_dispatcher import NotificationWorkerPool, OutboxSender
+
+class Command(BaseCommand):
+    help = 'Runs a pool of workers that deliver queued email and SMS notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Number of worker threads (defaults to SURVEY_NOTIFICATION_WORKERS)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds an idle worker waits before checking the outbox again')
+        parser.add_argument('--once', action='store_true',
+                            help='Send everything currently due and exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            handled = OutboxSender().drain()
+            self.stdout.write(self.style.SUCCESS(f"Handled {handled} notifications"))
+            return
+        
+        pool = NotificationWorkerPool(workers=options['workers'], poll_interval=options['poll_interval'])
+        stopped = threading.Event()
+        
+        def shutdown(signum, frame):
+            stopped.set()
+        
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        
+        pool.start()
+        self.stdout.write(f"Started {pool.workers} notification workers")
+        
+        stopped.wait()
+        self.stdout.write("Stopping notification workers...")
+        pool.stop()
+        self.stdout.write(self.style.SUCCESS("Notification workers stopped"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from survey_management.services.reminder_service import ReminderService
+
+class Command(BaseCommand):
+    help = 'Queues reminders for open survey responses whose reminder is due'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of responses handled per transaction')
+
+    def handle(self, *args, **options):
+        results = ReminderService().send_due_reminders(batch_size=options['batch_size'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {results['processed']} responses: {results['reminded']} reminded, "
+            f"{results['stopped']} stopped"
+        ))
@@ -0,0 +1,41 @@
+import sqlite3
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+class Command(BaseCommand):
+    help = 'Copies the SQLite database to the local read replica file, once or at an interval'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=settings.SURVEY_READ_DATABASE,
+                            help='Alias of the replica to refresh')
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep refreshing every N seconds (simulates replication lag)')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in settings.DATABASES:
+            raise CommandError(f"Database '{alias}' is not configured (set DB_REPLICA_NAME)")
+        
+        primary = settings.DATABASES['default']
+        replica = settings.DATABASES[alias]
+        for config in (primary, replica):
+            if config['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError('sync_sqlite_replica only works with SQLite databases')
+        
+        while True:
+            self.sync(str(primary['NAME']), str(replica['NAME']))
+            self.stdout.write(self.style.SUCCESS(f"Copied {primary['NAME']} to {replica['NAME']}"))
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, source_path, target_path):
+        # The backup API gives a consistent snapshot even while the primary is being written
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,202 @@
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+
+DEFAULT_METRICS = {
+    'ENABLED': True,
+    # Requests running more queries than this are logged with their most repeated statements
+    'QUERY_BUDGET': 50,
+    'TOP_STATEMENTS': 5,
+    # Route/method pairs tracked before new ones are folded into route="other"
+    'MAX_SERIES': 500,
+    'LATENCY_BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    'QUERY_BUCKETS': (0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+    'SIZE_BUCKETS': (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+}
+
+
+def get_metrics_config():
+    config = dict(DEFAULT_METRICS)
+    config.update(getattr(settings, 'SURVEY_METRICS', {}))
+    return config
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting the queries and DB time of one request
+
+    Statements are counted by their SQL template (parameters are passed
+    separately), so repeated N+1 lookups show up as one statement.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+
+# Recorders of the async request being handled. The async ORM runs queries
+# in worker threads with a copy of the caller's context, so recorders set
+# here see them although they run on other threads' connections.
+_context_recorders = contextvars.ContextVar('survey_query_recorders', default=())
+
+
+def record_context_queries(recorder):
+    """Also pass the queries of the current context to recorder, returning a token for reset"""
+    return _context_recorders.set(_context_recorders.get() + (recorder,))
+
+
+def stop_recording_context_queries(token):
+    _context_recorders.reset(token)
+
+
+def forward_to_context_recorder(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection, see record_context_queries()"""
+    for recorder in _context_recorders.get():
+        execute = functools.partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteMetrics:
+    __slots__ = ('latency', 'queries', 'db_seconds', 'size', 'statuses')
+
+    def __init__(self, config):
+        self.latency = Histogram(config['LATENCY_BUCKETS'])
+        self.queries = Histogram(config['QUERY_BUCKETS'])
+        self.db_seconds = 0.0
+        self.size = Histogram(config['SIZE_BUCKETS'])
+        self.statuses = Counter()
+
+
+class MetricsRegistry:
+    """
+    Per route and method request metrics of this process
+
+    Memory is bounded by MAX_SERIES route/method pairs with fixed buckets;
+    routes beyond that are recorded as route="other".
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_metrics_config()
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, method, status, duration, queries, db_seconds, size):
+        key = (route, method)
+        with self._lock:
+            metrics = self._routes.get(key)
+            if metrics is None:
+                if len(self._routes) >= self.config['MAX_SERIES']:
+                    key = ('other', method)
+                    metrics = self._routes.get(key)
+                if metrics is None:
+                    metrics = self._routes[key] = RouteMetrics(self.config)
+            metrics.latency.observe(duration)
+            metrics.queries.observe(queries)
+            metrics.db_seconds += db_seconds
+            if size is not None:
+                metrics.size.observe(size)
+            metrics.statuses[status] += 1
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            snapshot = [(key, self._copy(metrics)) for key, metrics in routes]
+
+        lines = []
+        self._render_histogram(lines, snapshot, 'survey_http_request_duration_seconds',
+                               'Request latency in seconds', lambda metrics: metrics.latency)
+        self._render_histogram(lines, snapshot, 'survey_http_request_db_queries',
+                               'Database queries per request', lambda metrics: metrics.queries)
+        self._render_histogram(lines, snapshot, 'survey_http_response_size_bytes',
+                               'Response body size in bytes', lambda metrics: metrics.size)
+
+        lines.append('# HELP survey_http_request_db_seconds_total Time spent in database queries')
+        lines.append('# TYPE survey_http_request_db_seconds_total counter')
+        for (route, method), metrics in snapshot:
+            lines.append(f'survey_http_request_db_seconds_total{{{_labels(route, method)}}} {metrics.db_seconds:.6f}')
+
+        lines.append('# HELP survey_http_requests_total Requests by status code')
+        lines.append('# TYPE survey_http_requests_total counter')
+        for (route, method), metrics in snapshot:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'survey_http_requests_total{{{_labels(route, method)},status="{status}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def _copy(self, metrics):
+        copy = RouteMetrics(self.config)
+        for name in ('latency', 'queries', 'size'):
+            source, target = getattr(metrics, name), getattr(copy, name)
+            target.counts = list(source.counts)
+            target.sum = source.sum
+            target.count = source.count
+        copy.db_seconds = metrics.db_seconds
+        copy.statuses = Counter(metrics.statuses)
+        return copy
+
+    def _render_histogram(self, lines, snapshot, name, help_text, histogram_of):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (route, method), metrics in snapshot:
+            histogram = histogram_of(metrics)
+            labels = _labels(route, method)
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+
+def route_of(request):
+    """Label of the URL pattern a request matched"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    # URL names ('survey-detail') read better than the router's regexes
+    return match.view_name or match.route or 'unmatched'
+
+
+def _labels(route, method):
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'route="{route}",method="{method}"'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,91 @@
+import logging
+import random
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.deprecation import MiddlewareMixin
+from survey_management.services.audit_writer import get_audit_writer, log_audit
+
+logger = logging.getLogger(__name__)
+
+class AuditFlushMiddleware(MiddlewareMixin):
+    """
+    Flushes buffered audit entries once the response has been produced.
+
+    Only does work when SURVEY_AUDIT_WRITER['MODE'] is 'request'; in 'thread'
+    mode the background writer flushes on its own. Under ASGI, MiddlewareMixin
+    runs the flush in a worker thread.
+    """
+    def process_response(self, request, response):
+        writer = get_audit_writer()
+        if writer.mode == 'request':
+            writer.flush()
+        
+        return response
+
+
+DEFAULT_READ_AUDIT = {
+    'ENABLED': True,
+    # Reads of the same object by the same user within this window are logged once
+    'COALESCE_SECONDS': 300,
+    # URL names not listed here are not audited
+    'RULES': {},
+}
+
+
+class ReadAuditMiddleware(MiddlewareMixin):
+    """
+    Records READ audit entries for successful reads of PHI endpoints.
+
+    Endpoints are matched by URL name against SURVEY_READ_AUDIT['RULES'].
+    A rule either samples reads (``sample_rate`` between 0 and 1) or, with
+    ``always``, logs every read without sampling or coalescing. Entries go
+    through the buffered audit writer, so requests never wait on the insert.
+    Under ASGI, MiddlewareMixin runs the cache and audit calls in a worker thread.
+    """
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        config = dict(DEFAULT_READ_AUDIT)
+        config.update(getattr(settings, 'SURVEY_READ_AUDIT', {}))
+        self.enabled = config['ENABLED']
+        self.coalesce_seconds = config['COALESCE_SECONDS']
+        self.rules = config['RULES']
+    
+    def process_response(self, request, response):
+        if self.enabled and request.method in ('GET', 'HEAD') and 200 <= response.status_code < 300:
+            try:
+                self.record(request)
+            except Exception as e:
+                # Auditing problems must not turn a successful read into an error
+                logger.error(f"Failed to record read access: {str(e)}")
+        
+        return response
+    
+    def record(self, request):
+        """Log the read if its endpoint has a rule and it survives sampling and coalescing"""
+        match = getattr(request, 'resolver_match', None)
+        if match is None or match.url_name not in self.rules:
+            return
+        
+        # DRF copies the authenticated user back onto the Django request
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return
+        
+        rule = self.rules[match.url_name]
+        object_id = match.kwargs.get('pk') or match.kwargs.get('survey_id') or '*'
+        always = rule.get('always', False)
+        sample_rate = 1.0 if always else rule.get('sample_rate', 1.0)
+        
+        if not always:
+            if sample_rate < 1.0 and random.random() >= sample_rate:
+                return
+            
+            # cache.add only succeeds for the first read in the window
+            key = f"read-audit:{user.pk}:{match.url_name}:{object_id}"
+            if not cache.add(key, 1, timeout=self.coalesce_seconds):
+                return
+        
+        details = f"Read {match.url_name} {object_id}: {request.get_full_path()}"
+        if sample_rate < 1.0:
+            details += f" (sampled at {sample_rate:.0%})"
+        log_audit(user, 'READ', details, request=request)
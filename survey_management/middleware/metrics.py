@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from contextlib import ExitStack
+from django.db import connections
+from survey_management.metrics import (
+    QueryRecorder, get_metrics_config, record_context_queries, registry, route_of, stop_recording_context_queries
+)
+
+logger = logging.getLogger(__name__)
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, query count, DB time, response size and status per route.
+
+    Queries are counted with execute wrappers on every database alias, so
+    reads sent to a replica are included. Requests over
+    SURVEY_METRICS['QUERY_BUDGET'] are logged with their most repeated SQL.
+    Routes are labelled by URL name, never by concrete path, which keeps the
+    number of series bounded.
+    
+    Under ASGI the middleware runs on the event loop. Queries then run on
+    worker-thread connections, so they are counted through the context
+    recorder every connection forwards to (see record_context_queries).
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Marks the instance as a coroutine function, so Django awaits it directly
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        config = get_metrics_config()
+        self.enabled = config['ENABLED']
+        self.query_budget = config['QUERY_BUDGET']
+        self.top_statements = config['TOP_STATEMENTS']
+    
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        self.record(request, response, recorder, time.perf_counter() - start)
+        return response
+    
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        token = record_context_queries(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_recording_context_queries(token)
+        self.record(request, response, recorder, time.perf_counter() - start)
+        return response
+    
+    def record(self, request, response, recorder, duration):
+        route = route_of(request)
+        size = None if response.streaming else len(response.content)
+        registry.record(route, request.method, response.status_code, duration,
+                        recorder.count, recorder.duration, size)
+        
+        if self.query_budget is not None and recorder.count > self.query_budget:
+            top = '; '.join(
+                f"{count}x {sql[:200]}" for sql, count in recorder.statements.most_common(self.top_statements)
+            )
+            logger.warning(
+                f"{request.method} {route} ran {recorder.count} queries "
+                f"(budget {self.query_budget}, {recorder.duration * 1000:.1f} ms in the database). "
+                f"Most repeated: {top}"
+            )
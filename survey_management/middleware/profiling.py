@@ -0,0 +1,104 @@
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from survey_management.metrics import route_of
+from survey_management.permissions.context import get_auth_context
+from survey_management.profiling import StatementRecorder, build_profiler, get_profiling_config, prune_profiles
+
+logger = logging.getLogger(__name__)
+
+class RequestProfilingMiddleware:
+    """
+    Profiles single requests on demand and stores their collapsed stacks and SQL.
+
+    A request is profiled when an admin sends SURVEY_PROFILING['HEADER'] or
+    when it is picked by SAMPLE_RATE. The header is only honoured for a user
+    already resolved when the middleware runs, i.e. a session admin; token
+    and API-key clients are authenticated inside the view, too late to decide
+    before profiling starts, so anyone could otherwise make the server
+    profile their requests. At most MAX_CONCURRENT requests per process are
+    profiled at once. When ENABLED is False the middleware raises
+    MiddlewareNotUsed, so Django drops it from the chain and it costs nothing.
+    It is synchronous only: under ASGI, Django runs it in a worker thread
+    while profiling is enabled.
+    """
+    def __init__(self, get_response):
+        config = get_profiling_config()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.config = config
+        self.header = 'HTTP_' + config['HEADER'].upper().replace('-', '_')
+        self.slots = threading.BoundedSemaphore(config['MAX_CONCURRENT'])
+
+    def __call__(self, request):
+        trigger = self.trigger_of(request)
+        if trigger is None or not self.slots.acquire(blocking=False):
+            return self.get_response(request)
+        
+        try:
+            return self.profile(request, trigger)
+        finally:
+            self.slots.release()
+
+    def trigger_of(self, request):
+        if self.header in request.META:
+            return 'HEADER' if self.is_admin(request) else None
+        
+        sample_rate = self.config['SAMPLE_RATE']
+        if sample_rate > 0 and random.random() < sample_rate:
+            return 'SAMPLE'
+        return None
+
+    def is_admin(self, request):
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_authenticated and get_auth_context(request).is_admin
+
+    def profile(self, request, trigger):
+        recorder = StatementRecorder(self.config['MAX_STATEMENTS'])
+        profiler = build_profiler(self.config)
+        
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            profiler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.stop()
+        duration = time.perf_counter() - start
+        
+        try:
+            profile = self.store(request, response, trigger, profiler, recorder, duration)
+            response['X-Profile-Id'] = str(profile.pk)
+        except Exception as e:
+            # Profiling problems must not fail the request being profiled
+            logger.error(f"Failed to store request profile: {str(e)}")
+        
+        return response
+
+    def store(self, request, response, trigger, profiler, recorder, duration):
+        from survey_management.models.profiling import RequestProfile
+        
+        user = getattr(request, 'user', None)
+        profile = RequestProfile.objects.create(
+            user=user if user is not None and user.is_authenticated else None,
+            method=request.method,
+            path=request.get_full_path()[:500],
+            route=route_of(request)[:255],
+            status_code=response.status_code,
+            mode=self.config['MODE'].upper(),
+            trigger=trigger,
+            duration_ms=duration * 1000,
+            query_count=recorder.count,
+            db_ms=recorder.duration * 1000,
+            collapsed_stacks=profiler.collapsed(),
+            queries=recorder.statements,
+        )
+        prune_profiles(self.config['MAX_PROFILES'], self.config['MAX_AGE_DAYS'])
+        return profile
@@ -0,0 +1,21 @@
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+from survey_management.db_router import mark_recent_write
+
+
+class StickyPrimaryMiddleware(MiddlewareMixin):
+    """
+    Marks users who just wrote so their next reads stay on the primary.
+
+    Any successful unsafe-method request by an authenticated user counts as
+    a write; ReadReplicaMixin consults the mark, kept in the cache and in a
+    signed cookie, before using the replica.
+    Under ASGI, MiddlewareMixin sets the mark from a worker thread.
+    """
+    def process_response(self, request, response):
+        user = getattr(request, 'user', None)
+        if (request.method not in SAFE_METHODS and response.status_code < 400
+                and user is not None and user.is_authenticated):
+            mark_recent_write(user.pk, response)
+
+        return response
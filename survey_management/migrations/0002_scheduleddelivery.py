@@ -0,0 +1,42 @@
+# Generated by Django 4.1.3 on 2026-10-19 00:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('survey_management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('APPOINTMENT_COMPLETED', 'Appointment Completed'), ('DISCHARGE', 'Patient Discharge'), ('MEDICATION_PRESCRIBED', 'Medication Prescribed'), ('PROCEDURE_COMPLETED', 'Procedure Completed'), ('MANUAL', 'Manual Trigger')], max_length=50)),
+                ('event_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('event_time', models.DateTimeField()),
+                ('deliver_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('CANCELLED', 'Cancelled'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='survey_management.surveyschedule')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scheduled_deliveries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['deliver_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='scheduleddelivery',
+            index=models.Index(fields=['status', 'deliver_at'], name='delivery_status_due_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduleddelivery',
+            constraint=models.UniqueConstraint(fields=('schedule', 'user', 'event_id'), name='unique_delivery_per_event'),
+        ),
+    ]
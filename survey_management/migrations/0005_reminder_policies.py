@@ -0,0 +1,68 @@
+# Generated by Django 4.1.3 on 2026-10-19 00:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey_management', '0004_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offsets_hours', models.JSONField(default=list, help_text='Hours after assignment to send each reminder, e.g. [24, 72]')),
+                ('max_reminders', models.PositiveIntegerField(default=1)),
+                ('is_active', models.BooleanField(default=True)),
+                ('send_email', models.BooleanField(default=True)),
+                ('send_sms', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Reminder policies',
+            },
+        ),
+        migrations.AddField(
+            model_name='response',
+            name='last_reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='response',
+            name='next_reminder_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='response',
+            name='reminders_sent',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(condition=models.Q(('is_complete', False), ('next_reminder_at__isnull', False)), fields=['next_reminder_at'], name='response_reminder_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='reminderpolicy',
+            name='schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reminder_policies', to='survey_management.surveyschedule'),
+        ),
+        migrations.AddField(
+            model_name='reminderpolicy',
+            name='survey',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reminder_policies', to='survey_management.survey'),
+        ),
+        migrations.AddField(
+            model_name='response',
+            name='reminder_policy',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='responses', to='survey_management.reminderpolicy'),
+        ),
+        migrations.AddConstraint(
+            model_name='reminderpolicy',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('schedule__isnull', True), ('survey__isnull', False)), models.Q(('schedule__isnull', False), ('survey__isnull', True)), _connector='OR'), name='reminder_policy_single_target'),
+        ),
+    ]
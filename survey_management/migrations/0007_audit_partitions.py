@@ -0,0 +1,48 @@
+# Generated by Django 4.1.3 on 2026-10-19 01:10
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_period(apps, schema_editor):
+    AuditLog = apps.get_model('survey_management', 'AuditLog')
+    AuditLog.objects.filter(period__isnull=True).update(
+        period=ExtractYear('timestamp') * 100 + ExtractMonth('timestamp')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey_management', '0006_auditlog_event_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='period',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_period, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='period',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp'], name='audit_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', 'timestamp'], name='audit_user_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['action', 'timestamp'], name='audit_action_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['period'], name='audit_period_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.1.3 on 2026-10-19 01:40
+
+import hashlib
+import hmac
+from django.conf import settings
+from django.db import migrations, models
+
+
+def hash_existing_keys(apps, schema_editor):
+    # Same scheme as survey_management.models.user.hash_api_key, frozen here
+    secret = getattr(settings, 'SURVEY_API_KEY_SECRET', settings.SECRET_KEY).encode('utf-8')
+    UserProfile = apps.get_model('survey_management', 'UserProfile')
+    for profile in UserProfile.objects.exclude(api_key__isnull=True).exclude(api_key=''):
+        profile.api_key_prefix = profile.api_key[:8]
+        profile.api_key_hash = hmac.new(secret, profile.api_key.encode('utf-8'), hashlib.sha256).hexdigest()
+        profile.save(update_fields=['api_key_prefix', 'api_key_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey_management', '0007_audit_partitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='api_key_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='api_key_prefix',
+            field=models.CharField(blank=True, db_index=True, max_length=8, null=True),
+        ),
+        migrations.RunPython(hash_existing_keys, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='api_key',
+        ),
+    ]
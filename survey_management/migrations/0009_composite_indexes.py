@@ -0,0 +1,33 @@
+# Generated by Django 4.1.3 on 2026-10-19 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey_management', '0008_hashed_api_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['survey', 'is_complete'], name='response_survey_complete_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['submitted_at'], name='response_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='responseitem',
+            index=models.Index(fields=['question', 'numeric_answer'], name='item_question_numeric_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='responseitem',
+            index=models.Index(fields=['question', 'selected_option'], name='item_question_option_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyschedule',
+            index=models.Index(fields=['trigger_event', 'is_active'], name='schedule_trigger_active_idx'),
+        ),
+    ]
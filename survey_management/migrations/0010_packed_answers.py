@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-19 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey_management', '0009_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='response',
+            name='packed_answers',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
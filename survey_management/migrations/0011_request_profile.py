@@ -0,0 +1,42 @@
+# Generated by Django 4.1.3 on 2026-10-19 01:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('survey_management', '0010_packed_answers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('route', models.CharField(max_length=255)),
+                ('status_code', models.PositiveIntegerField()),
+                ('mode', models.CharField(choices=[('STATISTICAL', 'Statistical'), ('DETERMINISTIC', 'Deterministic')], max_length=20)),
+                ('trigger', models.CharField(choices=[('HEADER', 'Requested by header'), ('SAMPLE', 'Sampled')], max_length=10)),
+                ('duration_ms', models.FloatField()),
+                ('query_count', models.PositiveIntegerField(default=0)),
+                ('db_ms', models.FloatField(default=0)),
+                ('collapsed_stacks', models.TextField(blank=True)),
+                ('queries', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request_profiles', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='requestprofile',
+            index=models.Index(fields=['created_at'], name='profile_created_idx'),
+        ),
+    ]
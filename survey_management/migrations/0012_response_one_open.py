@@ -0,0 +1,42 @@
+# Generated by Django 4.1.3 on 2026-10-19 02:02
+
+from django.db import migrations, models
+
+
+def merge_duplicate_drafts(apps, schema_editor):
+    """Keep the oldest open response of each respondent and survey, with the latest answer to each question"""
+    Response = apps.get_model('survey_management', 'Response')
+    ResponseItem = apps.get_model('survey_management', 'ResponseItem')
+
+    duplicates = Response.objects.filter(is_complete=False).order_by().values(
+        'survey_id', 'respondent_id'
+    ).annotate(open_count=models.Count('id')).filter(open_count__gt=1)
+    for pair in list(duplicates):
+        kept, *extra = Response.objects.filter(
+            is_complete=False, survey_id=pair['survey_id'], respondent_id=pair['respondent_id']
+        ).order_by('started_at', 'pk').values_list('pk', flat=True)
+
+        # The most recently edited answer to each question wins, whichever draft it is in
+        answered = set()
+        for item in ResponseItem.objects.filter(response_id__in=[kept, *extra]).order_by('-updated_at', '-pk'):
+            if item.question_id in answered:
+                continue
+            answered.add(item.question_id)
+            if item.response_id != kept:
+                ResponseItem.objects.filter(response_id=kept, question_id=item.question_id).delete()
+                ResponseItem.objects.filter(pk=item.pk).update(response_id=kept)
+        Response.objects.filter(pk__in=extra).delete()
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey_management', '0011_request_profile'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_drafts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='response',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_complete', False)), fields=('survey', 'respondent'), name='response_one_open_per_respondent'),
+        ),
+    ]
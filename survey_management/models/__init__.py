@@ -2,5 +2,9 @@ from survey_management.models.survey import Survey, Question, QuestionOption
 from survey_management.models.response import Response, ResponseItem
 from survey_management.models.user import UserProfile
 from survey_management.models.department import Department
-from survey_management.models.schedule import SurveySchedule
-from survey_management.models.audit import AuditLog
\ No newline at end of file
+from survey_management.models.schedule import SurveySchedule, ScheduledDelivery
+from survey_management.models.audit import AuditLog
+from survey_management.models.assignment import AssignmentJob
+from survey_management.models.notification import NotificationOutbox
+from survey_management.models.reminder import ReminderPolicy
+from survey_management.models.profiling import RequestProfile
\ No newline at end of file
@@ -0,0 +1,37 @@
+from django.db import models
+from django.contrib.auth.models import User
+from survey_management.models.survey import Survey
+
+class AssignmentJob(models.Model):
+    """Progress record for assigning a survey to many users at once"""
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    )
+    
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name='assignment_jobs')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='assignment_jobs')
+    
+    # Targeting criteria as submitted: user_ids, department and/or role
+    target = models.JSONField(default=dict)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    processed = models.PositiveIntegerField(default=0)
+    assigned = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0,
+                                          help_text="Users who already had an open response")
+    not_found = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Assignment of {self.survey.title} ({self.get_status_display()})"
@@ -1,4 +1,6 @@
+import datetime
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 class AuditLog(models.Model):
@@ -15,12 +17,33 @@ class AuditLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     action = models.CharField(max_length=20, choices=ACTION_TYPES)
     details = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when the buffered entry is written
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     
+    # Monthly time bucket (YYYYMM); whole buckets are archived at once
+    period = models.PositiveIntegerField(editable=False)
+    
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp'], name='audit_timestamp_idx'),
+            models.Index(fields=['user', 'timestamp'], name='audit_user_timestamp_idx'),
+            models.Index(fields=['action', 'timestamp'], name='audit_action_timestamp_idx'),
+            models.Index(fields=['period'], name='audit_period_idx'),
+        ]
     
     def __str__(self):
         user_str = self.user.username if self.user else 'Anonymous'
         return f"{user_str} - {self.action} - {self.timestamp}"
+    
+    @staticmethod
+    def period_for(timestamp):
+        """Return the YYYYMM bucket a timestamp belongs to (in UTC)"""
+        timestamp = timestamp.astimezone(datetime.timezone.utc)
+        return timestamp.year * 100 + timestamp.month
+    
+    def save(self, *args, **kwargs):
+        if self.period is None:
+            self.period = self.period_for(self.timestamp)
+        super().save(*args, **kwargs)
@@ -0,0 +1,54 @@
+from django.db import models
+from django.contrib.auth.models import User
+from survey_management.models.survey import Survey
+
+class NotificationOutbox(models.Model):
+    """An email or SMS waiting to be delivered by the notification workers"""
+    CHANNELS = (
+        ('EMAIL', 'Email'),
+        ('SMS', 'SMS'),
+    )
+    
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('DEAD', 'Dead Letter'),
+    )
+    
+    KINDS = (
+        ('ASSIGNMENT', 'Survey Assignment'),
+        ('REMINDER', 'Survey Reminder'),
+    )
+    
+    channel = models.CharField(max_length=10, choices=CHANNELS)
+    kind = models.CharField(max_length=20, choices=KINDS, default='ASSIGNMENT')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True,
+                             related_name='notifications')
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, null=True, blank=True,
+                               related_name='notifications')
+    
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    
+    # Claimed rows are leased so a crashed worker's batch is picked up again
+    lease_token = models.CharField(max_length=32, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'channel', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.recipient} ({self.get_status_display()})"
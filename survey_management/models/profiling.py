@@ -0,0 +1,45 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+class RequestProfile(models.Model):
+    """Profile of one request: collapsed call stacks plus the SQL it executed"""
+    MODES = (
+        ('STATISTICAL', 'Statistical'),
+        ('DETERMINISTIC', 'Deterministic'),
+    )
+    
+    TRIGGERS = (
+        ('HEADER', 'Requested by header'),
+        ('SAMPLE', 'Sampled'),
+    )
+    
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='request_profiles')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    route = models.CharField(max_length=255)
+    status_code = models.PositiveIntegerField()
+    mode = models.CharField(max_length=20, choices=MODES)
+    trigger = models.CharField(max_length=10, choices=TRIGGERS)
+    
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    db_ms = models.FloatField(default=0)
+    
+    # One "frame;frame;frame weight" line per distinct stack, the input format
+    # of flamegraph.pl and speedscope. Weights are samples (statistical) or
+    # microseconds (deterministic).
+    collapsed_stacks = models.TextField(blank=True)
+    # [{'sql': ..., 'ms': ...}] in execution order; parameters are not stored
+    queries = models.JSONField(default=list)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='profile_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.method} {self.route} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,40 @@
+from django.db import models
+from survey_management.models.survey import Survey
+from survey_management.models.schedule import SurveySchedule
+
+class ReminderPolicy(models.Model):
+    """When to remind respondents about surveys they haven't completed"""
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, null=True, blank=True,
+                               related_name='reminder_policies')
+    schedule = models.ForeignKey(SurveySchedule, on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='reminder_policies')
+    
+    offsets_hours = models.JSONField(default=list,
+                                     help_text="Hours after assignment to send each reminder, e.g. [24, 72]")
+    max_reminders = models.PositiveIntegerField(default=1)
+    is_active = models.BooleanField(default=True)
+    
+    # Notification methods
+    send_email = models.BooleanField(default=True)
+    send_sms = models.BooleanField(default=False)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Reminder policies'
+        constraints = [
+            models.CheckConstraint(
+                check=(models.Q(survey__isnull=False, schedule__isnull=True) |
+                       models.Q(survey__isnull=True, schedule__isnull=False)),
+                name='reminder_policy_single_target'
+            ),
+        ]
+    
+    def __str__(self):
+        target = self.schedule if self.schedule_id else self.survey
+        return f"Reminders for {target} after {self.offsets_hours}h"
+    
+    def reminder_offsets(self):
+        """Return the offsets (in hours) that will actually be used, capped by max_reminders"""
+        return list(self.offsets_hours)[:self.max_reminders]
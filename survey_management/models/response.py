@@ -1,6 +1,75 @@
+from collections import namedtuple
 from django.db import models
+from django.utils.dateparse import parse_datetime
 from django.contrib.auth.models import User
 from survey_management.models.survey import Survey, Question, QuestionOption
+from survey_management.models.scoping import ScopedQuerySet
+
+# One answer, read from either a ResponseItem row or the packed column. The
+# item's ID and timestamps are None when its row is gone (KEEP_ITEMS) or the
+# response was packed before they were stored.
+Answer = namedtuple('Answer', ['question_id', 'text_answer', 'numeric_answer', 'selected_option_id',
+                               'item_id', 'created_at', 'updated_at'], defaults=(None, None, None))
+
+
+def answer_display(question_type, text_answer, numeric_answer, option_text):
+    """Return an answer in a human-readable format"""
+    if question_type == 'TEXT':
+        return text_answer
+    elif question_type == 'MULTIPLE_CHOICE':
+        return option_text
+    elif question_type == 'RATING':
+        return str(numeric_answer)
+    elif question_type == 'BOOLEAN':
+        if numeric_answer == 1:
+            return 'Yes'
+        elif numeric_answer == 0:
+            return 'No'
+        return None
+    return None
+
+
+def pack_answer(item):
+    """Compact form of a ResponseItem, leaving out empty columns"""
+    packed = {}
+    if item.pk is not None:
+        packed['i'] = item.pk
+    if item.created_at is not None:
+        packed['c'] = item.created_at.isoformat()
+    if item.updated_at is not None:
+        packed['u'] = item.updated_at.isoformat()
+    if item.text_answer is not None:
+        packed['t'] = item.text_answer
+    if item.numeric_answer is not None:
+        packed['n'] = item.numeric_answer
+    if item.selected_option_id is not None:
+        packed['o'] = item.selected_option_id
+    return packed
+
+
+def unpack_answer(question_id, packed):
+    created_at, updated_at = packed.get('c'), packed.get('u')
+    return Answer(int(question_id), packed.get('t'), packed.get('n'), packed.get('o'), packed.get('i'),
+                  created_at and parse_datetime(created_at), updated_at and parse_datetime(updated_at))
+
+
+class ResponseQuerySet(ScopedQuerySet):
+    respondent_lookup = 'respondent_id'
+    
+    def itemless_answer_maps(self):
+        """
+        The packed_answers of completed responses whose item rows were dropped (KEEP_ITEMS)
+
+        Every other response's answers are in ResponseItem rows, which
+        aggregates read in SQL; only these have to be read in Python.
+        """
+        return self.filter(is_complete=True, packed_answers__isnull=False).exclude(
+            models.Exists(ResponseItem.objects.filter(response=models.OuterRef('pk')))
+        ).order_by().values_list('packed_answers', flat=True)
+
+class ResponseItemQuerySet(ScopedQuerySet):
+    survey_lookup = 'response__survey_id'
+    respondent_lookup = 'response__respondent_id'
 
 class Response(models.Model):
     survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name='responses')
@@ -9,28 +78,78 @@ class Response(models.Model):
     submitted_at = models.DateTimeField(null=True, blank=True)
     is_complete = models.BooleanField(default=False)
     
+    # Reminder state for open responses
+    reminder_policy = models.ForeignKey('survey_management.ReminderPolicy', on_delete=models.SET_NULL,
+                                        null=True, blank=True, related_name='responses')
+    reminders_sent = models.PositiveIntegerField(default=0)
+    last_reminded_at = models.DateTimeField(null=True, blank=True)
+    next_reminder_at = models.DateTimeField(null=True, blank=True)
+    
+    # Answers of a completed response keyed by question id, written at submit
+    # time (see pack_answers). ResponseItem rows stay the editable source for
+    # drafts; editing an item clears this so readers fall back to the rows.
+    packed_answers = models.JSONField(null=True, blank=True, editable=False)
+    
+    objects = ResponseQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-submitted_at', '-started_at']
+        indexes = [
+            # Completion counts per survey and open-response checks on assignment
+            models.Index(fields=['survey', 'is_complete'], name='response_survey_complete_idx'),
+            # Response trends over a date range
+            models.Index(fields=['submitted_at'], name='response_submitted_idx'),
+            # Only open responses are ever scanned for due reminders
+            models.Index(fields=['next_reminder_at'], name='response_reminder_due_idx',
+                         condition=models.Q(is_complete=False, next_reminder_at__isnull=False)),
+        ]
+        constraints = [
+            # One open draft per respondent and survey, so concurrent creation
+            # makes get_or_create fetch the winner instead of adding a second
+            models.UniqueConstraint(fields=['survey', 'respondent'], condition=models.Q(is_complete=False),
+                                    name='response_one_open_per_respondent'),
+        ]
     
     def __str__(self):
         return f"Response to {self.survey.title} by {self.respondent.username}"
     
-    def calculate_completion_percentage(self):
-        """Calculate what percentage of required questions have been answered"""
-        required_questions = self.survey.questions.filter(is_required=True).count()
-        if required_questions == 0:
-            return 100
+    def pack_answers(self, items=None):
+        """Store the answers in packed_answers (the caller saves the response)"""
+        if items is None:
+            items = self.items.all()
+        self.packed_answers = {str(item.question_id): pack_answer(item) for item in items}
+        return self.packed_answers
+    
+    def get_answers(self):
+        """Answers keyed by question id, from packed_answers when present, otherwise the item rows"""
+        if self.packed_answers is not None:
+            return {int(qid): unpack_answer(qid, packed) for qid, packed in self.packed_answers.items()}
+        return {
+            item.question_id: Answer(item.question_id, item.text_answer, item.numeric_answer,
+                                     item.selected_option_id, item.pk, item.created_at, item.updated_at)
+            for item in self.items.all()
+        }
+    
+    def calculate_completion_percentage(self, required_ids=None):
+        """
+        Calculate what percentage of required questions have been answered
         
-        answered_required = ResponseItem.objects.filter(
-            response=self,
-            question__is_required=True
-        ).exclude(
-            text_answer='',
-            numeric_answer=None,
-            selected_option=None
-        ).count()
+        required_ids are the survey's required question IDs; callers that
+        already loaded them pass them to save the query.
+        """
+        if required_ids is None:
+            required_ids = set(self.survey.questions.filter(is_required=True).values_list('id', flat=True))
+        if not required_ids:
+            return 100
         
-        return (answered_required / required_questions) * 100
+        answered_required = sum(
+            1 for answer in self.get_answers().values()
+            if answer.question_id in required_ids and (
+                answer.text_answer or answer.numeric_answer is not None
+                or answer.selected_option_id is not None
+            )
+        )
+        return (answered_required / len(required_ids)) * 100
 
 
 class ResponseItem(models.Model):
@@ -46,24 +165,22 @@ class ResponseItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ResponseItemQuerySet.as_manager()
+    
     class Meta:
         unique_together = ('response', 'question')
+        indexes = [
+            # Rating aggregates and answer distributions per question
+            models.Index(fields=['question', 'numeric_answer'], name='item_question_numeric_idx'),
+            models.Index(fields=['question', 'selected_option'], name='item_question_option_idx'),
+        ]
     
     def __str__(self):
         return f"Answer to {self.question.text}"
     
     def get_answer_display(self):
         """Return the answer in a human-readable format"""
-        if self.question.question_type == 'TEXT':
-            return self.text_answer
-        elif self.question.question_type == 'MULTIPLE_CHOICE':
-            return self.selected_option.text if self.selected_option else None
-        elif self.question.question_type == 'RATING':
-            return str(self.numeric_answer)
-        elif self.question.question_type == 'BOOLEAN':
-            if self.numeric_answer == 1:
-                return 'Yes'
-            elif self.numeric_answer == 0:
-                return 'No'
-            return None
-        return None
+        option_text = None
+        if self.question.question_type == 'MULTIPLE_CHOICE' and self.selected_option:
+            option_text = self.selected_option.text
+        return answer_display(self.question.question_type, self.text_answer, self.numeric_answer, option_text)
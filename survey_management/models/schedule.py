@@ -1,6 +1,21 @@
 from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
 from survey_management.models.survey import Survey
 
+class SurveyScheduleQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        """
+        Queryset updates send no signals, so they refresh updated_at like
+        save() does and invalidate the event ingestion schedule index
+        """
+        from survey_management.services.event_service import schedule_index
+        kwargs.setdefault('updated_at', timezone.now())
+        rows = super().update(**kwargs)
+        schedule_index.invalidate()
+        return rows
+
 class SurveySchedule(models.Model):
     TRIGGER_EVENTS = (
         ('APPOINTMENT_COMPLETED', 'Appointment Completed'),
@@ -27,5 +42,48 @@ class SurveySchedule(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = SurveyScheduleQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['trigger_event', 'is_active'], name='schedule_trigger_active_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.survey.title} - {self.get_trigger_event_display()}"
+
+
+class ScheduledDelivery(models.Model):
+    """A pending survey delivery produced by a matched trigger event"""
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('CANCELLED', 'Cancelled'),
+        ('FAILED', 'Failed'),
+    )
+    
+    schedule = models.ForeignKey(SurveySchedule, on_delete=models.CASCADE, related_name='deliveries')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scheduled_deliveries')
+    event_type = models.CharField(max_length=50, choices=SurveySchedule.TRIGGER_EVENTS)
+    
+    # External identifier of the source event, used to ignore replayed events
+    event_id = models.CharField(max_length=100, blank=True, null=True)
+    event_time = models.DateTimeField()
+    deliver_at = models.DateTimeField()
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['deliver_at']
+        indexes = [
+            models.Index(fields=['status', 'deliver_at'], name='delivery_status_due_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'user', 'event_id'],
+                                    name='unique_delivery_per_event'),
+        ]
+    
+    def __str__(self):
+        return f"{self.schedule} -> {self.user.username} at {self.deliver_at}"
@@ -0,0 +1,62 @@
+from django.db import models
+
+
+def department_survey_ids(department_id):
+    """Subquery of the IDs of surveys assigned to a department"""
+    from survey_management.models.survey import Survey
+    return Survey.departments.through.objects.filter(
+        department_id=department_id
+    ).values('survey_id')
+
+
+class ScopedQuerySet(models.QuerySet):
+    """
+    QuerySet that can be narrowed to the rows a user is allowed to see
+
+    Subclasses name the lookup leading to the row's survey ID and, for
+    respondent data, to its respondent. Department visibility becomes a
+    single ``survey_id IN (subquery)`` predicate: it never duplicates rows
+    the way joining through Survey.departments can, and lets the database
+    drive the query from the survey_id index.
+    """
+    survey_lookup = 'survey_id'
+    respondent_lookup = None
+
+    def visible_to(self, user):
+        """
+        Restrict the queryset to what a user may see
+
+        Args:
+            user: User object or AuthorizationContext
+
+        Returns:
+            Filtered queryset
+        """
+        from survey_management.permissions.context import AuthorizationContext
+        if isinstance(user, AuthorizationContext):
+            context = user
+        else:
+            context = AuthorizationContext.build(user)
+
+        # Admins see everything
+        if context.is_admin:
+            return self
+
+        # Staff see their department's surveys and everything below them, for
+        # every model alike; staff without a department see nothing
+        if context.is_department_restricted:
+            if context.department_id is None:
+                return self.none()
+            return self.filter(**{
+                f'{self.survey_lookup}__in': department_survey_ids(context.department_id)
+            })
+
+        # Surveys and questions themselves are not confidential
+        if self.respondent_lookup is None:
+            return self
+
+        # Patients see their own responses
+        if context.role == 'PATIENT':
+            return self.filter(**{self.respondent_lookup: context.user_id})
+
+        return self.none()
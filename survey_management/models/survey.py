@@ -1,6 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
 from survey_management.models.department import Department
+from survey_management.models.scoping import ScopedQuerySet
+
+class SurveyQuerySet(ScopedQuerySet):
+    survey_lookup = 'pk'
 
 class Survey(models.Model):
     title = models.CharField(max_length=255)
@@ -15,6 +19,8 @@ class Survey(models.Model):
     target_audience = models.CharField(max_length=255, blank=True, null=True, 
                                       help_text="Description of the target audience")
     
+    objects = SurveyQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Survey'
@@ -25,23 +31,13 @@ class Survey(models.Model):
     
     def get_completion_rate(self):
         """Calculate the completion rate of this survey"""
-        total_responses = self.responses.count()
-        if total_responses == 0:
-            return 0
-        completed_responses = self.responses.filter(is_complete=True).count()
-        return (completed_responses / total_responses) * 100
+        from survey_management.services.analytics_service import survey_statistics
+        return survey_statistics([self.pk])[self.pk]['completion_rate']
     
     def get_average_rating(self):
         """Calculate the average rating for rating questions in this survey"""
-        from survey_management.models.response import ResponseItem
-        rating_responses = ResponseItem.objects.filter(
-            response__survey=self,
-            question__question_type='RATING',
-            numeric_answer__isnull=False
-        )
-        if not rating_responses.exists():
-            return None
-        return rating_responses.aggregate(models.Avg('numeric_answer'))['numeric_answer__avg']
+        from survey_management.services.analytics_service import survey_statistics
+        return survey_statistics([self.pk])[self.pk]['average_rating']
 
 
 class Question(models.Model):
@@ -62,6 +58,8 @@ class Question(models.Model):
     min_rating = models.IntegerField(null=True, blank=True)
     max_rating = models.IntegerField(null=True, blank=True)
     
+    objects = ScopedQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order']
     
@@ -1,6 +1,28 @@
+import hashlib
+import hmac
+import secrets
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 
+# Permissions granted by each role; superusers have all of them
+ROLE_PERMISSIONS = {
+    'ADMIN': frozenset(['create_survey', 'edit_survey', 'delete_survey', 'view_responses', 
+                        'export_data', 'manage_users', 'view_analytics']),
+    'STAFF': frozenset(['assign_survey', 'view_responses', 'view_analytics']),
+    'PATIENT': frozenset(['submit_response']),
+    'INTEGRATOR': frozenset(['api_access', 'trigger_survey']),
+}
+
+# Length of the public API key prefix used to find the key's row
+API_KEY_PREFIX_LENGTH = 8
+
+
+def hash_api_key(key):
+    """Keyed hash of an API key; only this and the prefix are stored"""
+    secret = getattr(settings, 'SURVEY_API_KEY_SECRET', settings.SECRET_KEY)
+    return hmac.new(secret.encode('utf-8'), key.encode('utf-8'), hashlib.sha256).hexdigest()
+
 class UserProfile(models.Model):
     USER_ROLES = (
         ('ADMIN', 'Healthcare Admin'),
@@ -21,24 +43,30 @@ class UserProfile(models.Model):
     # For staff/admin
     position = models.CharField(max_length=100, blank=True, null=True)
     
-    # For system integrators
-    api_key = models.CharField(max_length=64, blank=True, null=True)
+    # For system integrators: the key itself is never stored
+    api_key_prefix = models.CharField(max_length=API_KEY_PREFIX_LENGTH, blank=True, null=True, db_index=True)
+    api_key_hash = models.CharField(max_length=64, blank=True, null=True)
     
     def __str__(self):
         return f"{self.user.username} ({self.get_role_display()})"
     
+    def set_api_key(self):
+        """Generate a new API key, store its prefix and hash, and return the key"""
+        prefix = secrets.token_hex(API_KEY_PREFIX_LENGTH // 2)
+        key = f"{prefix}.{secrets.token_urlsafe(32)}"
+        self.api_key_prefix = prefix
+        self.api_key_hash = hash_api_key(key)
+        return key
+    
+    def revoke_api_key(self):
+        """Remove the API key so it can no longer authenticate"""
+        self.api_key_prefix = None
+        self.api_key_hash = None
+    
     def has_permission(self, permission_name):
         """Check if user has a specific permission based on role"""
         # Superusers have all permissions
         if self.user.is_superuser:
             return True
-            
-        role_permissions = {
-            'ADMIN': ['create_survey', 'edit_survey', 'delete_survey', 'view_responses', 
-                     'export_data', 'manage_users', 'view_analytics'],
-            'STAFF': ['assign_survey', 'view_responses', 'view_analytics'],
-            'PATIENT': ['submit_response'],
-            'INTEGRATOR': ['api_access', 'trigger_survey'],
-        }
         
-        return permission_name in role_permissions.get(self.role, [])
+        return permission_name in ROLE_PERMISSIONS.get(self.role, ())
@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.cache import cache
+from survey_management.models.survey import Survey
+from survey_management.caching import get_profile_values
+from survey_management.models.user import ROLE_PERMISSIONS
+
+GENERATION_KEY = 'survey:authz:generation'
+REQUEST_ATTRIBUTE = '_survey_auth_context'
+
+
+class AuthorizationContext:
+    """
+    Resolved role, permissions and survey visibility of a single user
+
+    Built once per request (and cached across requests), so permission
+    classes and querysets can answer with set lookups instead of loading the
+    profile, its department and each survey's departments again.
+    """
+
+    def __init__(self, user_id, role=None, is_superuser=False, department_id=None, survey_ids=()):
+        self.user_id = user_id
+        self.role = role
+        self.is_superuser = is_superuser
+        self.department_id = department_id
+        self.survey_ids = frozenset(survey_ids)
+
+        if is_superuser:
+            self.permissions = frozenset().union(*ROLE_PERMISSIONS.values())
+        else:
+            self.permissions = ROLE_PERMISSIONS.get(role, frozenset())
+
+    @classmethod
+    def build(cls, user):
+        """Resolve the context of a user from the cached profile and at most one query"""
+        # Strict, so a context cached for minutes is never built from a stale profile
+        profile = get_profile_values(user.pk, strict=True)
+        if profile is None:
+            return cls(user.pk, is_superuser=user.is_superuser)
+
+        survey_ids = ()
+        if profile['role'] == 'STAFF' and profile['department_id']:
+            survey_ids = Survey.departments.through.objects.filter(
+                department_id=profile['department_id']
+            ).values_list('survey_id', flat=True)
+
+        return cls(
+            user.pk,
+            role=profile['role'],
+            is_superuser=user.is_superuser,
+            department_id=profile['department_id'],
+            survey_ids=survey_ids
+        )
+
+    @property
+    def has_profile(self):
+        return self.role is not None
+
+    @property
+    def is_admin(self):
+        return self.is_superuser or self.role == 'ADMIN'
+
+    @property
+    def is_department_restricted(self):
+        """Staff only see their department's surveys, and none without a department"""
+        return not self.is_superuser and self.role == 'STAFF'
+
+    def has_permission(self, permission_name):
+        return permission_name in self.permissions
+
+    def can_view_survey(self, survey_id):
+        return not self.is_department_restricted or survey_id in self.survey_ids
+
+
+def _cache_key(user_id):
+    generation = cache.get(GENERATION_KEY, 0)
+    return f"survey:authz:{generation}:{user_id}"
+
+
+def get_auth_context(request):
+    """
+    Return the AuthorizationContext of the request's user
+
+    The context is memoised on the request and in the Django cache for
+    SURVEY_AUTHZ_CACHE_SECONDS. Profile changes drop a user's entry;
+    survey/department changes invalidate every entry.
+    """
+    # DRF wraps the Django request; memoise on the underlying one so
+    # middleware and views share the same context
+    holder = getattr(request, '_request', request)
+    user = request.user
+
+    context = getattr(holder, REQUEST_ATTRIBUTE, None)
+    if context is not None and context.user_id == user.pk:
+        return context
+
+    key = _cache_key(user.pk)
+    context = cache.get(key)
+    if context is None:
+        context = AuthorizationContext.build(user)
+        cache.set(key, context, getattr(settings, 'SURVEY_AUTHZ_CACHE_SECONDS', 300))
+
+    setattr(holder, REQUEST_ATTRIBUTE, context)
+    return context
+
+
+def invalidate_user_context(user_id):
+    """Forget the cached context of one user"""
+    cache.delete(_cache_key(user_id))
+
+
+def invalidate_all_contexts():
+    """Forget every cached context, e.g. after survey departments changed"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from survey_management.permissions.context import get_auth_context
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -14,9 +15,8 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return request.user.is_authenticated
         
         # Write permissions are only allowed to admins
-        return (request.user.is_authenticated and 
-                hasattr(request.user, 'profile') and 
-                request.user.profile.role == 'ADMIN')
+        return (request.user.is_authenticated and
+                get_auth_context(request).role == 'ADMIN')
 
 class HasSurveyPermission(permissions.BasePermission):
     """
@@ -30,18 +30,17 @@ class HasSurveyPermission(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         
+        context = get_auth_context(request)
+        
         # Check if user has the required permission based on the action
         if view.action in ['create', 'update', 'partial_update', 'destroy']:
-            return (hasattr(request.user, 'profile') and 
-                    request.user.profile.has_permission('create_survey'))
+            return context.has_permission('create_survey')
         
         elif view.action == 'export_responses':
-            return (hasattr(request.user, 'profile') and 
-                    request.user.profile.has_permission('export_data'))
+            return context.has_permission('export_data')
         
-        elif view.action == 'assign_survey':
-            return (hasattr(request.user, 'profile') and 
-                    request.user.profile.has_permission('assign_survey'))
+        elif view.action in ['assign_survey', 'bulk_assign']:
+            return context.has_permission('assign_survey')
         
         # Read permissions are allowed to any authenticated user
         return True
@@ -51,19 +50,15 @@ class HasSurveyPermission(permissions.BasePermission):
         if request.user.is_superuser:
             return True
             
+        context = get_auth_context(request)
+        
         # Read permissions are allowed to any authenticated user
         if request.method in permissions.SAFE_METHODS:
             # Staff can only view surveys for their department
-            if (hasattr(request.user, 'profile') and 
-                request.user.profile.role == 'STAFF' and 
-                request.user.profile.department):
-                return request.user.profile.department in obj.departments.all()
-            return True
+            return context.can_view_survey(obj.pk)
         
         # Write permissions are only allowed to admins or the creator
-        return ((hasattr(request.user, 'profile') and 
-                request.user.profile.role == 'ADMIN') or 
-                obj.created_by == request.user)
+        return context.role == 'ADMIN' or obj.created_by_id == request.user.pk
 
 class HasResponsePermission(permissions.BasePermission):
     """
@@ -77,16 +72,18 @@ class HasResponsePermission(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        # Patients can only submit responses
-        if hasattr(request.user, 'profile') and request.user.profile.role == 'PATIENT':
-            return view.action in ['submit', 'create', 'retrieve', 'list']
+        role = get_auth_context(request).role
+        
+        # Patients can only submit responses, at once or through a draft
+        if role == 'PATIENT':
+            return view.action in ['submit', 'draft', 'answers', 'finalize', 'create', 'retrieve', 'list']
         
         # Staff can view responses but not modify them
-        elif hasattr(request.user, 'profile') and request.user.profile.role == 'STAFF':
+        elif role == 'STAFF':
             return request.method in permissions.SAFE_METHODS
         
         # Admins have full access
-        elif hasattr(request.user, 'profile') and request.user.profile.role == 'ADMIN':
+        elif role == 'ADMIN':
             return True
         
         return False
@@ -96,18 +93,21 @@ class HasResponsePermission(permissions.BasePermission):
         if request.user.is_superuser:
             return True
             
+        context = get_auth_context(request)
+        
+        # Response items are checked against the response they belong to
+        response = getattr(obj, 'response', obj)
+        
         # Patients can only access their own responses
-        if hasattr(request.user, 'profile') and request.user.profile.role == 'PATIENT':
-            return obj.respondent == request.user
+        if context.role == 'PATIENT':
+            return response.respondent_id == request.user.pk
         
         # Staff can only view responses for their department
-        elif (hasattr(request.user, 'profile') and 
-              request.user.profile.role == 'STAFF' and 
-              request.user.profile.department):
-            return request.user.profile.department in obj.survey.departments.all()
+        elif context.is_department_restricted:
+            return context.can_view_survey(response.survey_id)
         
         # Admins have full access
-        elif hasattr(request.user, 'profile') and request.user.profile.role == 'ADMIN':
+        elif context.role == 'ADMIN':
             return True
         
         return False
@@ -125,5 +125,65 @@ class HasAnalyticsPermission(permissions.BasePermission):
             return False
         
         # Only staff and admins can access analytics
-        return (hasattr(request.user, 'profile') and 
-                request.user.profile.has_permission('view_analytics'))
+        return get_auth_context(request).has_permission('view_analytics')
+
+class HasEventIngestionPermission(permissions.BasePermission):
+    """
+    Custom permission for feeding trigger events from external systems.
+    """
+    def has_permission(self, request, view):
+        # Superusers always have permission
+        if request.user.is_superuser:
+            return True
+            
+        if not request.user.is_authenticated:
+            return False
+        
+        # Integrators trigger surveys, admins may replay events manually
+        context = get_auth_context(request)
+        return context.has_permission('trigger_survey') or context.role == 'ADMIN'
+
+class HasAssignmentPermission(permissions.BasePermission):
+    """
+    Custom permission for viewing bulk assignment jobs.
+    """
+    def has_permission(self, request, view):
+        # Superusers always have permission
+        if request.user.is_superuser:
+            return True
+            
+        if not request.user.is_authenticated:
+            return False
+        
+        context = get_auth_context(request)
+        return context.has_permission('assign_survey') or context.role == 'ADMIN'
+
+class HasAuditPermission(permissions.BasePermission):
+    """
+    Custom permission for reading the audit trail.
+    """
+    def has_permission(self, request, view):
+        # Superusers always have permission
+        if request.user.is_superuser:
+            return True
+            
+        if not request.user.is_authenticated:
+            return False
+        
+        # Only admins can read the audit trail
+        return get_auth_context(request).role == 'ADMIN'
+
+class HasMonitoringPermission(permissions.BasePermission):
+    """
+    Custom permission for operational status endpoints.
+    """
+    def has_permission(self, request, view):
+        # Superusers always have permission
+        if request.user.is_superuser:
+            return True
+            
+        if not request.user.is_authenticated:
+            return False
+        
+        # Only admins can inspect the platform's runtime state
+        return get_auth_context(request).role == 'ADMIN'
@@ -0,0 +1,163 @@
+import sys
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+
+DEFAULT_PROFILING = {
+    # Off by default; when False the middleware removes itself at startup
+    'ENABLED': False,
+    # Admins request a profile of one request by sending this header
+    'HEADER': 'X-Profile',
+    # Share of all requests profiled without the header (0 disables sampling)
+    'SAMPLE_RATE': 0.0,
+    # 'statistical' samples the stack every INTERVAL seconds; 'deterministic'
+    # traces every call, which is exact but slows the request down
+    'MODE': 'statistical',
+    'INTERVAL': 0.005,
+    # Requests profiled at the same time per process; others run unprofiled
+    'MAX_CONCURRENT': 1,
+    # Retention: the newest MAX_PROFILES profiles younger than MAX_AGE_DAYS
+    'MAX_PROFILES': 200,
+    'MAX_AGE_DAYS': 7,
+    'MAX_STATEMENTS': 500,
+    'MAX_STACK_DEPTH': 128,
+}
+
+
+def get_profiling_config():
+    config = dict(DEFAULT_PROFILING)
+    config.update(getattr(settings, 'SURVEY_PROFILING', {}))
+    return config
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def collapse(stacks):
+    """Collapsed-stack text from a Counter of stack tuples (root first)"""
+    return '\n'.join(
+        f"{';'.join(stack)} {int(weight)}" for stack, weight in stacks.most_common() if int(weight) > 0
+    )
+
+
+class StatisticalProfiler:
+    """
+    Samples the call stack of one thread from a background thread
+
+    Overhead is one stack walk per INTERVAL, independent of how many
+    functions the request calls.
+    """
+
+    def __init__(self, interval=0.005, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+
+    def collapsed(self):
+        return collapse(self.stacks)
+
+
+class DeterministicProfiler:
+    """
+    Traces every Python and C call of the current thread with sys.setprofile
+
+    Time is attributed to the stack that was executing, in microseconds.
+    Frames that were already running when profiling started are not part
+    of the stacks.
+    """
+
+    def __init__(self, max_depth=128):
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self._stack = []
+        self._last = None
+
+    def start(self):
+        self._last = time.perf_counter()
+        sys.setprofile(self._hook)
+
+    def stop(self):
+        sys.setprofile(None)
+
+    def _hook(self, frame, event, arg):
+        now = time.perf_counter()
+        if self._stack:
+            self.stacks[tuple(self._stack[:self.max_depth])] += (now - self._last) * 1e6
+        if event == 'call':
+            self._stack.append(frame_label(frame))
+        elif event == 'c_call':
+            self._stack.append(f"{getattr(arg, '__qualname__', arg)} (builtin)")
+        elif self._stack and event in ('return', 'c_return', 'c_exception'):
+            self._stack.pop()
+        self._last = time.perf_counter()
+
+    def collapsed(self):
+        return collapse(self.stacks)
+
+
+class StatementRecorder:
+    """Database execute wrapper keeping the SQL templates and timings of a request"""
+
+    def __init__(self, max_statements=500):
+        self.max_statements = max_statements
+        self.statements = []
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if len(self.statements) < self.max_statements:
+                self.statements.append({'sql': sql, 'ms': round(elapsed * 1000, 3)})
+
+
+def build_profiler(config):
+    if config['MODE'] == 'deterministic':
+        return DeterministicProfiler(config['MAX_STACK_DEPTH'])
+    return StatisticalProfiler(config['INTERVAL'], config['MAX_STACK_DEPTH'])
+
+
+def prune_profiles(max_profiles, max_age_days):
+    """Delete profiles beyond the retention limits, returning the number deleted"""
+    from datetime import timedelta
+    from django.utils import timezone
+    from survey_management.models.profiling import RequestProfile
+
+    deleted, _ = RequestProfile.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=max_age_days)
+    ).delete()
+    stale = list(RequestProfile.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)[max_profiles:])
+    if stale:
+        deleted += RequestProfile.objects.filter(pk__in=stale).delete()[0]
+    return deleted
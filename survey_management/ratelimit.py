@@ -0,0 +1,57 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Holds up to ``capacity`` tokens and refills at ``rate`` tokens per second.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def try_consume(self, tokens=1):
+        """
+        Take tokens if available
+
+        Returns:
+            Tuple of (allowed, seconds to wait until enough tokens are available)
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True, 0.0
+            if self.rate <= 0:
+                return False, float('inf')
+            return False, (tokens - self.tokens) / self.rate
+
+    def consume(self, tokens=1, stop_event=None):
+        """
+        Block until tokens are available
+
+        Requests larger than the bucket are capped at its capacity so they can
+        still be served. Returns False if stop_event is set while waiting.
+        """
+        tokens = min(tokens, self.capacity)
+        while True:
+            allowed, wait = self.try_consume(tokens)
+            if allowed:
+                return True
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
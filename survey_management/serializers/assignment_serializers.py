@@ -0,0 +1,40 @@
+from rest_framework import serializers
+from survey_management.models.assignment import AssignmentJob
+from survey_management.models.department import Department
+from survey_management.models.user import UserProfile
+
+class BulkAssignmentSerializer(serializers.Serializer):
+    """Serializer for targeting a survey assignment at many users"""
+    user_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    department = serializers.PrimaryKeyRelatedField(queryset=Department.objects.all(), required=False)
+    role = serializers.ChoiceField(choices=UserProfile.USER_ROLES, required=False)
+    
+    def validate(self, data):
+        if 'user_ids' in data and ('department' in data or 'role' in data):
+            raise serializers.ValidationError("Specify either user_ids or a department/role query, not both")
+        if not data:
+            raise serializers.ValidationError("Specify user_ids, a department or a role")
+        return data
+    
+    def to_target(self):
+        """Return the JSON-serializable target stored on the AssignmentJob"""
+        data = self.validated_data
+        target = {}
+        if 'user_ids' in data:
+            target['user_ids'] = data['user_ids']
+        if 'department' in data:
+            target['department'] = data['department'].id
+        if 'role' in data:
+            target['role'] = data['role']
+        return target
+
+class AssignmentJobSerializer(serializers.ModelSerializer):
+    survey_title = serializers.ReadOnlyField(source='survey.title')
+    requested_by = serializers.ReadOnlyField(source='requested_by.username')
+    
+    class Meta:
+        model = AssignmentJob
+        fields = ['id', 'survey', 'survey_title', 'requested_by', 'target', 'status',
+                 'processed', 'assigned', 'skipped', 'not_found', 'error',
+                 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
@@ -9,4 +9,7 @@ class DepartmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'staff_count']
     
     def get_staff_count(self, obj):
+        # Annotated by DepartmentViewSet; counted for freshly saved departments
+        if hasattr(obj, 'staff_total'):
+            return obj.staff_total
         return obj.staff.count()
@@ -0,0 +1,12 @@
+from django.conf import settings
+from rest_framework import serializers
+
+class EventBatchSerializer(serializers.Serializer):
+    """Serializer for a batch of trigger events sent by an integration"""
+    events = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    
+    def validate_events(self, value):
+        limit = getattr(settings, 'SURVEY_EVENT_BATCH_LIMIT', 5000)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"A batch may contain at most {limit} events")
+        return value
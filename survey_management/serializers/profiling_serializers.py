@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from survey_management.models.profiling import RequestProfile
+
+class RequestProfileListSerializer(serializers.ModelSerializer):
+    username = serializers.ReadOnlyField(source='user.username')
+    
+    class Meta:
+        model = RequestProfile
+        fields = ['id', 'username', 'method', 'path', 'route', 'status_code', 'mode', 'trigger',
+                 'duration_ms', 'query_count', 'db_ms', 'created_at']
+        read_only_fields = fields
+
+class RequestProfileSerializer(RequestProfileListSerializer):
+    class Meta(RequestProfileListSerializer.Meta):
+        fields = RequestProfileListSerializer.Meta.fields + ['queries']
+        read_only_fields = fields
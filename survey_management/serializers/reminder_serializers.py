@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from survey_management.models.reminder import ReminderPolicy
+
+class ReminderPolicySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReminderPolicy
+        fields = ['id', 'survey', 'schedule', 'offsets_hours', 'max_reminders', 'is_active',
+                 'send_email', 'send_sms', 'created_at', 'updated_at']
+    
+    def validate_offsets_hours(self, value):
+        """Offsets must be a non-empty, strictly increasing list of positive hours"""
+        if not isinstance(value, list) or not value:
+            raise serializers.ValidationError("Provide at least one reminder offset")
+        if not all(isinstance(offset, int) and not isinstance(offset, bool) and offset > 0 for offset in value):
+            raise serializers.ValidationError("Offsets must be positive whole hours")
+        if any(later <= earlier for earlier, later in zip(value, value[1:])):
+            raise serializers.ValidationError("Offsets must be in increasing order")
+        return value
+    
+    def validate(self, data):
+        survey = data.get('survey', getattr(self.instance, 'survey', None))
+        schedule = data.get('schedule', getattr(self.instance, 'schedule', None))
+        if (survey is None) == (schedule is None):
+            raise serializers.ValidationError("A reminder policy applies to either a survey or a schedule")
+        return data
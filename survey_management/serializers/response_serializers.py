@@ -1,5 +1,7 @@
+from drf_yasg.utils import swagger_serializer_method
+from django.db import models
 from rest_framework import serializers
-from survey_management.models.response import Response, ResponseItem
+from survey_management.models.response import Response, ResponseItem, answer_display
 from survey_management.models.survey import Question, QuestionOption
 
 class ResponseItemSerializer(serializers.ModelSerializer):
@@ -38,8 +40,16 @@ class ResponseItemSerializer(serializers.ModelSerializer):
         
         return data
 
+class ResponseListSerializer(serializers.ListSerializer):
+    """Loads the questions of every survey in a list of responses at once"""
+    
+    def to_representation(self, data):
+        responses = list(data.all() if isinstance(data, models.Manager) else data)
+        self.child.load_survey_questions({response.survey_id for response in responses})
+        return super().to_representation(responses)
+
 class ResponseSerializer(serializers.ModelSerializer):
-    items = ResponseItemSerializer(many=True, read_only=True)
+    items = serializers.SerializerMethodField()
     respondent_username = serializers.ReadOnlyField(source='respondent.username')
     survey_title = serializers.ReadOnlyField(source='survey.title')
     completion_percentage = serializers.SerializerMethodField()
@@ -48,18 +58,162 @@ class ResponseSerializer(serializers.ModelSerializer):
         model = Response
         fields = ['id', 'survey', 'survey_title', 'respondent', 'respondent_username',
                  'started_at', 'submitted_at', 'is_complete', 'items', 'completion_percentage']
+        list_serializer_class = ResponseListSerializer
+    
+    @swagger_serializer_method(serializer_or_field=ResponseItemSerializer(many=True))
+    def get_items(self, obj):
+        """Answers from the item rows, or from packed_answers without joining them"""
+        if obj.packed_answers is None:
+            return ResponseItemSerializer(obj.items.all(), many=True, context=self.context).data
+        
+        questions = self._survey_questions(obj.survey_id)
+        timestamp = serializers.DateTimeField()
+        # In item ID order, like the rows of unpacked responses
+        answers = sorted(obj.get_answers().values(), key=lambda answer: (answer.item_id or 0, answer.question_id))
+        items = []
+        for answer in answers:
+            question = questions.get(answer.question_id)
+            if question is None:
+                continue
+            option_text = question.option_texts.get(answer.selected_option_id)
+            items.append({
+                'id': answer.item_id,
+                'question': question.id,
+                'question_text': question.text,
+                'question_type': question.question_type,
+                'text_answer': answer.text_answer,
+                'numeric_answer': answer.numeric_answer,
+                'selected_option': answer.selected_option_id,
+                'answer_display': answer_display(question.question_type, answer.text_answer,
+                                                 answer.numeric_answer, option_text),
+                'created_at': timestamp.to_representation(answer.created_at or obj.submitted_at),
+                'updated_at': timestamp.to_representation(answer.updated_at or obj.submitted_at),
+            })
+        return items
+    
+    def load_survey_questions(self, survey_ids):
+        """Load the questions of surveys with their option texts, once per serialization"""
+        cache = self.context.setdefault('_survey_questions', {})
+        missing = [survey_id for survey_id in survey_ids if survey_id not in cache]
+        if not missing:
+            return
+        for survey_id in missing:
+            cache[survey_id] = {}
+        for question in Question.objects.filter(survey_id__in=missing).prefetch_related('options'):
+            question.option_texts = {option.id: option.text for option in question.options.all()}
+            cache[question.survey_id][question.id] = question
+    
+    def _survey_questions(self, survey_id):
+        """Questions of a survey keyed by ID"""
+        self.load_survey_questions([survey_id])
+        return self.context['_survey_questions'][survey_id]
     
     def get_completion_percentage(self, obj):
-        return obj.calculate_completion_percentage()
+        required_ids = {
+            question_id for question_id, question in self._survey_questions(obj.survey_id).items()
+            if question.is_required
+        }
+        return obj.calculate_completion_percentage(required_ids)
 
-class SubmitResponseSerializer(serializers.Serializer):
-    """Serializer for submitting a complete response with all answers"""
+def check_submitted_answers(answers, questions):
+    """
+    Check submitted answers against the questions of their survey
+    
+    Raises:
+        ValidationError: An answer lacks a question_id or names a question of
+            another survey, or a required question is not answered
+    """
+    question_ids = set(q.id for q in questions)
+    
+    # Check that all required questions are answered
+    for answer in answers:
+        if 'question_id' not in answer:
+            raise serializers.ValidationError("Each answer must include a question_id")
+        
+        try:
+            question_id = int(answer['question_id'])
+        except (ValueError, TypeError):
+            raise serializers.ValidationError("question_id must be an integer")
+        
+        if question_id not in question_ids:
+            raise serializers.ValidationError(f"Question {question_id} does not belong to this survey")
+    
+    # Check for missing required questions
+    answered_question_ids = set(int(a['question_id']) for a in answers if 'question_id' in a)
+    required_question_ids = set(q.id for q in questions if q.is_required)
+    missing_required = required_question_ids - answered_question_ids
+    
+    if missing_required:
+        raise serializers.ValidationError(f"Missing answers for required questions: {missing_required}")
+
+def check_draft_answers(answers, definition):
+    """
+    Check answers saved to a draft against the cached survey definition
+    
+    Raises:
+        ValidationError: An answer lacks a question_id, names a question of
+            another survey or an option of another question
+    """
+    questions = {question['id']: question for question in definition['questions']}
+    
+    for answer in answers:
+        if 'question_id' not in answer:
+            raise serializers.ValidationError("Each answer must include a question_id")
+        
+        try:
+            question_id = int(answer['question_id'])
+        except (ValueError, TypeError):
+            raise serializers.ValidationError("question_id must be an integer")
+        
+        question = questions.get(question_id)
+        if question is None:
+            raise serializers.ValidationError(f"Question {question_id} does not belong to this survey")
+        
+        option_id = answer.get('option_id')
+        if option_id and question['question_type'] == 'MULTIPLE_CHOICE':
+            if option_id not in {str(option['id']) for option in question['options']}:
+                raise serializers.ValidationError(f"Option {option_id} does not belong to question {question_id}")
+
+def check_draft_complete(items, definition):
+    """
+    Check that a draft's items answer every required question of the cached survey definition
+    
+    Raises:
+        ValidationError: A required question is not answered
+    """
+    answered_question_ids = {
+        item.question_id for item in items
+        if item.text_answer or item.numeric_answer is not None or item.selected_option_id is not None
+    }
+    required_question_ids = {question['id'] for question in definition['questions'] if question['is_required']}
+    missing_required = required_question_ids - answered_question_ids
+    
+    if missing_required:
+        raise serializers.ValidationError(f"Missing answers for required questions: {missing_required}")
+
+class DraftSerializer(serializers.Serializer):
+    """Survey of a draft response to create or resume"""
     survey_id = serializers.IntegerField()
+
+class DraftAnswersSerializer(serializers.Serializer):
+    """Answers saved to a draft; only the listed questions are touched"""
     answers = serializers.ListField(
         child=serializers.DictField(
             child=serializers.CharField(allow_null=True, allow_blank=True)
         )
     )
+
+class SubmitResponsePayloadSerializer(serializers.Serializer):
+    """Shape of a response submission, checked without touching the database"""
+    survey_id = serializers.IntegerField()
+    answers = serializers.ListField(
+        child=serializers.DictField(
+            child=serializers.CharField(allow_null=True, allow_blank=True)
+        )
+    )
+
+class SubmitResponseSerializer(SubmitResponsePayloadSerializer):
+    """Serializer for submitting a complete response with all answers"""
     
     def validate_survey_id(self, value):
         from survey_management.models.survey import Survey
@@ -78,27 +232,6 @@ class SubmitResponseSerializer(serializers.Serializer):
         # Get all questions for this survey
         survey = Survey.objects.get(pk=survey_id)
         questions = Question.objects.filter(survey=survey)
-        question_ids = set(q.id for q in questions)
-        
-        # Check that all required questions are answered
-        for answer in answers:
-            if 'question_id' not in answer:
-                raise serializers.ValidationError("Each answer must include a question_id")
-            
-            try:
-                question_id = int(answer['question_id'])
-            except (ValueError, TypeError):
-                raise serializers.ValidationError("question_id must be an integer")
-            
-            if question_id not in question_ids:
-                raise serializers.ValidationError(f"Question {question_id} does not belong to this survey")
-        
-        # Check for missing required questions
-        answered_question_ids = set(int(a['question_id']) for a in answers if 'question_id' in a)
-        required_question_ids = set(q.id for q in questions if q.is_required)
-        missing_required = required_question_ids - answered_question_ids
-        
-        if missing_required:
-            raise serializers.ValidationError(f"Missing answers for required questions: {missing_required}")
+        check_submitted_answers(answers, questions)
         
         return data
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from survey_management.models.schedule import SurveySchedule
+from survey_management.services.event_service import compile_event_filter
 
 class SurveyScheduleSerializer(serializers.ModelSerializer):
     survey_title = serializers.ReadOnlyField(source='survey.title')
@@ -9,3 +10,11 @@ class SurveyScheduleSerializer(serializers.ModelSerializer):
         fields = ['id', 'survey', 'survey_title', 'trigger_event', 'delay_hours', 
                  'is_active', 'event_filter', 'send_email', 'send_sms', 
                  'created_at', 'updated_at']
+    
+    def validate_event_filter(self, value):
+        """Reject filters that cannot be compiled into a predicate"""
+        try:
+            compile_event_filter(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
@@ -1,12 +1,19 @@
+from django.db import models, transaction
 from rest_framework import serializers
 from survey_management.models.survey import Survey, Question, QuestionOption
+from survey_management.services.analytics_service import survey_statistics
+from survey_management.services.survey_authoring import save_question_options, save_survey_questions
 
 class QuestionOptionSerializer(serializers.ModelSerializer):
+    # Writable so nested updates can match options by ID and keep them
+    id = serializers.IntegerField(required=False)
+    
     class Meta:
         model = QuestionOption
         fields = ['id', 'text', 'order']
 
 class QuestionSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
     options = QuestionOptionSerializer(many=True, read_only=False, required=False)
     
     class Meta:
@@ -14,33 +21,51 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ['id', 'text', 'question_type', 'is_required', 'order', 
                  'min_rating', 'max_rating', 'options']
     
+    def save_options(self, question, options_data):
+        try:
+            save_question_options(question, options_data)
+        except serializers.ValidationError as error:
+            raise serializers.ValidationError({'options': error.detail})
+    
     def create(self, validated_data):
+        validated_data.pop('id', None)
         options_data = validated_data.pop('options', [])
-        question = Question.objects.create(**validated_data)
         
-        for option_data in options_data:
-            QuestionOption.objects.create(question=question, **option_data)
+        with transaction.atomic():
+            question = Question.objects.create(**validated_data)
+            if options_data:
+                self.save_options(question, options_data)
         
         return question
     
     def update(self, instance, validated_data):
+        validated_data.pop('id', None)
         options_data = validated_data.pop('options', None)
         
-        # Update question fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        
-        # Update options if provided
-        if options_data is not None:
-            instance.options.all().delete()
-            for option_data in options_data:
-                QuestionOption.objects.create(question=instance, **option_data)
+        with transaction.atomic():
+            # Update question fields
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+            
+            # Update options if provided, keeping the IDs answers refer to
+            if options_data is not None:
+                self.save_options(instance, options_data)
         
         return instance
 
+class SurveyListSerializer(serializers.ListSerializer):
+    """Loads the response statistics of every survey in a list at once"""
+    
+    def to_representation(self, data):
+        surveys = list(data.all() if isinstance(data, models.Manager) else data)
+        self.context.setdefault('_survey_statistics', {}).update(
+            survey_statistics([survey.pk for survey in surveys])
+        )
+        return super().to_representation(surveys)
+
 class SurveySerializer(serializers.ModelSerializer):
-    questions = QuestionSerializer(many=True, read_only=True, required=False)
+    questions = QuestionSerializer(many=True, required=False)
     created_by = serializers.ReadOnlyField(source='created_by.username')
     completion_rate = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
@@ -50,9 +75,55 @@ class SurveySerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'created_by', 'created_at', 
                  'updated_at', 'is_active', 'departments', 'target_audience',
                  'questions', 'completion_rate', 'average_rating']
+        list_serializer_class = SurveyListSerializer
+    
+    def _statistics(self, obj):
+        """Statistics of a survey, preloaded for lists and loaded once otherwise"""
+        statistics = self.context.setdefault('_survey_statistics', {})
+        if obj.pk not in statistics:
+            statistics.update(survey_statistics([obj.pk]))
+        return statistics[obj.pk]
     
     def get_completion_rate(self, obj):
-        return obj.get_completion_rate()
+        return self._statistics(obj)['completion_rate']
     
     def get_average_rating(self, obj):
-        return obj.get_average_rating()
+        return self._statistics(obj)['average_rating']
+    
+    def save_questions(self, survey, questions_data):
+        try:
+            save_survey_questions(survey, questions_data)
+        except serializers.ValidationError as error:
+            raise serializers.ValidationError({'questions': error.detail})
+    
+    def create(self, validated_data):
+        questions_data = validated_data.pop('questions', None)
+        if not questions_data:
+            return super().create(validated_data)
+        
+        with transaction.atomic():
+            survey = super().create(validated_data)
+            self.save_questions(survey, questions_data)
+        
+        return survey
+    
+    def update(self, instance, validated_data):
+        # A submitted questions list replaces the survey's questions; without one they are kept
+        questions_data = validated_data.pop('questions', None)
+        if questions_data is None:
+            return super().update(instance, validated_data)
+        
+        with transaction.atomic():
+            survey = super().update(instance, validated_data)
+            self.save_questions(survey, questions_data)
+        
+        return survey
+
+
+class SurveyDefinitionSerializer(SurveySerializer):
+    """A survey as served to respondents: its questions and options, without response statistics"""
+    
+    class Meta(SurveySerializer.Meta):
+        fields = ['id', 'title', 'description', 'created_by', 'created_at',
+                  'updated_at', 'is_active', 'departments', 'target_audience', 'questions']
+        list_serializer_class = serializers.ListSerializer
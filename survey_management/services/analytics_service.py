@@ -1,13 +1,177 @@
-from django.db.models import Avg, Count, Sum, F, Q
+from collections import defaultdict
+from django.db.models import Avg, Count, Sum, Min, Max, F, Q
 from django.utils import timezone
 from datetime import timedelta
 from survey_management.models.survey import Survey, Question
 from survey_management.models.response import Response, ResponseItem
+from survey_management.models.scoping import department_survey_ids
+from survey_management.db_router import replica_reads
+
+def packed_values(survey_ids, key):
+    """
+    Collect the packed answers of completed responses without item rows, per question
+    
+    Args:
+        survey_ids: IDs of the surveys whose responses are read
+        key: Packed answer key, 'n' for ratings or 'o' for selected options
+        
+    Returns:
+        Dictionary mapping question IDs to lists of values
+    """
+    return collect_packed_values(Response.objects.filter(survey_id__in=survey_ids).itemless_answer_maps(), key)
+
+
+async def apacked_values(survey_ids, key):
+    """packed_values() with the async ORM"""
+    answer_maps = Response.objects.filter(survey_id__in=survey_ids).itemless_answer_maps()
+    return collect_packed_values([answers async for answers in answer_maps], key)
+
+
+def collect_packed_values(answer_maps, key):
+    """Values stored under key in packed answer maps, per question ID"""
+    values = defaultdict(list)
+    for answers in answer_maps:
+        for question_id, answer in answers.items():
+            if answer.get(key) is not None:
+                values[int(question_id)].append(answer[key])
+    return values
+
+
+def rating_item_rows(questions):
+    """
+    Grouped rating count, total, minimum and maximum per question
+    
+    Every answer that still has its item row is aggregated here; packed
+    ratings are only read for responses whose rows were dropped.
+    """
+    return ResponseItem.objects.filter(
+        question_id__in=[question.id for question in questions],
+        numeric_answer__isnull=False
+    ).order_by().values('question_id').annotate(
+        count=Count('id'), total=Sum('numeric_answer'),
+        min=Min('numeric_answer'), max=Max('numeric_answer')
+    )
+
+
+def rating_summaries(questions, packed_ratings):
+    """
+    Count, average, minimum and maximum rating of each question
+    
+    Returns:
+        Dictionary mapping question IDs to statistics, for questions with ratings
+    """
+    return summarise_ratings(questions, rating_item_rows(questions), packed_ratings)
+
+
+async def arating_summaries(questions, packed_ratings):
+    """rating_summaries() with the async ORM"""
+    rows = [row async for row in rating_item_rows(questions)]
+    return summarise_ratings(questions, rows, packed_ratings)
+
+
+def summarise_ratings(questions, rows, packed_ratings):
+    """Combine rating_item_rows() with packed ratings into per-question statistics"""
+    item_stats = {row['question_id']: row for row in rows}
+    
+    summaries = {}
+    for question in questions:
+        stats = item_stats.get(question.id, {'count': 0, 'total': None, 'min': None, 'max': None})
+        packed = packed_ratings.get(question.id, [])
+        count = stats['count'] + len(packed)
+        if count == 0:
+            continue
+        
+        observed = [value for value in (stats['min'], stats['max']) if value is not None] + packed
+        summaries[question.id] = {
+            'count': count,
+            'average': ((stats['total'] or 0) + sum(packed)) / count,
+            'min': min(observed),
+            'max': max(observed),
+        }
+    return summaries
+
+
+def survey_statistics(survey_ids):
+    """
+    Completion rate and average rating of many surveys at once
+    
+    Args:
+        survey_ids: IDs of the surveys, such as one page of a survey list
+        
+    Returns:
+        Dictionary mapping survey IDs to their completion_rate and average_rating
+    """
+    return {
+        survey_id: {
+            'completion_rate': completion_rate(counters),
+            'average_rating': average_rating(counters),
+        }
+        for survey_id, counters in survey_counters(survey_ids).items()
+    }
+
+
+def survey_counters(survey_ids):
+    """
+    Response totals and rating sums of many surveys at once, in four queries
+    
+    Returns:
+        Dictionary mapping survey IDs to their total, completed, rating_count and rating_total
+    """
+    survey_ids = list(survey_ids)
+    totals = {
+        row['survey_id']: row for row in Response.objects.filter(survey_id__in=survey_ids).order_by()
+        .values('survey_id').annotate(total=Count('id'), completed=Count('id', filter=Q(is_complete=True)))
+    }
+    
+    # Item rows in SQL, plus the packed answers of responses whose rows were dropped
+    ratings = {survey_id: [0, 0] for survey_id in survey_ids}
+    item_ratings = ResponseItem.objects.filter(
+        response__survey_id__in=survey_ids,
+        question__question_type='RATING',
+        numeric_answer__isnull=False
+    ).order_by().values('response__survey_id').annotate(count=Count('id'), total=Sum('numeric_answer'))
+    for row in item_ratings:
+        ratings[row['response__survey_id']] = [row['count'], row['total'] or 0]
+    
+    rating_ids = {str(pk) for pk in Question.objects.filter(
+        survey_id__in=survey_ids, question_type='RATING'
+    ).values_list('id', flat=True)}
+    packed = Response.objects.filter(survey_id__in=survey_ids).itemless_answer_maps().values_list(
+        'survey_id', 'packed_answers'
+    )
+    for survey_id, answers in packed:
+        for question_id, answer in answers.items():
+            if question_id in rating_ids and answer.get('n') is not None:
+                ratings[survey_id][0] += 1
+                ratings[survey_id][1] += answer['n']
+    
+    counters = {}
+    for survey_id in survey_ids:
+        total = totals.get(survey_id, {'total': 0, 'completed': 0})
+        count, rating_total = ratings[survey_id]
+        counters[survey_id] = {
+            'total': total['total'],
+            'completed': total['completed'],
+            'rating_count': count,
+            'rating_total': rating_total,
+        }
+    return counters
+
+
+def completion_rate(counters):
+    """Completed share of a survey_counters() entry, in percent"""
+    return (counters['completed'] / counters['total']) * 100 if counters['total'] else 0
+
+
+def average_rating(counters):
+    return counters['rating_total'] / counters['rating_count'] if counters['rating_count'] else None
+
 
 class AnalyticsService:
     """Service for generating analytics from survey responses"""
     
-    def get_survey_completion_stats(self, survey_id=None, department_id=None, date_range=None):
+    @replica_reads()
+    def get_survey_completion_stats(self, survey_id=None, department_id=None, date_range=None, user=None):
         """
         Get completion statistics for surveys
         
@@ -15,38 +179,62 @@ class AnalyticsService:
             survey_id: Optional ID to filter by specific survey
             department_id: Optional ID to filter by department
             date_range: Optional tuple of (start_date, end_date)
+            user: Optional User or AuthorizationContext whose visibility applies
             
         Returns:
             Dictionary with completion statistics
         """
+        surveys, responses = self._completion_querysets(survey_id, department_id, date_range, user)
+        
+        totals = {row['survey_id']: row for row in responses}
+        return self._completion_results(surveys.only('id', 'title'), totals)
+    
+    @replica_reads()
+    async def aget_survey_completion_stats(self, survey_id=None, department_id=None, date_range=None, user=None):
+        """get_survey_completion_stats() with the async ORM"""
+        surveys, responses = self._completion_querysets(survey_id, department_id, date_range, user)
+        
+        totals = {row['survey_id']: row async for row in responses}
+        return self._completion_results([survey async for survey in surveys.only('id', 'title')], totals)
+    
+    def _completion_querysets(self, survey_id, department_id, date_range, user):
+        """Visible surveys and their grouped response totals"""
         # Start with all surveys
         surveys = Survey.objects.all()
+        if user is not None:
+            surveys = surveys.visible_to(user)
         
         # Apply filters
         if survey_id:
             surveys = surveys.filter(id=survey_id)
         
         if department_id:
-            surveys = surveys.filter(departments__id=department_id)
+            surveys = surveys.filter(pk__in=department_survey_ids(department_id))
+        
+        # Count every survey's responses in one grouped query
+        responses = Response.objects.filter(survey_id__in=surveys.values('pk'))
+        
+        # Apply date filter if provided
+        if date_range:
+            start_date, end_date = date_range
+            responses = responses.filter(
+                submitted_at__gte=start_date,
+                submitted_at__lte=end_date
+            )
         
+        return surveys, responses.order_by().values('survey_id').annotate(
+            total=Count('id'), completed=Count('id', filter=Q(is_complete=True))
+        )
+    
+    def _completion_results(self, surveys, totals):
         # Prepare results
         results = []
         
         for survey in surveys:
-            # Get responses for this survey
-            responses = survey.responses.all()
-            
-            # Apply date filter if provided
-            if date_range:
-                start_date, end_date = date_range
-                responses = responses.filter(
-                    submitted_at__gte=start_date,
-                    submitted_at__lte=end_date
-                )
-            
             # Calculate statistics
-            total_responses = responses.count()
-            completed_responses = responses.filter(is_complete=True).count()
+            total = totals.get(survey.id, {'total': 0, 'completed': 0})
+            total_responses = total['total']
+            completed_responses = total['completed']
             
             completion_rate = 0
             if total_responses > 0:
@@ -63,7 +251,8 @@ class AnalyticsService:
         
         return results
     
-    def get_rating_question_stats(self, question_id=None, survey_id=None, department_id=None):
+    @replica_reads()
+    def get_rating_question_stats(self, question_id=None, survey_id=None, department_id=None, user=None):
         """
         Get statistics for rating questions
         
@@ -71,12 +260,15 @@ class AnalyticsService:
             question_id: Optional ID to filter by specific question
             survey_id: Optional ID to filter by survey
             department_id: Optional ID to filter by department
+            user: Optional User or AuthorizationContext whose visibility applies
             
         Returns:
             Dictionary with rating statistics
         """
         # Get rating questions
         questions = Question.objects.filter(question_type='RATING')
+        if user is not None:
+            questions = questions.visible_to(user)
         
         # Apply filters
         if question_id:
@@ -86,41 +278,36 @@ class AnalyticsService:
             questions = questions.filter(survey_id=survey_id)
         
         if department_id:
-            questions = questions.filter(survey__departments__id=department_id)
+            questions = questions.filter(survey_id__in=department_survey_ids(department_id))
         
         # Prepare results
         results = []
+        questions = list(questions.select_related('survey'))
+        packed_ratings = packed_values({question.survey_id for question in questions}, 'n')
+        
+        # Calculate statistics from item rows and packed answers
+        summaries = rating_summaries(questions, packed_ratings)
         
         for question in questions:
-            # Get response items for this question
-            items = ResponseItem.objects.filter(
-                question=question,
-                numeric_answer__isnull=False
-            )
+            stats = summaries.get(question.id)
             
-            # Calculate statistics
-            count = items.count()
-            
-            if count > 0:
-                avg_rating = items.aggregate(avg=Avg('numeric_answer'))['avg']
-                min_rating = items.aggregate(min=Min('numeric_answer'))['min']
-                max_rating = items.aggregate(max=Max('numeric_answer'))['max']
-                
+            if stats is not None:
                 # Add to results
                 results.append({
                     'question_id': question.id,
                     'question_text': question.text,
                     'survey_id': question.survey.id,
                     'survey_title': question.survey.title,
-                    'response_count': count,
-                    'average_rating': avg_rating,
-                    'min_rating': min_rating,
-                    'max_rating': max_rating
+                    'response_count': stats['count'],
+                    'average_rating': stats['average'],
+                    'min_rating': stats['min'],
+                    'max_rating': stats['max']
                 })
         
         return results
     
-    def get_response_trend_data(self, days=30, survey_id=None, department_id=None):
+    @replica_reads()
+    def get_response_trend_data(self, days=30, survey_id=None, department_id=None, user=None):
         """
         Get trend data for responses over time
         
@@ -128,10 +315,22 @@ class AnalyticsService:
             days: Number of days to include in the trend
             survey_id: Optional ID to filter by survey
             department_id: Optional ID to filter by department
+            user: Optional User or AuthorizationContext whose visibility applies
             
         Returns:
             List of daily response counts
         """
+        daily_counts = self._trend_queryset(days, survey_id, department_id, user)
+        return self._trend_results(daily_counts)
+    
+    @replica_reads()
+    async def aget_response_trend_data(self, days=30, survey_id=None, department_id=None, user=None):
+        """get_response_trend_data() with the async ORM"""
+        daily_counts = self._trend_queryset(days, survey_id, department_id, user)
+        return self._trend_results([item async for item in daily_counts])
+    
+    def _trend_queryset(self, days, survey_id, department_id, user):
+        """Visible responses submitted in the last days, counted per day"""
         # Calculate date range
         end_date = timezone.now()
         start_date = end_date - timedelta(days=days)
@@ -141,22 +340,25 @@ class AnalyticsService:
             submitted_at__gte=start_date,
             submitted_at__lte=end_date
         )
+        if user is not None:
+            responses = responses.visible_to(user)
         
         # Apply filters
         if survey_id:
             responses = responses.filter(survey_id=survey_id)
         
         if department_id:
-            responses = responses.filter(survey__departments__id=department_id)
+            responses = responses.filter(survey_id__in=department_survey_ids(department_id))
         
         # Group by day and count
         from django.db.models.functions import TruncDay
-        daily_counts = responses.annotate(
+        return responses.annotate(
             day=TruncDay('submitted_at')
         ).values('day').annotate(
             count=Count('id')
         ).order_by('day')
-        
+    
+    def _trend_results(self, daily_counts):
         # Format results
         results = [{
             'date': item['day'].strftime('%Y-%m-%d'),
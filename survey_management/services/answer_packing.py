@@ -0,0 +1,100 @@
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
+from survey_management.models.response import Response, ResponseItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PACKED_ANSWERS = {
+    # Pack answers into Response.packed_answers when a response is submitted
+    'ENABLED': True,
+    # Keep the ResponseItem rows of packed responses (False reclaims their space)
+    'KEEP_ITEMS': True,
+}
+
+
+def get_packing_config():
+    config = dict(DEFAULT_PACKED_ANSWERS)
+    config.update(getattr(settings, 'SURVEY_PACKED_ANSWERS', {}))
+    return config
+
+
+def pack_submitted_response(response, items=None):
+    """
+    Pack the answers of a response that is being completed
+
+    Called before the response is saved; the caller's save() writes the
+    packed column together with the completion fields. items are the
+    response's items when the caller already loaded them.
+    """
+    config = get_packing_config()
+    if not config['ENABLED']:
+        return
+    response.pack_answers(items)
+    if not config['KEEP_ITEMS']:
+        response.items.all().delete()
+
+
+class AnswerPacker:
+    """Converts historical completed responses to packed answers in batches"""
+
+    def __init__(self, batch_size=500, keep_items=None, repack=False):
+        self.batch_size = batch_size
+        self.keep_items = get_packing_config()['KEEP_ITEMS'] if keep_items is None else keep_items
+        self.repack = repack
+
+    def pending(self, survey_id=None):
+        responses = Response.objects.filter(is_complete=True)
+        if self.repack:
+            # Packed responses are packed again from their rows, e.g. to add the
+            # item IDs older packed answers lack; those without rows are kept
+            responses = responses.filter(Exists(ResponseItem.objects.filter(response=OuterRef('pk'))))
+        else:
+            responses = responses.filter(packed_answers__isnull=True)
+        if survey_id is not None:
+            responses = responses.filter(survey_id=survey_id)
+        return responses
+
+    def run(self, survey_id=None, dry_run=False):
+        """
+        Pack every completed, unpacked response (or, with repack, every one that has item rows)
+
+        Args:
+            survey_id: Optional ID to limit the conversion to one survey
+            dry_run: Only count the responses that would be packed
+
+        Returns:
+            Number of responses packed (or pending, for a dry run)
+        """
+        pending = self.pending(survey_id)
+        if dry_run:
+            return pending.count()
+
+        packed = 0
+        last_id = 0
+        while True:
+            # Keyset pagination keeps each batch an index range scan
+            batch = list(
+                pending.filter(pk__gt=last_id).order_by('pk').only('pk')
+                .prefetch_related(Prefetch('items', queryset=ResponseItem.objects.only(
+                    'response_id', 'question_id', 'text_answer', 'numeric_answer', 'selected_option_id',
+                    'created_at', 'updated_at'
+                ).order_by('id')))[:self.batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+
+            with transaction.atomic():
+                for response in batch:
+                    response.pack_answers(response.items.all())
+                Response.objects.bulk_update(batch, ['packed_answers'])
+                if not self.keep_items:
+                    ResponseItem.objects.filter(response__in=[response.pk for response in batch]).delete()
+
+            packed += len(batch)
+            logger.info(f"Packed {packed} responses")
+
+        return packed
+
@@ -0,0 +1,238 @@
+import logging
+import threading
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from survey_management.models.assignment import AssignmentJob
+from survey_management.models.response import Response
+from survey_management.caching import bump_response_versions
+from survey_management.services.notification_dispatcher import NotificationDispatcher, DEFAULT_CHANNELS
+from survey_management.services.reminder_service import ReminderService
+
+logger = logging.getLogger(__name__)
+
+class AssignmentService:
+    """Service for assigning a survey to many users at once"""
+
+    def __init__(self, dispatcher=None, chunk_size=None):
+        self.dispatcher = dispatcher or NotificationDispatcher()
+        self.chunk_size = chunk_size or getattr(settings, 'SURVEY_ASSIGNMENT_CHUNK_SIZE', 1000)
+
+    def _explicit_chunks(self, user_ids):
+        """Yield (found, missing) chunks for an explicit list of user IDs"""
+        unique_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+
+        for start in range(0, len(unique_ids), self.chunk_size):
+            chunk = unique_ids[start:start + self.chunk_size]
+            found = dict(User.objects.filter(pk__in=chunk).values_list('pk', 'username'))
+            missing = [user_id for user_id in chunk if user_id not in found]
+            yield list(found.items()), missing
+
+    def _query_chunks(self, department_id=None, role=None):
+        """Yield chunks of users matching a department/role query using keyset pagination"""
+        users = User.objects.filter(is_active=True)
+        if department_id is not None:
+            users = users.filter(profile__department_id=department_id)
+        if role:
+            users = users.filter(profile__role=role)
+
+        last_id = 0
+        while True:
+            chunk = list(
+                users.filter(pk__gt=last_id).order_by('pk').values_list('pk', 'username')[:self.chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            yield chunk, []
+
+    def _create_open_responses(self, responses):
+        """
+        Insert open responses, returning (created, conflicting)
+
+        A respondent may open a draft between the check for open responses and
+        the insert, which then violates response_one_open_per_respondent. The
+        chunk is inserted with one bulk insert; only when that fails is it
+        retried row by row, so the rows that were created keep their IDs and
+        the conflicting ones can be reported as skipped.
+        """
+        if not responses:
+            return [], []
+        try:
+            with transaction.atomic():
+                Response.objects.bulk_create(responses)
+            return responses, []
+        except IntegrityError:
+            pass
+
+        created, conflicting = [], []
+        for response in responses:
+            response.pk = None
+            try:
+                with transaction.atomic():
+                    response.save(force_insert=True)
+            except IntegrityError:
+                conflicting.append(response)
+            else:
+                created.append(response)
+        return created, conflicting
+
+    def assign(self, survey, user_ids=None, department_id=None, role=None,
+               channels=DEFAULT_CHANNELS, schedule=None, progress=None, collect_details=False):
+        """
+        Assign a survey to an explicit user list or to every user matching a query
+
+        Users who already have an open response for the survey, including one
+        opened while the assignment runs, are skipped.
+
+        Args:
+            survey: Survey object
+            user_ids: Optional list of user IDs (takes precedence over the query)
+            department_id: Optional department to target
+            role: Optional UserProfile role to target
+            channels: Notification channels to use
+            schedule: Optional SurveySchedule the assignment comes from (for its reminder policy)
+            progress: Optional callable receiving the running totals after each chunk
+            collect_details: Include per-user results (only sensible for small lists)
+
+        Returns:
+            Dictionary with totals and, if requested, per-user results
+        """
+        results = {
+            'processed': 0,
+            'assigned': 0,
+            'skipped': 0,
+            'not_found': 0
+        }
+        if collect_details:
+            results['details'] = {'success': [], 'skipped': [], 'failed': []}
+
+        if user_ids is not None:
+            chunks = self._explicit_chunks(user_ids)
+        else:
+            chunks = self._query_chunks(department_id=department_id, role=role)
+
+        reminders = ReminderService(dispatcher=self.dispatcher)
+        policy = reminders.policy_for(survey, schedule)
+        
+        for users, missing in chunks:
+            chunk_ids = [user_id for user_id, _ in users]
+
+            with transaction.atomic():
+                open_ids = set(
+                    Response.objects.filter(
+                        survey=survey,
+                        is_complete=False,
+                        respondent_id__in=chunk_ids
+                    ).values_list('respondent_id', flat=True)
+                )
+
+                new_responses = [
+                    Response(survey=survey, respondent_id=user_id, is_complete=False)
+                    for user_id in chunk_ids if user_id not in open_ids
+                ]
+                reminders.apply_policy(new_responses, policy)
+                new_responses, conflicting = self._create_open_responses(new_responses)
+                open_ids.update(r.respondent_id for r in conflicting)
+                # bulk_create sends no post_save signals
+                transaction.on_commit(lambda: bump_response_versions(survey.id))
+
+                assigned_ids = [r.respondent_id for r in new_responses]
+                self.dispatcher.dispatch_survey_assignments(survey.id, assigned_ids, channels)
+
+            results['processed'] += len(users) + len(missing)
+            results['assigned'] += len(new_responses)
+            results['skipped'] += len(open_ids)
+            results['not_found'] += len(missing)
+
+            if collect_details:
+                details = results['details']
+                usernames = dict(users)
+                details['success'].extend({
+                    'user_id': r.respondent_id,
+                    'username': usernames[r.respondent_id],
+                    'response_id': r.id
+                } for r in new_responses)
+                details['skipped'].extend({
+                    'user_id': user_id,
+                    'username': usernames[user_id],
+                    'reason': 'Open response already exists'
+                } for user_id in chunk_ids if user_id in open_ids)
+                details['failed'].extend({
+                    'user_id': user_id,
+                    'reason': 'User not found'
+                } for user_id in missing)
+
+            if progress:
+                progress(results)
+
+        return results
+
+    def start_job(self, survey, requested_by, target):
+        """
+        Create an AssignmentJob and run it in the background
+
+        Args:
+            survey: Survey object
+            requested_by: User starting the assignment
+            target: Dictionary with user_ids, department and/or role
+
+        Returns:
+            The created AssignmentJob
+        """
+        job = AssignmentJob.objects.create(survey=survey, requested_by=requested_by, target=target)
+
+        if getattr(settings, 'SURVEY_BULK_ASSIGN_ASYNC', True):
+            transaction.on_commit(lambda: threading.Thread(
+                target=self._run_in_thread, args=(job.id,), daemon=True
+            ).start())
+        else:
+            self.run_job(job)
+
+        return job
+
+    def _run_in_thread(self, job_id):
+        try:
+            self.run_job(AssignmentJob.objects.select_related('survey').get(pk=job_id))
+        finally:
+            connection.close()
+
+    def run_job(self, job):
+        """Execute an AssignmentJob, saving progress after every chunk"""
+        job.status = 'RUNNING'
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+
+        def progress(totals):
+            AssignmentJob.objects.filter(pk=job.pk).update(
+                processed=totals['processed'],
+                assigned=totals['assigned'],
+                skipped=totals['skipped'],
+                not_found=totals['not_found']
+            )
+
+        target = job.target
+        try:
+            totals = self.assign(
+                job.survey,
+                user_ids=target.get('user_ids'),
+                department_id=target.get('department'),
+                role=target.get('role'),
+                progress=progress
+            )
+        except Exception as e:
+            logger.error(f"Assignment job {job.id} failed: {str(e)}")
+            job.refresh_from_db()
+            job.status = 'FAILED'
+            job.error = str(e)
+        else:
+            job.processed = totals['processed']
+            job.assigned = totals['assigned']
+            job.skipped = totals['skipped']
+            job.not_found = totals['not_found']
+            job.status = 'COMPLETED'
+
+        job.finished_at = timezone.now()
+        job.save()
+        return job
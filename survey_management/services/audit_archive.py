@@ -0,0 +1,268 @@
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from survey_management.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+
+
+def _isoformat(timestamp):
+    """Fixed-width UTC timestamps so archived and hot rows sort as strings"""
+    return timestamp.astimezone(datetime.timezone.utc).isoformat(timespec='microseconds')
+
+
+class AuditArchive:
+    """
+    Compressed, append-only storage for old audit log partitions
+
+    Each archived chunk of a monthly partition becomes an immutable gzip
+    JSON-lines segment. A small index.json lists every segment with its time
+    range, row count, actions and user IDs so searches only open the
+    segments that can match.
+    """
+
+    _index_lock = threading.Lock()
+
+    def __init__(self, directory=None):
+        self.directory = directory or getattr(
+            settings, 'SURVEY_AUDIT_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'audit_archive')
+        )
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def load_index(self):
+        """Return the list of segment descriptors"""
+        try:
+            with open(self._index_path(), encoding='utf-8') as index:
+                return json.load(index)['segments']
+        except FileNotFoundError:
+            return []
+
+    def _save_index(self, segments):
+        # Written to a temporary file and renamed so readers never see a partial index
+        tmp_path = f"{self._index_path()}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as index:
+            json.dump({'segments': segments}, index, indent=1)
+            index.flush()
+            os.fsync(index.fileno())
+        os.replace(tmp_path, self._index_path())
+
+    def write_segment(self, period, rows):
+        """
+        Write rows (dicts) to a new segment and register it in the index
+
+        Returns:
+            The segment descriptor
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"audit-{period}-{timezone.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+        path = os.path.join(self.directory, name)
+
+        digest = hashlib.sha256()
+        actions = {}
+        user_ids = set()
+        # 'xb' refuses to overwrite: segments are never modified once written
+        with open(path, 'xb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+                for row in rows:
+                    line = (json.dumps(row, separators=(',', ':')) + '\n').encode('utf-8')
+                    digest.update(line)
+                    archive.write(line)
+                    actions[row['action']] = actions.get(row['action'], 0) + 1
+                    if row['user_id'] is not None:
+                        user_ids.add(row['user_id'])
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        segment = {
+            'file': name,
+            'period': period,
+            'count': len(rows),
+            'min_timestamp': rows[0]['timestamp'],
+            'max_timestamp': rows[-1]['timestamp'],
+            'actions': actions,
+            'user_ids': sorted(user_ids),
+            'sha256': digest.hexdigest(),
+        }
+
+        with self._index_lock:
+            segments = self.load_index()
+            segments.append(segment)
+            self._save_index(segments)
+
+        return segment
+
+    def archive_before(self, cutoff, chunk_size=5000, dry_run=False):
+        """
+        Move every monthly partition that ends before cutoff into archive segments
+
+        Rows are deleted only after the segment holding them was fsynced and
+        indexed, so a crash can at worst leave a row both archived and hot.
+
+        Args:
+            cutoff: Datetime; monthly partitions that ended before cutoff's month are archived
+            chunk_size: Maximum rows per segment
+            dry_run: Only report what would be archived
+
+        Returns:
+            Dictionary mapping period to archived row count
+        """
+        last_period = AuditLog.period_for(cutoff)
+        # order_by() replaces the default timestamp ordering, which would defeat distinct()
+        periods = list(
+            AuditLog.objects.filter(period__lt=last_period)
+            .order_by('period').values_list('period', flat=True).distinct()
+        )
+
+        archived = {}
+        for period in periods:
+            if dry_run:
+                archived[period] = AuditLog.objects.filter(period=period).count()
+                continue
+
+            archived[period] = 0
+            last_id = 0
+            while True:
+                chunk = list(
+                    AuditLog.objects.filter(period=period, pk__gt=last_id)
+                    .order_by('pk')
+                    .values('id', 'user_id', 'action', 'details', 'timestamp', 'ip_address')[:chunk_size]
+                )
+                if not chunk:
+                    break
+                last_id = chunk[-1]['id']
+
+                chunk.sort(key=lambda row: row['timestamp'])
+                rows = [dict(row, timestamp=_isoformat(row['timestamp'])) for row in chunk]
+                self.write_segment(period, rows)
+
+                with transaction.atomic():
+                    AuditLog.objects.filter(pk__in=[row['id'] for row in chunk]).delete()
+                archived[period] += len(chunk)
+
+            logger.info(f"Archived {archived[period]} audit entries for period {period}")
+
+        return archived
+
+    def _segment_matches(self, segment, user_id, action, start, end):
+        if action and action not in segment['actions']:
+            return False
+        if user_id is not None and user_id not in segment['user_ids']:
+            return False
+        if start and parse_datetime(segment['max_timestamp']) < start:
+            return False
+        if end and parse_datetime(segment['min_timestamp']) > end:
+            return False
+        return True
+
+    def search(self, user_id=None, action=None, start=None, end=None, text=None, limit=100):
+        """
+        Search archived entries, newest first
+
+        Segments whose index entry rules out a match are never opened.
+        """
+        candidates = [
+            segment for segment in self.load_index()
+            if self._segment_matches(segment, user_id, action, start, end)
+        ]
+        candidates.sort(key=lambda segment: segment['max_timestamp'], reverse=True)
+
+        if limit < 1:
+            return []
+
+        text = text.lower() if text else None
+        results = []
+        for segment in candidates:
+            # Older segments cannot beat what we already have
+            if len(results) >= limit and segment['max_timestamp'] < results[limit - 1]['timestamp']:
+                break
+
+            path = os.path.join(self.directory, segment['file'])
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as archive:
+                    for line in archive:
+                        row = json.loads(line)
+                        if user_id is not None and row['user_id'] != user_id:
+                            continue
+                        if action and row['action'] != action:
+                            continue
+                        timestamp = parse_datetime(row['timestamp'])
+                        if start and timestamp < start:
+                            continue
+                        if end and timestamp > end:
+                            continue
+                        if text and text not in row['details'].lower():
+                            continue
+                        row['archived'] = True
+                        results.append(row)
+            except OSError as e:
+                logger.error(f"Could not read audit archive segment {segment['file']}: {str(e)}")
+                continue
+
+            results.sort(key=lambda row: row['timestamp'], reverse=True)
+
+        return results[:limit]
+
+
+def search_audit_logs(user_id=None, action=None, start=None, end=None, text=None, limit=100, archive=None):
+    """
+    Search audit entries across the hot table and archived segments
+
+    Args:
+        user_id: Optional user ID
+        action: Optional action type
+        start: Optional earliest timestamp
+        end: Optional latest timestamp
+        text: Optional case-insensitive substring of details
+        limit: Maximum number of entries
+        archive: Optional AuditArchive (defaults to SURVEY_AUDIT_ARCHIVE_DIR)
+
+    Returns:
+        List of entry dicts, newest first, with an 'archived' flag
+    """
+    if limit < 1:
+        return []
+
+    hot = AuditLog.objects.all()
+    if user_id is not None:
+        hot = hot.filter(user_id=user_id)
+    if action:
+        hot = hot.filter(action=action)
+    if start:
+        hot = hot.filter(timestamp__gte=start)
+    if end:
+        hot = hot.filter(timestamp__lte=end)
+    if text:
+        hot = hot.filter(details__icontains=text)
+
+    results = [
+        dict(row, timestamp=_isoformat(row['timestamp']), archived=False)
+        for row in hot.order_by('-timestamp').values(
+            'id', 'user_id', 'action', 'details', 'timestamp', 'ip_address'
+        )[:limit]
+    ]
+
+    # With a full page of hot rows only newer archived rows could matter,
+    # which lets the index rule out every segment without opening it
+    archive_start = start
+    if results and len(results) >= limit:
+        oldest_hot = parse_datetime(results[-1]['timestamp'])
+        archive_start = max(start, oldest_hot) if start else oldest_hot
+
+    archive = archive or AuditArchive()
+    results.extend(archive.search(user_id, action, archive_start, end, text, limit))
+    results.sort(key=lambda row: row['timestamp'], reverse=True)
+
+    return results[:limit]
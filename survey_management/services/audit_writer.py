@@ -0,0 +1,426 @@
+import atexit
+import glob
+import ipaddress
+import json
+import logging
+import os
+import threading
+import uuid
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from survey_management.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIT_WRITER = {
+    # 'thread': flush from a background thread, 'request': flush at the end of
+    # each request (AuditFlushMiddleware), 'sync': write immediately
+    'MODE': 'thread',
+    'MAX_BATCH': 500,
+    'FLUSH_INTERVAL': 2.0,
+    # Entries held in memory while the database cannot be written. Beyond it
+    # entries are kept only in the spill file when there is one, and dropped
+    # (oldest first, counted in /api/metrics/) otherwise.
+    'MAX_BUFFER': 10000,
+    # Optional JSON-lines file entries are appended to before being buffered,
+    # replayed on startup so a crash doesn't lose them
+    'SPILL_PATH': None,
+}
+
+
+def get_trusted_proxies():
+    """Networks of SURVEY_TRUSTED_PROXIES, the reverse proxies whose X-Forwarded-For is believed"""
+    return [ipaddress.ip_network(proxy, strict=False) for proxy in getattr(settings, 'SURVEY_TRUSTED_PROXIES', [])]
+
+
+def _is_trusted(address, proxies):
+    return any(address in network for network in proxies)
+
+
+def get_client_ip(request):
+    """
+    Return the client address of a request
+
+    REMOTE_ADDR is the client unless it is a trusted proxy. X-Forwarded-For
+    is then read from the nearest hop back, and the first address that is
+    not a trusted proxy is the client; hops further back were written by
+    the client and may be forged.
+    """
+    if request is None:
+        return None
+    remote_addr = request.META.get('REMOTE_ADDR') or None
+    proxies = get_trusted_proxies()
+    if remote_addr is None or not proxies:
+        return remote_addr
+
+    hops = [remote_addr] + [
+        hop.strip() for hop in reversed(request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')) if hop.strip()
+    ]
+    for hop in hops:
+        try:
+            address = ipaddress.ip_address(hop)
+        except ValueError:
+            # Garbage from a hop that was not a trusted proxy; the client is unknown
+            return None
+        if not _is_trusted(address, proxies):
+            return hop
+    # Every hop is a proxy, so the farthest one is the closest to the client
+    return hops[-1]
+
+
+def _process_gone(pid):
+    """Whether the process that owned a spill file has exited"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # Exists but belongs to someone else
+        return False
+    return False
+
+
+class AuditWriter:
+    """
+    Buffers AuditLog entries in-process and writes them with bulk_create
+
+    Entries are flushed when the buffer reaches max_batch, every
+    flush_interval seconds, on request end and at interpreter shutdown.
+    With a spill path, entries are written at least once even if the process
+    crashes: they are appended to the spill file first and the file is only
+    removed after its entries were committed.
+
+    While flushes fail the buffer holds at most max_buffer entries. With a
+    spill path the overflow is moved out of memory to replay files that the
+    next flush writes from disk; without one the oldest entries are dropped.
+    """
+
+    def __init__(self, mode='thread', max_batch=500, flush_interval=2.0, spill_path=None, max_buffer=10000):
+        self.mode = mode
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.shed = 0
+        self._dropping = False
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = []
+        self._spill_file = None
+        self._spill_segments = []
+        self._in_flight = []
+        self._segment_counter = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._replayed = False
+        self._token = uuid.uuid4().hex[:8]
+
+    @classmethod
+    def from_settings(cls):
+        config = dict(DEFAULT_AUDIT_WRITER)
+        config.update(getattr(settings, 'SURVEY_AUDIT_WRITER', {}))
+        return cls(
+            mode=config['MODE'],
+            max_batch=config['MAX_BATCH'],
+            flush_interval=config['FLUSH_INTERVAL'],
+            spill_path=config['SPILL_PATH'],
+            max_buffer=config['MAX_BUFFER'],
+        )
+
+    def log(self, user, action, details, ip_address=None, timestamp=None):
+        """
+        Record an audit entry
+
+        Args:
+            user: User object, user ID or None
+            action: One of AuditLog.ACTION_TYPES
+            details: Free-text description
+            ip_address: Optional client address
+            timestamp: When the action happened (defaults to now)
+        """
+        user_id = getattr(user, 'pk', user)
+        if user_id is not None and getattr(user, 'is_anonymous', False):
+            user_id = None
+
+        timestamp = timestamp or timezone.now()
+        entry = {
+            'user_id': user_id,
+            'action': action,
+            'details': details,
+            'ip_address': ip_address,
+            'timestamp': timestamp,
+            'period': AuditLog.period_for(timestamp),
+        }
+
+        if self.mode == 'sync':
+            AuditLog.objects.create(**entry)
+            return
+
+        with self._lock:
+            if self.spill_path:
+                self._spill(entry)
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.max_batch
+            if len(self._buffer) > self.max_buffer:
+                self._shed()
+
+        if self.mode == 'thread':
+            self._ensure_thread()
+            if full:
+                self._wake.set()
+
+    def _owner(self):
+        # The random token tells a restarted process apart from one that reused its pid
+        return f"{os.getpid()}-{self._token}"
+
+    def _spill_name(self, suffix):
+        # Each process spills to its own files so workers never clobber each other
+        return f"{self.spill_path}.{self._owner()}.{suffix}"
+
+    def _spill(self, entry):
+        if self._spill_file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+            self._spill_file = open(self._spill_name('active'), 'a', encoding='utf-8')
+        record = dict(entry, timestamp=entry['timestamp'].isoformat())
+        self._spill_file.write(json.dumps(record) + '\n')
+        self._spill_file.flush()
+
+    def _rotate_spill(self):
+        """Close the active spill file so its entries can be flushed independently"""
+        if self._spill_file is None:
+            return
+        self._spill_file.close()
+        self._spill_file = None
+        self._segment_counter += 1
+        segment = self._spill_name(f"{self._segment_counter}.flushing")
+        os.replace(self._spill_name('active'), segment)
+        self._spill_segments.append(segment)
+
+    def _shed(self):
+        """Bring the buffer back to max_buffer entries (called with _lock held)"""
+        if self.spill_path:
+            # Every buffered entry is also in a spill segment that no flush is
+            # writing, or in the active file: leave them on disk only, under
+            # names the next flush replays
+            self._rotate_spill()
+            for segment in self._spill_segments:
+                if segment not in self._in_flight:
+                    os.replace(segment, self._spill_name(f"replay-{uuid.uuid4().hex[:8]}"))
+            self._spill_segments = list(self._in_flight)
+            self._replayed = False
+            self.shed += len(self._buffer)
+            logger.warning(f"Audit buffer full; moved {len(self._buffer)} entries to spill files")
+            self._buffer = []
+        else:
+            overflow = len(self._buffer) - self.max_buffer
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            if not self._dropping:
+                # Once per outage; the running count is in /api/metrics/
+                self._dropping = True
+                logger.error("Audit buffer full; dropping the oldest entries until a flush succeeds")
+
+    def flush(self):
+        """Write all buffered entries, returning the number written"""
+        with self._flush_lock:
+            self._replay_spill()
+
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+                if self.spill_path:
+                    self._rotate_spill()
+                segments = self._in_flight = list(self._spill_segments)
+
+            if not entries:
+                with self._lock:
+                    self._in_flight = []
+                return 0
+
+            try:
+                AuditLog.objects.bulk_create(
+                    [AuditLog(**entry) for entry in entries], batch_size=self.max_batch
+                )
+            except Exception as e:
+                logger.error(f"Failed to flush {len(entries)} audit entries: {str(e)}")
+                # Keep them for the next attempt; their spill segments stay on disk
+                with self._lock:
+                    self._in_flight = []
+                    self._buffer[:0] = entries
+                    if len(self._buffer) > self.max_buffer:
+                        self._shed()
+                return 0
+
+            with self._lock:
+                self._in_flight = []
+                self._dropping = False
+                for segment in segments:
+                    self._spill_segments.remove(segment)
+                    try:
+                        os.remove(segment)
+                    except OSError:
+                        pass
+
+            return len(entries)
+
+    def _replay_spill(self):
+        """
+        Write entries left on disk: by processes that exited without flushing,
+        and by this one when its buffer was full
+
+        Each file is written and removed on its own, so replaying a large
+        backlog never holds more than one file in memory. A file that fails
+        to write stays claimed by this process and is retried on the next flush.
+        """
+        if self._replayed or not self.spill_path:
+            return
+
+        claimed_files = []
+        owner = self._owner()
+        for path in sorted(glob.glob(f"{self.spill_path}.*")):
+            file_owner, _, suffix = path[len(self.spill_path) + 1:].partition('.')
+            pid = file_owner.split('-', 1)[0]
+            if not pid.isdigit():
+                continue
+
+            if file_owner == owner:
+                # Only files we shed or claimed earlier, not those still being written
+                if suffix.startswith('replay'):
+                    claimed_files.append(path)
+                continue
+            if int(pid) != os.getpid() and not _process_gone(int(pid)):
+                continue
+
+            # Claim the file so concurrent processes don't replay it twice
+            claimed = self._spill_name(f"replay-{uuid.uuid4().hex[:8]}")
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            claimed_files.append(claimed)
+
+        recovered = 0
+        for path in claimed_files:
+            try:
+                entries = self._read_spill(path)
+            except OSError as e:
+                logger.error(f"Could not read audit spill file {path}: {str(e)}")
+                continue
+            AuditLog.objects.bulk_create(entries, batch_size=self.max_batch)
+            os.remove(path)
+            recovered += len(entries)
+
+        if recovered:
+            logger.info(f"Recovered {recovered} audit entries from spill files")
+        self._replayed = True
+
+    def _read_spill(self, path):
+        entries = []
+        with open(path, encoding='utf-8') as spill:
+            for line in spill:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write
+                    continue
+                record['timestamp'] = parse_datetime(record['timestamp'])
+                record.setdefault('period', AuditLog.period_for(record['timestamp']))
+                entries.append(AuditLog(**record))
+        return entries
+
+    def render_metrics(self):
+        """Buffer size and shed/dropped entry counters in Prometheus text format"""
+        with self._lock:
+            buffered = len(self._buffer)
+        return '\n'.join([
+            '# HELP survey_audit_buffered_entries Audit entries waiting to be written',
+            '# TYPE survey_audit_buffered_entries gauge',
+            f'survey_audit_buffered_entries {buffered}',
+            '# HELP survey_audit_entries_shed_total Audit entries moved from a full buffer to spill files',
+            '# TYPE survey_audit_entries_shed_total counter',
+            f'survey_audit_entries_shed_total {self.shed}',
+            '# HELP survey_audit_entries_dropped_total Audit entries dropped from a full buffer',
+            '# TYPE survey_audit_entries_dropped_total counter',
+            f'survey_audit_entries_dropped_total {self.dropped}',
+        ]) + '\n'
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                close_old_connections()
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Audit writer error: {str(e)}")
+        finally:
+            connection.close()
+
+    def close(self):
+        """Stop the background thread and write everything still buffered"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+        self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush audit entries at shutdown: {str(e)}")
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer():
+    """Return the process-wide audit writer, configured from SURVEY_AUDIT_WRITER"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter.from_settings()
+                atexit.register(_writer.close)
+    return _writer
+
+
+@receiver(setting_changed)
+def reset_audit_writer(setting, **kwargs):
+    """Build the writer again after SURVEY_AUDIT_WRITER changed, e.g. by override_settings"""
+    global _writer
+    if setting != 'SURVEY_AUDIT_WRITER':
+        return
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            atexit.unregister(_writer.close)
+        _writer = None
+
+
+def log_audit(user, action, details, request=None):
+    """Record an audit entry through the buffered writer"""
+    get_audit_writer().log(user, action, details, ip_address=get_client_ip(request))
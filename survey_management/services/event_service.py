@@ -0,0 +1,415 @@
+import logging
+import threading
+from collections import namedtuple
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from survey_management.caching import tiered_cache
+from survey_management.models.schedule import SurveySchedule, ScheduledDelivery
+from survey_management.models.user import UserProfile
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+CompiledSchedule = namedtuple(
+    'CompiledSchedule', ['id', 'survey_id', 'trigger_event', 'delay', 'predicate', 'updated_at']
+)
+
+
+def _compare(op):
+    """Wrap an ordering comparison so missing or null values never match"""
+    def check(value, arg):
+        if value is _MISSING or value is None:
+            return False
+        try:
+            return op(value, arg)
+        except TypeError:
+            return False
+    return check
+
+
+def _membership(arg):
+    """Prepare a membership operand, using a frozenset when the values are hashable"""
+    if not isinstance(arg, (list, tuple)):
+        raise ValueError("'in' and 'nin' operators require a list")
+    try:
+        return frozenset(arg)
+    except TypeError:
+        return tuple(arg)
+
+
+def _safe_in(value, arg):
+    try:
+        return value in arg
+    except TypeError:
+        # Unhashable event values can never be members of a frozenset operand
+        return False
+
+
+def _contains(value, arg):
+    if value is _MISSING or value is None:
+        return False
+    try:
+        return arg in value
+    except TypeError:
+        return False
+
+
+FILTER_OPERATORS = {
+    'eq': lambda value, arg: value is not _MISSING and value == arg,
+    'ne': lambda value, arg: value is _MISSING or value != arg,
+    'in': lambda value, arg: value is not _MISSING and _safe_in(value, arg),
+    'nin': lambda value, arg: value is _MISSING or not _safe_in(value, arg),
+    'gt': _compare(lambda value, arg: value > arg),
+    'gte': _compare(lambda value, arg: value >= arg),
+    'lt': _compare(lambda value, arg: value < arg),
+    'lte': _compare(lambda value, arg: value <= arg),
+    'contains': _contains,
+    'exists': lambda value, arg: (value is not _MISSING) == bool(arg),
+}
+
+
+def _make_getter(path):
+    """Build a lookup for a (possibly dotted) key in the event data"""
+    parts = tuple(path.split('.'))
+
+    if len(parts) == 1:
+        key = parts[0]
+        return lambda data: data.get(key, _MISSING)
+
+    def getter(data):
+        value = data
+        for part in parts:
+            if not isinstance(value, dict):
+                return _MISSING
+            value = value.get(part, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+        return value
+    return getter
+
+
+def _compile_condition(path, condition):
+    getter = _make_getter(path)
+
+    # A bare value means equality, a list means membership
+    if not isinstance(condition, dict):
+        if isinstance(condition, list):
+            condition = {'in': condition}
+        else:
+            condition = {'eq': condition}
+
+    checks = []
+    for op_name, arg in condition.items():
+        if op_name not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator '{op_name}' for '{path}'")
+        if op_name in ('in', 'nin'):
+            arg = _membership(arg)
+        checks.append((FILTER_OPERATORS[op_name], arg))
+
+    if len(checks) == 1:
+        check, arg = checks[0]
+        return lambda data: check(getter(data), arg)
+
+    def predicate(data):
+        value = getter(data)
+        for check, arg in checks:
+            if not check(value, arg):
+                return False
+        return True
+    return predicate
+
+
+def compile_event_filter(event_filter):
+    """
+    Compile a schedule's JSON event_filter into a predicate over event data
+
+    Keys are (dotted) paths into the event's data object. Values are either a
+    literal (equality), a list (membership) or a dict of operators such as
+    {"gte": 18, "lt": 65}. Supported operators are listed in FILTER_OPERATORS.
+
+    Args:
+        event_filter: The filter dictionary, or None/empty to match every event
+
+    Returns:
+        Callable taking the event data dict and returning a boolean
+
+    Raises:
+        ValueError: If the filter is malformed
+    """
+    if not event_filter:
+        return lambda data: True
+
+    if not isinstance(event_filter, dict):
+        raise ValueError("event_filter must be a JSON object")
+
+    conditions = [_compile_condition(path, condition) for path, condition in event_filter.items()]
+
+    if len(conditions) == 1:
+        return conditions[0]
+
+    def predicate(data):
+        for condition in conditions:
+            if not condition(data):
+                return False
+        return True
+    return predicate
+
+
+class ScheduleIndex:
+    """
+    In-process index of active schedules keyed by trigger event
+
+    Each schedule's event_filter is compiled once and reused until the
+    schedule's updated_at changes. Saves and queryset updates invalidate the
+    index and bump the 'schedules' version in the shared cache once they are
+    committed. Before each batch the index compares that version and a
+    count/max(updated_at) stamp query, which also catches changes made
+    without the version (e.g. in another process without a shared cache).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_event = {}
+        self._compiled = {}
+        self._stamp = None
+
+    def invalidate(self, schedule_id=None):
+        """Force the index to be rebuilt on next use, in this process and, once committed, in the others"""
+        with self._lock:
+            self._stamp = None
+            if schedule_id is not None:
+                self._compiled.pop(schedule_id, None)
+        transaction.on_commit(lambda: tiered_cache.bump('schedules'))
+
+    def _current_stamp(self):
+        stamp = SurveySchedule.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+        return (tiered_cache.version('schedules', 'all', strict=True), stamp['count'], stamp['latest'])
+
+    def refresh(self):
+        """Rebuild the index if any schedule changed since it was last built"""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return
+
+        with self._lock:
+            if stamp == self._stamp:
+                return
+
+            rows = SurveySchedule.objects.filter(is_active=True).values_list(
+                'id', 'survey_id', 'trigger_event', 'delay_hours', 'event_filter', 'updated_at'
+            )
+
+            # A version bump may come from a write that left updated_at alone
+            reusable = self._compiled if self._stamp is not None and self._stamp[0] == stamp[0] else {}
+            compiled = {}
+            by_event = {}
+            for schedule_id, survey_id, trigger_event, delay_hours, event_filter, updated_at in rows:
+                entry = reusable.get(schedule_id)
+                if entry is None or entry.updated_at != updated_at:
+                    try:
+                        predicate = compile_event_filter(event_filter)
+                    except ValueError as e:
+                        logger.warning(f"Skipping schedule {schedule_id} with invalid event_filter: {str(e)}")
+                        continue
+                    entry = CompiledSchedule(
+                        schedule_id, survey_id, trigger_event,
+                        timedelta(hours=delay_hours), predicate, updated_at
+                    )
+                compiled[schedule_id] = entry
+                by_event.setdefault(trigger_event, []).append(entry)
+
+            self._compiled = compiled
+            self._by_event = {event: tuple(entries) for event, entries in by_event.items()}
+            self._stamp = stamp
+
+    def candidates(self, trigger_event):
+        """Return the compiled active schedules listening for a trigger event"""
+        return self._by_event.get(trigger_event, ())
+
+
+schedule_index = ScheduleIndex()
+
+
+class EventIngestionService:
+    """Service for matching batches of trigger events against survey schedules"""
+
+    VALID_EVENTS = frozenset(event for event, _ in SurveySchedule.TRIGGER_EVENTS)
+
+    def __init__(self, index=None):
+        self.index = index or schedule_index
+
+    def _normalize(self, position, event, now):
+        """Validate one raw event, returning (event, error)"""
+        if not isinstance(event, dict):
+            return None, {'index': position, 'detail': 'Event must be an object'}
+
+        event_type = event.get('event_type')
+        if event_type not in self.VALID_EVENTS:
+            return None, {'index': position, 'detail': f"Unknown event_type: {event_type}"}
+
+        occurred_at = event.get('occurred_at')
+        if occurred_at:
+            occurred_at = parse_datetime(str(occurred_at))
+            if occurred_at is None:
+                return None, {'index': position, 'detail': 'occurred_at is not a valid datetime'}
+            if timezone.is_naive(occurred_at):
+                occurred_at = timezone.make_aware(occurred_at)
+        else:
+            occurred_at = now
+
+        data = event.get('data') or {}
+        if not isinstance(data, dict):
+            return None, {'index': position, 'detail': 'data must be an object'}
+
+        user_id = event.get('user_id')
+        mrn = event.get('medical_record_number')
+        if user_id is None and not mrn:
+            return None, {'index': position, 'detail': 'Event must include user_id or medical_record_number'}
+
+        if user_id is not None:
+            try:
+                user_id = int(user_id)
+            except (ValueError, TypeError):
+                return None, {'index': position, 'detail': 'user_id must be an integer'}
+
+        event_id = event.get('event_id')
+        return {
+            'index': position,
+            'event_type': event_type,
+            'event_id': str(event_id)[:100] if event_id is not None else None,
+            'occurred_at': occurred_at,
+            'user_id': user_id,
+            'mrn': str(mrn) if mrn else None,
+            'data': data,
+        }, None
+
+    def _resolve_users(self, events):
+        """Resolve user ids and medical record numbers with one query each"""
+        mrns = {e['mrn'] for e in events if e['user_id'] is None}
+        by_mrn = {}
+        if mrns:
+            by_mrn = dict(
+                UserProfile.objects.filter(medical_record_number__in=mrns)
+                .values_list('medical_record_number', 'user_id')
+            )
+
+        user_ids = {e['user_id'] for e in events if e['user_id'] is not None}
+        known_ids = set()
+        if user_ids:
+            known_ids = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+
+        return by_mrn, known_ids
+
+    def _new_deliveries(self, deliveries):
+        """
+        Leave out deliveries that already exist or repeat one earlier in the batch
+
+        Deliveries are unique per (schedule, user, event_id); those without
+        an event_id are always new. One query looks up the existing keys.
+        """
+        keyed = [delivery for delivery in deliveries if delivery.event_id is not None]
+        seen = set()
+        if keyed:
+            seen = set(ScheduledDelivery.objects.filter(
+                event_id__in={delivery.event_id for delivery in keyed},
+                schedule_id__in={delivery.schedule_id for delivery in keyed},
+                user_id__in={delivery.user_id for delivery in keyed},
+            ).values_list('schedule_id', 'user_id', 'event_id'))
+
+        new = []
+        for delivery in deliveries:
+            if delivery.event_id is not None:
+                key = (delivery.schedule_id, delivery.user_id, delivery.event_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+            new.append(delivery)
+        return new
+
+    def ingest(self, events, batch_size=1000):
+        """
+        Match a batch of trigger events and enqueue the resulting deliveries
+
+        Replayed events (same schedule, user and event_id) are matched again
+        but schedule nothing; 'scheduled' counts the deliveries inserted.
+
+        Args:
+            events: List of event dicts with event_type, user_id or
+                medical_record_number, optional event_id, occurred_at and data
+            batch_size: Rows per bulk insert
+
+        Returns:
+            Dictionary with counts and per-event errors
+        """
+        now = timezone.now()
+        results = {
+            'received': len(events),
+            'accepted': 0,
+            'matched': 0,
+            'scheduled': 0,
+            'errors': []
+        }
+
+        normalized = []
+        for position, raw in enumerate(events):
+            event, error = self._normalize(position, raw, now)
+            if error:
+                results['errors'].append(error)
+            else:
+                normalized.append(event)
+
+        if not normalized:
+            return results
+
+        by_mrn, known_ids = self._resolve_users(normalized)
+        self.index.refresh()
+
+        deliveries = []
+        for event in normalized:
+            if event['user_id'] is None:
+                user_id = by_mrn.get(event['mrn'])
+            else:
+                user_id = event['user_id'] if event['user_id'] in known_ids else None
+
+            if user_id is None:
+                results['errors'].append({'index': event['index'], 'detail': 'User not found'})
+                continue
+
+            results['accepted'] += 1
+            data = event['data']
+            matched = False
+
+            # Only schedules listening for this event type are evaluated
+            for schedule in self.index.candidates(event['event_type']):
+                if not schedule.predicate(data):
+                    continue
+                matched = True
+                deliveries.append(ScheduledDelivery(
+                    schedule_id=schedule.id,
+                    user_id=user_id,
+                    event_type=event['event_type'],
+                    event_id=event['event_id'],
+                    event_time=event['occurred_at'],
+                    deliver_at=event['occurred_at'] + schedule.delay,
+                ))
+
+            if matched:
+                results['matched'] += 1
+
+        deliveries = self._new_deliveries(deliveries)
+        if deliveries:
+            # A replay ingested concurrently by another request still hits the unique constraint
+            ScheduledDelivery.objects.bulk_create(deliveries, batch_size=batch_size, ignore_conflicts=True)
+
+        results['scheduled'] = len(deliveries)
+        logger.info(
+            f"Ingested {results['received']} events: {results['matched']} matched, "
+            f"{results['scheduled']} deliveries scheduled"
+        )
+
+        return results
@@ -0,0 +1,306 @@
+import logging
+import random
+import threading
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+from survey_management.models.notification import NotificationOutbox
+from survey_management.models.survey import Survey
+from survey_management.ratelimit import TokenBucket
+from survey_management.services.sms_backends import SMSMessage, get_sms_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNELS = ('EMAIL', 'SMS')
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_channel_limiter(channel):
+    """Return the process-wide rate limiter for a channel (SURVEY_NOTIFICATION_RATE_LIMITS)"""
+    limiter = _limiters.get(channel)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(channel)
+            if limiter is None:
+                limits = getattr(settings, 'SURVEY_NOTIFICATION_RATE_LIMITS', {})
+                limiter = TokenBucket(limits.get(channel, 50))
+                _limiters[channel] = limiter
+    return limiter
+
+
+class NotificationDispatcher:
+    """Queues notifications in the outbox so requests never wait on delivery"""
+
+    def __init__(self, chunk_size=500):
+        self.chunk_size = chunk_size
+
+    def enqueue(self, messages):
+        """
+        Store unsaved NotificationOutbox rows for the workers to deliver
+
+        When SURVEY_ASYNC_NOTIFICATIONS is off the outbox is drained
+        immediately, which keeps development and tests synchronous.
+        """
+        if not messages:
+            return
+        NotificationOutbox.objects.bulk_create(messages, batch_size=self.chunk_size)
+
+        if not getattr(settings, 'SURVEY_ASYNC_NOTIFICATIONS', True):
+            OutboxSender().drain()
+
+    def dispatch_survey_assignments(self, survey_id, user_ids, channels=DEFAULT_CHANNELS):
+        """
+        Queue assignment notifications for a set of users
+
+        Args:
+            survey_id: ID of the assigned survey
+            user_ids: Iterable of user IDs to notify
+            channels: Channels to use when the user has a matching address
+        """
+        from survey_management.services.notification_service import NotificationService
+
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+
+        survey = Survey.objects.only('id', 'title').get(pk=survey_id)
+        notification = NotificationService()
+
+        messages = []
+        for start in range(0, len(user_ids), self.chunk_size):
+            chunk = user_ids[start:start + self.chunk_size]
+            users = User.objects.filter(pk__in=chunk).select_related('profile').only(
+                'id', 'username', 'first_name', 'email', 'profile__phone_number'
+            )
+            for user in users:
+                messages.extend(notification.build_assignment_messages(survey, user, channels))
+
+        self.enqueue(messages)
+
+
+class OutboxSender:
+    """
+    Claims due outbox rows and delivers them
+
+    Emails are sent over a single connection per batch, SMS through the
+    configured SMS backend. Failed messages are retried with exponential
+    backoff and moved to the dead letter state after max_attempts.
+    """
+
+    def __init__(self, batch_size=None, max_attempts=None, backoff_seconds=None,
+                 max_backoff_seconds=None, lease_seconds=300, stop_event=None):
+        self.batch_size = batch_size or getattr(settings, 'SURVEY_NOTIFICATION_BATCH_SIZE', 100)
+        self.max_attempts = max_attempts or getattr(settings, 'SURVEY_NOTIFICATION_MAX_ATTEMPTS', 5)
+        self.backoff_seconds = backoff_seconds or getattr(settings, 'SURVEY_NOTIFICATION_BACKOFF_SECONDS', 30)
+        self.max_backoff_seconds = (max_backoff_seconds or
+                                    getattr(settings, 'SURVEY_NOTIFICATION_MAX_BACKOFF_SECONDS', 3600))
+        self.lease = timedelta(seconds=lease_seconds)
+        self.stop_event = stop_event
+
+    def claim(self, channel):
+        """
+        Lease a batch of due rows for this worker
+
+        The conditional UPDATE only succeeds for rows nobody else has claimed,
+        so concurrent workers never send the same message twice.
+        """
+        now = timezone.now()
+        claimable = (
+            Q(status='PENDING', next_attempt_at__lte=now) |
+            Q(status='SENDING', lease_expires_at__lt=now)
+        )
+
+        candidate_ids = list(
+            NotificationOutbox.objects.filter(claimable, channel=channel)
+            .order_by('next_attempt_at')
+            .values_list('pk', flat=True)[:self.batch_size]
+        )
+        if not candidate_ids:
+            return []
+
+        token = uuid.uuid4().hex
+        NotificationOutbox.objects.filter(claimable, pk__in=candidate_ids).update(
+            status='SENDING',
+            lease_token=token,
+            lease_expires_at=now + self.lease,
+            attempts=F('attempts') + 1
+        )
+        return list(NotificationOutbox.objects.filter(pk__in=candidate_ids, lease_token=token))
+
+    def _rate_limited_batches(self, channel, rows):
+        """Split rows into batches no larger than the channel's burst, waiting for tokens"""
+        limiter = get_channel_limiter(channel)
+        size = max(1, int(limiter.capacity))
+        for start in range(0, len(rows), size):
+            batch = rows[start:start + size]
+            if not limiter.consume(len(batch), stop_event=self.stop_event):
+                return
+            yield batch
+
+    def _deliver(self, transport, build, rows):
+        """
+        Send rows over an open transport, recording the outcome of each message
+
+        Messages are handed to the transport one at a time on the same
+        connection. A batch call that fails partway cannot say which messages
+        already went out, and resending the whole batch would reach some
+        recipients twice.
+        """
+        failures = {}
+        for row in rows:
+            try:
+                sent = transport.send_messages([build(row)])
+            except Exception as e:
+                failures[row.pk] = str(e)
+            else:
+                if not sent:
+                    failures[row.pk] = 'Not accepted by the transport'
+        return failures
+
+    def send_batch(self, channel, rows):
+        """
+        Deliver claimed rows and record the outcome
+
+        Returns:
+            Tuple of (sent, failed) counts
+        """
+        failures = {}
+        attempted = []
+
+        if channel == 'EMAIL':
+            from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None)
+            transport = get_connection(fail_silently=False)
+            build = lambda row: EmailMessage(row.subject, row.body, from_email, [row.recipient])
+        else:
+            transport = get_sms_backend(fail_silently=False)
+            build = lambda row: SMSMessage(row.recipient, row.body)
+
+        try:
+            transport.open()
+            for batch in self._rate_limited_batches(channel, rows):
+                failures.update(self._deliver(transport, build, batch))
+                attempted.extend(batch)
+        except Exception as e:
+            # The connection itself failed; everything not yet sent is retried
+            logger.error(f"{channel} transport failed: {str(e)}")
+            done = {row.pk for row in attempted}
+            for row in rows:
+                if row.pk not in done:
+                    failures[row.pk] = str(e)
+                    attempted.append(row)
+        finally:
+            try:
+                transport.close()
+            except Exception:
+                pass
+
+        # Rows skipped because the worker is stopping go back to the queue untouched
+        attempted_ids = {row.pk for row in attempted}
+        released = [row for row in rows if row.pk not in attempted_ids]
+        if released:
+            NotificationOutbox.objects.filter(pk__in=[row.pk for row in released]).update(
+                status='PENDING', lease_token='', lease_expires_at=None, attempts=F('attempts') - 1
+            )
+
+        self._record(attempted, failures)
+        return len(attempted) - len(failures), len(failures)
+
+    def _backoff(self, attempts):
+        delay = min(self.backoff_seconds * (2 ** (attempts - 1)), self.max_backoff_seconds)
+        # Jitter spreads retries so a provider outage doesn't end in a thundering herd
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+    def _record(self, rows, failures):
+        now = timezone.now()
+        for row in rows:
+            row.lease_token = ''
+            row.lease_expires_at = None
+            error = failures.get(row.pk)
+            if error is None:
+                row.status = 'SENT'
+                row.sent_at = now
+                row.last_error = ''
+            elif row.attempts >= self.max_attempts:
+                row.status = 'DEAD'
+                row.last_error = error
+                logger.error(f"Notification {row.pk} moved to dead letter after {row.attempts} attempts: {error}")
+            else:
+                row.status = 'PENDING'
+                row.next_attempt_at = now + self._backoff(row.attempts)
+                row.last_error = error
+
+        if rows:
+            NotificationOutbox.objects.bulk_update(
+                rows, ['status', 'sent_at', 'next_attempt_at', 'last_error',
+                       'lease_token', 'lease_expires_at']
+            )
+
+    def drain_once(self, channels=DEFAULT_CHANNELS):
+        """Claim and send at most one batch per channel, returning the number of rows handled"""
+        handled = 0
+        for channel in channels:
+            rows = self.claim(channel)
+            if rows:
+                self.send_batch(channel, rows)
+                handled += len(rows)
+        return handled
+
+    def drain(self, channels=DEFAULT_CHANNELS):
+        """Send everything that is currently due, returning the number of rows handled"""
+        total = 0
+        while not (self.stop_event and self.stop_event.is_set()):
+            handled = self.drain_once(channels)
+            if not handled:
+                break
+            total += handled
+        return total
+
+
+class NotificationWorkerPool:
+    """Pool of threads that drain the outbox concurrently"""
+
+    def __init__(self, workers=None, poll_interval=1.0, **sender_options):
+        self.workers = workers or getattr(settings, 'SURVEY_NOTIFICATION_WORKERS', 4)
+        self.poll_interval = poll_interval
+        self.sender_options = sender_options
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads"""
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f'survey-notify-{index}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Ask workers to finish their current batch and wait for them"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self):
+        sender = OutboxSender(stop_event=self._stop, **self.sender_options)
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                try:
+                    handled = sender.drain_once()
+                except Exception as e:
+                    logger.error(f"Notification worker error: {str(e)}")
+                    handled = 0
+                if not handled:
+                    self._stop.wait(self.poll_interval)
+        finally:
+            connection.close()
@@ -1,88 +1,132 @@
 import logging
-from django.core.mail import send_mail
-from django.conf import settings
-from django.contrib.auth.models import User
-from survey_management.models.response import Response
-from survey_management.models.schedule import SurveySchedule
+from django.utils import timezone
+from survey_management.models.notification import NotificationOutbox
+from survey_management.models.schedule import ScheduledDelivery
+from survey_management.services.notification_dispatcher import NotificationDispatcher
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
     """Service for sending notifications about surveys"""
     
-    def send_survey_assignment(self, survey, user):
+    def build_assignment_messages(self, survey, user, channels=('EMAIL', 'SMS')):
         """
-        Send notification to user about survey assignment
+        Build the outbox entries announcing a survey assignment
         
         Args:
             survey: Survey object
-            user: User object
+            user: User object (with profile loaded for SMS)
+            channels: Channels to use when the user has a matching address
         
         Returns:
-            Boolean indicating success
+            List of unsaved NotificationOutbox objects
         """
-        # Get user's email and phone
-        email = user.email
+        now = timezone.now()
+        messages = []
+        
+        # Email notification (if email available)
+        if 'EMAIL' in channels and user.email:
+            body = (
+                f"Hello {user.first_name or user.username},\n\n"
+                f"You have been assigned a new survey: {survey.title}\n\n"
+                f"Please complete this survey at your earliest convenience.\n\n"
+                f"Thank you,\n"
+                f"Healthcare Survey Platform\n"
+            )
+            messages.append(NotificationOutbox(
+                channel='EMAIL', kind='ASSIGNMENT', user=user, survey=survey,
+                recipient=user.email, subject=f"New Survey: {survey.title}",
+                body=body, next_attempt_at=now
+            ))
+        
+        # SMS notification (if phone available)
         phone = user.profile.phone_number if hasattr(user, 'profile') else None
+        if 'SMS' in channels and phone:
+            messages.append(NotificationOutbox(
+                channel='SMS', kind='ASSIGNMENT', user=user, survey=survey,
+                recipient=phone,
+                body=f"New survey assigned: {survey.title}. Please complete at your earliest convenience.",
+                next_attempt_at=now
+            ))
         
-        # Log the notification
-        logger.info(f"Sending survey assignment notification to {user.username} for survey: {survey.title}")
+        return messages
+    
+    def build_reminder_messages(self, survey, user, channels=('EMAIL', 'SMS'), reminder_number=1):
+        """
+        Build the outbox entries reminding a user about an incomplete survey
         
-        # Send email notification (if email available)
-        if email:
-            try:
-                subject = f"New Survey: {survey.title}"
-                message = f"""
-                Hello {user.first_name or user.username},
-                
-                You have been assigned a new survey: {survey.title}
-                
-                Please complete this survey at your earliest convenience.
-                
-                Thank you,
-                Healthcare Survey Platform
-                """
-                
-                # In production, this would actually send an email
-                # For development, we're just logging it
-                logger.info(f"Would send email to {email}: {subject}")
-                
-                # Uncomment to actually send email
-                # send_mail(
-                #     subject,
-                #     message,
-                #     settings.DEFAULT_FROM_EMAIL,
-                #     [email],
-                #     fail_silently=False,
-                # )
-                
-            except Exception as e:
-                logger.error(f"Failed to send email notification: {str(e)}")
-                return False
+        Args:
+            survey: Survey object
+            user: User object (with profile loaded for SMS)
+            channels: Channels to use when the user has a matching address
+            reminder_number: Which reminder this is, starting at 1
         
-        # Send SMS notification (if phone available)
-        if phone:
-            try:
-                message = f"New survey assigned: {survey.title}. Please complete at your earliest convenience."
-                
-                # In production, this would integrate with an SMS service
-                # For development, we're just logging it
-                logger.info(f"Would send SMS to {phone}: {message}")
-                
-                # Example SMS integration (commented out)
-                # twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-                # twilio_client.messages.create(
-                #     body=message,
-                #     from_=settings.TWILIO_PHONE_NUMBER,
-                #     to=phone
-                # )
-                
-            except Exception as e:
-                logger.error(f"Failed to send SMS notification: {str(e)}")
-                # Continue even if SMS fails
+        Returns:
+            List of unsaved NotificationOutbox objects
+        """
+        now = timezone.now()
+        messages = []
+        
+        if 'EMAIL' in channels and user.email:
+            body = (
+                f"Hello {user.first_name or user.username},\n\n"
+                f"This is a reminder that your survey \"{survey.title}\" is still waiting for you.\n\n"
+                f"It only takes a few minutes and helps us improve your care.\n\n"
+                f"Thank you,\n"
+                f"Healthcare Survey Platform\n"
+            )
+            messages.append(NotificationOutbox(
+                channel='EMAIL', kind='REMINDER', user=user, survey=survey,
+                recipient=user.email, subject=f"Reminder: {survey.title}",
+                body=body, next_attempt_at=now
+            ))
+        
+        phone = user.profile.phone_number if hasattr(user, 'profile') else None
+        if 'SMS' in channels and phone:
+            messages.append(NotificationOutbox(
+                channel='SMS', kind='REMINDER', user=user, survey=survey,
+                recipient=phone,
+                body=f"Reminder: your survey \"{survey.title}\" is still open. Please complete it when you can.",
+                next_attempt_at=now
+            ))
+        
+        logger.debug(f"Built reminder {reminder_number} for {user.username} on survey: {survey.title}")
+        return messages
+    
+    def send_survey_assignment(self, survey, user, channels=('EMAIL', 'SMS')):
+        """
+        Queue notifications to user about survey assignment
+        
+        Delivery happens in the notification workers, so this never blocks
+        on SMTP or the SMS provider.
+        
+        Args:
+            survey: Survey object
+            user: User object
+            channels: Channels to use when the user has a matching address
+        
+        Returns:
+            Boolean indicating success
+        """
+        logger.info(f"Queueing survey assignment notification to {user.username} for survey: {survey.title}")
+        
+        try:
+            NotificationDispatcher().enqueue(self.build_assignment_messages(survey, user, channels))
+        except Exception as e:
+            logger.error(f"Failed to queue notification: {str(e)}")
+            return False
         
         return True
     
+    def enabled_channels(self, config):
+        """Return the notification channels enabled on a schedule or reminder policy"""
+        channels = []
+        if config.send_email:
+            channels.append('EMAIL')
+        if config.send_sms:
+            channels.append('SMS')
+        return tuple(channels)
+    
     def process_manual_trigger(self, schedule, user_ids):
         """
         Process a manual trigger for a scheduled survey
@@ -94,76 +138,106 @@ class NotificationService:
         Returns:
             Dictionary with results
         """
-        survey = schedule.survey
-        results = {
-            'success': [],
-            'failed': []
-        }
-        
+        valid_ids = []
+        invalid = []
         for user_id in user_ids:
             try:
-                user = User.objects.get(pk=user_id)
-                
-                # Create a new response object
-                response = Response.objects.create(
-                    survey=survey,
-                    respondent=user,
-                    is_complete=False
-                )
-                
-                # Send notification
-                success = self.send_survey_assignment(survey, user)
-                
-                if success:
-                    results['success'].append({
-                        'user_id': user.id,
-                        'username': user.username,
-                        'response_id': response.id
-                    })
-                else:
-                    results['failed'].append({
-                        'user_id': user.id,
-                        'username': user.username,
-                        'reason': 'Notification failed'
-                    })
-                    
-            except User.DoesNotExist:
-                results['failed'].append({
-                    'user_id': user_id,
-                    'reason': 'User not found'
-                })
-            except Exception as e:
-                results['failed'].append({
+                valid_ids.append(int(user_id))
+            except (ValueError, TypeError):
+                invalid.append({
                     'user_id': user_id,
-                    'reason': str(e)
+                    'reason': 'Invalid user ID'
                 })
         
-        return results
+        # Responses are bulk-created and notifications handed to the dispatcher
+        from survey_management.services.assignment_service import AssignmentService
+        assignment = AssignmentService()
+        details = assignment.assign(
+            schedule.survey,
+            user_ids=valid_ids,
+            channels=self.enabled_channels(schedule),
+            schedule=schedule,
+            collect_details=True
+        )['details']
+        
+        return {
+            'success': details['success'],
+            'skipped': details['skipped'],
+            'failed': details['failed'] + invalid
+        }
     
-    def process_scheduled_surveys(self):
+    def process_scheduled_surveys(self, batch_size=500):
         """
-        Process all scheduled surveys that are due
+        Deliver all scheduled surveys that are due
+        
+        Args:
+            batch_size: Number of due deliveries to claim per query
         
         Returns:
             Dictionary with results
         """
-        # Get all active schedules
-        schedules = SurveySchedule.objects.filter(is_active=True)
-        
         results = {
             'processed': 0,
             'success': 0,
-            'failed': 0
+            'failed': 0,
+            'cancelled': 0
         }
         
-        for schedule in schedules:
-            # In a real implementation, this would check external systems
-            # to find events that match the trigger criteria
+        from survey_management.services.assignment_service import AssignmentService
+        assignment = AssignmentService()
+        
+        while True:
+            now = timezone.now()
+            due = list(
+                ScheduledDelivery.objects.filter(status='PENDING', deliver_at__lte=now)
+                .select_related('schedule__survey')
+                .order_by('deliver_at')[:batch_size]
+            )
+            if not due:
+                break
             
-            # For demonstration, we'll just log that we would process this schedule
-            logger.info(f"Would process schedule: {schedule.id} - {schedule.survey.title} - {schedule.trigger_event}")
+            # Group deliverable users by schedule so each one is assigned in bulk
+            by_schedule = {}
+            for delivery in due:
+                schedule = delivery.schedule
+                delivery.processed_at = now
+                results['processed'] += 1
+                
+                # Schedules or surveys switched off after the event was matched
+                if not schedule.is_active or not schedule.survey.is_active:
+                    delivery.status = 'CANCELLED'
+                    results['cancelled'] += 1
+                    continue
+                
+                by_schedule.setdefault(schedule.id, (schedule, []))[1].append(delivery)
+            
+            for schedule, deliveries in by_schedule.values():
+                try:
+                    details = assignment.assign(
+                        schedule.survey,
+                        user_ids=[d.user_id for d in deliveries],
+                        channels=self.enabled_channels(schedule),
+                        schedule=schedule,
+                        collect_details=True
+                    )['details']
+                    assigned_ids = {item['user_id'] for item in details['success']}
+                    skipped_ids = {item['user_id'] for item in details['skipped']}
+                except Exception as e:
+                    logger.error(f"Failed to deliver scheduled survey {schedule.survey_id}: {str(e)}")
+                    assigned_ids = skipped_ids = set()
+                
+                for delivery in deliveries:
+                    if delivery.user_id in assigned_ids:
+                        delivery.status = 'SENT'
+                        results['success'] += 1
+                    elif delivery.user_id in skipped_ids:
+                        # The user still has an open response for this survey
+                        delivery.status = 'CANCELLED'
+                        results['cancelled'] += 1
+                    else:
+                        delivery.status = 'FAILED'
+                        results['failed'] += 1
             
-            # Increment processed count
-            results['processed'] += 1
+            ScheduledDelivery.objects.bulk_update(due, ['status', 'processed_at'])
         
         return results
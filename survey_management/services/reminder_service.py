@@ -0,0 +1,128 @@
+import logging
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from survey_management.models.reminder import ReminderPolicy
+from survey_management.models.response import Response
+from survey_management.services.notification_dispatcher import NotificationDispatcher
+
+logger = logging.getLogger(__name__)
+
+class ReminderService:
+    """Service for reminding respondents about incomplete surveys"""
+
+    def __init__(self, dispatcher=None):
+        self.dispatcher = dispatcher or NotificationDispatcher()
+
+    def policy_for(self, survey, schedule=None):
+        """
+        Find the active reminder policy for a new assignment
+
+        A schedule's own policy takes precedence over the survey-wide one.
+
+        Args:
+            survey: Survey object
+            schedule: Optional SurveySchedule that triggered the assignment
+
+        Returns:
+            ReminderPolicy or None
+        """
+        if schedule is not None:
+            policy = ReminderPolicy.objects.filter(schedule=schedule, is_active=True).first()
+            if policy:
+                return policy
+        return ReminderPolicy.objects.filter(survey=survey, is_active=True).first()
+
+    def next_reminder_at(self, policy, started_at, reminders_sent=0):
+        """Return when the next reminder is due, or None once the policy is exhausted"""
+        if policy is None or not policy.is_active:
+            return None
+        offsets = policy.reminder_offsets()
+        if reminders_sent >= len(offsets):
+            return None
+        return started_at + timedelta(hours=offsets[reminders_sent])
+
+    def apply_policy(self, responses, policy):
+        """Set the reminder state on unsaved responses before they are bulk-created"""
+        if policy is None:
+            return
+        now = timezone.now()
+        first_reminder = self.next_reminder_at(policy, now)
+        for response in responses:
+            response.reminder_policy = policy
+            response.next_reminder_at = first_reminder
+
+    def _claim_due(self, now, batch_size):
+        due = (
+            Response.objects.filter(is_complete=False, next_reminder_at__lte=now)
+            .select_related('survey', 'reminder_policy', 'respondent__profile')
+            .order_by('next_reminder_at')
+        )
+        # Lets several reminder runners work in parallel on PostgreSQL
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True, of=('self',))
+        return list(due[:batch_size])
+
+    def send_due_reminders(self, batch_size=500):
+        """
+        Queue reminders for every open response whose next reminder is due
+
+        Uses the partial index on open responses' next_reminder_at, so the
+        cost depends on the number of due reminders, not the table size.
+
+        Args:
+            batch_size: Number of responses handled per transaction
+
+        Returns:
+            Dictionary with results
+        """
+        from survey_management.services.notification_service import NotificationService
+        notification = NotificationService()
+
+        results = {
+            'processed': 0,
+            'reminded': 0,
+            'stopped': 0
+        }
+
+        while True:
+            now = timezone.now()
+            with transaction.atomic():
+                due = self._claim_due(now, batch_size)
+                if not due:
+                    break
+
+                messages = []
+                for response in due:
+                    policy = response.reminder_policy
+                    results['processed'] += 1
+
+                    # Policy removed or switched off since the survey was assigned
+                    if policy is None or not policy.is_active:
+                        response.next_reminder_at = None
+                        results['stopped'] += 1
+                        continue
+
+                    response.reminders_sent += 1
+                    response.last_reminded_at = now
+                    next_at = self.next_reminder_at(policy, response.started_at, response.reminders_sent)
+                    if next_at is not None and next_at <= now:
+                        # Catching up after downtime: keep the policy's spacing between reminders
+                        offsets = policy.reminder_offsets()
+                        gap = offsets[response.reminders_sent] - offsets[response.reminders_sent - 1]
+                        next_at = now + timedelta(hours=max(gap, 1))
+                    response.next_reminder_at = next_at
+                    messages.extend(notification.build_reminder_messages(
+                        response.survey, response.respondent,
+                        channels=notification.enabled_channels(policy),
+                        reminder_number=response.reminders_sent
+                    ))
+                    results['reminded'] += 1
+
+                Response.objects.bulk_update(
+                    due, ['reminders_sent', 'last_reminded_at', 'next_reminder_at']
+                )
+                self.dispatcher.enqueue(messages)
+
+        logger.info(f"Sent {results['reminded']} survey reminders")
+        return results
@@ -0,0 +1,191 @@
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.utils import timezone
+from survey_management.live import live_counters
+from survey_management.models.response import Response, ResponseItem
+from survey_management.models.survey import Question, QuestionOption
+from survey_management.services.answer_packing import pack_submitted_response
+
+ITEM_FIELDS = ['text_answer', 'numeric_answer', 'selected_option', 'updated_at']
+
+# Inserting an item another request created meanwhile updates it instead.
+# Django 4.1.3 writes these names into ON CONFLICT as given, so they are column names.
+UPSERT = {
+    'update_conflicts': True,
+    'unique_fields': ['response_id', 'question_id'],
+    'update_fields': ['text_answer', 'numeric_answer', 'selected_option_id', 'updated_at'],
+}
+
+
+def submitted_ids(answers):
+    """
+    Question and option IDs referenced by submitted answers
+
+    Returns:
+        Tuple of (question IDs in answer order, 0 where missing; valid option IDs)
+    """
+    question_ids = [int(answer_data.get('question_id') or 0) for answer_data in answers]
+
+    option_ids = []
+    for answer_data in answers:
+        try:
+            option_ids.append(int(answer_data.get('option_id')))
+        except (ValueError, TypeError):
+            pass
+    return question_ids, option_ids
+
+
+def open_response(survey_id, respondent):
+    """
+    The respondent's open response to a survey, created if there is none
+
+    The response_one_open_per_respondent constraint makes this safe under
+    concurrency: when two requests both try to create the response, the
+    loser's insert fails and get_or_create returns the winner's row.
+
+    Returns:
+        Tuple of (response, created)
+    """
+    return Response.objects.get_or_create(
+        survey_id=survey_id,
+        respondent=respondent,
+        is_complete=False,
+        defaults={'started_at': timezone.now()}
+    )
+
+
+async def aopen_response(survey_id, respondent):
+    return await Response.objects.aget_or_create(
+        survey_id=survey_id,
+        respondent=respondent,
+        is_complete=False,
+        defaults={'started_at': timezone.now()}
+    )
+
+
+def answer_values(response_item):
+    return response_item.text_answer, response_item.numeric_answer, response_item.selected_option_id
+
+
+def apply_answers(response, answers, question_ids, questions, options, existing):
+    """
+    Set submitted answers on new or existing response items, without touching the database
+
+    Args:
+        response: Response the items belong to
+        answers: Submitted answer dictionaries
+        question_ids: Question ID of each answer, as returned by submitted_ids()
+        questions: Questions by ID
+        options: Question options by ID
+        existing: Existing response items by question ID
+
+    Returns:
+        Tuple of (items to create, existing items whose answer changed)
+    """
+    new_items, original_values = [], {}
+
+    for question_id, answer_data in zip(question_ids, answers):
+        question = questions.get(question_id)
+        if question is None:
+            continue
+
+        # Create or update response item based on question type
+        response_item = existing.get(question.id)
+        if response_item is None:
+            response_item = existing[question.id] = ResponseItem(response=response, question=question)
+            new_items.append(response_item)
+        elif response_item.pk is not None and response_item.pk not in original_values:
+            original_values[response_item.pk] = answer_values(response_item)
+
+        if question.question_type == 'TEXT':
+            response_item.text_answer = answer_data.get('text_answer', '')
+
+        elif question.question_type == 'MULTIPLE_CHOICE':
+            option_id = answer_data.get('option_id')
+            if option_id:
+                try:
+                    response_item.selected_option = options[int(option_id)]
+                except (KeyError, ValueError, TypeError):
+                    pass
+
+        elif question.question_type in ['RATING', 'BOOLEAN']:
+            try:
+                response_item.numeric_answer = int(answer_data.get('numeric_answer', 0))
+            except (ValueError, TypeError):
+                response_item.numeric_answer = None
+
+    # Answers resubmitted unchanged are not written again
+    changed_items = [
+        response_item for response_item in existing.values()
+        if response_item.pk in original_values and answer_values(response_item) != original_values[response_item.pk]
+    ]
+    now = timezone.now()
+    for response_item in changed_items:
+        response_item.updated_at = now
+    return new_items, changed_items
+
+
+def save_answers(response, answers):
+    """
+    Create or update the response items of submitted answers
+
+    Questions, options and existing items are loaded once and the items
+    written in bulk, so a submission costs the same number of queries
+    however many questions it answers. Only new and changed answers are
+    written; new items are upserted, so a concurrent save of the same
+    question updates the row instead of failing. Answers to unknown
+    questions or options are skipped.
+
+    Returns:
+        Number of items created or changed
+    """
+    question_ids, option_ids = submitted_ids(answers)
+    questions = Question.objects.in_bulk([question_id for question_id in question_ids if question_id])
+    options = QuestionOption.objects.in_bulk(option_ids) if option_ids else {}
+    existing = {item.question_id: item for item in response.items.all()}
+
+    new_items, changed_items = apply_answers(response, answers, question_ids, questions, options, existing)
+    if new_items:
+        ResponseItem.objects.bulk_create(new_items, **UPSERT)
+    if changed_items:
+        ResponseItem.objects.bulk_update(changed_items, ITEM_FIELDS)
+    return len(new_items) + len(changed_items)
+
+
+async def asave_answers(response, answers):
+    """save_answers() with the async ORM, running the same queries"""
+    question_ids, option_ids = submitted_ids(answers)
+    questions = await Question.objects.ain_bulk([question_id for question_id in question_ids if question_id])
+    options = await QuestionOption.objects.ain_bulk(option_ids) if option_ids else {}
+    existing = {item.question_id: item async for item in response.items.all()}
+
+    new_items, changed_items = apply_answers(response, answers, question_ids, questions, options, existing)
+    if new_items:
+        await ResponseItem.objects.abulk_create(new_items, **UPSERT)
+    if changed_items:
+        await ResponseItem.objects.abulk_update(changed_items, ITEM_FIELDS)
+    return len(new_items) + len(changed_items)
+
+
+def complete_response(response, items=None):
+    """
+    Mark a response as submitted, pack its answers and save it
+
+    Callers that already loaded the response's items pass them to save the query.
+    """
+    response.is_complete = True
+    response.next_reminder_at = None
+    response.submitted_at = timezone.now()
+    pack_submitted_response(response, items)
+    response.save()
+
+    if live_counters.is_counting(response.survey_id):
+        # Read from the packed answers just written, unless packing is disabled
+        answers = response.get_answers()
+        transaction.on_commit(lambda: live_counters.record_completed(response.survey_id, answers))
+
+
+async def acomplete_response(response):
+    # Model.save() has no async variant in Django 4.1, and the signals it
+    # sends invalidate caches synchronously
+    await sync_to_async(complete_response)(response)
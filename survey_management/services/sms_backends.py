@@ -0,0 +1,68 @@
+import logging
+import threading
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Messages sent through LocmemSMSBackend, for tests
+outbox = []
+_outbox_lock = threading.Lock()
+
+
+class SMSMessage:
+    """A single text message"""
+
+    def __init__(self, to, body):
+        self.to = to
+        self.body = body
+
+    def __repr__(self):
+        return f"SMSMessage(to={self.to!r})"
+
+
+class BaseSMSBackend:
+    """
+    Base class for SMS providers
+
+    Mirrors Django's email backend API: open a connection, send a batch of
+    messages over it and close it. Subclasses implement send_messages().
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        """Send a list of SMSMessage objects and return the number sent"""
+        raise NotImplementedError('Subclasses of BaseSMSBackend must implement send_messages()')
+
+
+class ConsoleSMSBackend(BaseSMSBackend):
+    """Logs messages instead of sending them (development default)"""
+
+    def send_messages(self, messages):
+        for message in messages:
+            logger.info(f"Would send SMS to {message.to}: {message.body}")
+        return len(messages)
+
+
+class LocmemSMSBackend(BaseSMSBackend):
+    """Keeps messages in sms_backends.outbox (test transport)"""
+
+    def send_messages(self, messages):
+        with _outbox_lock:
+            outbox.extend(messages)
+        return len(messages)
+
+
+def get_sms_backend(backend=None, **kwargs):
+    """Instantiate the configured SMS backend (SURVEY_SMS_BACKEND)"""
+    path = backend or getattr(settings, 'SURVEY_SMS_BACKEND',
+                              'survey_management.services.sms_backends.ConsoleSMSBackend')
+    return import_string(path)(**kwargs)
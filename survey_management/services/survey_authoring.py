@@ -0,0 +1,192 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Q
+from rest_framework import serializers
+from survey_management.caching import bump_survey_definitions
+from survey_management.models.response import Response, ResponseItem
+from survey_management.models.survey import Question, QuestionOption
+
+QUESTION_FIELDS = ['text', 'question_type', 'is_required', 'order', 'min_rating', 'max_rating']
+OPTION_FIELDS = ['text', 'order']
+
+
+class Diff:
+    """Submitted rows matched against the existing ones by ID"""
+
+    def __init__(self):
+        self.rows = []
+        self.new = []
+        self.changed = []
+        self.changed_fields = set()
+        self.removed = []
+
+
+def diff_by_id(existing, submitted, fields, build, label):
+    """
+    Match submitted rows to existing ones by ID, without touching the database
+
+    Rows without an id are new. Fields missing from a submitted row keep
+    their current value, and a row is only marked changed when a value
+    differs, so resubmitting an unchanged survey writes nothing.
+
+    Args:
+        existing: Existing objects by ID
+        submitted: Validated row dictionaries, without nested rows
+        fields: Fields an update may change
+        build: Called with a row dictionary to make an unsaved object
+        label: Name of the rows in error messages
+    Returns:
+        Diff whose rows are the objects in submitted order
+    Raises:
+        ValidationError: an id is not one of the existing rows, or is given twice
+    """
+    diff = Diff()
+    seen = set()
+    for data in submitted:
+        data = dict(data)
+        object_id = data.pop('id', None)
+        if object_id is None:
+            obj = build(data)
+            diff.new.append(obj)
+        else:
+            obj = existing.get(object_id)
+            if obj is None or object_id in seen:
+                raise serializers.ValidationError(f"{label} {object_id} cannot be updated here")
+            seen.add(object_id)
+            updates = {field: data[field] for field in fields if field in data and getattr(obj, field) != data[field]}
+            for field, value in updates.items():
+                setattr(obj, field, value)
+            if updates:
+                diff.changed.append(obj)
+                diff.changed_fields.update(updates)
+        diff.rows.append(obj)
+    diff.removed = [object_id for object_id in existing if object_id not in seen]
+    return diff
+
+
+def check_unanswered(survey_id, question_ids, options):
+    """
+    Refuse to remove questions or options that have answers
+
+    ResponseItem rows cascade with their question and selected option, so
+    removing an answered one would delete collected answers.
+
+    Args:
+        survey_id: Survey the rows belong to
+        question_ids: IDs of the questions to remove
+        options: Question IDs of the options to remove, by option ID
+    """
+    if not question_ids and not options:
+        return
+    question_ids, option_ids = set(question_ids), set(options)
+    answered = list(ResponseItem.objects.filter(
+        Q(question_id__in=question_ids) | Q(selected_option_id__in=option_ids)
+    ).values_list('question_id', 'selected_option_id').distinct())
+    answered_questions = {question_id for question_id, _ in answered if question_id in question_ids}
+    answered_options = {option_id for _, option_id in answered if option_id in option_ids}
+
+    # Packed responses may have dropped their items (SURVEY_PACKED_ANSWERS KEEP_ITEMS),
+    # leaving the packed answer as the only record of a question or selected option
+    keys = {str(question_id) for question_id in question_ids | set(options.values())}
+    for packed in Response.objects.filter(
+        survey_id=survey_id, packed_answers__has_any_keys=sorted(keys)
+    ).values_list('packed_answers', flat=True):
+        answered_questions.update(int(key) for key in keys & packed.keys() if int(key) in question_ids)
+        answered_options.update(
+            option_id for option_id, question_id in options.items()
+            if packed.get(str(question_id), {}).get('o') == option_id
+        )
+
+    errors = []
+    if answered_questions:
+        errors.append(f"Questions {sorted(answered_questions)} have answers and cannot be removed")
+    if answered_options:
+        errors.append(f"Options {sorted(answered_options)} have answers and cannot be removed")
+    if errors:
+        raise serializers.ValidationError(errors)
+
+
+def write_diffs(model, diffs):
+    """Write the diffs of one model with a bulk insert, a bulk update of the changed fields and a delete"""
+    new = [obj for diff in diffs for obj in diff.new]
+    changed = [obj for diff in diffs for obj in diff.changed]
+    fields = set().union(*(diff.changed_fields for diff in diffs))
+    removed = [object_id for diff in diffs for object_id in diff.removed]
+    if new:
+        model.objects.bulk_create(new)
+    if changed:
+        model.objects.bulk_update(changed, sorted(fields))
+    if removed:
+        model.objects.filter(pk__in=removed).delete()
+
+
+def diff_options(questions, options_data, existing_options):
+    """Diff the options of each question that was submitted with an options list"""
+    diffs = []
+    for question, data in zip(questions, options_data):
+        if data is None:
+            continue
+        diffs.append(diff_by_id(
+            existing_options.get(question.pk, {}), data, OPTION_FIELDS,
+            lambda row, question=question: QuestionOption(question=question, **row), 'Option'
+        ))
+    return diffs
+
+
+def save_survey_questions(survey, questions_data):
+    """
+    Make a survey's questions and their options match a submitted list
+
+    Submitted questions and options with an id are updated in place and keep
+    it, those without one are created, and those left out are deleted. A
+    question submitted without an options list keeps its options. Everything
+    is written in one transaction with a bulk insert, a bulk update and a
+    delete per model, so the query count does not grow with the survey.
+
+    Bulk writes send no model signals, so the survey definition caches are
+    invalidated here.
+
+    Raises:
+        ValidationError: an id belongs to another survey or question, or a removed row has answers
+    """
+    with transaction.atomic():
+        existing = {question.pk: question for question in Question.objects.filter(survey=survey)}
+        existing_options = defaultdict(dict)
+        option_questions = {}
+        for option in QuestionOption.objects.filter(question__survey=survey):
+            existing_options[option.question_id][option.pk] = option
+            option_questions[option.pk] = option.question_id
+
+        rows = [{key: value for key, value in data.items() if key != 'options'} for data in questions_data]
+        questions = diff_by_id(
+            existing, rows, QUESTION_FIELDS, lambda row: Question(survey=survey, **row), 'Question'
+        )
+        options_data = [data.get('options') for data in questions_data]
+        options = diff_options(questions.rows, options_data, existing_options)
+        check_unanswered(survey.pk, questions.removed, {
+            object_id: option_questions[object_id] for diff in options for object_id in diff.removed
+        })
+
+        # bulk_create sets the IDs of new questions, which their new options then pick up
+        write_diffs(Question, [questions])
+        write_diffs(QuestionOption, options)
+
+        transaction.on_commit(lambda: bump_survey_definitions(survey.pk))
+    return questions.rows
+
+
+def save_question_options(question, options_data):
+    """
+    Make a question's options match a submitted list, keeping the IDs of those that remain
+
+    Raises:
+        ValidationError: an id belongs to another question, or a removed option has answers
+    """
+    with transaction.atomic():
+        existing = {question.pk: {option.pk: option for option in question.options.all()}}
+        [options] = diff_options([question], [options_data], existing)
+        check_unanswered(question.survey_id, [], dict.fromkeys(options.removed, question.pk))
+        write_diffs(QuestionOption, [options])
+
+        transaction.on_commit(lambda: bump_survey_definitions(question.survey_id))
+    return options.rows
@@ -0,0 +1,248 @@
+import logging
+import random
+from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from survey_management.models.department import Department
+from survey_management.models.response import Response, ResponseItem, pack_answer
+from survey_management.models.survey import Survey, Question, QuestionOption
+from survey_management.models.user import UserProfile
+
+logger = logging.getLogger(__name__)
+
+DEPARTMENT_NAMES = [
+    'Cardiology', 'Neurology', 'Pediatrics', 'Oncology', 'Orthopedics', 'Dermatology',
+    'Emergency Medicine', 'Gastroenterology', 'Radiology', 'Urology', 'Nephrology', 'Psychiatry',
+]
+
+QUESTION_TEMPLATES = {
+    'RATING': ['How would you rate your overall experience?', 'How satisfied were you with the wait time?',
+               'How well did the staff explain your treatment?', 'How clean was the facility?'],
+    'MULTIPLE_CHOICE': ['How did you hear about us?', 'Which service did you use today?',
+                        'How long did you wait before being seen?'],
+    'BOOLEAN': ['Would you recommend us to a friend?', 'Were you seen at your scheduled time?',
+                'Did you receive discharge instructions?'],
+    'TEXT': ['What could we do better?', 'Is there anything else you would like to tell us?'],
+}
+
+OPTION_TEXTS = ['Referral', 'Website', 'Friend or family', 'Walk-in', 'Under 15 minutes',
+                '15 to 30 minutes', 'Over 30 minutes', 'Other']
+
+TEXT_ANSWERS = ['Everything was fine.', 'The wait was too long.', 'Friendly and helpful staff.',
+                'Parking was difficult.', 'Clear explanations, thank you.', '']
+
+# Skew ratings towards the positive end, as real satisfaction surveys are
+RATING_WEIGHTS = [1, 2, 4, 8, 10]
+
+
+class SyntheticDataGenerator:
+    """
+    Bulk-creates reproducible, production-shaped data for load and query tests
+
+    The same seed and sizes always produce the same data. Rows are inserted
+    with bulk_create in batches, so model signals do not run; caches that
+    depend on them are invalidated once at the end.
+    """
+
+    def __init__(self, seed=0, batch_size=5000, password='synthetic', prefix='syn'):
+        self.random = random.Random(seed)
+        self.seed = seed
+        self.batch_size = batch_size
+        self.password_hash = make_password(password)
+        self.prefix = f"{prefix}{seed}"
+
+    def generate(self, departments=5, staff=50, patients=1000, surveys=20, questions_per_survey=10,
+                 responses=10000, completion_rate=0.8, days=180, pack=False, progress=None):
+        """
+        Generate a full data set
+
+        Args:
+            departments: Number of departments
+            staff: Number of staff users, spread over the departments
+            patients: Number of patient users
+            surveys: Number of surveys
+            questions_per_survey: Questions per survey, of mixed types
+            responses: Number of responses, each with an item per answered question
+            completion_rate: Share of responses that are complete
+            days: Responses are submitted over this many past days
+            pack: Also store packed answers on completed responses
+            progress: Optional callable receiving a message per step
+
+        Returns:
+            Dictionary with the number of rows created per model
+        """
+        report = progress or (lambda message: logger.info(message))
+        counts = {}
+
+        with transaction.atomic():
+            department_objs = self.create_departments(departments)
+            admin = self.create_users(1, 'admin', 'ADMIN')[0]
+            self.create_users(staff, 'staff', 'STAFF', department_objs)
+            patient_ids = [user.pk for user in self.create_users(patients, 'patient', 'PATIENT')]
+            survey_questions = self.create_surveys(surveys, questions_per_survey, admin, department_objs)
+        counts.update({'departments': departments, 'users': 1 + staff + patients, 'surveys': surveys,
+                       'questions': surveys * questions_per_survey})
+        report(f"Created {counts['users']} users and {surveys} surveys")
+
+        counts['responses'], counts['response_items'] = self.create_responses(
+            responses, survey_questions, patient_ids, completion_rate, days, pack, report
+        )
+        self.invalidate_caches([survey.pk for survey, _ in survey_questions])
+        return counts
+
+    def create_departments(self, count):
+        departments = []
+        for index in range(count):
+            name = DEPARTMENT_NAMES[index % len(DEPARTMENT_NAMES)]
+            departments.append(Department(
+                name=f"{name} {index // len(DEPARTMENT_NAMES) + 1} ({self.prefix})",
+                description=f"Synthetic {name.lower()} department"
+            ))
+        return Department.objects.bulk_create(departments)
+
+    def create_users(self, count, kind, role, departments=None):
+        users = []
+        for start in range(0, count, self.batch_size):
+            batch = User.objects.bulk_create([
+                User(username=f"{self.prefix}-{kind}-{index}", email=f"{kind}{index}@{self.prefix}.example.com",
+                     password=self.password_hash, is_superuser=role == 'ADMIN', is_staff=role == 'ADMIN')
+                for index in range(start, min(count, start + self.batch_size))
+            ])
+            UserProfile.objects.bulk_create([
+                UserProfile(
+                    user=user,
+                    role=role,
+                    department=departments[index % len(departments)] if departments else None,
+                    phone_number=f"+1555{self.random.randrange(10 ** 7):07d}",
+                    medical_record_number=f"MRN-{self.prefix}-{start + index}" if role == 'PATIENT' else None,
+                )
+                for index, user in enumerate(batch)
+            ])
+            users.extend(batch)
+        return users
+
+    def create_surveys(self, count, questions_per_survey, admin, departments):
+        """Create surveys with mixed question types, returning [(survey, [question, ...]), ...]"""
+        surveys = Survey.objects.bulk_create([
+            Survey(title=f"Patient experience survey {index + 1} ({self.prefix})",
+                   description='Synthetic survey', created_by=admin, target_audience='Patients')
+            for index in range(count)
+        ])
+        Survey.departments.through.objects.bulk_create([
+            Survey.departments.through(survey_id=survey.pk, department_id=self.random.choice(departments).pk)
+            for survey in surveys
+        ])
+
+        types = list(QUESTION_TEMPLATES)
+        questions = []
+        for survey in surveys:
+            for order in range(questions_per_survey):
+                question_type = types[order % len(types)] if order < len(types) else self.random.choice(types)
+                questions.append(Question(
+                    survey=survey,
+                    text=self.random.choice(QUESTION_TEMPLATES[question_type]),
+                    question_type=question_type,
+                    is_required=question_type != 'TEXT',
+                    order=order,
+                    min_rating=1 if question_type == 'RATING' else None,
+                    max_rating=5 if question_type == 'RATING' else None,
+                ))
+        questions = Question.objects.bulk_create(questions, batch_size=self.batch_size)
+
+        options = []
+        for question in questions:
+            if question.question_type == 'MULTIPLE_CHOICE':
+                for order, text in enumerate(self.random.sample(OPTION_TEXTS, 4)):
+                    options.append(QuestionOption(question=question, text=text, order=order))
+        options = QuestionOption.objects.bulk_create(options, batch_size=self.batch_size)
+
+        options_by_question = {}
+        for option in options:
+            options_by_question.setdefault(option.question_id, []).append(option.pk)
+        for question in questions:
+            question.option_ids = options_by_question.get(question.pk, [])
+
+        by_survey = {}
+        for question in questions:
+            by_survey.setdefault(question.survey_id, []).append(question)
+        return [(survey, by_survey.get(survey.pk, [])) for survey in surveys]
+
+    def answer(self, question):
+        """A ResponseItem for a question, or None when an optional question is skipped"""
+        if not question.is_required and self.random.random() < 0.5:
+            return None
+        item = ResponseItem(question_id=question.pk)
+        if question.question_type == 'RATING':
+            item.numeric_answer = self.random.choices(range(1, 6), RATING_WEIGHTS)[0]
+        elif question.question_type == 'BOOLEAN':
+            item.numeric_answer = 1 if self.random.random() < 0.8 else 0
+        elif question.question_type == 'MULTIPLE_CHOICE':
+            item.selected_option_id = self.random.choice(question.option_ids)
+        else:
+            item.text_answer = self.random.choice(TEXT_ANSWERS)
+        return item
+
+    def create_responses(self, count, survey_questions, patient_ids, completion_rate, days, pack, report):
+        now = timezone.now()
+        created_responses = created_items = 0
+        # A patient has at most one open response per survey
+        open_pairs = set()
+
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            responses, answers = [], []
+            for _ in range(size):
+                survey, questions = self.random.choice(survey_questions)
+                respondent_id = self.random.choice(patient_ids)
+                complete = self.random.random() < completion_rate or (survey.pk, respondent_id) in open_pairs
+                if not complete:
+                    open_pairs.add((survey.pk, respondent_id))
+                if complete:
+                    items = [item for item in (self.answer(question) for question in questions) if item]
+                else:
+                    # Drafts stop part-way through the survey
+                    items = [item for item in (self.answer(question) for question in
+                             questions[:self.random.randrange(len(questions) + 1)]) if item]
+                response = Response(
+                    survey=survey,
+                    respondent_id=respondent_id,
+                    is_complete=complete,
+                    submitted_at=now - timedelta(seconds=self.random.randrange(days * 86400)) if complete else None,
+                )
+                responses.append(response)
+                answers.append(items)
+
+            with transaction.atomic():
+                Response.objects.bulk_create(responses)
+                items = []
+                for response, response_items in zip(responses, answers):
+                    for item in response_items:
+                        item.response_id = response.pk
+                        items.append(item)
+                ResponseItem.objects.bulk_create(items, batch_size=self.batch_size)
+                if pack:
+                    # Packed after the items are inserted, so they carry the item ids and timestamps
+                    completed = []
+                    for response, response_items in zip(responses, answers):
+                        if response.is_complete:
+                            response.packed_answers = {str(item.question_id): pack_answer(item)
+                                                       for item in response_items}
+                            completed.append(response)
+                    Response.objects.bulk_update(completed, ['packed_answers'], batch_size=self.batch_size)
+
+            created_responses += size
+            created_items += len(items)
+            report(f"Created {created_responses}/{count} responses ({created_items} items)")
+
+        return created_responses, created_items
+
+    def invalidate_caches(self, survey_ids):
+        from survey_management.caching import bump_response_versions, tiered_cache
+        from survey_management.permissions.context import invalidate_all_contexts
+        for survey_id in survey_ids:
+            bump_response_versions(survey_id)
+        tiered_cache.bump('survey')
+        tiered_cache.bump('departments')
+        invalidate_all_contexts()
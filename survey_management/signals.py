@@ -1,7 +1,14 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from survey_management.models.user import UserProfile
+from survey_management.models.schedule import SurveySchedule
+from survey_management.models.survey import Survey, Question, QuestionOption
+from survey_management.models.department import Department
+from survey_management.models.response import Response, ResponseItem
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -20,3 +27,188 @@ def save_user_profile(sender, instance, **kwargs):
         UserProfile.objects.create(user=instance, role=role)
     else:
         instance.profile.save()
+
+@receiver(post_save, sender=SurveySchedule)
+@receiver(post_delete, sender=SurveySchedule)
+def invalidate_schedule_index(sender, instance, **kwargs):
+    """Recompile the schedule's event filter the next time events are ingested"""
+    from survey_management.services.event_service import schedule_index
+    schedule_index.invalidate(instance.pk)
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_user_auth_context(sender, instance, **kwargs):
+    """Rebuild the user's authorization context on their next request"""
+    from survey_management.permissions.context import invalidate_user_context
+    invalidate_user_context(instance.user_id)
+
+# Profile fields whose changes other caches depend on. Every User save
+# (e.g. the last_login update of each login) saves the profile as well, so
+# handlers compare against the loaded values instead of acting on every save.
+TRACKED_PROFILE_FIELDS = ('api_key_hash', 'role', 'department_id', 'phone_number')
+
+def loaded_values(instance, fields):
+    # Deferred fields are left out rather than loaded
+    return {field: instance.__dict__.get(field) for field in fields}
+
+def changed_profile_fields(instance):
+    """Tracked fields whose values differ from those loaded or last saved"""
+    current = loaded_values(instance, TRACKED_PROFILE_FIELDS)
+    return {field for field, value in current.items() if value != instance._loaded_values[field]}
+
+@receiver(post_init, sender=UserProfile)
+def remember_profile_values(sender, instance, **kwargs):
+    instance._loaded_values = loaded_values(instance, TRACKED_PROFILE_FIELDS)
+
+@receiver(post_init, sender=User)
+def remember_user_active(sender, instance, **kwargs):
+    instance._loaded_is_active = instance.__dict__.get('is_active')
+
+def revoke_api_keys(*key_hashes):
+    from survey_management.authentication import revoke_cached_api_key
+    for key_hash in set(key_hashes) - {None}:
+        revoke_cached_api_key(key_hash)
+
+@receiver(post_save, sender=UserProfile)
+def revoke_changed_api_key(sender, instance, **kwargs):
+    """Key rotation, revocation and role changes apply on the key's next request"""
+    if changed_profile_fields(instance) & {'api_key_hash', 'role'}:
+        revoke_api_keys(instance._loaded_values['api_key_hash'], instance.api_key_hash)
+
+@receiver(post_delete, sender=UserProfile)
+def revoke_deleted_api_key(sender, instance, **kwargs):
+    revoke_api_keys(instance._loaded_values['api_key_hash'], instance.api_key_hash)
+
+@receiver(post_save, sender=User)
+def revoke_deactivated_api_key(sender, instance, created, **kwargs):
+    """A deactivated or reactivated integrator's key is resolved again"""
+    if created or instance.is_active == instance._loaded_is_active:
+        return
+    instance._loaded_is_active = instance.is_active
+    revoke_api_keys(UserProfile.objects.filter(user=instance).values_list('api_key_hash', flat=True).first())
+
+@receiver(m2m_changed, sender=Survey.departments.through)
+@receiver(post_delete, sender=Department)
+def invalidate_auth_contexts(sender, **kwargs):
+    """Survey visibility of staff changes with the surveys' departments"""
+    from survey_management.permissions.context import invalidate_all_contexts
+    invalidate_all_contexts()
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Apply SURVEY_SQLITE_PRAGMAS (WAL, synchronous, mmap) to new SQLite connections"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SURVEY_SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+@receiver(connection_created)
+def forward_queries_to_metrics(sender, connection, **kwargs):
+    """Let RequestMetricsMiddleware count the queries async requests run in worker threads"""
+    from survey_management.metrics import forward_to_context_recorder
+    if forward_to_context_recorder not in connection.execute_wrappers:
+        # Inserted first: execute_wrapper() blocks pop the last wrapper on exit
+        connection.execute_wrappers.insert(0, forward_to_context_recorder)
+
+@receiver(post_save, sender=ResponseItem)
+def unpack_edited_response(sender, instance, **kwargs):
+    """Edited answers are read from the item rows until the response is packed again"""
+    # Only completed responses are packed; drafts being filled in need no query
+    response = instance.response
+    if response.is_complete:
+        Response.objects.filter(pk=response.pk, packed_answers__isnull=False).update(packed_answers=None)
+        response.packed_answers = None
+
+@receiver(post_save, sender=Survey)
+@receiver(post_delete, sender=Survey)
+def invalidate_survey_definition(sender, instance, **kwargs):
+    """Serve the changed survey definition from the next request on"""
+    from survey_management.caching import bump_survey_definitions
+    survey_id = instance.pk
+    transaction.on_commit(lambda: bump_survey_definitions(survey_id))
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_survey_definition(sender, instance, **kwargs):
+    from survey_management.caching import bump_survey_definitions
+    survey_id = instance.survey_id
+    transaction.on_commit(lambda: bump_survey_definitions(survey_id))
+
+@receiver(post_save, sender=QuestionOption)
+@receiver(post_delete, sender=QuestionOption)
+def invalidate_option_survey_definition(sender, instance, **kwargs):
+    from survey_management.caching import bump_survey_definitions
+    survey_id = Question.objects.filter(pk=instance.question_id).values_list('survey_id', flat=True).first()
+    # Options deleted with their question are covered by the question's signal
+    if survey_id is not None:
+        transaction.on_commit(lambda: bump_survey_definitions(survey_id))
+
+@receiver(m2m_changed, sender=Survey.departments.through)
+def invalidate_survey_departments(sender, instance, action, reverse, pk_set, **kwargs):
+    """The definition lists the survey's departments"""
+    from survey_management.caching import bump_survey_definitions
+    if not action.startswith('post_'):
+        return
+    survey_ids = list(pk_set or ()) if reverse else [instance.pk]
+    transaction.on_commit(lambda: bump_survey_definitions(*survey_ids))
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_department_list(sender, instance, **kwargs):
+    """Department names and staff counts are cached as one list"""
+    from survey_management.caching import tiered_cache
+    transaction.on_commit(lambda: tiered_cache.bump('departments'))
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_department_staff_counts(sender, instance, created, **kwargs):
+    """Staff counts only change when a profile joins or leaves a department"""
+    from survey_management.caching import tiered_cache
+    if created:
+        moved = instance.department_id is not None
+    else:
+        moved = 'department_id' in changed_profile_fields(instance)
+    if moved:
+        transaction.on_commit(lambda: tiered_cache.bump('departments'))
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_profile_values(sender, instance, created, **kwargs):
+    """Cached role, department and phone number (see get_profile_values)"""
+    from survey_management.caching import tiered_cache
+    if created or changed_profile_fields(instance) & {'role', 'department_id', 'phone_number'}:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: tiered_cache.bump('profile', user_id))
+
+@receiver(post_delete, sender=UserProfile)
+def invalidate_deleted_profile_values(sender, instance, **kwargs):
+    from survey_management.caching import tiered_cache
+    user_id = instance.user_id
+    transaction.on_commit(lambda: tiered_cache.bump('profile', user_id))
+
+@receiver(post_save, sender=Response)
+@receiver(post_delete, sender=Response)
+def invalidate_response_statistics(sender, instance, **kwargs):
+    """Survey statistics and analytics get new ETags"""
+    from survey_management.caching import bump_response_versions
+    survey_id = instance.survey_id
+    transaction.on_commit(lambda: bump_response_versions(survey_id))
+
+@receiver(post_save, sender=Response)
+def count_live_response(sender, instance, created, **kwargs):
+    """Open dashboards count new responses (completions are counted by complete_response)"""
+    from survey_management.live import live_counters
+    if created and live_counters.is_counting(instance.survey_id):
+        transaction.on_commit(lambda: live_counters.record_created(instance.survey_id))
+
+@receiver(post_save, sender=ResponseItem)
+def invalidate_answer_statistics(sender, instance, **kwargs):
+    from survey_management.caching import bump_response_versions
+    survey_id = instance.response.survey_id
+    transaction.on_commit(lambda: bump_response_versions(survey_id))
+
+# Registered last so the handlers above compare against the values before this save
+@receiver(post_save, sender=UserProfile)
+def remember_saved_profile_values(sender, instance, **kwargs):
+    instance._loaded_values = loaded_values(instance, TRACKED_PROFILE_FIELDS)
@@ -0,0 +1,136 @@
+from itertools import count
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from survey_management.caching import tiered_cache
+from survey_management.models import (
+    Department, Survey, Question, QuestionOption, Response, ResponseItem,
+    SurveySchedule, AuditLog, ReminderPolicy, AssignmentJob, RequestProfile
+)
+
+QUESTION_TYPES = ('RATING', 'MULTIPLE_CHOICE', 'BOOLEAN', 'TEXT')
+
+# Tests write audit entries at once, inside each test's transaction, rather
+# than from a thread that outlives the test database
+SYNC_AUDIT_WRITER = dict(settings.SURVEY_AUDIT_WRITER, MODE='sync')
+
+
+def make_user(username, role, department=None):
+    user = User.objects.create_user(username, f'{username}@example.com', 'password')
+    user.profile.role = role
+    user.profile.department = department
+    user.profile.save()
+    return user
+
+
+@override_settings(SURVEY_THROTTLES={'BACKEND': 'local', 'RATES': {}}, SURVEY_BULK_ASSIGN_ASYNC=False,
+                   SURVEY_AUDIT_WRITER=SYNC_AUDIT_WRITER,
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SurveyTestCase(TestCase):
+    """
+    A department, a user of every role and a survey with a discharge schedule,
+    shared by the tests of the services and endpoints
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Cardiology')
+        cls.superuser = User.objects.create_superuser('root', 'root@example.com', 'password')
+        cls.admin = make_user('admin', 'ADMIN')
+        cls.staff = make_user('staff', 'STAFF', cls.department)
+        cls.patient = make_user('patient', 'PATIENT')
+
+        cls.survey = Survey.objects.create(title='Visit', description='', created_by=cls.admin)
+        cls.survey.departments.add(cls.department)
+        cls.schedule = SurveySchedule.objects.create(survey=cls.survey, trigger_event='DISCHARGE')
+
+    def setUp(self):
+        cache.clear()
+        tiered_cache.clear_local()
+        self.addCleanup(cache.clear)
+        self.addCleanup(tiered_cache.clear_local)
+        self.names = count()
+        self.patients = []
+
+    def grow(self, size):
+        """Add size rows of everything the endpoints read"""
+        # Run the cache bumps that wait for a commit, which TestCase never makes
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(size):
+                index = next(self.names)
+                department = Department.objects.create(name=f'Department {index}')
+                make_user(f'staff{index}', 'STAFF', department)
+                patient = make_user(f'patient{index}', 'PATIENT')
+                self.patients.append(patient)
+
+                survey = Survey.objects.create(title=f'Survey {index}', description='', created_by=self.admin)
+                survey.departments.add(self.department, department)
+                Question.objects.create(survey=survey, text='Rate us', question_type='RATING',
+                                        min_rating=1, max_rating=5)
+                SurveySchedule.objects.create(survey=survey, trigger_event='DISCHARGE')
+                ReminderPolicy.objects.create(survey=survey, offsets_hours=[24])
+                AssignmentJob.objects.create(survey=survey, requested_by=self.admin,
+                                             target={'user_ids': [patient.pk]})
+                AuditLog.objects.create(user=self.admin, action='READ', details=f'Entry {index}')
+                RequestProfile.objects.create(user=self.admin, method='GET', path='/api/surveys/',
+                                              route='survey-list', status_code=200, mode='STATISTICAL',
+                                              trigger='HEADER', duration_ms=12.5, query_count=1,
+                                              collapsed_stacks='main;handle 3',
+                                              queries=[{'sql': 'SELECT 1', 'ms': 0.1}])
+
+                # The main survey gains a question of every type in turn
+                question_type = QUESTION_TYPES[index % len(QUESTION_TYPES)]
+                question = Question.objects.create(survey=self.survey, text=f'Question {index}',
+                                                   question_type=question_type, is_required=True, order=index,
+                                                   min_rating=1 if question_type == 'RATING' else None,
+                                                   max_rating=5 if question_type == 'RATING' else None)
+                if question_type == 'MULTIPLE_CHOICE':
+                    for order in range(3):
+                        QuestionOption.objects.create(question=question, text=f'Option {order}', order=order)
+
+                # Drafts, completed item-row responses and packed responses
+                self.respond(self.survey, patient, complete=index % 3 != 0, packed=index % 3 == 2)
+                self.respond(survey, patient, complete=True, packed=index % 2 == 0)
+
+    def respond(self, survey, respondent, complete=True, packed=False):
+        response = Response.objects.create(survey=survey, respondent=respondent, is_complete=complete,
+                                           submitted_at=timezone.now() if complete else None)
+        items = []
+        for question in survey.questions.prefetch_related('options'):
+            item = ResponseItem(response=response, question=question)
+            if question.question_type in ('RATING', 'BOOLEAN'):
+                item.numeric_answer = 1
+            elif question.question_type == 'MULTIPLE_CHOICE':
+                item.selected_option = question.options.all()[0]
+            else:
+                item.text_answer = 'Fine'
+            items.append(item)
+        ResponseItem.objects.bulk_create(items)
+        if packed:
+            response.pack_answers(items)
+            response.save(update_fields=['packed_answers'])
+        return response
+
+    def answers(self):
+        """A submission answering every question of the main survey"""
+        answers = []
+        for question in self.survey.questions.prefetch_related('options'):
+            answer = {'question_id': str(question.id)}
+            if question.question_type in ('RATING', 'BOOLEAN'):
+                answer['numeric_answer'] = '1'
+            elif question.question_type == 'MULTIPLE_CHOICE':
+                answer['option_id'] = str(question.options.all()[0].id)
+            else:
+                answer['text_answer'] = 'Fine'
+            answers.append(answer)
+        return answers
+
+    def request(self, user, method, url, data=None, expected=200, **headers):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = getattr(client, method)(url, data, format='json', **headers)
+        self.assertEqual(response.status_code, expected, getattr(response, 'content', b'')[:500])
+        return response
@@ -0,0 +1,55 @@
+from survey_management.models import AssignmentJob, Department, Response
+from survey_management.services.assignment_service import AssignmentService
+from survey_management.tests.base import SurveyTestCase, make_user
+
+
+class AssignmentServiceTests(SurveyTestCase):
+    """
+    Surveys are assigned chunk by chunk to users without an open response
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.service = AssignmentService(chunk_size=2)
+
+    def test_explicit_users(self):
+        patients = [make_user(f'patient{index}', 'PATIENT') for index in range(3)]
+        Response.objects.create(survey=self.survey, respondent=patients[0])
+        processed = []
+
+        results = self.service.assign(self.survey, user_ids=[patient.pk for patient in patients] + [patients[1].pk, 0],
+                                      progress=lambda totals: processed.append(totals['processed']),
+                                      collect_details=True)
+        self.assertEqual({key: results[key] for key in ('processed', 'assigned', 'skipped', 'not_found')},
+                         {'processed': 4, 'assigned': 2, 'skipped': 1, 'not_found': 1})
+        # Repeated IDs count once, and progress is reported per chunk
+        self.assertEqual(processed, [2, 4])
+
+        details = results['details']
+        self.assertEqual([entry['username'] for entry in details['success']], ['patient1', 'patient2'])
+        self.assertEqual([entry['username'] for entry in details['skipped']], ['patient0'])
+        self.assertEqual(details['failed'], [{'user_id': 0, 'reason': 'User not found'}])
+        self.assertEqual(Response.objects.filter(survey=self.survey, is_complete=False).count(), 3)
+
+    def test_query_target(self):
+        make_user('nurse', 'STAFF', self.department)
+        make_user('oncologist', 'STAFF', Department.objects.create(name='Oncology'))
+        retired = make_user('retired', 'STAFF', self.department)
+        retired.is_active = False
+        retired.save()
+
+        results = self.service.assign(self.survey, department_id=self.department.pk, role='STAFF')
+        self.assertEqual((results['processed'], results['assigned']), (2, 2))
+        self.assertEqual(set(Response.objects.values_list('respondent__username', flat=True)), {'staff', 'nurse'})
+
+    def test_bulk_assign_job(self):
+        url = f'/api/surveys/{self.survey.id}/bulk_assign/'
+        job = self.request(self.superuser, 'post', url, {'department': self.department.pk}, expected=202).data
+        self.assertEqual((job['status'], job['assigned']), ('COMPLETED', 1))
+        self.assertEqual(self.request(self.admin, 'get', f"/api/assignment-jobs/{job['id']}/").data['processed'], 1)
+        self.request(self.superuser, 'post', url, {}, expected=400)
+
+        # Staff only follow the jobs they started
+        self.request(self.staff, 'get', f"/api/assignment-jobs/{job['id']}/", expected=404)
+        self.request(self.admin, 'post', url, {'department': self.department.pk}, expected=403)
+        self.assertEqual(AssignmentJob.objects.count(), 1)
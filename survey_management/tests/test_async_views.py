@@ -0,0 +1,105 @@
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from survey_management.models import Response
+from survey_management.tests.base import SurveyTestCase
+
+
+class AsyncViewTests(SurveyTestCase):
+    """
+    The async endpoints answer like their synchronous counterparts, without extra queries
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.grow(4)
+
+    def login(self, user):
+        """A logged-in synchronous and async test client"""
+        clients = (Client(), AsyncClient())
+        for client in clients:
+            client.force_login(user)
+        return clients
+
+    def send(self, client, method, url, data=None, **headers):
+        args = (url,) if data is None else (url, data, 'application/json')
+        if isinstance(client, AsyncClient):
+            async def request():
+                return await getattr(client, method)(*args, **headers)
+            return async_to_sync(request)()
+        return getattr(client, method)(*args, **headers)
+
+    def compare(self, user, sync_url, async_url, method='get', data=None):
+        """
+        Send both requests once to warm caches, then again measured
+
+        Returns:
+            The (status, body, query count) of the sync and the async request
+        """
+        results = []
+        for client, url in zip(self.login(user), (sync_url, async_url)):
+            self.send(client, method, url, data)
+            with CaptureQueriesContext(connection) as captured:
+                response = self.send(client, method, url, data)
+            results.append((response.status_code, response.json(), len(captured)))
+        return results
+
+    def assertSameAsSync(self, user, sync_url, async_url, method='get', data=None):
+        sync_result, async_result = self.compare(user, sync_url, async_url, method, data)
+        self.assertEqual(sync_result[:2], async_result[:2])
+        self.assertLessEqual(async_result[2], sync_result[2])
+
+    def test_completion_rates(self):
+        self.assertSameAsSync(self.staff, '/api/analytics/completion_rates/',
+                              '/api/async/analytics/completion_rates/')
+
+    def test_rating_averages(self):
+        self.assertSameAsSync(self.admin, '/api/analytics/rating_averages/',
+                              '/api/async/analytics/rating_averages/')
+
+    def test_response_trends(self):
+        self.assertSameAsSync(self.admin, '/api/analytics/response_trends/?days=7',
+                              '/api/async/analytics/response_trends/?days=7')
+
+    def test_multiple_choice_distribution(self):
+        self.assertSameAsSync(self.staff, f'/api/analytics/{self.survey.id}/multiple_choice_distribution/',
+                              f'/api/async/analytics/{self.survey.id}/multiple_choice_distribution/')
+
+    def test_survey_definition(self):
+        self.assertSameAsSync(self.patient, f'/api/surveys/{self.survey.id}/definition/',
+                              f'/api/async/surveys/{self.survey.id}/definition/')
+
+    def test_analytics_permission(self):
+        self.assertSameAsSync(self.patient, '/api/analytics/completion_rates/',
+                              '/api/async/analytics/completion_rates/')
+
+    def test_not_modified(self):
+        client = self.login(self.admin)[1]
+        response = self.send(client, 'get', '/api/async/analytics/completion_rates/')
+        self.assertEqual(response.status_code, 200)
+
+        # AsyncClient takes headers without the HTTP_ prefix
+        response = self.send(client, 'get', '/api/async/analytics/completion_rates/',
+                             IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_submit(self):
+        sync_result, async_result = self.compare(
+            self.patient, '/api/responses/submit/', '/api/async/responses/submit/', 'post',
+            {'survey_id': self.survey.id, 'answers': self.answers()}
+        )
+        self.assertEqual(async_result[0], 200)
+        self.assertLessEqual(async_result[2], sync_result[2])
+
+        submitted = Response.objects.get(pk=async_result[1]['response_id'])
+        self.assertTrue(submitted.is_complete)
+        self.assertIsNotNone(submitted.packed_answers)
+        self.assertEqual(submitted.items.count(), self.survey.questions.count())
+
+    def test_submit_validation(self):
+        answers = self.answers()[1:]
+        self.assertSameAsSync(self.patient, '/api/responses/submit/', '/api/async/responses/submit/', 'post',
+                              {'survey_id': self.survey.id, 'answers': answers})
+        self.assertSameAsSync(self.patient, '/api/responses/submit/', '/api/async/responses/submit/', 'post',
+                              {'survey_id': 0, 'answers': answers})
@@ -0,0 +1,86 @@
+import datetime
+import gzip
+import tempfile
+from unittest import mock
+from django.test import override_settings
+from rest_framework.test import APIClient
+from survey_management.models import AuditLog
+from survey_management.services.audit_archive import AuditArchive, search_audit_logs
+from survey_management.tests.base import SurveyTestCase
+
+
+def at(month, day):
+    return datetime.datetime(2025, month, day, 12, tzinfo=datetime.timezone.utc)
+
+
+class AuditArchiveTests(SurveyTestCase):
+    """
+    Whole monthly periods move to the archive, and searches merge them with hot rows newest first
+    """
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive = AuditArchive(directory.name)
+
+        for month, day, action in [(1, 5, 'READ'), (1, 20, 'EXPORT'), (2, 10, 'READ'),
+                                   (3, 1, 'UPDATE'), (3, 15, 'READ')]:
+            AuditLog.objects.create(user=self.admin, action=action, details=f'entry {month}/{day}',
+                                    timestamp=at(month, day))
+
+    def search(self, **filters):
+        return search_audit_logs(archive=self.archive, text='entry', **filters)
+
+    def details(self, rows):
+        return [row['details'] for row in rows]
+
+    def test_archives_whole_periods(self):
+        archived = self.archive.archive_before(at(3, 1))
+
+        self.assertEqual(archived, {202501: 2, 202502: 1})
+        self.assertEqual(sorted(AuditLog.objects.values_list('period', flat=True)), [202503, 202503])
+        self.assertEqual([segment['period'] for segment in self.archive.load_index()], [202501, 202502])
+
+    def test_search_merges_hot_and_archived(self):
+        before = self.search()
+        self.archive.archive_before(at(3, 1))
+        after = self.search()
+
+        self.assertEqual(self.details(after), ['entry 3/15', 'entry 3/1', 'entry 2/10', 'entry 1/20', 'entry 1/5'])
+        self.assertEqual(self.details(after), self.details(before))
+        self.assertEqual([row['archived'] for row in after], [False, False, True, True, True])
+
+        self.assertEqual(self.details(self.search(limit=3)), ['entry 3/15', 'entry 3/1', 'entry 2/10'])
+        self.assertEqual(self.details(self.search(action='READ', start=at(1, 6))), ['entry 3/15', 'entry 2/10'])
+
+    def test_index_prunes_segments(self):
+        self.archive.archive_before(at(3, 1))
+
+        with mock.patch('survey_management.services.audit_archive.gzip.open', wraps=gzip.open) as opened:
+            # A full page of hot rows rules out every older segment
+            self.assertEqual(len(self.search(limit=2)), 2)
+            self.assertEqual(opened.call_count, 0)
+
+            # Only the segment whose period and actions can match is read
+            self.assertEqual(self.details(self.search(action='EXPORT')), ['entry 1/20'])
+            self.assertEqual(opened.call_count, 1)
+            self.search(start=at(2, 1), end=at(2, 28))
+            self.assertEqual(opened.call_count, 2)
+
+    def test_empty_limit(self):
+        self.archive.archive_before(at(3, 1))
+        self.assertEqual(self.search(limit=0), [])
+        self.assertEqual(self.archive.search(limit=0), [])
+
+    def test_limit_validated(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with override_settings(SURVEY_AUDIT_ARCHIVE_DIR=self.archive.directory):
+            for limit in ('0', '-5', '1001', 'many'):
+                response = client.get('/api/audit-logs/search/', {'limit': limit})
+                self.assertEqual(response.status_code, 400, limit)
+
+            response = client.get('/api/audit-logs/search/', {'limit': '1', 'q': 'entry'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.details(response.data), ['entry 3/15'])
@@ -0,0 +1,137 @@
+import glob
+import json
+import os
+import tempfile
+from unittest import mock
+from django.db import DatabaseError
+from django.test import RequestFactory, TestCase, override_settings
+from survey_management.models import AuditLog
+from survey_management.services.audit_writer import AuditWriter, get_audit_writer, get_client_ip, log_audit
+from survey_management.tests.base import make_user
+
+
+class AuditWriterTests(TestCase):
+    """
+    Buffered entries are written in batches, kept while the database fails and bounded in memory
+    """
+
+    def setUp(self):
+        self.admin = make_user('admin', 'ADMIN')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.spill_path = os.path.join(directory.name, 'audit.jsonl')
+
+    def writer(self, **options):
+        options = dict({'mode': 'request', 'max_batch': 3}, **options)
+        return AuditWriter(**options)
+
+    def log(self, writer, count, start=0):
+        for number in range(start, start + count):
+            writer.log(self.admin, 'READ', f'entry {number}')
+
+    def written(self):
+        return sorted(AuditLog.objects.values_list('details', flat=True), key=lambda details: int(details.split()[1]))
+
+    def failing(self):
+        return mock.patch.object(AuditLog.objects, 'bulk_create', side_effect=DatabaseError('table is locked'))
+
+    def test_batches(self):
+        writer = self.writer()
+        self.log(writer, 7)
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        # One bulk insert per max_batch entries
+        with self.assertNumQueries(3):
+            self.assertEqual(writer.flush(), 7)
+        self.assertEqual(self.written(), [f'entry {number}' for number in range(7)])
+        self.assertEqual(writer.flush(), 0)
+
+    def test_settings_change_rebuilds_writer(self):
+        with override_settings(SURVEY_AUDIT_WRITER={'MODE': 'sync'}):
+            log_audit(self.admin, 'READ', 'entry 0')
+            self.assertEqual(self.written(), ['entry 0'])
+        with override_settings(SURVEY_AUDIT_WRITER={'MODE': 'request'}):
+            self.assertEqual(get_audit_writer().mode, 'request')
+
+    def test_client_ip_behind_trusted_proxies(self):
+        def client_ip(remote_addr, forwarded):
+            request = RequestFactory().get('/', REMOTE_ADDR=remote_addr, HTTP_X_FORWARDED_FOR=forwarded)
+            return get_client_ip(request)
+
+        # Without trusted proxies the header is the client's to forge
+        self.assertEqual(client_ip('203.0.113.7', '10.1.1.1'), '203.0.113.7')
+        with override_settings(SURVEY_TRUSTED_PROXIES=['10.0.0.0/8']):
+            self.assertEqual(client_ip('203.0.113.7', '10.1.1.1'), '203.0.113.7')
+            # A forged first hop is skipped; the address the proxies saw is kept
+            self.assertEqual(client_ip('10.0.0.2', '198.51.100.1, 203.0.113.7, 10.0.0.1'), '203.0.113.7')
+            self.assertEqual(client_ip('10.0.0.2', ''), '10.0.0.2')
+            self.assertIsNone(client_ip('10.0.0.2', 'unknown'))
+
+    def test_thread_mode_wakes_when_full(self):
+        writer = self.writer(mode='thread')
+        with mock.patch.object(writer, '_ensure_thread'), mock.patch.object(writer._wake, 'set') as wake:
+            self.log(writer, 2)
+            wake.assert_not_called()
+            self.log(writer, 1, start=2)
+            wake.assert_called_once_with()
+
+    def test_failed_flush_keeps_entries(self):
+        writer = self.writer()
+        self.log(writer, 4)
+        with self.failing():
+            self.assertEqual(writer.flush(), 0)
+
+        self.log(writer, 1, start=4)
+        self.assertEqual(writer.flush(), 5)
+        self.assertEqual(self.written(), [f'entry {number}' for number in range(5)])
+
+    def test_full_buffer_drops_oldest(self):
+        writer = self.writer(max_buffer=4)
+        self.log(writer, 3)
+        with self.failing():
+            writer.flush()
+        self.log(writer, 3, start=3)
+
+        self.assertEqual(writer.dropped, 2)
+        self.assertIn('survey_audit_entries_dropped_total 2', writer.render_metrics())
+        self.assertIn('survey_audit_buffered_entries 4', writer.render_metrics())
+        writer.flush()
+        self.assertEqual(self.written(), [f'entry {number}' for number in range(2, 6)])
+
+    def test_full_buffer_sheds_to_spill(self):
+        writer = self.writer(max_buffer=4, spill_path=self.spill_path)
+        self.log(writer, 3)
+        with self.failing():
+            writer.flush()
+            self.log(writer, 3, start=3)
+            # Still failing: the shed files stay on disk for the next attempt
+            with self.assertRaises(DatabaseError):
+                writer.flush()
+
+        self.assertEqual(writer.dropped, 0)
+        self.assertEqual(writer.shed, 5)
+        self.assertIn('survey_audit_buffered_entries 1', writer.render_metrics())
+        self.log(writer, 1, start=6)
+
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(self.written(), [f'entry {number}' for number in range(7)])
+        self.assertEqual(glob.glob(f'{self.spill_path}.*'), [])
+
+    def test_replays_spill_of_exited_process(self):
+        # A worker that crashed before flushing; no live process has this pid
+        crashed = f'{self.spill_path}.999999999-deadbeef.active'
+        with open(crashed, 'w', encoding='utf-8') as spill:
+            for number in range(2):
+                spill.write(json.dumps({
+                    'user_id': self.admin.pk, 'action': 'READ', 'details': f'entry {number}',
+                    'ip_address': None, 'timestamp': '2025-03-01T12:00:00+00:00',
+                }) + '\n')
+            spill.write('{"user_id": ')
+
+        writer = self.writer(spill_path=self.spill_path)
+        self.log(writer, 1, start=2)
+        self.assertEqual(writer.flush(), 1)
+
+        self.assertEqual(self.written(), ['entry 0', 'entry 1', 'entry 2'])
+        self.assertEqual(AuditLog.objects.get(details='entry 0').period, 202503)
+        self.assertEqual(glob.glob(f'{self.spill_path}.*'), [])
@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+from survey_management.models import Department, Survey
+from survey_management.models.user import ROLE_PERMISSIONS
+from survey_management.permissions.context import get_auth_context
+from survey_management.tests.base import SurveyTestCase, make_user
+
+
+class AuthorizationContextCacheTests(SurveyTestCase):
+    """
+    Contexts are built once per request and cached across requests until the profile or survey departments change
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.oncology = Department.objects.create(name='Oncology')
+        cls.cancer = Survey.objects.create(title='Cancer', description='', created_by=cls.admin)
+        cls.cancer.departments.add(cls.oncology)
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def context(self, user=None):
+        request = self.factory.get('/api/surveys/')
+        request.user = user or self.staff
+        return get_auth_context(request)
+
+    def test_memoised_per_request(self):
+        request = self.factory.get('/api/surveys/')
+        request.user = self.staff
+        context = get_auth_context(request)
+        with self.assertNumQueries(0):
+            self.assertIs(get_auth_context(request), context)
+
+        # A request whose user changed, e.g. after login, gets that user's context
+        request.user = make_user('doctor', 'STAFF', self.oncology)
+        self.assertEqual(get_auth_context(request).survey_ids, {self.cancer.pk})
+
+    def test_cached_across_requests(self):
+        context = self.context()
+        self.assertEqual((context.role, context.survey_ids), ('STAFF', {self.survey.pk}))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.context().survey_ids, {self.survey.pk})
+
+    def test_profile_change_invalidates_user(self):
+        doctor = make_user('doctor', 'STAFF', self.oncology)
+        self.context()
+        self.context(doctor)
+
+        profile = User.objects.get(pk=self.staff.pk).profile
+        profile.department = self.oncology
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertEqual(self.context().survey_ids, {self.cancer.pk})
+
+        # Other users keep their cached context
+        with self.assertNumQueries(0):
+            self.assertEqual(self.context(doctor).survey_ids, {self.cancer.pk})
+
+    def test_survey_departments_invalidate_all(self):
+        self.context()
+        self.cancer.departments.add(self.department)
+        self.assertEqual(self.context().survey_ids, {self.survey.pk, self.cancer.pk})
+
+        self.department.delete()
+        self.assertEqual(self.context().survey_ids, frozenset())
+
+    def test_superuser_permissions(self):
+        context = self.context(self.superuser)
+        self.assertEqual(context.permissions, frozenset().union(*ROLE_PERMISSIONS.values()))
+        self.assertTrue(context.can_view_survey(self.cancer.pk))
@@ -0,0 +1,94 @@
+from django.contrib.auth.models import User, update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+from survey_management.authentication import APIKeyAuthentication, api_key_cache, revocation_key
+from survey_management.models.user import hash_api_key
+from survey_management.tests.base import make_user
+
+
+class APIKeyAuthenticationTests(TestCase):
+    """
+    Verified keys are served from memory and evicted only by changes to their own profile
+    """
+
+    def setUp(self):
+        cache.clear()
+        api_key_cache.clear()
+        self.addCleanup(api_key_cache.clear)
+        self.integrator = make_user('integrator', 'INTEGRATOR')
+        self.key = self.issue_key()
+
+    def issue_key(self):
+        profile = User.objects.get(pk=self.integrator.pk).profile
+        key = profile.set_api_key()
+        profile.save(update_fields=['api_key_prefix', 'api_key_hash'])
+        return key
+
+    def authenticate(self, key=None):
+        request = APIRequestFactory().get('/api/events/', HTTP_AUTHORIZATION=f'Api-Key {key or self.key}')
+        return APIKeyAuthentication().authenticate(request)
+
+    def test_cached_principal(self):
+        user, prefix = self.authenticate()
+        self.assertEqual(user, self.integrator)
+        self.assertEqual(prefix, self.key[:8])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate()[0], self.integrator)
+
+    def test_unrelated_saves_keep_cache(self):
+        self.authenticate()
+        generation = cache.get(revocation_key(hash_api_key(self.key)), 0)
+
+        # Each login saves the user and, through save_user_profile, their profile
+        patient = make_user('patient', 'PATIENT')
+        update_last_login(None, patient)
+        update_last_login(None, User.objects.get(pk=self.integrator.pk))
+        self.integrator.profile.phone_number = '555-0100'
+        self.integrator.profile.save()
+
+        self.assertEqual(cache.get(revocation_key(hash_api_key(self.key)), 0), generation)
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+    def test_rotation_revokes_old_key(self):
+        self.authenticate()
+        new_key = self.issue_key()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+        self.assertEqual(self.authenticate(new_key)[0], self.integrator)
+
+    def test_role_change_revokes(self):
+        self.authenticate()
+        profile = User.objects.get(pk=self.integrator.pk).profile
+        profile.role = 'STAFF'
+        profile.save()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivation_revokes(self):
+        self.authenticate()
+        user = User.objects.get(pk=self.integrator.pk)
+        user.is_active = False
+        user.save()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_revocation_from_other_process(self):
+        self.authenticate()
+        # Another process revoking the key moves its generation in the shared cache
+        cache.set(revocation_key(hash_api_key(self.key)), 7, None)
+
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+    def test_invalid_key(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(f'{self.key[:8]}.forged')
@@ -0,0 +1,168 @@
+from unittest import mock
+from django.contrib.auth.models import User, update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+from survey_management.caching import (
+    TieredCache, get_department_list, get_profile_values, get_survey_definition, tiered_cache
+)
+from survey_management.models import Department, Question
+from survey_management.tests.base import SurveyTestCase, make_user
+
+
+class TieredCacheTests(TestCase):
+    """
+    Values live in a bounded local LRU in front of the shared cache, under versions that bumps move
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.computed = []
+
+    def compute(self, value):
+        def compute():
+            self.computed.append(value)
+            return value
+        return compute
+
+    def test_local_lru(self):
+        tiered = TieredCache(local_max_size=2)
+        tiered.get_or_set('item', 1, self.compute('one'))
+        tiered.get_or_set('item', 2, self.compute('two'))
+        tiered.get_or_set('item', 1, self.compute('one'))
+        tiered.get_or_set('item', 3, self.compute('three'))
+
+        self.assertEqual(len(tiered._local), 2)
+        # 2 was least recently used; it comes back from the shared cache, not recomputed
+        with mock.patch.object(tiered.shared, 'get', wraps=tiered.shared.get) as shared_get:
+            self.assertEqual(tiered.get_or_set('item', 1, self.compute('one')), 'one')
+            shared_get.assert_not_called()
+            self.assertEqual(tiered.get_or_set('item', 2, self.compute('two')), 'two')
+            self.assertTrue(shared_get.called)
+        self.assertEqual(self.computed, ['one', 'two', 'three'])
+
+    def test_local_ttl(self):
+        tiered = TieredCache(local_ttl=10, version_ttl=60)
+        with mock.patch('survey_management.caching.time.monotonic', return_value=100.0) as clock, \
+                mock.patch.object(tiered.shared, 'get', wraps=tiered.shared.get) as shared_get:
+            tiered.get_or_set('item', 1, self.compute('one'))
+            clock.return_value = 109.0
+            shared_get.reset_mock()
+            tiered.get_or_set('item', 1, self.compute('one'))
+            shared_get.assert_not_called()
+
+            # Expired locally: read back from the shared cache
+            clock.return_value = 111.0
+            self.assertEqual(tiered.get_or_set('item', 1, self.compute('one')), 'one')
+            self.assertTrue(shared_get.called)
+        self.assertEqual(self.computed, ['one'])
+
+    def test_bump_invalidates_key(self):
+        tiered = TieredCache()
+        tiered.get_or_set('item', 1, self.compute('old'))
+        tiered.get_or_set('item', 2, self.compute('other'))
+        version = tiered.version('item', 1)
+
+        tiered.bump('item', 1)
+        self.assertGreater(tiered.version('item', 1), version)
+        self.assertEqual(tiered.get_or_set('item', 1, self.compute('new')), 'new')
+        self.assertEqual(tiered.get_or_set('item', 2, self.compute('changed')), 'other')
+
+    def test_bump_reaches_other_processes(self):
+        here, there = TieredCache(version_ttl=60), TieredCache(version_ttl=60)
+        here.get_or_set('item', 1, self.compute('old'))
+        there.get_or_set('item', 1, self.compute('old'))
+
+        here.bump('item', 1)
+        # The other process trusts its copy of the version until VERSION_TTL, unless strict
+        self.assertEqual(there.get_or_set('item', 1, self.compute('new')), 'old')
+        self.assertEqual(there.get_or_set('item', 1, self.compute('new'), strict=True), 'new')
+
+    def test_bumps_in_same_millisecond(self):
+        tiered = TieredCache()
+        with mock.patch('survey_management.caching.time.time', return_value=1000.0):
+            tiered.bump('item', 1)
+            first = tiered.version('item', 1)
+            tiered.bump('item', 1)
+        self.assertGreater(tiered.version('item', 1), first)
+
+
+class CacheInvalidationTests(SurveyTestCase):
+    """
+    Saves invalidate cached values once they commit, and profile saves only when the cached fields change
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = Department.objects.create(name='Oncology', description='Cancer')
+
+    def versions(self):
+        return tiered_cache.version('departments', 'all', strict=True), tiered_cache.version(
+            'profile', self.staff.pk, strict=True)
+
+    def staff_counts(self):
+        return {department['name']: department['staff_count'] for department in get_department_list()}
+
+    def test_login_keeps_caches(self):
+        versions = self.versions()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            update_last_login(None, User.objects.get(pk=self.staff.pk))
+            self.staff.profile.save()
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.versions(), versions)
+
+    def test_department_change(self):
+        self.assertEqual(self.staff_counts(), {'Cardiology': 1, 'Oncology': 0})
+        self.assertEqual(get_profile_values(self.staff.pk)['department_id'], self.department.pk)
+
+        profile = User.objects.get(pk=self.staff.pk).profile
+        profile.department = self.other
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+
+        self.assertEqual(self.staff_counts(), {'Cardiology': 0, 'Oncology': 1})
+        self.assertEqual(get_profile_values(self.staff.pk)['department_id'], self.other.pk)
+
+    def test_contact_change(self):
+        departments, profile_version = self.versions()
+        profile = User.objects.get(pk=self.staff.pk).profile
+        profile.phone_number = '555-0100'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+
+        self.assertEqual(self.versions()[0], departments)
+        self.assertGreater(self.versions()[1], profile_version)
+        self.assertEqual(get_profile_values(self.staff.pk)['phone_number'], '555-0100')
+
+    def test_new_staff_counted(self):
+        self.assertEqual(self.staff_counts()['Oncology'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_user('oncologist', 'STAFF', department=self.other)
+        self.assertEqual(self.staff_counts()['Oncology'], 1)
+
+    def test_repeated_saves_compare_last_save(self):
+        profile = User.objects.get(pk=self.staff.pk).profile
+        profile.department = self.other
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        versions = self.versions()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertEqual(self.versions(), versions)
+
+    def test_bumps_wait_for_commit(self):
+        definition = get_survey_definition(self.survey.pk)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.survey.title = 'Follow-up'
+            self.survey.save()
+            Question.objects.create(survey=self.survey, text='How?', question_type='TEXT')
+        # Until the transaction commits, readers keep the committed definition
+        self.assertEqual(get_survey_definition(self.survey.pk), definition)
+
+        for callback in callbacks:
+            callback()
+        definition = get_survey_definition(self.survey.pk)
+        self.assertEqual((definition['title'], len(definition['questions'])), ('Follow-up', 1))
@@ -0,0 +1,39 @@
+from survey_management.tests.base import SurveyTestCase
+
+
+class ConditionalRequestTests(SurveyTestCase):
+    """
+    Cached responses are revalidated with 304s until a committed change moves their ETag
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.grow(2)
+        self.url = f'/api/surveys/{self.survey.id}/definition/'
+
+    def test_if_none_match(self):
+        etag = self.request(self.patient, 'get', self.url)['ETag']
+        response = self.request(self.patient, 'get', self.url, expected=304, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response['ETag'], etag)
+
+        # Users of another scope never share an ETag
+        self.request(self.staff, 'get', self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.request(self.patient, 'get', self.url)['Last-Modified']
+        self.request(self.patient, 'get', self.url, expected=304, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.request(self.patient, 'get', self.url, HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT')
+
+    def test_etag_changes_once_committed(self):
+        etag = self.request(self.patient, 'get', self.url)['ETag']
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.request(self.admin, 'patch', f'/api/surveys/{self.survey.id}/', {'title': 'Follow-up'})
+        # Until the edit commits, clients keep the definition they have
+        self.request(self.patient, 'get', self.url, expected=304, HTTP_IF_NONE_MATCH=etag)
+
+        for callback in callbacks:
+            callback()
+        response = self.request(self.patient, 'get', self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['title'], 'Follow-up')
@@ -0,0 +1,136 @@
+import asyncio
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from survey_management.checks import check_sticky_primary_cache
+from survey_management.db_router import (
+    STICKY_COOKIE, ReadReplicaRouter, activate, deactivate, mark_recent_write, replica_reads, wrote_recently
+)
+from survey_management.middleware.replica import StickyPrimaryMiddleware
+from survey_management.models import Survey
+
+
+class ReadReplicaRouterTests(SimpleTestCase):
+    """
+    Reads reach the replica only where code opted in, outside transactions and without a preference for the primary
+    """
+
+    def setUp(self):
+        alias = mock.patch('survey_management.db_router.get_read_alias', return_value='replica')
+        alias.start()
+        self.addCleanup(alias.stop)
+        self.router = ReadReplicaRouter()
+
+    def read(self):
+        return self.router.db_for_read(Survey)
+
+    def test_writes_use_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(Survey), DEFAULT_DB_ALIAS)
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'survey_management'))
+        self.assertFalse(self.router.allow_migrate('replica', 'survey_management'))
+
+    def test_reads_opt_in(self):
+        self.assertIsNone(self.read())
+        with replica_reads():
+            self.assertEqual(self.read(), 'replica')
+        self.assertIsNone(self.read())
+
+    def test_decorator(self):
+        @replica_reads()
+        def sync_read():
+            return self.read()
+
+        @replica_reads()
+        async def async_read():
+            return self.read()
+
+        self.assertEqual(sync_read(), 'replica')
+        self.assertEqual(asyncio.run(async_read()), 'replica')
+        self.assertIsNone(self.read())
+
+    def test_primary_preference_kept(self):
+        token = activate('primary')
+        try:
+            with replica_reads():
+                self.assertIsNone(self.read())
+        finally:
+            deactivate(token)
+
+    def test_transactions_read_primary(self):
+        with replica_reads(), mock.patch.object(connections[DEFAULT_DB_ALIAS], 'in_atomic_block', True):
+            self.assertIsNone(self.read())
+
+    def test_no_replica_configured(self):
+        with mock.patch('survey_management.db_router.get_read_alias', return_value=None), replica_reads():
+            self.assertIsNone(self.read())
+
+
+@override_settings(SURVEY_DB_STICKY_SECONDS=5)
+class StickyPrimaryTests(SimpleTestCase):
+    """
+    Users who just wrote stay on the primary for the sticky window, through the cache or their cookie
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+
+    def request_with(self, response):
+        request = self.factory.get('/api/surveys/')
+        request.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+        return request
+
+    def test_cache_mark_expires(self):
+        mark_recent_write(7)
+        self.assertTrue(wrote_recently(7))
+        self.assertFalse(wrote_recently(8))
+
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=10 ** 10):
+            self.assertFalse(wrote_recently(7))
+
+    def test_cookie_reaches_other_processes(self):
+        response = HttpResponse()
+        mark_recent_write(7, response)
+        self.assertEqual(response.cookies[STICKY_COOKIE]['max-age'], 5)
+        request = self.request_with(response)
+
+        # Another process, whose cache never saw the write
+        cache.clear()
+        self.assertTrue(wrote_recently(7, request))
+        self.assertFalse(wrote_recently(8, request))
+
+        with mock.patch('django.core.signing.time.time', return_value=10 ** 10):
+            self.assertFalse(wrote_recently(7, request))
+
+    def test_forged_cookie_ignored(self):
+        request = self.factory.get('/api/surveys/')
+        request.COOKIES[STICKY_COOKIE] = '7'
+        self.assertFalse(wrote_recently(7, request))
+
+    def test_middleware_marks_successful_writes(self):
+        middleware = StickyPrimaryMiddleware(lambda request: HttpResponse())
+        user = mock.Mock(pk=7, is_authenticated=True)
+
+        for method, status, marked in [('get', 200, False), ('post', 400, False), ('post', 201, True)]:
+            request = getattr(self.factory, method)('/api/surveys/')
+            request.user = user
+            response = middleware.process_response(request, HttpResponse(status=status))
+            self.assertEqual(STICKY_COOKIE in response.cookies, marked, (method, status))
+
+        request = self.factory.post('/api/surveys/')
+        request.user = AnonymousUser()
+        self.assertNotIn(STICKY_COOKIE, middleware.process_response(request, HttpResponse()).cookies)
+
+    def test_shared_cache_check(self):
+        with mock.patch('survey_management.checks.get_read_alias', return_value='replica'):
+            self.assertEqual([warning.id for warning in check_sticky_primary_cache(None)],
+                             ['survey_management.W001'])
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                       'LOCATION': 'redis://cache:6379/0'}}):
+                self.assertEqual(check_sticky_primary_cache(None), [])
+        self.assertEqual(check_sticky_primary_cache(None), [])
@@ -0,0 +1,124 @@
+from unittest import mock
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from survey_management.models import Question, Response, ResponseItem
+from survey_management.services.assignment_service import AssignmentService
+from survey_management.services.reminder_service import ReminderService
+from survey_management.services.response_submission import open_response
+from survey_management.tests.base import SurveyTestCase, make_user
+
+
+class DraftTests(SurveyTestCase):
+    """
+    Drafts are unique per respondent and survey, autosave only changed answers and finalize once complete
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.grow(4)
+        self.respondent = make_user('respondent', 'PATIENT')
+
+    def open_draft(self, expected=201):
+        return self.request(self.respondent, 'post', '/api/responses/draft/',
+                            {'survey_id': self.survey.id}, expected=expected).data
+
+    def save(self, answers, expected=200):
+        return self.request(self.respondent, 'patch', f'/api/responses/{self.draft_id}/answers/',
+                            {'answers': answers}, expected=expected).data
+
+    def item_writes(self, captured):
+        return [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith(('INSERT INTO "survey_management_responseitem"',
+                                        'UPDATE "survey_management_responseitem"'))
+        ]
+
+    def test_draft_resumed(self):
+        self.draft_id = self.open_draft()['id']
+        self.save(self.answers()[:1])
+
+        resumed = self.open_draft(expected=200)
+        self.assertEqual(resumed['id'], self.draft_id)
+        self.assertEqual(len(resumed['items']), 1)
+
+    def test_one_open_response(self):
+        open_response(self.survey.id, self.respondent)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Response.objects.create(survey=self.survey, respondent=self.respondent)
+
+        # A submission completes the open response instead of adding one
+        self.request(self.respondent, 'post', '/api/responses/submit/',
+                     {'survey_id': self.survey.id, 'answers': self.answers()})
+        self.assertEqual(Response.objects.filter(survey=self.survey, respondent=self.respondent).count(), 1)
+
+    def test_only_changed_answers_written(self):
+        self.draft_id = self.open_draft()['id']
+        answers = self.answers()
+        self.assertEqual(self.save(answers)['saved'], len(answers))
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.save(answers)['saved'], 0)
+        self.assertEqual(self.item_writes(captured), [])
+
+        rating = next(answer for answer in answers if 'numeric_answer' in answer)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.save([dict(rating, numeric_answer='4')])['saved'], 1)
+        self.assertEqual(len(self.item_writes(captured)), 1)
+        self.assertEqual(ResponseItem.objects.get(response_id=self.draft_id,
+                                                  question_id=rating['question_id']).numeric_answer, 4)
+
+    def test_invalid_answers(self):
+        self.draft_id = self.open_draft()['id']
+        other_question = Question.objects.exclude(survey=self.survey).first()
+        self.save([{'question_id': str(other_question.id), 'numeric_answer': '1'}], expected=400)
+
+        choice = next(answer for answer in self.answers() if 'option_id' in answer)
+        self.save([dict(choice, option_id='0')], expected=400)
+
+    def test_finalize(self):
+        self.draft_id = self.open_draft()['id']
+        self.save(self.answers()[1:])
+        self.request(self.respondent, 'post', f'/api/responses/{self.draft_id}/finalize/', expected=400)
+
+        self.save(self.answers()[:1])
+        saved_at = dict(ResponseItem.objects.filter(response_id=self.draft_id).values_list('id', 'updated_at'))
+        self.request(self.respondent, 'post', f'/api/responses/{self.draft_id}/finalize/')
+
+        draft = Response.objects.get(pk=self.draft_id)
+        self.assertTrue(draft.is_complete)
+        self.assertEqual(len(draft.packed_answers), len(self.answers()))
+        self.assertEqual(
+            dict(ResponseItem.objects.filter(response_id=self.draft_id).values_list('id', 'updated_at')), saved_at
+        )
+
+        # A submitted response is no longer a draft
+        self.save(self.answers(), expected=400)
+
+    def test_only_respondent_changes_draft(self):
+        self.draft_id = self.open_draft()['id']
+        self.request(self.patient, 'patch', f'/api/responses/{self.draft_id}/answers/',
+                     {'answers': self.answers()}, expected=404)
+        self.request(self.staff, 'patch', f'/api/responses/{self.draft_id}/answers/',
+                     {'answers': self.answers()}, expected=403)
+        self.request(self.admin, 'post', f'/api/responses/{self.draft_id}/finalize/', expected=403)
+
+    def test_bulk_assign_skips_draft_opened_meanwhile(self):
+        newcomer = make_user('newcomer', 'PATIENT')
+        apply_policy = ReminderService.apply_policy
+
+        def open_draft_first(reminders, responses, policy):
+            # The respondent opens a draft after the check for open responses
+            open_response(self.survey.id, self.respondent)
+            apply_policy(reminders, responses, policy)
+
+        with mock.patch.object(ReminderService, 'apply_policy', open_draft_first):
+            results = AssignmentService().assign(
+                self.survey, user_ids=[self.respondent.id, newcomer.id], collect_details=True
+            )
+
+        self.assertEqual((results['assigned'], results['skipped']), (1, 1))
+        [assigned] = results['details']['success']
+        self.assertEqual(assigned['user_id'], newcomer.id)
+        self.assertEqual(Response.objects.get(pk=assigned['response_id']).respondent, newcomer)
+        self.assertEqual([skipped['user_id'] for skipped in results['details']['skipped']], [self.respondent.id])
+        self.assertEqual(Response.objects.filter(survey=self.survey, respondent=self.respondent).count(), 1)
@@ -0,0 +1,118 @@
+from django.test import SimpleTestCase
+from survey_management.models import ScheduledDelivery, SurveySchedule
+from survey_management.services.event_service import EventIngestionService, ScheduleIndex, compile_event_filter
+from survey_management.tests.base import SurveyTestCase, make_user
+
+
+class EventFilterTests(SimpleTestCase):
+    """
+    Schedule event filters compile to predicates over the event data
+    """
+
+    def test_empty_matches_everything(self):
+        for event_filter in (None, {}):
+            self.assertTrue(compile_event_filter(event_filter)({'ward': 'any'}))
+
+    def test_literals_and_lists(self):
+        matches = compile_event_filter({'ward': 'ICU', 'age_group': ['adult', 'senior']})
+        self.assertTrue(matches({'ward': 'ICU', 'age_group': 'adult'}))
+        self.assertFalse(matches({'ward': 'ICU', 'age_group': 'child'}))
+        self.assertFalse(matches({'age_group': 'adult'}))
+
+    def test_operators(self):
+        matches = compile_event_filter({'age': {'gte': 18, 'lt': 65}, 'code': {'nin': ['X1']}})
+        self.assertTrue(matches({'age': 40, 'code': 'A1'}))
+        self.assertTrue(matches({'age': 18}))
+        self.assertFalse(matches({'age': 65, 'code': 'A1'}))
+        self.assertFalse(matches({'age': 40, 'code': 'X1'}))
+        # Missing, null and incomparable values never satisfy a comparison
+        for age in (None, 'forty', [40]):
+            self.assertFalse(matches({'age': age}))
+        self.assertFalse(matches({}))
+
+    def test_nested_paths(self):
+        matches = compile_event_filter({'visit.department': 'Cardiology', 'visit.tags': {'contains': 'follow-up'},
+                                        'visit.notes': {'exists': False}})
+        self.assertTrue(matches({'visit': {'department': 'Cardiology', 'tags': ['follow-up']}}))
+        self.assertFalse(matches({'visit': {'department': 'Cardiology', 'tags': []}}))
+        self.assertFalse(matches({'visit': {'department': 'Cardiology', 'tags': ['follow-up'], 'notes': ''}}))
+        self.assertFalse(matches({'visit': 'Cardiology'}))
+
+    def test_invalid_filters(self):
+        for event_filter in (['ward'], {'age': {'between': [1, 2]}}, {'ward': {'in': 'ICU'}}):
+            with self.assertRaises(ValueError):
+                compile_event_filter(event_filter)
+
+
+class EventIngestionTests(SurveyTestCase):
+    """
+    Events are matched against active schedules once each, and replays schedule nothing
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.index = ScheduleIndex()
+        self.service = EventIngestionService(index=self.index)
+        self.icu = SurveySchedule.objects.create(survey=self.survey, trigger_event='DISCHARGE', delay_hours=24,
+                                                 event_filter={'ward': 'ICU'})
+        # Matches every discharge
+        self.any_discharge = self.schedule
+        self.patient.profile.medical_record_number = 'MRN-1'
+        self.patient.profile.save()
+
+    def discharge(self, event_id='e1', ward='ICU', **event):
+        return dict({'event_type': 'DISCHARGE', 'user_id': self.patient.id, 'event_id': event_id,
+                     'occurred_at': '2025-03-01T12:00:00Z', 'data': {'ward': ward}}, **event)
+
+    def test_matching(self):
+        results = self.service.ingest([self.discharge(), self.discharge('e2', ward='Maternity')])
+        self.assertEqual((results['accepted'], results['matched'], results['scheduled']), (2, 2, 3))
+
+        icu = ScheduledDelivery.objects.get(schedule=self.icu)
+        self.assertEqual((icu.event_id, icu.deliver_at.isoformat()), ('e1', '2025-03-02T12:00:00+00:00'))
+        self.assertEqual(ScheduledDelivery.objects.filter(schedule=self.any_discharge).count(), 2)
+
+    def test_invalid_events(self):
+        other = make_user('other', 'PATIENT')
+        results = self.service.ingest([
+            self.discharge(user_id=None, medical_record_number='MRN-1'),
+            self.discharge('e2', user_id=other.id + 1000),
+            self.discharge('e3', event_type='ADMISSION'),
+            self.discharge('e4', occurred_at='yesterday'),
+            'not an event',
+        ])
+        self.assertEqual(results['accepted'], 1)
+        self.assertEqual(sorted(error['index'] for error in results['errors']), [1, 2, 3, 4])
+        self.assertEqual(ScheduledDelivery.objects.get(schedule=self.icu).user, self.patient)
+
+    def test_replays_not_counted(self):
+        self.service.ingest([self.discharge()])
+        results = self.service.ingest([self.discharge(), self.discharge('e2'), self.discharge('e2')])
+
+        # e1 was delivered already, and the second e2 repeats the first
+        self.assertEqual((results['matched'], results['scheduled']), (3, 2))
+        self.assertEqual(ScheduledDelivery.objects.count(), 4)
+
+        # Events without an event_id cannot be told apart and are always scheduled
+        self.assertEqual(self.service.ingest([self.discharge(None), self.discharge(None)])['scheduled'], 4)
+
+    def test_queryset_update_refreshes_index(self):
+        self.service.ingest([self.discharge()])
+        # Queryset updates send no signals but set updated_at, as save() does
+        SurveySchedule.objects.filter(pk=self.icu.pk).update(is_active=False)
+
+        results = self.service.ingest([self.discharge('e2')])
+        self.assertEqual(results['scheduled'], 1)
+        self.assertFalse(ScheduledDelivery.objects.filter(schedule=self.icu, event_id='e2').exists())
+
+    def test_changes_reach_other_processes(self):
+        other_process = EventIngestionService(index=ScheduleIndex())
+        other_process.ingest([self.discharge()])
+
+        # With updated_at kept, the count/max(updated_at) stamp is unchanged; only the version moves
+        with self.captureOnCommitCallbacks(execute=True):
+            SurveySchedule.objects.filter(pk=self.icu.pk).update(event_filter={'ward': 'Maternity'},
+                                                                 updated_at=self.icu.updated_at)
+
+        results = other_process.ingest([self.discharge('e2', ward='Maternity')])
+        self.assertEqual(results['scheduled'], 2)
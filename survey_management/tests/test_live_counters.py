@@ -0,0 +1,114 @@
+import asyncio
+import json
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from survey_management.live import LiveCounterHub, astream_events, get_live_config, live_counters
+from survey_management.models import Survey
+from survey_management.services.analytics_service import survey_counters
+from survey_management.tests.base import SurveyTestCase
+
+
+def parse_event(part):
+    """Data of a counters event, or None for the retry field and heartbeats"""
+    if isinstance(part, bytes):
+        part = part.decode('utf-8')
+    if not part.startswith('event: counters'):
+        return None
+    return json.loads(part.split('data: ', 1)[1])
+
+
+@override_settings(SURVEY_LIVE_COUNTERS={'HEARTBEAT_SECONDS': 0.05})
+class LiveCounterTests(SurveyTestCase):
+    """
+    Dashboards receive the counters of their visible surveys, updated by submissions without queries
+    """
+
+    def setUp(self):
+        super().setUp()
+        live_counters.clear()
+        self.addCleanup(live_counters.clear)
+        self.grow(2)
+        self.other = Survey.objects.create(title='Elsewhere', description='', created_by=self.admin)
+
+    def open_stream(self, user, url='/api/analytics/live/'):
+        response = self.request(user, 'get', url)
+        self.addCleanup(response.close)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return iter(response.streaming_content)
+
+    def next_counters(self, stream):
+        for part in stream:
+            data = parse_event(part)
+            if data is not None:
+                return data
+
+    def test_stream_scoped_to_departments(self):
+        stream = self.open_stream(self.staff)
+        visible = set(Survey.objects.filter(departments=self.department).values_list('id', flat=True))
+
+        received = {self.next_counters(stream)['survey_id'] for _ in visible}
+        self.assertEqual(received, visible)
+        self.assertNotIn(self.other.id, received)
+
+        # The surveys parameter narrows the stream further
+        stream = self.open_stream(self.admin, f'/api/analytics/live/?surveys={self.other.id}')
+        self.assertEqual(self.next_counters(stream)['survey_id'], self.other.id)
+
+    def test_submission_updates_counters(self):
+        stream = self.open_stream(self.staff, f'/api/analytics/live/?surveys={self.survey.id}')
+        before = self.next_counters(stream)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.request(self.patient, 'post', '/api/responses/submit/',
+                         {'survey_id': self.survey.id, 'answers': self.answers()})
+
+        with CaptureQueriesContext(connection) as captured:
+            after = self.next_counters(stream)
+        self.assertEqual(len(captured), 0)
+        self.assertEqual(after['total_responses'], before['total_responses'] + 1)
+        self.assertEqual(after['completed_responses'], before['completed_responses'] + 1)
+
+        # The in-memory counters match what the database reports
+        expected = survey_counters([self.survey.id])[self.survey.id]
+        self.assertEqual(live_counters.snapshot([self.survey.id]), [(self.survey.id, expected)])
+
+    def test_events_coalesce(self):
+        hub = LiveCounterHub()
+        hub.seed([self.survey.id, self.other.id])
+        wakes = []
+        subscriber = hub.subscribe([self.survey.id], lambda: wakes.append(1))
+
+        for _ in range(3):
+            hub.record_created(self.survey.id)
+        hub.record_created(self.other.id)
+
+        self.assertEqual(len(wakes), 1)
+        [(survey_id, counters)] = hub.take(subscriber)
+        self.assertEqual(survey_id, self.survey.id)
+        self.assertEqual(counters['total'], survey_counters([self.survey.id])[self.survey.id]['total'] + 3)
+
+    def test_async_stream_ends_on_disconnect(self):
+        hub = LiveCounterHub()
+        hub.seed([self.survey.id])
+
+        async def run():
+            disconnected = asyncio.get_running_loop().create_future()
+            events = astream_events(hub, [self.survey.id], get_live_config(), disconnected)
+            parts = [await events.__anext__(), await events.__anext__()]
+
+            hub.record_created(self.survey.id)
+            parts.append(await events.__anext__())
+            self.assertEqual(hub.subscriber_count, 1)
+
+            disconnected.set_result(None)
+            parts += [part async for part in events]
+            return parts
+
+        parts = asyncio.run(run())
+        totals = [data['total_responses'] for data in map(parse_event, parts) if data is not None]
+        self.assertEqual(totals[1], totals[0] + 1)
+        self.assertEqual(hub.subscriber_count, 0)
+
+    def test_patient_denied(self):
+        self.request(self.patient, 'get', '/api/analytics/live/', expected=403)
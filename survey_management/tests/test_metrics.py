@@ -0,0 +1,91 @@
+from django.test import SimpleTestCase, override_settings
+from survey_management.metrics import DEFAULT_METRICS, MetricsRegistry, registry
+from survey_management.tests.base import SurveyTestCase
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    """
+    Requests are aggregated per route and method into cumulative histograms and a bounded number of series
+    """
+
+    def registry(self, **config):
+        return MetricsRegistry(dict(DEFAULT_METRICS, LATENCY_BUCKETS=(0.1, 1), QUERY_BUCKETS=(1, 10),
+                                    SIZE_BUCKETS=(100,), **config))
+
+    def test_cumulative_buckets(self):
+        metrics = self.registry()
+        metrics.record('survey-list', 'GET', 200, 0.05, 3, 0.01, 50)
+        metrics.record('survey-list', 'GET', 200, 0.5, 30, 0.02, 500)
+        metrics.record('survey-list', 'GET', 404, 5, 1, 0.0, None)
+
+        lines = metrics.render().splitlines()
+        labels = 'route="survey-list",method="GET"'
+        for line in (
+            f'survey_http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1',
+            f'survey_http_request_duration_seconds_bucket{{{labels},le="1"}} 2',
+            f'survey_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3',
+            f'survey_http_request_db_queries_bucket{{{labels},le="1"}} 1',
+            f'survey_http_request_db_queries_bucket{{{labels},le="10"}} 2',
+            # Streaming responses have no size
+            f'survey_http_response_size_bytes_count{{{labels}}} 2',
+            f'survey_http_request_db_seconds_total{{{labels}}} 0.030000',
+            f'survey_http_requests_total{{{labels},status="200"}} 2',
+            f'survey_http_requests_total{{{labels},status="404"}} 1',
+        ):
+            self.assertIn(line, lines)
+
+    def test_series_bounded(self):
+        metrics = self.registry(MAX_SERIES=2)
+        for route in ('survey-list', 'survey-detail', 'response-list', 'response-detail'):
+            metrics.record(route, 'GET', 200, 0.01, 1, 0.0, 10)
+        metrics.record('survey-list', 'GET', 200, 0.01, 1, 0.0, 10)
+
+        totals = [line for line in metrics.render().splitlines() if line.startswith('survey_http_requests_total')]
+        self.assertEqual(totals, [
+            'survey_http_requests_total{route="other",method="GET",status="200"} 2',
+            'survey_http_requests_total{route="survey-detail",method="GET",status="200"} 1',
+            'survey_http_requests_total{route="survey-list",method="GET",status="200"} 2',
+        ])
+
+    def test_labels_escaped(self):
+        metrics = self.registry()
+        metrics.record('a"b\\c', 'GET', 200, 0.01, 1, 0.0, 10)
+        self.assertIn('route="a\\"b\\\\c"', metrics.render())
+
+
+class RequestMetricsMiddlewareTests(SurveyTestCase):
+    """
+    Every request is recorded under its URL name, with its queries, and over-budget requests are logged
+    """
+
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_requests_recorded_by_route(self):
+        self.request(self.admin, 'get', '/api/surveys/')
+        self.request(self.admin, 'get', f'/api/surveys/{self.survey.id}/')
+        self.request(self.admin, 'get', '/api/surveys/0/', expected=404)
+
+        body = self.request(self.admin, 'get', '/api/metrics/').content.decode()
+        self.assertIn('survey_http_requests_total{route="survey-list",method="GET",status="200"} 1', body)
+        self.assertIn('survey_http_requests_total{route="survey-detail",method="GET",status="200"} 1', body)
+        self.assertIn('survey_http_requests_total{route="survey-detail",method="GET",status="404"} 1', body)
+        self.assertNotIn(f'/api/surveys/{self.survey.id}/', body)
+        # The survey list ran queries
+        self.assertIn('survey_http_request_db_queries_bucket{route="survey-list",method="GET",le="0"} 0', body)
+
+    @override_settings(SURVEY_METRICS={'QUERY_BUDGET': 1, 'TOP_STATEMENTS': 1})
+    def test_query_budget_logged(self):
+        with self.assertLogs('survey_management.middleware.metrics', 'WARNING') as logs:
+            self.request(self.admin, 'get', '/api/surveys/')
+        [message] = logs.output
+        self.assertIn('GET survey-list ran', message)
+        self.assertIn('(budget 1,', message)
+        self.assertIn('Most repeated: ', message)
+
+    @override_settings(SURVEY_METRICS={'ENABLED': False})
+    def test_disabled(self):
+        self.request(self.admin, 'get', '/api/surveys/')
+        self.assertNotIn('survey-list', registry.render())
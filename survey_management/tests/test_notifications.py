@@ -0,0 +1,165 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from survey_management.models import NotificationOutbox
+from survey_management.ratelimit import TokenBucket
+from survey_management.services import sms_backends
+from survey_management.services.notification_dispatcher import OutboxSender
+
+
+class FlakySMSBackend(sms_backends.LocmemSMSBackend):
+    """Rejects messages to 'unreachable' and fails a whole batch call because of it"""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to == 'unreachable':
+                raise ConnectionError('Provider rejected the number')
+        return super().send_messages(messages)
+
+
+@override_settings(SURVEY_SMS_BACKEND='survey_management.tests.test_notifications.FlakySMSBackend',
+                   SURVEY_NOTIFICATION_RATE_LIMITS={'SMS': 1000})
+class OutboxSenderTests(TestCase):
+    """
+    Outbox rows are leased to one worker, sent once each and retried with capped backoff
+    """
+
+    def setUp(self):
+        sms_backends.outbox.clear()
+        self.addCleanup(sms_backends.outbox.clear)
+        limiters = mock.patch.dict('survey_management.services.notification_dispatcher._limiters', clear=True)
+        limiters.start()
+        self.addCleanup(limiters.stop)
+
+    def queue(self, *recipients, due=None):
+        due = due or timezone.now()
+        return NotificationOutbox.objects.bulk_create([
+            NotificationOutbox(channel='SMS', recipient=recipient, body='Please take our survey', next_attempt_at=due)
+            for recipient in recipients
+        ])
+
+    def sent_to(self):
+        return [message.to for message in sms_backends.outbox]
+
+    def test_claim_leases_rows_once(self):
+        self.queue('100', '101', '102')
+        self.queue('later', due=timezone.now() + timedelta(hours=1))
+
+        first = OutboxSender(batch_size=2).claim('SMS')
+        second = OutboxSender(batch_size=2).claim('SMS')
+        self.assertEqual(len(first), 2)
+        self.assertEqual([row.recipient for row in second], ['102'])
+        self.assertFalse({row.pk for row in first} & {row.pk for row in second})
+        self.assertEqual(OutboxSender().claim('SMS'), [])
+
+        row = first[0]
+        self.assertEqual((row.status, row.attempts), ('SENDING', 1))
+        self.assertGreater(row.lease_expires_at, timezone.now())
+
+    def test_expired_lease_reclaimed(self):
+        self.queue('100')
+        [row] = OutboxSender(lease_seconds=-1).claim('SMS')
+
+        # The worker holding the lease died; another picks the row up again
+        [reclaimed] = OutboxSender().claim('SMS')
+        self.assertEqual(reclaimed.pk, row.pk)
+        self.assertEqual(reclaimed.attempts, 2)
+        self.assertNotEqual(reclaimed.lease_token, row.lease_token)
+
+    def test_partial_failure_sends_each_once(self):
+        self.queue('100', 'unreachable', '102')
+
+        sender = OutboxSender()
+        self.assertEqual(sender.send_batch('SMS', sender.claim('SMS')), (2, 1))
+        self.assertEqual(self.sent_to(), ['100', '102'])
+
+        statuses = dict(NotificationOutbox.objects.values_list('recipient', 'status'))
+        self.assertEqual(statuses, {'100': 'SENT', 'unreachable': 'PENDING', '102': 'SENT'})
+        failed = NotificationOutbox.objects.get(recipient='unreachable')
+        self.assertEqual(failed.last_error, 'Provider rejected the number')
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+
+        # Nothing is due until the backoff has passed
+        self.assertEqual(sender.drain(), 0)
+        self.assertEqual(self.sent_to(), ['100', '102'])
+
+    def test_dead_letter_after_max_attempts(self):
+        self.queue('unreachable')
+        sender = OutboxSender(max_attempts=2)
+        for attempt in range(2):
+            NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+            sender.drain()
+
+        row = NotificationOutbox.objects.get()
+        self.assertEqual((row.status, row.attempts), ('DEAD', 2))
+        self.assertEqual(sender.drain(), 0)
+
+    def test_backoff_doubles_up_to_cap(self):
+        sender = OutboxSender(backoff_seconds=30, max_backoff_seconds=100)
+        with mock.patch('survey_management.services.notification_dispatcher.random.uniform', return_value=1.0):
+            delays = [sender._backoff(attempts).total_seconds() for attempts in range(1, 5)]
+        self.assertEqual(delays, [30, 60, 100, 100])
+
+        # Jitter only ever shortens the delay, by at most half
+        for _ in range(20):
+            self.assertTrue(15 <= sender._backoff(1).total_seconds() <= 30)
+
+    def test_sms_rate_limit(self):
+        self.queue(*[str(number) for number in range(5)])
+        with override_settings(SURVEY_NOTIFICATION_RATE_LIMITS={'SMS': 2}), \
+                mock.patch.object(TokenBucket, 'consume', autospec=True, return_value=True) as consume:
+            sender = OutboxSender()
+            self.assertEqual(sender.send_batch('SMS', sender.claim('SMS')), (5, 0))
+
+        # Batches no larger than the burst, each waiting for its tokens
+        self.assertEqual([call.args[1] for call in consume.call_args_list], [2, 2, 1])
+        self.assertEqual(len(self.sent_to()), 5)
+
+    def test_stopping_releases_unsent_rows(self):
+        self.queue('100', '101', '102')
+        sender = OutboxSender()
+        rows = sender.claim('SMS')
+        with override_settings(SURVEY_NOTIFICATION_RATE_LIMITS={'SMS': 2}), \
+                mock.patch.object(TokenBucket, 'consume', autospec=True, side_effect=[True, False]):
+            self.assertEqual(sender.send_batch('SMS', rows), (2, 0))
+
+        released = NotificationOutbox.objects.get(status='PENDING')
+        self.assertEqual((released.attempts, released.lease_token), (0, ''))
+
+
+class TokenBucketTests(TestCase):
+    """
+    Buckets allow a burst of their capacity and refill at their rate
+    """
+
+    def setUp(self):
+        clock = mock.patch('survey_management.ratelimit.time.monotonic', return_value=100.0)
+        self.clock = clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_burst_and_refill(self):
+        bucket = TokenBucket(rate=2, capacity=4)
+        self.assertEqual(bucket.try_consume(4), (True, 0.0))
+        self.assertEqual(bucket.try_consume(1), (False, 0.5))
+
+        self.clock.return_value = 101.0
+        self.assertEqual(bucket.try_consume(2), (True, 0.0))
+        self.assertFalse(bucket.try_consume(1)[0])
+
+        # Refill never exceeds the capacity
+        self.clock.return_value = 200.0
+        self.assertTrue(bucket.try_consume(4)[0])
+        self.assertFalse(bucket.try_consume(1)[0])
+
+    def test_consume_waits_for_tokens(self):
+        bucket = TokenBucket(rate=5)
+        bucket.try_consume(5)
+
+        def sleep(seconds):
+            self.clock.return_value += seconds
+
+        with mock.patch('survey_management.ratelimit.time.sleep', side_effect=sleep) as slept:
+            # Larger than the bucket: capped at its capacity
+            self.assertTrue(bucket.consume(10))
+        self.assertEqual(slept.call_args.args, (1.0,))
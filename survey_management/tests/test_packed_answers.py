@@ -0,0 +1,76 @@
+from survey_management.models import Question, Response, ResponseItem
+from survey_management.services.analytics_service import packed_values, rating_summaries, survey_counters
+from survey_management.services.answer_packing import AnswerPacker
+from survey_management.tests.base import SurveyTestCase
+
+
+class PackedAnswerTests(SurveyTestCase):
+    """
+    Packed responses read the same as their item rows, in the API and in analytics
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.grow(6)
+
+    def unpack_all(self):
+        Response.objects.update(packed_answers=None)
+
+    def analytics(self):
+        survey_ids = list(Question.objects.values_list('survey_id', flat=True).distinct())
+        rating_questions = list(Question.objects.filter(question_type='RATING'))
+        return (
+            rating_summaries(rating_questions, packed_values(survey_ids, 'n')),
+            survey_counters(survey_ids),
+        )
+
+    def test_serialized_alike(self):
+        submitted = self.request(self.patient, 'post', '/api/responses/submit/',
+                                 {'survey_id': self.survey.id, 'answers': self.answers()}).data['response_id']
+        url = f'/api/responses/{submitted}/'
+        self.assertIsNotNone(Response.objects.get(pk=submitted).packed_answers)
+        packed = self.request(self.admin, 'get', url).data
+
+        self.unpack_all()
+        unpacked = self.request(self.admin, 'get', url).data
+        self.assertEqual(packed, unpacked)
+        self.assertTrue(all(item['id'] for item in packed['items']))
+
+        # The item IDs of packed responses reach their rows
+        item = packed['items'][0]
+        self.request(self.admin, 'get', f"/api/response-items/{item['id']}/")
+
+    def test_list_serialized_alike(self):
+        packed = self.request(self.admin, 'get', '/api/responses/').data
+        self.unpack_all()
+        self.assertEqual(self.request(self.admin, 'get', '/api/responses/').data, packed)
+
+    def test_analytics_count_once(self):
+        self.assertTrue(Response.objects.filter(packed_answers__isnull=False).exists())
+        packed = self.analytics()
+        self.unpack_all()
+        self.assertEqual(self.analytics(), packed)
+
+    def test_repack_adds_item_ids(self):
+        legacy = Response.objects.filter(packed_answers__isnull=False).first()
+        legacy.packed_answers = {
+            question_id: {key: value for key, value in answer.items() if key not in 'icu'}
+            for question_id, answer in legacy.packed_answers.items()
+        }
+        legacy.save(update_fields=['packed_answers'])
+
+        AnswerPacker(repack=True).run(survey_id=legacy.survey_id)
+        legacy.refresh_from_db()
+        self.assertEqual(sorted(answer['i'] for answer in legacy.packed_answers.values()),
+                         sorted(legacy.items.values_list('id', flat=True)))
+
+    def test_analytics_without_items(self):
+        survey_ids = list(Question.objects.values_list('survey_id', flat=True).distinct())
+        distribution = f'/api/analytics/{self.survey.id}/multiple_choice_distribution/'
+        with_items = self.analytics(), self.request(self.admin, 'get', distribution).data
+        # Packed answers are only read for responses whose item rows were dropped
+        self.assertEqual(packed_values(survey_ids, 'n'), {})
+
+        ResponseItem.objects.filter(response__packed_answers__isnull=False).delete()
+        self.assertNotEqual(packed_values(survey_ids, 'n'), {})
+        self.assertEqual((self.analytics(), self.request(self.admin, 'get', distribution).data), with_items)
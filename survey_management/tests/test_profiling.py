@@ -0,0 +1,102 @@
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from survey_management.models import RequestProfile
+from survey_management.profiling import collapse, prune_profiles
+from survey_management.tests.base import SurveyTestCase
+
+PROFILING = {'ENABLED': True, 'MODE': 'deterministic'}
+
+
+@override_settings(SURVEY_PROFILING=PROFILING)
+class RequestProfilingTests(SurveyTestCase):
+    """
+    Admins profile single requests with the header; other clients only through sampling
+    """
+
+    def profiled(self, user, url='/api/surveys/', expected=200, **headers):
+        client = APIClient()
+        if user is not None:
+            client.force_login(user)
+        response = client.get(url, HTTP_X_PROFILE='1', **headers)
+        self.assertEqual(response.status_code, expected)
+        return response
+
+    def test_admin_header(self):
+        response = self.profiled(self.admin)
+        profile = RequestProfile.objects.get()
+        self.assertEqual(response['X-Profile-Id'], str(profile.pk))
+        self.assertEqual((profile.user, profile.route, profile.trigger, profile.mode),
+                         (self.admin, 'survey-list', 'HEADER', 'DETERMINISTIC'))
+        self.assertEqual(profile.query_count, len(profile.queries))
+        self.assertGreater(profile.query_count, 0)
+        self.assertIn('SELECT', profile.queries[0]['sql'])
+        # The view's frames show up in the collapsed stacks
+        self.assertIn('list (', profile.collapsed_stacks)
+
+    def test_header_ignored_for_other_users(self):
+        response = self.profiled(self.patient)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_header_ignored_before_authentication(self):
+        # Token clients are only known to be admins once the view ran
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with mock.patch('survey_management.middleware.profiling.build_profiler') as build_profiler:
+            response = self.profiled(None, expected=401)
+            client.get('/api/surveys/', HTTP_X_PROFILE='1')
+        build_profiler.assert_not_called()
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(SURVEY_PROFILING=dict(PROFILING, SAMPLE_RATE=0.5))
+    def test_sampling(self):
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        with mock.patch('survey_management.middleware.profiling.random.random', side_effect=[0.7, 0.2]):
+            client.get('/api/surveys/')
+            client.get('/api/surveys/')
+        profile = RequestProfile.objects.get()
+        self.assertEqual((profile.user, profile.trigger), (self.patient, 'SAMPLE'))
+
+    @override_settings(SURVEY_PROFILING={'ENABLED': False})
+    def test_disabled(self):
+        self.profiled(self.admin)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_one_profile_at_a_time(self):
+        with mock.patch('survey_management.middleware.profiling.threading.BoundedSemaphore') as slots:
+            slots.return_value.acquire.return_value = False
+            self.profiled(self.admin)
+        self.assertFalse(RequestProfile.objects.exists())
+
+
+class ProfileRetentionTests(TestCase):
+    """
+    Only the newest profiles younger than the age limit are kept
+    """
+
+    def test_prune(self):
+        now = timezone.now()
+        for days in (0, 1, 2, 10):
+            profile = RequestProfile.objects.create(method='GET', path='/api/surveys/', route='survey-list',
+                                                    status_code=200, mode='STATISTICAL', trigger='SAMPLE',
+                                                    duration_ms=days)
+            RequestProfile.objects.filter(pk=profile.pk).update(created_at=now - timedelta(days=days))
+
+        self.assertEqual(prune_profiles(max_profiles=2, max_age_days=7), 2)
+        self.assertEqual(sorted(RequestProfile.objects.values_list('duration_ms', flat=True)), [0, 1])
+
+
+class CollapseTests(SimpleTestCase):
+    """
+    Stacks are written heaviest first, one 'frame;frame weight' line each
+    """
+
+    def test_collapse(self):
+        stacks = Counter({('main', 'view'): 3, ('main',): 5, ('main', 'idle'): 0.4})
+        self.assertEqual(collapse(stacks), 'main 5\nmain;view 3')
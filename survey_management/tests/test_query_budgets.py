@@ -0,0 +1,312 @@
+from itertools import count
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from survey_management.live import live_counters
+from survey_management.models import Survey, Question, Response, ResponseItem, AssignmentJob, RequestProfile
+from survey_management.tests.base import SurveyTestCase, make_user
+
+# Rows added before each measurement; lists stay within one page at the
+# smaller size, so a per-row query shows up as a difference in counts
+SIZES = (2, 6)
+
+
+class QueryBudgetTestCase(SurveyTestCase):
+    """
+    Sends a request at two data sizes and fails if its query count differs
+    between them or exceeds the endpoint's budget
+    """
+
+    def assertScales(self, budget, send, setup=lambda: None):
+        """
+        Run send(setup()) at every size and compare the queries of the runs
+
+        Each size is sent once unmeasured first, so caches filled on first
+        use do not count against the request.
+        """
+        counts = []
+        for size in SIZES:
+            self.grow(size)
+            send(setup())
+            target = setup()
+            with CaptureQueriesContext(connection) as captured:
+                send(target)
+            # Tests write audit entries at once; deployments write them in the background
+            measured = [
+                query for query in captured.captured_queries
+                if not query['sql'].startswith('INSERT INTO "survey_management_auditlog"')
+            ]
+            counts.append(len(measured))
+
+        queries = '\n'.join(query['sql'] for query in measured)
+        self.assertEqual(len(set(counts)), 1,
+                         f"Query count grows with the data: {counts}\n\nLast run:\n{queries}")
+        self.assertLessEqual(counts[-1], budget,
+                             f"{counts[-1]} queries exceed the budget of {budget}\n\n{queries}")
+
+
+class SurveyQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_list(self):
+        self.assertScales(10, lambda _: self.request(self.staff, 'get', '/api/surveys/'))
+
+    def test_retrieve(self):
+        self.assertScales(9, lambda _: self.request(self.staff, 'get', f'/api/surveys/{self.survey.id}/'))
+
+    def test_definition(self):
+        self.assertScales(1, lambda _: self.request(
+            self.staff, 'get', f'/api/surveys/{self.survey.id}/definition/'
+        ))
+
+    def test_create(self):
+        self.assertScales(12, lambda _: self.request(
+            self.admin, 'post', '/api/surveys/',
+            {'title': 'New', 'description': 'Follow-up', 'departments': [self.department.id]}, expected=201
+        ))
+
+    def test_update(self):
+        self.assertScales(14, lambda _: self.request(
+            self.admin, 'patch', f'/api/surveys/{self.survey.id}/', {'title': 'Renamed'}
+        ))
+
+    def test_update_questions(self):
+        edits = count()
+
+        def setup():
+            # Every question is edited and one is added with its options
+            edit = next(edits)
+            questions = [
+                {'id': question.id, 'text': f'{question.text} ({edit})'} for question in self.survey.questions.all()
+            ]
+            questions.append({'text': f'Added {edit}', 'question_type': 'MULTIPLE_CHOICE',
+                              'options': [{'text': 'Yes', 'order': 0}, {'text': 'No', 'order': 1}]})
+            return questions
+
+        self.assertScales(22, lambda questions: self.request(
+            self.admin, 'patch', f'/api/surveys/{self.survey.id}/', {'questions': questions}
+        ), setup)
+
+    def test_destroy(self):
+        def setup():
+            survey = Survey.objects.create(title='Disposable', description='', created_by=self.admin)
+            Question.objects.create(survey=survey, text='Rate us', question_type='RATING')
+            for patient in self.patients:
+                self.respond(survey, patient)
+            return survey
+
+        self.assertScales(18, lambda survey: self.request(
+            self.admin, 'delete', f'/api/surveys/{survey.id}/', expected=204
+        ), setup)
+
+    def test_export_responses(self):
+        self.assertScales(9, lambda _: self.request(
+            self.admin, 'get', f'/api/surveys/{self.survey.id}/export_responses/'
+        ))
+
+    def test_export_path(self):
+        self.assertScales(9, lambda _: self.request(
+            self.admin, 'get', f'/api/surveys/{self.survey.id}/export/'
+        ))
+
+    def test_assign_survey(self):
+        self.assertScales(11, lambda _: self.request(
+            self.superuser, 'post', f'/api/surveys/{self.survey.id}/assign/{self.patients[-1].id}/'
+        ))
+
+    def test_bulk_assign(self):
+        self.assertScales(14, lambda _: self.request(
+            self.superuser, 'post', f'/api/surveys/{self.survey.id}/bulk_assign/',
+            {'user_ids': [patient.id for patient in self.patients]}, expected=202
+        ))
+
+
+class QuestionQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_list(self):
+        self.assertScales(5, lambda _: self.request(
+            self.staff, 'get', f'/api/questions/?survey={self.survey.id}'
+        ))
+
+    def test_retrieve(self):
+        def setup():
+            return self.survey.questions.filter(question_type='MULTIPLE_CHOICE').first()
+
+        self.assertScales(3, lambda question: self.request(self.staff, 'get', f'/api/questions/{question.id}/'),
+                          setup)
+
+    def test_destroy(self):
+        def setup():
+            question = Question.objects.create(survey=self.survey, text='Disposable', question_type='TEXT')
+            ResponseItem.objects.bulk_create([
+                ResponseItem(response=response, question=question, text_answer='Fine')
+                for response in self.survey.responses.all()
+            ])
+            return question
+
+        self.assertScales(6, lambda question: self.request(
+            self.admin, 'delete', f'/api/questions/{question.id}/', expected=204
+        ), setup)
+
+
+class ResponseQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_staff_list(self):
+        self.assertScales(6, lambda _: self.request(self.staff, 'get', '/api/responses/'))
+
+    def test_admin_list(self):
+        self.assertScales(6, lambda _: self.request(self.admin, 'get', '/api/responses/'))
+
+    def test_patient_list(self):
+        self.assertScales(6, lambda _: self.request(self.patients[0], 'get', '/api/responses/'))
+
+    def test_retrieve(self):
+        def setup():
+            return self.survey.responses.filter(is_complete=True).order_by('pk').last()
+
+        self.assertScales(5, lambda response: self.request(
+            self.staff, 'get', f'/api/responses/{response.id}/'
+        ), setup)
+
+    def test_submit(self):
+        self.assertScales(17, lambda _: self.request(
+            self.patient, 'post', '/api/responses/submit/',
+            {'survey_id': self.survey.id, 'answers': self.answers()}
+        ))
+
+    def test_destroy(self):
+        self.assertScales(5, lambda response: self.request(
+            self.admin, 'delete', f'/api/responses/{response.id}/', expected=204
+        ), lambda: self.respond(self.survey, self.patient))
+
+    def new_patient(self):
+        return make_user(f'respondent{next(self.names)}', 'PATIENT')
+
+    def test_draft(self):
+        self.assertScales(9, lambda patient: self.request(
+            patient, 'post', '/api/responses/draft/', {'survey_id': self.survey.id}, expected=201
+        ), self.new_patient)
+
+    def test_draft_answers(self):
+        def setup():
+            return Response.objects.create(survey=self.survey, respondent=self.new_patient())
+
+        self.assertScales(8, lambda draft: self.request(
+            draft.respondent, 'patch', f'/api/responses/{draft.id}/answers/', {'answers': self.answers()}
+        ), setup)
+
+    def test_finalize(self):
+        self.assertScales(4, lambda draft: self.request(
+            draft.respondent, 'post', f'/api/responses/{draft.id}/finalize/'
+        ), lambda: self.respond(self.survey, self.new_patient(), complete=False))
+
+    def test_item_list(self):
+        self.assertScales(3, lambda _: self.request(self.staff, 'get', '/api/response-items/'))
+
+    def test_item_retrieve(self):
+        def setup():
+            return ResponseItem.objects.filter(response__survey=self.survey).order_by('pk').last()
+
+        self.assertScales(2, lambda item: self.request(self.staff, 'get', f'/api/response-items/{item.id}/'),
+                          setup)
+
+    def test_item_destroy(self):
+        def setup():
+            return self.respond(self.survey, self.patient, packed=True).items.order_by('pk').first()
+
+        self.assertScales(4, lambda item: self.request(
+            self.admin, 'delete', f'/api/response-items/{item.id}/', expected=204
+        ), setup)
+
+
+class DepartmentQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_list(self):
+        self.assertScales(1, lambda _: self.request(self.staff, 'get', '/api/departments/'))
+
+    def test_filtered_list(self):
+        self.assertScales(3, lambda _: self.request(self.staff, 'get', '/api/departments/?search=Department'))
+
+    def test_retrieve(self):
+        self.assertScales(2, lambda _: self.request(
+            self.staff, 'get', f'/api/departments/{self.department.id}/'
+        ))
+
+
+class ScheduleQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_list(self):
+        self.assertScales(3, lambda _: self.request(self.staff, 'get', '/api/schedules/'))
+
+    def test_retrieve(self):
+        self.assertScales(2, lambda _: self.request(self.staff, 'get', f'/api/schedules/{self.schedule.id}/'))
+
+    def test_trigger_manually(self):
+        self.assertScales(8, lambda _: self.request(
+            self.superuser, 'post', f'/api/schedules/{self.schedule.id}/trigger_manually/',
+            {'user_ids': [patient.id for patient in self.patients]}
+        ))
+
+    def test_reminder_policy_list(self):
+        self.assertScales(3, lambda _: self.request(self.staff, 'get', '/api/reminder-policies/'))
+
+    def test_event_ingest(self):
+        self.assertScales(4, lambda _: self.request(
+            self.admin, 'post', '/api/events/ingest/',
+            {'events': [{'event_type': 'DISCHARGE', 'user_id': patient.id} for patient in self.patients]},
+            expected=202
+        ))
+
+
+class AnalyticsQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_completion_rates(self):
+        self.assertScales(3, lambda _: self.request(self.staff, 'get', '/api/analytics/completion_rates/'))
+
+    def test_rating_averages(self):
+        self.assertScales(4, lambda _: self.request(self.staff, 'get', '/api/analytics/rating_averages/'))
+
+    def test_response_trends(self):
+        self.assertScales(2, lambda _: self.request(self.staff, 'get', '/api/analytics/response_trends/'))
+
+    def test_multiple_choice_distribution(self):
+        self.assertScales(6, lambda _: self.request(
+            self.staff, 'get', f'/api/analytics/{self.survey.id}/multiple_choice_distribution/'
+        ))
+
+    def test_live(self):
+        # Seeding the counters of new surveys is part of the unmeasured first request
+        self.addCleanup(live_counters.clear)
+        self.assertScales(1, lambda _: self.request(self.staff, 'get', '/api/analytics/live/'))
+
+
+class AdministrationQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_assignment_job_list(self):
+        self.assertScales(3, lambda _: self.request(self.admin, 'get', '/api/assignment-jobs/'))
+
+    def test_assignment_job_retrieve(self):
+        def setup():
+            return AssignmentJob.objects.order_by('pk').last()
+
+        self.assertScales(2, lambda job: self.request(
+            self.admin, 'get', f'/api/assignment-jobs/{job.id}/'
+        ), setup)
+
+    def test_audit_search(self):
+        self.assertScales(2, lambda _: self.request(self.admin, 'get', '/api/audit-logs/search/?action=READ'))
+
+    def test_throttles(self):
+        self.assertScales(1, lambda _: self.request(self.admin, 'get', '/api/throttles/'))
+
+    def test_metrics(self):
+        self.assertScales(1, lambda _: self.request(self.admin, 'get', '/api/metrics/'))
+
+    def test_profile_list(self):
+        self.assertScales(2, lambda _: self.request(self.admin, 'get', '/api/profiles/'))
+
+    def test_profile_collapsed(self):
+        def setup():
+            return RequestProfile.objects.order_by('pk').last()
+
+        self.assertScales(1, lambda profile: self.request(
+            self.admin, 'get', f'/api/profiles/{profile.id}/collapsed/'
+        ), setup)
@@ -0,0 +1,65 @@
+from unittest import mock
+from django.test import override_settings
+from survey_management.models import AuditLog, Response
+from survey_management.tests.base import SurveyTestCase, make_user
+
+READ_AUDIT = {
+    'ENABLED': True,
+    'COALESCE_SECONDS': 300,
+    'RULES': {
+        'response-detail': {'sample_rate': 1.0},
+        'response-list': {'sample_rate': 0.5},
+        'survey-export-responses': {'always': True},
+    },
+}
+
+
+@override_settings(SURVEY_READ_AUDIT=READ_AUDIT)
+class ReadAuditTests(SurveyTestCase):
+    """
+    PHI reads are logged once per user and object within the window, sampled where the rule says so
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.response = Response.objects.create(survey=self.survey, respondent=self.patient)
+
+    def reads(self):
+        return list(AuditLog.objects.filter(action='READ').order_by('id').values_list('user__username', 'details'))
+
+    def test_reads_coalesced(self):
+        url = f'/api/responses/{self.response.id}/'
+        self.request(self.patient, 'get', url)
+        self.request(self.patient, 'get', url)
+        self.assertEqual(self.reads(), [('patient', f'Read response-detail {self.response.id}: {url}')])
+
+        # Other readers and other objects have their own windows
+        other = Response.objects.create(survey=self.survey, respondent=make_user('other', 'PATIENT'))
+        self.request(self.admin, 'get', url)
+        self.request(self.patient, 'get', f'/api/responses/{other.id}/', expected=404)
+        self.request(self.admin, 'get', f'/api/responses/{other.id}/')
+        self.assertEqual([username for username, _ in self.reads()], ['patient', 'admin', 'admin'])
+
+    def test_sampled_reads(self):
+        with mock.patch('survey_management.middleware.audit.random.random', side_effect=[0.7, 0.2]):
+            self.request(self.admin, 'get', '/api/responses/')
+            self.assertEqual(self.reads(), [])
+            self.request(self.admin, 'get', '/api/responses/')
+        [(_, details)] = self.reads()
+        self.assertTrue(details.endswith('(sampled at 50%)'))
+
+    def test_always_logged(self):
+        url = f'/api/surveys/{self.survey.id}/export_responses/'
+        for _ in range(2):
+            self.request(self.admin, 'get', url)
+        self.assertEqual(len(self.reads()), 2)
+
+    def test_unlisted_and_failed_reads_skipped(self):
+        self.request(self.patient, 'get', f'/api/surveys/{self.survey.id}/')
+        self.request(self.patient, 'get', '/api/responses/0/', expected=404)
+        self.assertEqual(self.reads(), [])
+
+    def test_disabled(self):
+        with override_settings(SURVEY_READ_AUDIT=dict(READ_AUDIT, ENABLED=False)):
+            self.request(self.patient, 'get', f'/api/responses/{self.response.id}/')
+        self.assertEqual(self.reads(), [])
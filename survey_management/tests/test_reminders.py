@@ -0,0 +1,89 @@
+from datetime import timedelta
+from django.utils import timezone
+from survey_management.models import NotificationOutbox, ReminderPolicy, Response
+from survey_management.services.reminder_service import ReminderService
+from survey_management.tests.base import SurveyTestCase, make_user
+
+
+class ReminderServiceTests(SurveyTestCase):
+    """
+    Open responses are reminded at their policy's offsets, once each, until the policy runs out
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.service = ReminderService()
+        self.policy = ReminderPolicy.objects.create(survey=self.survey, offsets_hours=[24, 72], max_reminders=2)
+
+    def open_response(self, hours_ago, **fields):
+        started_at = timezone.now() - timedelta(hours=hours_ago)
+        respondent = make_user(f'respondent{next(self.names)}', 'PATIENT')
+        response = Response.objects.create(survey=self.survey, respondent=respondent, reminder_policy=self.policy,
+                                           next_reminder_at=self.service.next_reminder_at(self.policy, started_at),
+                                           **fields)
+        Response.objects.filter(pk=response.pk).update(started_at=started_at)
+        response.refresh_from_db()
+        return response
+
+    def test_schedule_policy_first(self):
+        schedule_policy = ReminderPolicy.objects.create(schedule=self.schedule, offsets_hours=[4])
+        self.assertEqual(self.service.policy_for(self.survey, self.schedule), schedule_policy)
+        self.assertEqual(self.service.policy_for(self.survey), self.policy)
+
+        schedule_policy.is_active = False
+        schedule_policy.save()
+        self.assertEqual(self.service.policy_for(self.survey, self.schedule), self.policy)
+
+    def test_offsets_capped(self):
+        started_at = timezone.now()
+        self.assertEqual(self.service.next_reminder_at(self.policy, started_at, 1), started_at + timedelta(hours=72))
+        self.assertIsNone(self.service.next_reminder_at(self.policy, started_at, 2))
+
+        self.policy.max_reminders = 1
+        self.assertIsNone(self.service.next_reminder_at(self.policy, started_at, 1))
+
+    def test_due_reminders_sent_once(self):
+        due = self.open_response(hours_ago=48)
+        self.open_response(hours_ago=1)
+        # Completed responses are never reminded
+        self.open_response(hours_ago=48, is_complete=True)
+
+        results = self.service.send_due_reminders()
+        self.assertEqual((results['processed'], results['reminded']), (1, 1))
+        self.assertEqual(list(NotificationOutbox.objects.values_list('recipient', flat=True)),
+                         [due.respondent.email])
+
+        due.refresh_from_db()
+        self.assertEqual(due.reminders_sent, 1)
+        self.assertEqual(due.next_reminder_at, due.started_at + timedelta(hours=72))
+        self.assertEqual(self.service.send_due_reminders()['processed'], 0)
+
+    def test_catch_up_keeps_spacing(self):
+        # Both reminders are overdue after downtime; the second still follows the first by 48 hours
+        response = self.open_response(hours_ago=240)
+        before = timezone.now()
+        self.service.send_due_reminders()
+
+        response.refresh_from_db()
+        self.assertGreaterEqual(response.next_reminder_at, before + timedelta(hours=48))
+        self.assertEqual(self.service.send_due_reminders()['reminded'], 0)
+
+    def test_last_reminder_ends_schedule(self):
+        response = self.open_response(hours_ago=100)
+        Response.objects.filter(pk=response.pk).update(reminders_sent=1)
+        self.service.send_due_reminders()
+
+        response.refresh_from_db()
+        self.assertEqual(response.reminders_sent, 2)
+        self.assertIsNone(response.next_reminder_at)
+
+    def test_inactive_policy_stops(self):
+        response = self.open_response(hours_ago=48)
+        self.policy.is_active = False
+        self.policy.save()
+
+        results = self.service.send_due_reminders()
+        self.assertEqual((results['reminded'], results['stopped']), (0, 1))
+        response.refresh_from_db()
+        self.assertIsNone(response.next_reminder_at)
+        self.assertFalse(NotificationOutbox.objects.exists())
@@ -0,0 +1,175 @@
+from unittest import mock
+from django.db import connection
+from django.utils import timezone
+from survey_management.models import Department, Survey, Question, Response, ResponseItem
+from survey_management.models.user import ROLE_PERMISSIONS
+from survey_management.permissions.context import AuthorizationContext
+from survey_management.tests.base import SurveyTestCase, make_user
+
+
+class VisibleToTests(SurveyTestCase):
+    """Row scoping of surveys, responses and response items by role and department"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.oncology = Department.objects.create(name='Oncology')
+
+        cls.unassigned_staff = make_user('unassigned', 'STAFF')
+        cls.other_patient = make_user('other', 'PATIENT')
+        cls.integrator = make_user('integrator', 'INTEGRATOR')
+
+        cls.onco_survey = Survey.objects.create(title='Onco', description='', created_by=cls.admin)
+        cls.onco_survey.departments.add(cls.oncology)
+        # Shared surveys must not show up twice
+        cls.shared_survey = Survey.objects.create(title='Shared', description='', created_by=cls.admin)
+        cls.shared_survey.departments.add(cls.department, cls.oncology)
+
+        cls.question = Question.objects.create(survey=cls.shared_survey, text='How?', question_type='TEXT')
+
+        cls.cardio_response = Response.objects.create(survey=cls.survey, respondent=cls.patient)
+        cls.onco_response = Response.objects.create(survey=cls.onco_survey, respondent=cls.other_patient)
+        cls.shared_response = Response.objects.create(survey=cls.shared_survey, respondent=cls.patient)
+        cls.item = ResponseItem.objects.create(response=cls.shared_response, question=cls.question,
+                                               text_answer='Fine')
+
+    def assertVisible(self, queryset, expected):
+        ids = list(queryset.values_list('pk', flat=True))
+        self.assertEqual(len(ids), len(set(ids)), 'visible_to returned duplicate rows')
+        self.assertEqual(set(ids), {obj.pk for obj in expected})
+
+    def test_admin_sees_everything(self):
+        self.assertVisible(Response.objects.visible_to(self.admin),
+                           [self.cardio_response, self.onco_response, self.shared_response])
+
+    def test_superuser_sees_everything(self):
+        self.assertVisible(Survey.objects.visible_to(self.superuser),
+                           [self.survey, self.onco_survey, self.shared_survey])
+
+    def test_staff_see_their_departments_rows_once(self):
+        self.assertVisible(Survey.objects.visible_to(self.staff), [self.survey, self.shared_survey])
+        self.assertVisible(Response.objects.visible_to(self.staff), [self.cardio_response, self.shared_response])
+        self.assertVisible(ResponseItem.objects.visible_to(self.staff), [self.item])
+        self.assertVisible(Question.objects.visible_to(self.staff), [self.question])
+
+    def test_patients_see_only_their_own_responses(self):
+        self.assertVisible(Response.objects.visible_to(self.patient), [self.cardio_response, self.shared_response])
+        self.assertVisible(ResponseItem.objects.visible_to(self.other_patient), [])
+
+    def test_users_without_department_or_role_see_no_responses(self):
+        self.assertVisible(Response.objects.visible_to(self.unassigned_staff), [])
+        self.assertVisible(Response.objects.visible_to(self.integrator), [])
+
+    def test_staff_without_department_see_no_surveys(self):
+        # The same rule for every model, so analytics agree with the response lists
+        for model in (Survey, Question, Response, ResponseItem):
+            self.assertVisible(model.objects.visible_to(self.unassigned_staff), [])
+        self.assertFalse(AuthorizationContext.build(self.unassigned_staff).can_view_survey(self.shared_survey.pk))
+
+    def test_accepts_authorization_context(self):
+        context = AuthorizationContext.build(self.staff)
+        with self.assertNumQueries(1):
+            list(Response.objects.visible_to(context))
+
+    def test_staff_predicate_is_a_single_subquery(self):
+        sql = str(Response.objects.visible_to(self.staff).query)
+        self.assertIn('IN (SELECT', sql)
+        self.assertNotIn('JOIN', sql)
+
+
+class VisibleToQueryPlanTests(SurveyTestCase):
+    """Staff list queries must be driven by indexes, not table scans"""
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plan assertions are written for SQLite')
+
+    def plan(self, queryset):
+        return queryset.explain()
+
+    def test_staff_response_list_uses_survey_index(self):
+        plan = self.plan(Response.objects.visible_to(self.staff))
+        self.assertIn('SEARCH survey_management_response USING', plan)
+        self.assertIn('(survey_id=?)', plan)
+        self.assertNotIn('SCAN survey_management_response', plan)
+
+    def test_staff_response_item_list_uses_indexes(self):
+        plan = self.plan(ResponseItem.objects.visible_to(self.staff))
+        self.assertIn('(response_id=?)', plan)
+        self.assertNotIn('SCAN survey_management_responseitem', plan)
+        self.assertNotIn('SCAN survey_management_response ', plan)
+
+
+class AnalyticsScopingTests(SurveyTestCase):
+    """Every analytics endpoint applies the same visibility, and rejects bad parameters with 400"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.unassigned_staff = make_user('unassigned', 'STAFF')
+        Response.objects.create(survey=cls.survey, respondent=cls.patient,
+                                is_complete=True, submitted_at=timezone.now())
+
+    def get(self, user, url, expected=200):
+        return self.request(user, 'get', url, expected=expected).data
+
+    def test_completion_rates_and_trends_agree(self):
+        for user, responses in ((self.staff, 1), (self.unassigned_staff, 0)):
+            rates = self.get(user, '/api/analytics/completion_rates/')
+            trends = self.get(user, '/api/analytics/response_trends/')
+            self.assertEqual(sum(row['total_responses'] for row in rates), responses)
+            self.assertEqual(sum(row['response_count'] for row in trends), responses)
+
+        self.get(self.unassigned_staff, f'/api/analytics/{self.survey.id}/multiple_choice_distribution/',
+                 expected=403)
+
+    def test_trend_days_validated(self):
+        for days in ('week', '0', '-3'):
+            self.assertIn('days', self.get(self.staff, f'/api/analytics/response_trends/?days={days}',
+                                           expected=400))
+        self.get(self.staff, '/api/analytics/response_trends/?days=7')
+
+
+class SurveyEndpointScopingTests(SurveyTestCase):
+    """
+    Survey and question endpoints only serve the surveys of a staff member's department
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.unassigned_staff = make_user('unassigned', 'STAFF')
+        cls.other_survey = Survey.objects.create(title='Onco', description='', created_by=cls.admin)
+        cls.other_survey.departments.add(Department.objects.create(name='Oncology'))
+        cls.question = Question.objects.create(survey=cls.survey, text='How?', question_type='TEXT')
+        cls.other_question = Question.objects.create(survey=cls.other_survey, text='How?', question_type='TEXT')
+
+    def listed(self, user, url):
+        return {row['id'] for row in self.request(user, 'get', url).data['results']}
+
+    def test_list(self):
+        self.assertEqual(self.listed(self.admin, '/api/surveys/'), {self.survey.id, self.other_survey.id})
+        self.assertEqual(self.listed(self.staff, '/api/surveys/'), {self.survey.id})
+        self.assertEqual(self.listed(self.unassigned_staff, '/api/surveys/'), set())
+
+        self.assertEqual(self.listed(self.staff, '/api/questions/'), {self.question.id})
+        self.assertEqual(self.listed(self.unassigned_staff, '/api/questions/'), set())
+
+    def test_retrieve(self):
+        self.request(self.staff, 'get', f'/api/surveys/{self.survey.id}/')
+        self.request(self.staff, 'get', f'/api/surveys/{self.other_survey.id}/', expected=404)
+        self.request(self.unassigned_staff, 'get', f'/api/surveys/{self.survey.id}/', expected=404)
+        self.request(self.admin, 'get', f'/api/surveys/{self.other_survey.id}/')
+
+        self.request(self.staff, 'get', f'/api/questions/{self.other_question.id}/', expected=404)
+
+    def test_export(self):
+        # Staff may not export by default; grant it to check the survey is scoped too
+        permissions = dict(ROLE_PERMISSIONS, STAFF=ROLE_PERMISSIONS['STAFF'] | {'export_data'})
+        with mock.patch.dict(ROLE_PERMISSIONS, permissions):
+            self.request(self.staff, 'get', f'/api/surveys/{self.survey.id}/export_responses/')
+            self.request(self.staff, 'get', f'/api/surveys/{self.other_survey.id}/export_responses/', expected=404)
+            self.request(self.unassigned_staff, 'get', f'/api/surveys/{self.survey.id}/export_responses/',
+                         expected=404)
+        self.request(self.admin, 'get', f'/api/surveys/{self.other_survey.id}/export_responses/')
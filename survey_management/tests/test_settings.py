@@ -0,0 +1,47 @@
+import importlib.util
+import os
+from unittest import mock
+from django.test import SimpleTestCase
+
+
+def load_settings(**environ):
+    """Execute the settings module afresh with only the given DB_* variables set"""
+    environ = dict({key: value for key, value in os.environ.items() if not key.startswith('DB_')}, **environ)
+    spec = importlib.util.find_spec('healthcare_survey_platform.settings')
+    module = importlib.util.module_from_spec(spec)
+    # A developer's .env must not leak into the assertions
+    with mock.patch.dict(os.environ, environ, clear=True), mock.patch('dotenv.load_dotenv'):
+        spec.loader.exec_module(module)
+    return module
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    """
+    The database configuration is built from the environment for SQLite and PostgreSQL
+    """
+
+    def test_sqlite(self):
+        settings = load_settings(DB_BUSY_TIMEOUT='7', DB_REPLICA_NAME='replica.sqlite3')
+        default = settings.DATABASES['default']
+        self.assertEqual((default['ENGINE'], default['CONN_MAX_AGE']), ('django.db.backends.sqlite3', 0))
+        # One busy timeout, in the driver options, rather than a second PRAGMA
+        self.assertEqual(default['OPTIONS'], {'timeout': 7})
+        self.assertNotIn('busy_timeout', settings.SURVEY_SQLITE_PRAGMAS)
+        self.assertEqual(settings.DATABASES['replica']['NAME'], settings.BASE_DIR / 'replica.sqlite3')
+
+        self.assertEqual(load_settings().DATABASES['default']['OPTIONS'], {'timeout': 20})
+        self.assertNotIn('replica', load_settings().DATABASES)
+
+    def test_postgresql(self):
+        settings = load_settings(DB_ENGINE='postgresql', DB_NAME='surveys', DB_CONN_MAX_AGE='30',
+                                 DB_CONN_HEALTH_CHECKS='0', DB_DISABLE_SERVER_SIDE_CURSORS='1',
+                                 DB_REPLICA_HOST='standby', DB_SSLMODE='require')
+        default, replica = settings.DATABASES['default'], settings.DATABASES['replica']
+        self.assertEqual(
+            (default['ENGINE'], default['NAME'], default['CONN_MAX_AGE'],
+             default['CONN_HEALTH_CHECKS'], default['DISABLE_SERVER_SIDE_CURSORS']),
+            ('django.db.backends.postgresql', 'surveys', 30, False, True)
+        )
+        self.assertEqual(default['OPTIONS'], {'connect_timeout': 5, 'sslmode': 'require'})
+        self.assertEqual((replica['HOST'], replica['PORT'], replica['NAME']), ('standby', '5432', 'surveys'))
+        self.assertEqual(replica['TEST'], {'MIRROR': 'default'})
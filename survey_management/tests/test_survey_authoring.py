@@ -0,0 +1,146 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from survey_management.models import Question, QuestionOption, ResponseItem, Survey
+from survey_management.tests.base import SurveyTestCase
+
+
+class SurveyAuthoringTests(SurveyTestCase):
+    """
+    Nested survey writes match questions and options by ID, keep their IDs and never delete answers
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.grow(4)
+        self.choice = self.survey.questions.get(question_type='MULTIPLE_CHOICE')
+
+    def current(self):
+        """The main survey's questions, as submitted back by an editor"""
+        return self.request(self.admin, 'get', f'/api/surveys/{self.survey.id}/').data['questions']
+
+    def save(self, questions, expected=200):
+        return self.request(self.admin, 'patch', f'/api/surveys/{self.survey.id}/',
+                            {'questions': questions}, expected=expected).data
+
+    def writes(self, captured):
+        return [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith(('INSERT INTO "survey_management_question',
+                                        'UPDATE "survey_management_question',
+                                        'DELETE FROM "survey_management_question'))
+        ]
+
+    def test_create_nested(self):
+        data = self.request(self.admin, 'post', '/api/surveys/', {
+            'title': 'Follow-up', 'description': 'After discharge', 'departments': [self.department.id],
+            'questions': [
+                {'text': 'How was your stay?', 'question_type': 'MULTIPLE_CHOICE', 'order': 0,
+                 'options': [{'text': 'Good', 'order': 0}, {'text': 'Poor', 'order': 1}]},
+                {'text': 'Rate us', 'question_type': 'RATING', 'order': 1, 'min_rating': 1, 'max_rating': 5},
+            ]
+        }, expected=201).data
+
+        survey = Survey.objects.get(pk=data['id'])
+        self.assertEqual(list(survey.questions.values_list('text', flat=True)), ['How was your stay?', 'Rate us'])
+        self.assertEqual([option['text'] for option in data['questions'][0]['options']], ['Good', 'Poor'])
+
+    def test_update_keeps_ids_and_answers(self):
+        answers = ResponseItem.objects.count()
+        definition = self.request(self.patient, 'get', f'/api/surveys/{self.survey.id}/definition/').data
+
+        questions = self.current()
+        choice = next(question for question in questions if question['id'] == self.choice.id)
+        kept, *removed = choice['options']
+        choice['text'] = 'Which ward?'
+        choice['options'] = [dict(kept, text='North'), {'text': 'South', 'order': 3}]
+        questions.append({'text': 'Anything else?', 'question_type': 'TEXT', 'order': 9})
+        with self.captureOnCommitCallbacks() as callbacks:
+            data = self.save(questions)
+
+        self.assertEqual([question['id'] for question in data['questions'][:-1]],
+                         [question['id'] for question in questions[:-1]])
+        self.assertEqual(list(self.choice.options.values_list('id', 'text')),
+                         [(kept['id'], 'North'), (self.choice.options.get(text='South').id, 'South')])
+        self.assertFalse(QuestionOption.objects.filter(pk__in=[option['id'] for option in removed]).exists())
+        self.assertEqual(ResponseItem.objects.count(), answers)
+
+        # Bulk writes send no signals; the definition cache is invalidated all the same, once committed
+        self.assertEqual(self.request(self.patient, 'get', f'/api/surveys/{self.survey.id}/definition/').data,
+                         definition)
+        for callback in callbacks:
+            callback()
+        updated = self.request(self.patient, 'get', f'/api/surveys/{self.survey.id}/definition/').data
+        self.assertNotEqual(updated, definition)
+        self.assertIn('Which ward?', [question['text'] for question in updated['questions']])
+
+    def test_unchanged_writes_nothing(self):
+        questions = self.current()
+        with CaptureQueriesContext(connection) as captured:
+            self.save(questions)
+        self.assertEqual(self.writes(captured), [])
+
+    def test_answered_rows_kept(self):
+        answers = ResponseItem.objects.count()
+        questions = self.current()
+
+        self.save(questions[1:], expected=400)
+        self.assertTrue(Question.objects.filter(pk=questions[0]['id']).exists())
+
+        choice = next(question for question in questions if question['id'] == self.choice.id)
+        answered = choice['options'][0]
+        choice['options'] = choice['options'][1:]
+        self.assertIn('questions', self.save(questions, expected=400))
+        self.assertTrue(QuestionOption.objects.filter(pk=answered['id']).exists())
+        self.assertEqual(ResponseItem.objects.count(), answers)
+
+    def test_unanswered_question_removed(self):
+        questions = self.current()
+        added = self.save(questions + [{'text': 'Draft question', 'question_type': 'BOOLEAN'}])['questions']
+        added_id = next(question['id'] for question in added if question['text'] == 'Draft question')
+
+        self.save(questions)
+        self.assertFalse(Question.objects.filter(pk=added_id).exists())
+
+    def test_foreign_ids_rejected(self):
+        other = Question.objects.exclude(survey=self.survey).first()
+        self.save(self.current() + [{'id': other.id, 'text': 'Taken'}], expected=400)
+
+        questions = self.current()
+        choice = next(question for question in questions if question['id'] == self.choice.id)
+        rating = next(question for question in questions if question['question_type'] == 'RATING')
+        rating['options'] = [choice['options'][0]]
+        self.save(questions, expected=400)
+        self.assertEqual(Question.objects.get(pk=other.id).survey_id, other.survey_id)
+
+    def test_question_update_keeps_option_ids(self):
+        kept, *removed = self.choice.options.all()
+        data = self.request(self.admin, 'patch', f'/api/questions/{self.choice.id}/', {
+            'options': [{'id': kept.id, 'text': 'Renamed', 'order': 0}, {'text': 'Added', 'order': 1}]
+        }).data
+
+        self.assertEqual(data['options'][0], {'id': kept.id, 'text': 'Renamed', 'order': 0})
+        self.assertEqual(ResponseItem.objects.filter(selected_option=kept).count(),
+                         ResponseItem.objects.filter(question=self.choice).count())
+        self.assertFalse(QuestionOption.objects.filter(pk__in=[option.id for option in removed]).exists())
+
+        # The answered option cannot be dropped
+        self.request(self.admin, 'patch', f'/api/questions/{self.choice.id}/',
+                     {'options': [{'text': 'Replacement'}]}, expected=400)
+
+    def test_packed_answers_kept(self):
+        # With KEEP_ITEMS off a packed answer is the only record of the selected option
+        option = QuestionOption.objects.create(question=self.choice, text='Packed only', order=9)
+        response = self.respond(self.survey, self.patient, packed=True)
+        response.packed_answers[str(self.choice.id)]['o'] = option.id
+        response.save(update_fields=['packed_answers'])
+        ResponseItem.objects.filter(response=response).delete()
+
+        self.request(self.admin, 'patch', f'/api/questions/{self.choice.id}/', {
+            'options': [{'id': kept.id} for kept in self.choice.options.exclude(pk=option.pk)]
+        }, expected=400)
+        questions = self.current()
+        choice = next(question for question in questions if question['id'] == self.choice.id)
+        choice['options'] = [row for row in choice['options'] if row['id'] != option.id]
+        self.save(questions, expected=400)
+        self.assertTrue(QuestionOption.objects.filter(pk=option.pk).exists())
+
@@ -0,0 +1,88 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Count
+from django.test import TestCase
+from survey_management.models import Question, QuestionOption, Response, ResponseItem, Survey
+from survey_management.services.synthetic_data import SyntheticDataGenerator
+
+SIZES = dict(departments=2, staff=3, patients=5, surveys=2, questions_per_survey=6, responses=40, days=30)
+
+
+class Rollback(Exception):
+    pass
+
+
+class SyntheticDataTests(TestCase):
+    """
+    The generator creates the requested, consistent rows, and the same seed always creates the same data
+    """
+
+    def generate(self, seed=1, batch_size=15, **sizes):
+        return SyntheticDataGenerator(seed=seed, batch_size=batch_size).generate(**dict(SIZES, **sizes))
+
+    def snapshot(self):
+        """The generated answers, by names rather than primary keys"""
+        return sorted(ResponseItem.objects.values_list(
+            'response__respondent__username', 'response__survey__title', 'response__is_complete',
+            'question__order', 'numeric_answer', 'text_answer', 'selected_option__text'
+        ))
+
+    def test_counts(self):
+        counts = self.generate()
+        self.assertEqual(counts['users'], User.objects.count())
+        self.assertEqual(counts['questions'], Question.objects.count())
+        self.assertEqual(counts['responses'], Response.objects.count())
+        self.assertEqual(counts['response_items'], ResponseItem.objects.count())
+        self.assertEqual(counts, dict(counts, departments=2, users=9, surveys=2, questions=12, responses=40))
+
+        # One open response per patient and survey at most, and complete ones answer every required question
+        open_pairs = Response.objects.filter(is_complete=False).values('survey', 'respondent').annotate(
+            total=Count('id')).filter(total__gt=1)
+        self.assertFalse(open_pairs.exists())
+        self.assertFalse(Response.objects.filter(is_complete=True, submitted_at__isnull=True).exists())
+        required = Question.objects.filter(is_required=True).count() // SIZES['surveys']
+        for response in Response.objects.filter(is_complete=True).annotate(answered=Count('items')):
+            self.assertGreaterEqual(response.answered, required)
+        self.assertFalse(QuestionOption.objects.values('question').annotate(total=Count('id'))
+                         .exclude(total=4).exists())
+
+    def test_same_seed_same_data(self):
+        try:
+            with transaction.atomic():
+                self.generate()
+                first = self.snapshot()
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.generate(batch_size=7)
+        self.assertEqual(self.snapshot(), first)
+        self.assertNotEqual(first, [])
+
+    def test_seeds_do_not_collide(self):
+        self.generate(seed=1)
+        self.generate(seed=2)
+        self.assertEqual(Survey.objects.count(), 4)
+
+    def test_packed_answers_match_items(self):
+        self.generate(pack=True)
+        completed = Response.objects.filter(is_complete=True)
+        self.assertTrue(completed.exists())
+        self.assertFalse(Response.objects.filter(is_complete=False, packed_answers__isnull=False).exists())
+
+        for response in completed:
+            packed = response.get_answers()
+            response.packed_answers = None
+            self.assertEqual(packed, response.get_answers())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('generate_synthetic_data', '--seed', '3', '--departments', '1', '--staff', '1',
+                     '--patients', '2', '--surveys', '1', '--questions', '4', '--responses', '5', stdout=out)
+        self.assertIn('5 responses', out.getvalue())
+        self.assertIn('(user prefix syn3-)', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('generate_synthetic_data', '--patients', '0', stdout=StringIO())
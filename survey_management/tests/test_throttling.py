@@ -0,0 +1,83 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from survey_management.throttling import CacheBucketStore, LocalBucketStore
+from survey_management.tests.base import SurveyTestCase
+
+DEFINITION_LIMITS = {
+    'BACKEND': 'local',
+    'RATES': {
+        'surveys.definition': {'rate': 0.001, 'burst': 2,
+                               'roles': {'ADMIN': {'rate': 0.001, 'burst': 4}}},
+    },
+}
+
+
+@override_settings(SURVEY_THROTTLES=DEFINITION_LIMITS)
+class ThrottleTests(SurveyTestCase):
+    """
+    Each client gets its own bucket per throttled action, sized by its role
+    """
+
+    def setUp(self):
+        super().setUp()
+        store = mock.patch('survey_management.throttling._store', None)
+        store.start()
+        self.addCleanup(store.stop)
+
+    def definition(self, user, expected=200):
+        return self.request(user, 'get', f'/api/surveys/{self.survey.id}/definition/', expected=expected)
+
+    def test_burst_then_429(self):
+        self.definition(self.patient)
+        self.definition(self.patient)
+        response = self.definition(self.patient, expected=429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+        # Other clients and other actions have their own buckets
+        self.definition(self.staff)
+        self.request(self.patient, 'get', f'/api/surveys/{self.survey.id}/')
+
+    def test_role_rates(self):
+        for _ in range(4):
+            self.definition(self.admin)
+        self.definition(self.admin, expected=429)
+
+    def test_unthrottled_actions(self):
+        for _ in range(5):
+            self.request(self.patient, 'get', f'/api/surveys/{self.survey.id}/')
+
+
+class BucketStoreTests(SimpleTestCase):
+    """
+    Buckets refill at their rate up to their burst, locally and in the shared cache
+    """
+
+    def test_local_refill(self):
+        store = LocalBucketStore()
+        with mock.patch('survey_management.ratelimit.time.monotonic', return_value=100.0) as clock:
+            self.assertEqual([store.consume('client', 0.5, 2)[0] for _ in range(3)], [True, True, False])
+            self.assertEqual(store.consume('client', 0.5, 2), (False, 2.0))
+
+            clock.return_value = 102.0
+            self.assertEqual(store.consume('client', 0.5, 2), (True, 0.0))
+            self.assertFalse(store.consume('client', 0.5, 2)[0])
+
+            # A changed rule starts a new, full bucket
+            self.assertTrue(store.consume('client', 1, 5)[0])
+
+    def test_local_buckets_bounded(self):
+        store = LocalBucketStore(max_buckets=2)
+        for client in ('a', 'b', 'c'):
+            store.consume(client, 1, 1)
+        self.assertEqual([bucket['key'] for bucket in store.snapshot()], ['b', 'c'])
+
+    def test_cache_refill(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        store = CacheBucketStore()
+        with mock.patch('survey_management.throttling.time.time', return_value=100.0) as clock:
+            self.assertEqual([store.consume('client', 0.5, 2)[0] for _ in range(3)], [True, True, False])
+            clock.return_value = 102.0
+            self.assertEqual(store.consume('client', 0.5, 2), (True, 0.0))
+            self.assertEqual(store.consume('client', 0, 2)[1], float('inf'))
@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+from survey_management.ratelimit import TokenBucket
+
+DEFAULT_THROTTLES = {
+    # 'local' keeps buckets in this process, 'cache' shares them through a Django cache
+    'BACKEND': 'local',
+    'CACHE_ALIAS': 'default',
+    # Most buckets tracked by the local backend before the least recently used are dropped
+    'MAX_BUCKETS': 10000,
+    # '<throttle_scope>.<action>': {'rate': tokens per second, 'burst': bucket size,
+    #                               'roles': {ROLE: {'rate': ..., 'burst': ...}}}
+    'RATES': {},
+}
+
+
+def get_throttle_config():
+    config = dict(DEFAULT_THROTTLES)
+    config.update(getattr(settings, 'SURVEY_THROTTLES', {}))
+    return config
+
+
+class LocalBucketStore:
+    """In-process token buckets, bounded with LRU eviction"""
+
+    def __init__(self, max_buckets=10000):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst):
+        """Take one token, returning (allowed, seconds until a token is available)"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.rate != rate or bucket.capacity != burst:
+                bucket = TokenBucket(rate, burst)
+                self._buckets[key] = bucket
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return bucket.try_consume()
+
+    def snapshot(self):
+        """Current state of every bucket, refilled to now"""
+        with self._lock:
+            buckets = list(self._buckets.items())
+        now = time.monotonic()
+        return [{
+            'key': key,
+            'rate': bucket.rate,
+            'burst': bucket.capacity,
+            'tokens': round(min(bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate), 3),
+        } for key, bucket in buckets]
+
+
+class CacheBucketStore:
+    """
+    Token buckets kept in a shared Django cache so limits hold across processes
+
+    Updates are read-modify-write without a lock, so concurrent requests
+    from the same client can occasionally get an extra token.
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def consume(self, key, rate, burst):
+        cache_key = f"survey:throttle:{key}"
+        now = time.time()
+        tokens, updated = self.cache.get(cache_key, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Keep the entry until the bucket would be full again
+        self.cache.set(cache_key, (tokens, now), int((burst - tokens) / rate) + 1 if rate > 0 else None)
+
+        if allowed:
+            return True, 0.0
+        if rate <= 0:
+            return False, float('inf')
+        return False, (1 - tokens) / rate
+
+    def snapshot(self):
+        # Cache backends cannot be enumerated
+        return []
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    """Return the process-wide bucket store configured by SURVEY_THROTTLES"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = get_throttle_config()
+                if config['BACKEND'] == 'cache':
+                    _store = CacheBucketStore(config['CACHE_ALIAS'])
+                else:
+                    _store = LocalBucketStore(config['MAX_BUCKETS'])
+    return _store
+
+
+class ActionTokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle configured per viewset action
+
+    The view's ``throttle_scope`` and action select an entry in
+    SURVEY_THROTTLES['RATES']; actions without an entry are not throttled.
+    Clients are identified by API key, then user, then address, and a rule
+    may give each role its own rate.
+    """
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_rule(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return None, None
+        rule_name = f"{scope}.{getattr(view, 'action', None)}"
+        rule = get_throttle_config()['RATES'].get(rule_name)
+        if rule is None:
+            return None, None
+
+        if request.user and request.user.is_authenticated and rule.get('roles'):
+            from survey_management.permissions.context import get_auth_context
+            rule = rule['roles'].get(get_auth_context(request).role, rule)
+        return rule_name, rule
+
+    def get_ident(self, request):
+        from survey_management.authentication import APIKeyAuthentication
+        if isinstance(request.successful_authenticator, APIKeyAuthentication):
+            return f"key:{request.auth}"
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{super().get_ident(request)}"
+
+    def allow_request(self, request, view):
+        rule_name, rule = self.get_rule(request, view)
+        if rule is None:
+            return True
+
+        rate = float(rule['rate'])
+        burst = float(rule.get('burst', max(rate, 1)))
+        key = f"{rule_name}:{self.get_ident(request)}"
+
+        allowed, self.retry_after = get_bucket_store().consume(key, rate, burst)
+        return allowed
+
+    def wait(self):
+        # A zero rate never refills; DRF omits Retry-After for None
+        if self.retry_after == float('inf'):
+            return None
+        return self.retry_after
@@ -1,10 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from survey_management.views.survey_views import SurveyViewSet, QuestionViewSet
+from survey_management.views.survey_views import (
+    SurveyViewSet, QuestionViewSet, AssignmentJobViewSet
+)
 from survey_management.views.response_views import ResponseViewSet, ResponseItemViewSet
 from survey_management.views.analytics_views import AnalyticsViewSet
 from survey_management.views.department_views import DepartmentViewSet
 from survey_management.views.schedule_views import SurveyScheduleViewSet
+from survey_management.views.event_views import EventViewSet
+from survey_management.views.reminder_views import ReminderPolicyViewSet
+from survey_management.views.audit_views import AuditLogViewSet
+from survey_management.views.throttle_views import ThrottleViewSet
+from survey_management.views.metrics_views import MetricsViewSet
+from survey_management.views.profiling_views import ProfileViewSet
+from survey_management.views.async_views import (
+    AsyncSubmitResponseView, AsyncSurveyDefinitionView, AsyncCompletionRatesView, AsyncRatingAveragesView,
+    AsyncResponseTrendsView, AsyncMultipleChoiceDistributionView
+)
 
 # Create a router and register our viewsets
 router = DefaultRouter()
@@ -15,16 +27,35 @@ router.register(r'response-items', ResponseItemViewSet)
 router.register(r'departments', DepartmentViewSet)
 router.register(r'schedules', SurveyScheduleViewSet)
 router.register(r'analytics', AnalyticsViewSet, basename='analytics')
+router.register(r'events', EventViewSet, basename='events')
+router.register(r'assignment-jobs', AssignmentJobViewSet)
+router.register(r'reminder-policies', ReminderPolicyViewSet)
+router.register(r'audit-logs', AuditLogViewSet, basename='audit-logs')
+router.register(r'throttles', ThrottleViewSet, basename='throttles')
+router.register(r'metrics', MetricsViewSet, basename='metrics')
+router.register(r'profiles', ProfileViewSet)
 
 # The API URLs are determined automatically by the router
 urlpatterns = [
     path('', include(router.urls)),
     path('auth/', include('rest_framework.urls')),
     # Custom endpoints
-    path('surveys/<int:survey_id>/export/', 
+    path('surveys/<int:pk>/export/', 
          SurveyViewSet.as_view({'get': 'export_responses'}), 
          name='survey-export'),
-    path('surveys/<int:survey_id>/assign/<int:user_id>/', 
+    path('surveys/<int:pk>/assign/<int:user_id>/', 
          SurveyViewSet.as_view({'post': 'assign_survey'}), 
          name='assign-survey'),
+    # Native async endpoints for ASGI deployments, answering like their viewset actions
+    path('async/responses/submit/', AsyncSubmitResponseView.as_view(), name='async-response-submit'),
+    path('async/surveys/<int:pk>/definition/', AsyncSurveyDefinitionView.as_view(),
+         name='async-survey-definition'),
+    path('async/analytics/completion_rates/', AsyncCompletionRatesView.as_view(),
+         name='async-analytics-completion-rates'),
+    path('async/analytics/rating_averages/', AsyncRatingAveragesView.as_view(),
+         name='async-analytics-rating-averages'),
+    path('async/analytics/response_trends/', AsyncResponseTrendsView.as_view(),
+         name='async-analytics-response-trends'),
+    path('async/analytics/<int:pk>/multiple_choice_distribution/', AsyncMultipleChoiceDistributionView.as_view(),
+         name='async-analytics-multiple-choice-distribution'),
 ]
@@ -1,5 +1,8 @@
+from collections import Counter
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from django.db.models import Avg, Count, F, Q
 from django.utils import timezone
@@ -7,112 +10,118 @@ from datetime import timedelta
 from survey_management.models.survey import Survey
 from survey_management.models.response import ResponseItem
 from survey_management.permissions.rbac import HasAnalyticsPermission
+from survey_management.permissions.context import get_auth_context
+from survey_management.services.analytics_service import AnalyticsService, packed_values, rating_summaries
+from survey_management.db_router import ReadReplicaMixin
+from survey_management.conditional import conditional, analytics_validators
+from survey_management.live import EventStreamRenderer, EventStreamResponse, live_counters
 
-class AnalyticsViewSet(viewsets.ViewSet):
+def trend_days(request):
+    """The days query parameter of the response trends, 30 by default"""
+    try:
+        days = int(request.query_params.get('days', 30))
+    except ValueError:
+        raise ValidationError({'days': 'Must be an integer'})
+    if days < 1:
+        raise ValidationError({'days': 'Must be at least 1'})
+    return days
+
+def rating_average_rows(rating_questions, summaries):
+    """Average rating of every rating question that has answers"""
+    data = []
+    for question in rating_questions:
+        stats = summaries.get(question.id)
+        
+        if stats is not None:
+            data.append({
+                'survey_id': question.survey.id,
+                'survey_title': question.survey.title,
+                'question_id': question.id,
+                'question_text': question.text,
+                'average_rating': stats['average'],
+                'min_rating': question.min_rating,
+                'max_rating': question.max_rating
+            })
+    return data
+
+def selected_option_counts(multiple_choice_questions):
+    """(option ID, count) rows of the answers with item rows to the questions, in one grouped query"""
+    return ResponseItem.objects.filter(
+        question_id__in=[question.id for question in multiple_choice_questions],
+        selected_option__isnull=False
+    ).order_by().values('selected_option_id').annotate(count=Count('id')).values_list(
+        'selected_option_id', 'count'
+    )
+
+def option_distribution(multiple_choice_questions, item_counts, packed_options):
+    """Answers per option of each question, from item rows and packed answers"""
+    data = []
+    for question in multiple_choice_questions:
+        # Get distribution of selected options
+        options = question.options.all()
+        packed_counts = Counter(packed_options.get(question.id, ()))
+        option_counts = []
+        
+        for option in options:
+            count = item_counts.get(option.id, 0) + packed_counts[option.id]
+            
+            option_counts.append({
+                'option_id': option.id,
+                'option_text': option.text,
+                'count': count
+            })
+        
+        data.append({
+            'question_id': question.id,
+            'question_text': question.text,
+            'options': option_counts
+        })
+    return data
+
+class AnalyticsViewSet(ReadReplicaMixin, viewsets.ViewSet):
     """
     ViewSet for survey analytics
     """
     permission_classes = [permissions.IsAuthenticated, HasAnalyticsPermission]
+    replica_actions = ('completion_rates', 'rating_averages', 'response_trends', 'multiple_choice_distribution')
     
     @action(detail=False, methods=['get'])
+    @conditional(analytics_validators)
     def completion_rates(self, request):
         """Get completion rates for all surveys"""
-        surveys = Survey.objects.all()
-        
-        # Filter by department if staff user
-        if request.user.profile.role == 'STAFF' and request.user.profile.department:
-            surveys = surveys.filter(departments=request.user.profile.department)
-        
-        data = []
-        for survey in surveys:
-            total_responses = survey.responses.count()
-            completed_responses = survey.responses.filter(is_complete=True).count()
-            
-            completion_rate = 0
-            if total_responses > 0:
-                completion_rate = (completed_responses / total_responses) * 100
-            
-            data.append({
-                'survey_id': survey.id,
-                'survey_title': survey.title,
-                'total_responses': total_responses,
-                'completed_responses': completed_responses,
-                'completion_rate': completion_rate
-            })
+        data = AnalyticsService().get_survey_completion_stats(user=get_auth_context(request))
         
         return Response(data)
     
     @action(detail=False, methods=['get'])
+    @conditional(analytics_validators)
     def rating_averages(self, request):
         """Get average ratings for all surveys with rating questions"""
         # Get all rating questions
         from survey_management.models.survey import Question
-        rating_questions = Question.objects.filter(question_type='RATING')
-        
-        # Filter by department if staff user
-        if request.user.profile.role == 'STAFF' and request.user.profile.department:
-            rating_questions = rating_questions.filter(
-                survey__departments=request.user.profile.department
-            )
-        
-        data = []
-        for question in rating_questions:
-            # Calculate average rating
-            avg_rating = ResponseItem.objects.filter(
-                question=question,
-                numeric_answer__isnull=False
-            ).aggregate(avg=Avg('numeric_answer'))['avg']
-            
-            if avg_rating is not None:
-                data.append({
-                    'survey_id': question.survey.id,
-                    'survey_title': question.survey.title,
-                    'question_id': question.id,
-                    'question_text': question.text,
-                    'average_rating': avg_rating,
-                    'min_rating': question.min_rating,
-                    'max_rating': question.max_rating
-                })
+        rating_questions = list(Question.objects.filter(question_type='RATING').visible_to(
+            get_auth_context(request)
+        ).select_related('survey'))
+        packed_ratings = packed_values({question.survey_id for question in rating_questions}, 'n')
         
-        return Response(data)
+        # Calculate average ratings over item rows and packed answers
+        summaries = rating_summaries(rating_questions, packed_ratings)
+        
+        return Response(rating_average_rows(rating_questions, summaries))
     
     @action(detail=False, methods=['get'])
+    @conditional(analytics_validators)
     def response_trends(self, request):
         """Get response trends over time"""
         # Get date range from query params (default to last 30 days)
-        days = int(request.query_params.get('days', 30))
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # Get all responses in the date range
-        from survey_management.models.response import Response as SurveyResponse
-        responses = SurveyResponse.objects.filter(
-            submitted_at__gte=start_date,
-            submitted_at__lte=end_date
-        )
+        days = trend_days(request)
         
-        # Filter by department if staff user
-        if request.user.profile.role == 'STAFF' and request.user.profile.department:
-            responses = responses.filter(
-                survey__departments=request.user.profile.department
-            )
-        
-        # Group by day and count
-        from django.db.models.functions import TruncDay
-        daily_counts = responses.annotate(
-            day=TruncDay('submitted_at')
-        ).values('day').annotate(
-            count=Count('id')
-        ).order_by('day')
-        
-        data = [{
-            'date': item['day'].strftime('%Y-%m-%d'),
-            'response_count': item['count']
-        } for item in daily_counts]
+        data = AnalyticsService().get_response_trend_data(days=days, user=get_auth_context(request))
         
         return Response(data)
     
     @action(detail=True, methods=['get'])
+    @conditional(analytics_validators)
     def multiple_choice_distribution(self, request, pk=None):
         """Get distribution of answers for multiple choice questions in a survey"""
         try:
@@ -121,36 +130,41 @@ class AnalyticsViewSet(viewsets.ViewSet):
             return Response({'detail': 'Survey not found'}, status=404)
         
         # Check department access for staff
-        if (request.user.profile.role == 'STAFF' and 
-            request.user.profile.department and 
-            request.user.profile.department not in survey.departments.all()):
+        if not get_auth_context(request).can_view_survey(survey.pk):
             return Response({'detail': 'Access denied'}, status=403)
         
         # Get all multiple choice questions for this survey
-        multiple_choice_questions = survey.questions.filter(question_type='MULTIPLE_CHOICE')
+        multiple_choice_questions = list(
+            survey.questions.filter(question_type='MULTIPLE_CHOICE').prefetch_related('options')
+        )
         
-        data = []
-        for question in multiple_choice_questions:
-            # Get distribution of selected options
-            options = question.options.all()
-            option_counts = []
-            
-            for option in options:
-                count = ResponseItem.objects.filter(
-                    question=question,
-                    selected_option=option
-                ).count()
-                
-                option_counts.append({
-                    'option_id': option.id,
-                    'option_text': option.text,
-                    'count': count
-                })
-            
-            data.append({
-                'question_id': question.id,
-                'question_text': question.text,
-                'options': option_counts
-            })
+        packed_options = packed_values([survey.pk], 'o')
         
-        return Response(data)
+        # Count the selected options of every question in one grouped query
+        item_counts = dict(selected_option_counts(multiple_choice_questions))
+        
+        return Response(option_distribution(multiple_choice_questions, item_counts, packed_options))
+    
+    @action(detail=False, methods=['get'], renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def live(self, request):
+        """
+        Stream response counters of the visible surveys as Server-Sent Events
+        
+        Every survey (or those in the comma-separated surveys parameter) is
+        sent on connect and again whenever one of its responses is created
+        or completed. Counters are kept in memory, so events cost no queries.
+        """
+        surveys = Survey.objects.visible_to(get_auth_context(request))
+        requested = request.query_params.get('surveys')
+        if requested:
+            try:
+                surveys = surveys.filter(pk__in=[int(survey_id) for survey_id in requested.split(',')])
+            except ValueError:
+                return Response({'detail': 'surveys must be a comma-separated list of survey IDs'}, status=400)
+        
+        if live_counters.is_full():
+            return Response({'detail': 'Too many open live streams, retry later'}, status=503)
+        
+        survey_ids = list(surveys.values_list('id', flat=True))
+        live_counters.seed(survey_ids)
+        return EventStreamResponse(survey_ids)
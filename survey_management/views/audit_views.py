@@ -0,0 +1,55 @@
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response as DRF_Response
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+from survey_management.models.audit import AuditLog
+from survey_management.permissions.rbac import HasAuditPermission
+from survey_management.services.audit_archive import search_audit_logs
+
+MAX_SEARCH_LIMIT = 1000
+
+class AuditLogViewSet(viewsets.ViewSet):
+    """
+    ViewSet for searching audit entries in the database and the archive
+    """
+    permission_classes = [permissions.IsAuthenticated, HasAuditPermission]
+    
+    def _parse_time(self, value):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(value)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Search audit entries by user, action, time range and text"""
+        params = request.query_params
+        
+        action_type = params.get('action')
+        if action_type and action_type not in dict(AuditLog.ACTION_TYPES):
+            return DRF_Response({"detail": f"Unknown action: {action_type}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            user_id = int(params['user']) if params.get('user') else None
+            limit = int(params.get('limit', 100))
+            start = self._parse_time(params.get('start'))
+            end = self._parse_time(params.get('end'))
+        except ValueError:
+            return DRF_Response({"detail": "Invalid user, limit, start or end parameter"},
+                                status=status.HTTP_400_BAD_REQUEST)
+        
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            return DRF_Response({"detail": f"limit must be between 1 and {MAX_SEARCH_LIMIT}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+        
+        results = search_audit_logs(
+            user_id=user_id, action=action_type, start=start, end=end,
+            text=params.get('q'), limit=limit
+        )
+        return DRF_Response(results)
@@ -1,10 +1,30 @@
+from django.db.models import Count
 from rest_framework import viewsets, permissions
+from rest_framework.response import Response as DRF_Response
 from survey_management.models.department import Department
 from survey_management.serializers.department_serializers import DepartmentSerializer
 from survey_management.permissions.rbac import IsAdminOrReadOnly
+from survey_management.caching import get_department_list
+from survey_management.conditional import conditional, department_validators
 
 class DepartmentViewSet(viewsets.ModelViewSet):
-    queryset = Department.objects.all()
+    queryset = Department.objects.annotate(staff_total=Count('staff'))
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
     search_fields = ['name', 'description']
+    
+    @conditional(department_validators)
+    def list(self, request, *args, **kwargs):
+        # The unfiltered list is served from the department cache
+        if request.query_params.keys() - {'page'}:
+            return super().list(request, *args, **kwargs)
+        
+        departments = get_department_list()
+        page = self.paginate_queryset(departments)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return DRF_Response(departments)
+    
+    @conditional(department_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,27 @@
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response as DRF_Response
+from survey_management.serializers.event_serializers import EventBatchSerializer
+from survey_management.services.event_service import EventIngestionService
+from survey_management.permissions.rbac import HasEventIngestionPermission
+from survey_management.throttling import ActionTokenBucketThrottle
+
+class EventViewSet(viewsets.ViewSet):
+    """
+    ViewSet for ingesting trigger events from external systems (EHR, scheduling)
+    """
+    permission_classes = [permissions.IsAuthenticated, HasEventIngestionPermission]
+    throttle_classes = [ActionTokenBucketThrottle]
+    throttle_scope = 'events'
+    
+    @action(detail=False, methods=['post'])
+    def ingest(self, request):
+        """Match a batch of trigger events against active schedules"""
+        serializer = EventBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return DRF_Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        service = EventIngestionService()
+        results = service.ingest(serializer.validated_data['events'])
+        
+        return DRF_Response(results, status=status.HTTP_202_ACCEPTED)
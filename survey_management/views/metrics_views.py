@@ -0,0 +1,16 @@
+from django.http import HttpResponse
+from rest_framework import viewsets, permissions
+from survey_management.permissions.rbac import HasMonitoringPermission
+from survey_management.metrics import registry
+from survey_management.services.audit_writer import get_audit_writer
+
+class MetricsViewSet(viewsets.ViewSet):
+    """
+    ViewSet exposing per-route request metrics in Prometheus text format
+    """
+    permission_classes = [permissions.IsAuthenticated, HasMonitoringPermission]
+    
+    def list(self, request):
+        """Latency, query-count and size histograms, status counts and audit buffer state of this process"""
+        body = registry.render() + get_audit_writer().render_metrics()
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,34 @@
+from django.http import HttpResponse
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from survey_management.models.profiling import RequestProfile
+from survey_management.permissions.rbac import HasMonitoringPermission
+from survey_management.serializers.profiling_serializers import (
+    RequestProfileListSerializer, RequestProfileSerializer
+)
+
+class ProfileViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for listing stored request profiles and downloading their stacks
+    """
+    queryset = RequestProfile.objects.select_related('user').defer('collapsed_stacks', 'queries')
+    permission_classes = [permissions.IsAuthenticated, HasMonitoringPermission]
+    filterset_fields = ['route', 'method', 'trigger', 'status_code']
+    
+    def get_queryset(self):
+        if self.action == 'list':
+            return self.queryset
+        return RequestProfile.objects.select_related('user')
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return RequestProfileListSerializer
+        return RequestProfileSerializer
+    
+    @action(detail=True, methods=['get'])
+    def collapsed(self, request, pk=None):
+        """Download the collapsed stacks, ready for flamegraph.pl or speedscope"""
+        profile = self.get_object()
+        response = HttpResponse(profile.collapsed_stacks, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.collapsed"'
+        return response
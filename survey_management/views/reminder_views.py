@@ -0,0 +1,10 @@
+from rest_framework import viewsets, permissions
+from survey_management.models.reminder import ReminderPolicy
+from survey_management.serializers.reminder_serializers import ReminderPolicySerializer
+from survey_management.permissions.rbac import IsAdminOrReadOnly
+
+class ReminderPolicyViewSet(viewsets.ModelViewSet):
+    queryset = ReminderPolicy.objects.all()
+    serializer_class = ReminderPolicySerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
+    filterset_fields = ['survey', 'schedule', 'is_active']
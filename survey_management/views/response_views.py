@@ -1,44 +1,39 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response as DRF_Response
-from django.utils import timezone
+from rest_framework.settings import api_settings
+from django.db.models import Prefetch
 from survey_management.models.response import Response, ResponseItem
-from survey_management.models.survey import Survey, Question, QuestionOption
+from survey_management.models.survey import Survey
 from survey_management.serializers.response_serializers import (
-    ResponseSerializer, ResponseItemSerializer, SubmitResponseSerializer
+    ResponseSerializer, ResponseItemSerializer, SubmitResponseSerializer, DraftSerializer,
+    DraftAnswersSerializer, check_draft_answers, check_draft_complete
 )
 from survey_management.permissions.rbac import HasResponsePermission
+from survey_management.permissions.context import get_auth_context
+from survey_management.throttling import ActionTokenBucketThrottle
+from survey_management.db_router import ReadReplicaMixin
+from survey_management.services.audit_writer import log_audit
+from survey_management.services.response_submission import open_response, save_answers, complete_response
+from survey_management.caching import bump_response_versions, get_survey_definition
 
-class ResponseViewSet(viewsets.ModelViewSet):
+class ResponseViewSet(ReadReplicaMixin, viewsets.ModelViewSet):
     queryset = Response.objects.all()
     serializer_class = ResponseSerializer
     permission_classes = [permissions.IsAuthenticated, HasResponsePermission]
+    throttle_classes = [ActionTokenBucketThrottle]
+    throttle_scope = 'responses'
     filterset_fields = ['survey', 'respondent', 'is_complete']
     
     def get_queryset(self):
         """Filter responses based on user role"""
-        user = self.request.user
-        
-        # Superusers can see all responses
-        if user.is_superuser:
-            return Response.objects.all()
-        
-        # Patients can only see their own responses
-        if hasattr(user, 'profile') and user.profile.role == 'PATIENT':
-            return Response.objects.filter(respondent=user)
-        
-        # Staff can see responses for their department
-        elif hasattr(user, 'profile') and user.profile.role == 'STAFF' and user.profile.department:
-            return Response.objects.filter(
-                survey__departments=user.profile.department
-            )
-        
-        # Admins can see all responses
-        elif hasattr(user, 'profile') and user.profile.role == 'ADMIN':
-            return Response.objects.all()
-        
-        # Default case
-        return Response.objects.none()
+        # Packed responses are serialized without their item rows
+        return Response.objects.visible_to(get_auth_context(self.request)).select_related(
+            'survey', 'respondent'
+        ).prefetch_related(Prefetch('items', queryset=ResponseItem.objects.filter(
+            response__packed_answers__isnull=True
+        ).select_related('question', 'selected_option').order_by('id')))
     
     @action(detail=False, methods=['post'])
     def submit(self, request):
@@ -64,61 +59,20 @@ class ResponseViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_404_NOT_FOUND
                     )
                 
-                response, created = Response.objects.get_or_create(
-                    survey=survey,
-                    respondent=request.user,
-                    is_complete=False,
-                    defaults={'started_at': timezone.now()}
-                )
+                response, created = open_response(survey.pk, request.user)
                 
                 # Process each answer
-                for answer_data in answers:
-                    question_id = int(answer_data.get('question_id', 0))
-                    if not question_id:
-                        continue
-                        
-                    try:
-                        question = Question.objects.get(pk=question_id)
-                    except Question.DoesNotExist:
-                        continue
-                    
-                    # Create or update response item based on question type
-                    response_item, _ = ResponseItem.objects.get_or_create(
-                        response=response,
-                        question=question
-                    )
-                    
-                    if question.question_type == 'TEXT':
-                        response_item.text_answer = answer_data.get('text_answer', '')
-                    
-                    elif question.question_type == 'MULTIPLE_CHOICE':
-                        option_id = answer_data.get('option_id')
-                        if option_id:
-                            try:
-                                option = QuestionOption.objects.get(pk=int(option_id))
-                                response_item.selected_option = option
-                            except QuestionOption.DoesNotExist:
-                                pass
-                    
-                    elif question.question_type in ['RATING', 'BOOLEAN']:
-                        try:
-                            response_item.numeric_answer = int(answer_data.get('numeric_answer', 0))
-                        except (ValueError, TypeError):
-                            response_item.numeric_answer = None
-                    
-                    response_item.save()
+                save_answers(response, answers)
                 
                 # Mark response as complete
-                response.is_complete = True
-                response.submitted_at = timezone.now()
-                response.save()
+                complete_response(response)
                 
                 # Log the submission
-                from survey_management.models.audit import AuditLog
-                AuditLog.objects.create(
-                    user=request.user,
-                    action='CREATE',
-                    details=f"Submitted response for survey: {survey.title}"
+                log_audit(
+                    request.user,
+                    'CREATE',
+                    f"Submitted response for survey: {survey.title}",
+                    request=request
                 )
                 
                 return DRF_Response({
@@ -141,51 +95,20 @@ class ResponseViewSet(viewsets.ModelViewSet):
             
             # Get or create response object
             survey = Survey.objects.get(pk=survey_id)
-            response, created = Response.objects.get_or_create(
-                survey=survey,
-                respondent=request.user,
-                is_complete=False,
-                defaults={'started_at': timezone.now()}
-            )
+            response, created = open_response(survey.pk, request.user)
             
             # Process each answer
-            for answer_data in answers:
-                question_id = int(answer_data['question_id'])
-                question = Question.objects.get(pk=question_id)
-                
-                # Create or update response item based on question type
-                response_item, _ = ResponseItem.objects.get_or_create(
-                    response=response,
-                    question=question
-                )
-                
-                if question.question_type == 'TEXT':
-                    response_item.text_answer = answer_data.get('text_answer', '')
-                
-                elif question.question_type == 'MULTIPLE_CHOICE':
-                    option_id = answer_data.get('option_id')
-                    if option_id:
-                        response_item.selected_option = QuestionOption.objects.get(pk=int(option_id))
-                
-                elif question.question_type in ['RATING', 'BOOLEAN']:
-                    try:
-                        response_item.numeric_answer = int(answer_data.get('numeric_answer', 0))
-                    except (ValueError, TypeError):
-                        response_item.numeric_answer = None
-                
-                response_item.save()
+            save_answers(response, answers)
             
             # Mark response as complete
-            response.is_complete = True
-            response.submitted_at = timezone.now()
-            response.save()
+            complete_response(response)
             
             # Log the submission
-            from survey_management.models.audit import AuditLog
-            AuditLog.objects.create(
-                user=request.user,
-                action='CREATE',
-                details=f"Submitted response for survey: {survey.title}"
+            log_audit(
+                request.user,
+                'CREATE',
+                f"Submitted response for survey: {survey.title}",
+                request=request
             )
             
             return DRF_Response({
@@ -194,9 +117,92 @@ class ResponseViewSet(viewsets.ModelViewSet):
             })
         
         return DRF_Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['post'])
+    def draft(self, request):
+        """
+        Create or resume the user's open response to a survey
+        
+        Returns the draft with its answers so far, with 201 if it was created.
+        """
+        serializer = DraftSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        survey_id = serializer.validated_data['survey_id']
+        
+        definition = get_survey_definition(survey_id)
+        if definition is None or not definition['is_active']:
+            return DRF_Response({'survey_id': ["Survey does not exist or is not active"]},
+                                status=status.HTTP_400_BAD_REQUEST)
+        
+        response, created = open_response(survey_id, request.user)
+        response = self.get_queryset().get(pk=response.pk)
+        return DRF_Response(self.get_serializer(response).data,
+                            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+    
+    @action(detail=True, methods=['patch'])
+    def answers(self, request, pk=None):
+        """
+        Save answers to a draft
+        
+        Only the questions listed are touched, and of those only answers that
+        changed are written, so clients can autosave after every edit.
+        """
+        response = self.get_draft()
+        serializer = DraftAnswersSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        answers = serializer.validated_data['answers']
+        
+        try:
+            check_draft_answers(answers, get_survey_definition(response.survey_id))
+        except ValidationError as error:
+            return DRF_Response({api_settings.NON_FIELD_ERRORS_KEY: error.detail},
+                                status=status.HTTP_400_BAD_REQUEST)
+        
+        saved = save_answers(response, answers)
+        if saved:
+            # Bulk writes send no ResponseItem signals
+            bump_response_versions(response.survey_id)
+        
+        return DRF_Response({'response_id': response.id, 'saved': saved})
+    
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """Submit a draft once its saved answers cover every required question"""
+        response = self.get_draft()
+        items = list(response.items.all())
+        
+        try:
+            check_draft_complete(items, get_survey_definition(response.survey_id))
+        except ValidationError as error:
+            return DRF_Response({api_settings.NON_FIELD_ERRORS_KEY: error.detail},
+                                status=status.HTTP_400_BAD_REQUEST)
+        
+        # The items are final as saved; completing only writes the response row
+        complete_response(response, items)
+        
+        log_audit(
+            request.user,
+            'CREATE',
+            f"Submitted response for survey: {response.survey.title}",
+            request=request
+        )
+        
+        return DRF_Response({
+            "detail": "Survey response submitted successfully",
+            "response_id": response.id
+        })
+    
+    def get_draft(self):
+        """The open response of the URL, which only its respondent may change"""
+        response = self.get_object()
+        if response.respondent_id != self.request.user.pk:
+            raise PermissionDenied("Only the respondent can change a draft")
+        if response.is_complete:
+            raise ValidationError({'detail': "Response has already been submitted"})
+        return response
 
 
-class ResponseItemViewSet(viewsets.ModelViewSet):
+class ResponseItemViewSet(ReadReplicaMixin, viewsets.ModelViewSet):
     queryset = ResponseItem.objects.all()
     serializer_class = ResponseItemSerializer
     permission_classes = [permissions.IsAuthenticated, HasResponsePermission]
@@ -204,25 +210,12 @@ class ResponseItemViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter response items based on user role"""
-        user = self.request.user
-        
-        # Superusers can see all response items
-        if user.is_superuser:
-            return ResponseItem.objects.all()
-        
-        # Patients can only see their own response items
-        if hasattr(user, 'profile') and user.profile.role == 'PATIENT':
-            return ResponseItem.objects.filter(response__respondent=user)
-        
-        # Staff can see response items for their department
-        elif hasattr(user, 'profile') and user.profile.role == 'STAFF' and user.profile.department:
-            return ResponseItem.objects.filter(
-                response__survey__departments=user.profile.department
-            )
-        
-        # Admins can see all response items
-        elif hasattr(user, 'profile') and user.profile.role == 'ADMIN':
-            return ResponseItem.objects.all()
-        
-        # Default case
-        return ResponseItem.objects.none()
\ No newline at end of file
+        return ResponseItem.objects.visible_to(get_auth_context(self.request)).select_related(
+            'response', 'question', 'selected_option'
+        )
+    
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        # Stop readers from using the packed copy of the deleted answer
+        Response.objects.filter(pk=instance.response_id, packed_answers__isnull=False).update(packed_answers=None)
+        bump_response_versions(instance.response.survey_id)
\ No newline at end of file
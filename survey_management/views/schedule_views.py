@@ -4,11 +4,15 @@ from rest_framework.response import Response as DRF_Response
 from survey_management.models.schedule import SurveySchedule
 from survey_management.serializers.schedule_serializers import SurveyScheduleSerializer
 from survey_management.permissions.rbac import IsAdminOrReadOnly
+from survey_management.permissions.context import get_auth_context
+from survey_management.throttling import ActionTokenBucketThrottle
 
 class SurveyScheduleViewSet(viewsets.ModelViewSet):
-    queryset = SurveySchedule.objects.all()
+    queryset = SurveySchedule.objects.select_related('survey')
     serializer_class = SurveyScheduleSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
+    throttle_classes = [ActionTokenBucketThrottle]
+    throttle_scope = 'schedules'
     filterset_fields = ['survey', 'trigger_event', 'is_active']
     
     @action(detail=True, methods=['post'])
@@ -17,7 +21,7 @@ class SurveyScheduleViewSet(viewsets.ModelViewSet):
         schedule = self.get_object()
         
         # Check if user has permission to trigger surveys
-        if not request.user.profile.has_permission('assign_survey'):
+        if not get_auth_context(request).has_permission('assign_survey'):
             return DRF_Response(
                 {"detail": "You do not have permission to trigger surveys."},
                 status=status.HTTP_403_FORBIDDEN
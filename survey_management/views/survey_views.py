@@ -1,40 +1,97 @@
 import csv
 import json
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response as DRF_Response
-from survey_management.models.survey import Survey, Question
-from survey_management.models.response import Response
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from survey_management.models.survey import Survey, Question, QuestionOption
+from survey_management.models.response import Response, ResponseItem, answer_display
+from survey_management.models.assignment import AssignmentJob
 from survey_management.serializers.survey_serializers import (
     SurveySerializer, QuestionSerializer
 )
-from survey_management.permissions.rbac import IsAdminOrReadOnly, HasSurveyPermission
+from survey_management.serializers.assignment_serializers import (
+    BulkAssignmentSerializer, AssignmentJobSerializer
+)
+from survey_management.permissions.rbac import (
+    IsAdminOrReadOnly, HasSurveyPermission, HasAssignmentPermission
+)
+from survey_management.permissions.context import get_auth_context
+from survey_management.throttling import ActionTokenBucketThrottle
+from survey_management.db_router import ReadReplicaMixin
+from survey_management.services.audit_writer import log_audit
+from survey_management.caching import get_survey_definition
+from survey_management.conditional import (
+    conditional, survey_validators, survey_definition_validators, survey_list_validators,
+    question_validators
+)
 
-class SurveyViewSet(viewsets.ModelViewSet):
-    queryset = Survey.objects.all()
+class SurveyViewSet(ReadReplicaMixin, viewsets.ModelViewSet):
+    queryset = Survey.objects.select_related('created_by').prefetch_related('departments', 'questions__options')
     serializer_class = SurveySerializer
     permission_classes = [permissions.IsAuthenticated, HasSurveyPermission]
+    throttle_classes = [ActionTokenBucketThrottle]
+    throttle_scope = 'surveys'
+    replica_actions = ('list', 'export_responses')
     filterset_fields = ['is_active', 'departments']
     search_fields = ['title', 'description']
     
+    def get_queryset(self):
+        """Filter surveys based on user role"""
+        return super().get_queryset().visible_to(get_auth_context(self.request))
+    
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        # Saving drops the prefetched questions; reload them for the response body
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+    
+    @conditional(survey_list_validators)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional(survey_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
+    @action(detail=True, methods=['get'])
+    @conditional(survey_definition_validators)
+    def definition(self, request, pk=None):
+        """Questions and options of a survey, served from the survey definition cache"""
+        try:
+            survey_id = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        
+        # Checked against the cached authorization context, not the survey row
+        if not get_auth_context(request).can_view_survey(survey_id):
+            return DRF_Response({'detail': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        data = get_survey_definition(survey_id)
+        if data is None:
+            raise Http404
+        return DRF_Response(data)
+    
     @action(detail=True, methods=['get'])
     def export_responses(self, request, pk=None):
         """Export all responses for a survey as CSV"""
         survey = self.get_object()
         
         # Check if user has permission to export
-        if not request.user.profile.has_permission('export_data'):
+        if not get_auth_context(request).has_permission('export_data'):
             return DRF_Response(
                 {"detail": "You do not have permission to export data."},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Get all responses for this survey
-        responses = Response.objects.filter(survey=survey)
+        # Get all responses for this survey; packed responses need no item rows
+        responses = Response.objects.filter(survey=survey).select_related('respondent').prefetch_related(
+            Prefetch('items', queryset=ResponseItem.objects.filter(response__packed_answers__isnull=True))
+        )
         
         # Create CSV response
         response = HttpResponse(content_type='text/csv')
@@ -44,6 +101,7 @@ class SurveyViewSet(viewsets.ModelViewSet):
         
         # Write header row with question texts
         questions = survey.questions.all().order_by('order')
+        option_texts = dict(QuestionOption.objects.filter(question__survey=survey).values_list('id', 'text'))
         header = ['Respondent', 'Submitted At', 'Complete']
         header.extend([q.text for q in questions])
         writer.writerow(header)
@@ -57,21 +115,25 @@ class SurveyViewSet(viewsets.ModelViewSet):
             ]
             
             # Add answers for each question
+            answers = resp.get_answers()
             for question in questions:
-                try:
-                    answer_item = resp.items.get(question=question)
-                    row.append(answer_item.get_answer_display() or '')
-                except:
+                answer = answers.get(question.id)
+                if answer is None:
                     row.append('')
+                    continue
+                row.append(answer_display(
+                    question.question_type, answer.text_answer, answer.numeric_answer,
+                    option_texts.get(answer.selected_option_id)
+                ) or '')
             
             writer.writerow(row)
         
         # Log the export action
-        from survey_management.models.audit import AuditLog
-        AuditLog.objects.create(
-            user=request.user,
-            action='EXPORT',
-            details=f"Exported responses for survey: {survey.title}"
+        log_audit(
+            request.user,
+            'EXPORT',
+            f"Exported responses for survey: {survey.title}",
+            request=request
         )
         
         return response
@@ -82,7 +144,7 @@ class SurveyViewSet(viewsets.ModelViewSet):
         survey = self.get_object()
         
         # Check if user has permission to assign surveys
-        if not request.user.profile.has_permission('assign_survey'):
+        if not get_auth_context(request).has_permission('assign_survey'):
             return DRF_Response(
                 {"detail": "You do not have permission to assign surveys."},
                 status=status.HTTP_403_FORBIDDEN
@@ -97,26 +159,109 @@ class SurveyViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        # A user has at most one open response per survey, as with bulk_assign
+        open_response = Response.objects.filter(survey=survey, respondent=target_user, is_complete=False).first()
+        if open_response is not None:
+            return DRF_Response({
+                "detail": f"{target_user.username} already has an open response to this survey",
+                "response_id": open_response.id
+            })
+        
         # Create a new response object (not submitted yet)
-        response = Response.objects.create(
+        from survey_management.services.reminder_service import ReminderService
+        response = Response(
             survey=survey,
             respondent=target_user,
             is_complete=False
         )
+        reminders = ReminderService()
+        reminders.apply_policy([response], reminders.policy_for(survey))
+        try:
+            with transaction.atomic():
+                response.save()
+        except IntegrityError:
+            # The user opened a draft since the check above
+            return DRF_Response({
+                "detail": f"{target_user.username} already has an open response to this survey",
+                "response_id": Response.objects.get(survey=survey, respondent=target_user, is_complete=False).id
+            })
         
-        # Send notification (mocked)
-        from survey_management.services.notification_service import NotificationService
-        notification = NotificationService()
-        notification.send_survey_assignment(survey, target_user)
+        # Queue the notification so the request doesn't wait on delivery
+        from survey_management.services.notification_dispatcher import NotificationDispatcher
+        NotificationDispatcher().dispatch_survey_assignments(survey.id, [target_user.id])
         
         return DRF_Response({
             "detail": f"Survey assigned to {target_user.username}",
             "response_id": response.id
         })
+    
+    @action(detail=True, methods=['post'])
+    def bulk_assign(self, request, pk=None):
+        """Assign a survey to a list of users, a department or a role in the background"""
+        survey = self.get_object()
+        
+        # Check if user has permission to assign surveys
+        if not get_auth_context(request).has_permission('assign_survey'):
+            return DRF_Response(
+                {"detail": "You do not have permission to assign surveys."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = BulkAssignmentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return DRF_Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Staff can only target their own department
+        context = get_auth_context(request)
+        department = serializer.validated_data.get('department')
+        if (context.role == 'STAFF' and 
+            'user_ids' not in serializer.validated_data and 
+            (department is None or department.pk != context.department_id)):
+            return DRF_Response(
+                {"detail": "Staff can only assign surveys to their own department."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        from survey_management.services.assignment_service import AssignmentService
+        job = AssignmentService().start_job(survey, request.user, serializer.to_target())
+        
+        return DRF_Response(
+            AssignmentJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED
+        )
 
 
-class QuestionViewSet(viewsets.ModelViewSet):
-    queryset = Question.objects.all()
+class AssignmentJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for following the progress of bulk assignments
+    """
+    queryset = AssignmentJob.objects.select_related('survey', 'requested_by')
+    serializer_class = AssignmentJobSerializer
+    permission_classes = [permissions.IsAuthenticated, HasAssignmentPermission]
+    filterset_fields = ['survey', 'status']
+    
+    def get_queryset(self):
+        """Admins see every job, everyone else only the jobs they started"""
+        user = self.request.user
+        if get_auth_context(self.request).is_admin:
+            return self.queryset
+        return self.queryset.filter(requested_by=user)
+
+
+class QuestionViewSet(ReadReplicaMixin, viewsets.ModelViewSet):
+    queryset = Question.objects.prefetch_related('options')
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
     filterset_fields = ['survey', 'question_type', 'is_required']
+    
+    def get_queryset(self):
+        """Filter questions based on user role"""
+        return super().get_queryset().visible_to(get_auth_context(self.request))
+    
+    @conditional(question_validators)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional(question_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,24 @@
+from rest_framework import viewsets, permissions
+from rest_framework.response import Response as DRF_Response
+from survey_management.permissions.rbac import HasMonitoringPermission
+from survey_management.throttling import get_bucket_store, get_throttle_config
+
+class ThrottleViewSet(viewsets.ViewSet):
+    """
+    ViewSet exposing the configured throttles and the state of their token buckets
+    """
+    permission_classes = [permissions.IsAuthenticated, HasMonitoringPermission]
+    
+    def list(self, request):
+        """List configured limits and, for the local backend, every live bucket"""
+        config = get_throttle_config()
+        buckets = get_bucket_store().snapshot()
+        
+        # Clients close to their limit first
+        buckets.sort(key=lambda bucket: bucket['tokens'] / bucket['burst'] if bucket['burst'] else 0)
+        
+        return DRF_Response({
+            'backend': config['BACKEND'],
+            'rates': config['RATES'],
+            'buckets': buckets
+        })